@@ -36,12 +36,33 @@ a = Analysis(
         'google.auth',
         'threading',
         'cv2',
+        'numpy',
         'uuid',
         'requests',
         'os',
         'sys',
         'utilities.LegionData',
         'utilities.LegionRules',
+        'utilities.DiceEngine',
+        'utilities.AttackCalculator',
+        'utilities.MatchupSimulator',
+        'utilities.GameEngine',
+        'utilities.AIHeuristics',
+        'utilities.AITournament',
+        'utilities.GeminiAdvisor',
+        'utilities.GeminiCache',
+        'utilities.GeminiRouter',
+        'utilities.CameraCapture',
+        'utilities.MatchLog',
+        'utilities.MatchEvents',
+        'utilities.GameSave',
+        'utilities.TreeSync',
+        'utilities.PhasePanels',
+        'utilities.Tooltips',
+        'utilities.ArmyOptimizer',
+        'utilities.ArmyValidator',
+        'utilities.ArmyBatch',
+        'utilities.ArmyFormat',
         'utilities.LegionUtils',
         'utilities.GameCompanion',
         'utilities.CustomFactoryMenu',
@@ -0,0 +1,20 @@
+"""Shared fixtures for the engine/AI tests."""
+
+
+def make_unit(name, hp=1, minis=4, points=40, courage=1, dice=None, weapon_range=None, surge=None,
+              current_hp=None, in_play=True, **extra):
+    """
+    Minimal troop unit as used by GameEngine/AIHeuristics (one Blaster weapon).
+    in_play=False leaves out current_hp/suppression, like a unit fresh from the catalog.
+    Any further fields (rank, keyword_map, ...) can be overridden via keyword arguments.
+    """
+    unit = {
+        "name": name, "points": points, "hp": hp, "minis": minis, "courage": courage,
+        "defense": "White", "surge": surge if surge is not None else {}, "rank": "Corps", "keyword_map": {},
+        "weapons": [{"name": "Blaster", "range": list(weapon_range or [1, 3]),
+                     "dice": dice or {"red": 0, "black": 0, "white": 1}, "keyword_map": {}}],
+    }
+    if in_play:
+        unit.update({"current_hp": hp if current_hp is None else current_hp, "suppression": 0})
+    unit.update(extra)
+    return unit
@@ -0,0 +1,51 @@
+import unittest
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities import AIHeuristics
+from utilities.GameEngine import GameState, RulesEngine
+from utilities.DiceEngine import DiceEngine
+from tests.helpers import make_unit
+
+
+def make_ai_unit(name, weapon_range, hp=3, current_hp=3):
+    return make_unit(name, hp=hp, current_hp=current_hp, minis=1, points=50, weapon_range=weapon_range,
+                     dice={"red": 0, "black": 1, "white": 0})
+
+
+class TestAIHeuristics(unittest.TestCase):
+    def test_intention_steps(self):
+        self.assertEqual(AIHeuristics.intention_steps(make_ai_unit("Melee", [0, 1])), ["advance", "melee"])
+        self.assertEqual(AIHeuristics.intention_steps(make_ai_unit("Melee", [0, 1], current_hp=1)), ["take_cover", "dodge"])
+        self.assertEqual(AIHeuristics.intention_steps(make_ai_unit("Ranged", [1, 3])), ["aim", "attack_exposed"])
+        self.assertEqual(AIHeuristics.intention_steps(make_ai_unit("Ranged", [1, 3], hp=10, current_hp=2)),
+                         ["retreat", "attack_threat"])
+
+    def test_local_decision(self):
+        ranged = make_ai_unit("Ranged", [1, 4])
+        self.assertEqual(AIHeuristics.local_decision(ranged, "Nahkampf (Engaged)", "Feind-Trupp", True)[0], "Melee")
+        self.assertEqual(AIHeuristics.local_decision(ranged, "Range 3-4 (Mittel)", "Missions-Marker", True)[0], "Move")
+        self.assertEqual(AIHeuristics.local_decision(ranged, "Range 3-4 (Mittel)", "Feind-Trupp", True)[0], "Ranged")
+        self.assertEqual(AIHeuristics.local_decision(ranged, "Range 5+ (Fern)", "Feind-Trupp", False)[0], "Move")
+
+    def test_equipment_advice(self):
+        unit = {"upgrades": ["Impact-Granaten (5 Pkt)", "Gefechtsschild"]}
+        self.assertIn("Impact-Granaten", AIHeuristics.equipment_advice(unit))
+
+    def test_policies_return_engine_actions(self):
+        engine = RulesEngine(DiceEngine(seed=1))
+        state = GameState({"faction": "A", "units": [make_ai_unit("A", [1, 3])]},
+                          {"faction": "B", "units": [make_ai_unit("B", [1, 3])]})
+        unit = state.player_army["units"][0]
+        activation = {"actions": 2, "panicked": False, "suppressed": False}
+        for name, policy in AIHeuristics.HEURISTICS.items():
+            actions = policy(engine, state, unit, "Player", activation)
+            attack = [a for a in actions if isinstance(a, tuple)]
+            self.assertEqual(attack[0][1]["name"], "B", name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import unittest.mock
+import os
+import sys
+import json
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities import AITournament
+from tests.helpers import make_unit
+
+
+class TestAITournament(unittest.TestCase):
+    def setUp(self):
+        self.db = unittest.mock.MagicMock()
+        self.db.get_unit.side_effect = lambda faction, name: make_unit(
+            name, minis=3, points=45, dice={"red": 0, "black": 1, "white": 0}, surge={"attack": "hit"}, in_play=False)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(2):
+            path = os.path.join(self.tmp.name, f"army{i}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"faction": "F", "army": [{"name": "Trupp", "points": 45}, {"name": "Trupp", "points": 45}]}, f)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_armies_enriches_units(self):
+        armies = AITournament.load_armies(self.paths, self.db)
+        self.assertEqual([name for name, _ in armies], ["army0", "army1"])
+        unit = armies[0][1]["units"][0]
+        self.assertEqual((unit["current_hp"], unit["suppression"], unit["minis"]), (1, 0, 3))
+
+    def test_load_missions_default(self):
+        self.assertEqual(AITournament.load_missions([]), [("Standard", 6)])
+
+    def test_run_tournament_counts_games(self):
+        armies = AITournament.load_armies(self.paths, self.db)
+        calls = []
+        stats = AITournament.run_tournament(armies, [("Kurz", 2)], ["baseline", "intention-v1"], games=5,
+                                            workers=1, seed=3, progress=lambda d, t: calls.append(d))
+        # 2 Heuristik-Paarungen x 2 Armee-Paarungen x 5 Spiele, je Spiel eine Seite pro Heuristik
+        for name in ("baseline", "intention-v1"):
+            s = stats[name]
+            self.assertEqual(s["games"], 20)
+            self.assertEqual(s["wins"] + s["draws"] + s["losses"], 20)
+            self.assertGreater(s["decisions"], 0)
+        self.assertEqual(stats["baseline"]["wins"], stats["intention-v1"]["losses"])
+        self.assertEqual(calls, [1, 2, 3, 4])
+        self.assertIn("baseline", AITournament.format_report(stats))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities import ArmyBatch
+
+
+class FakeDB:
+    def __init__(self):
+        self.units = {"Truppler": {"name": "Truppler", "id": "troopers", "rank": "Corps", "points": 44, "minis": 4},
+                      "Offizier": {"name": "Offizier", "id": "officer", "rank": "Commander", "points": 50}}
+        self.upgrades = [{"name": "DLT-19", "id": "dlt-19", "points": 20, "adds_mini": True},
+                         {"name": "Zielfernrohr", "points": 4}]
+
+    def get_unit(self, faction, name):
+        return self.units.get(name) if faction == "Imperium" else None
+
+    def get_command_cards(self, faction):
+        return [{"name": "Ambush", "pips": 1}]
+
+    def get_unit_by_id(self, unit_id, faction=None):
+        return next((u for u in self.units.values() if u["id"] == unit_id), None)
+
+    def get_upgrade(self, name):
+        return next((u for u in self.upgrades if u["name"] == name), None)
+
+    def get_upgrade_by_id(self, upgrade_id):
+        return self.get_upgrade(upgrade_id.upper())
+
+    def get_command_card(self, key):
+        return next((c for c in self.get_command_cards(None) if c["name"] == key), None)
+
+
+def saved_army(*entries, cards=()):
+    return {"faction": "Imperium", "total_points": 0, "army": list(entries), "command_cards": list(cards)}
+
+
+def entry(name, points, upgrades=()):
+    return {"name": name, "upgrades": list(upgrades), "points": points, "base_points": points, "minis": 1}
+
+
+class TestArmyBatch(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeDB()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "Armeen")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel, data):
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+        return path
+
+    def test_reprice_and_missing(self):
+        data = saved_army(entry("Truppler", 60, ["DLT-19 (18 Pkt)", "Alt (3 Pkt)"]), entry("Weg", 70),
+                          cards=[{"name": "Ambush"}, {"name": "Gestrichen"}])
+        repriced, missing = ArmyBatch.reprice_army(data, self.db)
+        trooper = repriced["army"][0]
+        self.assertEqual(trooper["upgrades"], ["DLT-19 (20 Pkt)", "Alt (3 Pkt)"])
+        self.assertEqual((trooper["points"], trooper["minis"]), (44 + 20 + 3, 5))
+        self.assertEqual(repriced["total_points"], 67 + 70)  # unbekannte Einheit behält ihren Preis
+        self.assertEqual(missing, ["Ausrüstung: Alt (3 Pkt)", "Einheit: Weg", "Kommandokarte: Gestrichen"])
+
+    def test_check_all_report_and_export(self):
+        self.write("Imperium/a.json", saved_army(entry("Offizier", 50), *[entry("Truppler", 44)] * 3))
+        self.write("Imperium/b.json", saved_army(entry("Truppler", 40)))
+        self.write("kaputt.json", "{")
+        out = os.path.join(self.tmp.name, "Export")
+        paths = ArmyBatch.find_army_files(self.root)
+        calls = []
+        rows = ArmyBatch.check_all(paths, self.root, out, workers=1, db=self.db,
+                                   progress=lambda d, t: calls.append((d, t)))
+
+        self.assertEqual([r["path"] for r in rows], [os.path.join("Imperium", "a.json"),
+                                                     os.path.join("Imperium", "b.json"), "kaputt.json"])
+        self.assertEqual(calls[-1], (3, 3))
+        a, b, broken = rows
+        self.assertEqual((a["new_points"], a["changed"], a["missing"]), (182, 0, []))
+        self.assertEqual(a["violations"], ["Kommandokarten: 1•: 0/2 | 2•: 0/2 | 3•: 0/2 | 4•: 0/1"])
+        self.assertEqual((b["old_points"], b["new_points"], b["changed"]), (40, 44, 1))
+        self.assertIn("Mindestens 1x Kommandeur (aktuell 0)", b["violations"])
+        self.assertIsNotNone(broken["error"])
+
+        with open(os.path.join(out, "Imperium", "b.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["total_points"], 44)
+        report = ArmyBatch.format_report(rows)
+        self.assertIn("3 Listen: 0 ohne Probleme, 1 mit geänderten Punkten, 1 nicht lesbar", report)
+
+        csv_path = os.path.join(out, "bericht.csv")
+        ArmyBatch.write_csv(rows, csv_path)
+        with open(csv_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+    def test_compact_files_and_export(self):
+        self.write("kompakt.json", {"version": 2, "faction": "Imperium",
+                                    "units": [{"id": "troopers", "upgrades": ["dlt-19"]}, {"id": "weg"}],
+                                    "command_cards": ["Ambush"]})
+        self.write("alt.json", saved_army(entry("Truppler", 64, ["DLT-19 (20 Pkt)", "Zielfernrohr (4 Pkt)"])))
+        out = os.path.join(self.tmp.name, "Export")
+        rows = ArmyBatch.check_all(ArmyBatch.find_army_files(self.root), self.root, out, workers=1, db=self.db,
+                                   compact=True)
+        old, compact = rows
+        self.assertEqual((compact["new_points"], compact["missing"]), (64, ["Einheit: weg"]))
+
+        with open(os.path.join(out, "alt.json"), encoding="utf-8") as f:
+            exported = json.load(f)
+        self.assertEqual(exported["units"], [{"id": "troopers", "upgrades": ["dlt-19", {"name": "Zielfernrohr"}]}])
+
+    def test_malformed_entries_give_error_rows(self):
+        self.write("ohne_name.json", saved_army({"points": 10}))
+        self.write("upgrades_null.json", {"version": 2, "faction": "Imperium",
+                                          "units": [{"id": "troopers", "upgrades": None}]})
+        self.write("karten_text.json", saved_army(entry("Offizier", 50), cards=["Ambush"]))
+        self.write("ok.json", saved_army(entry("Offizier", 50)))
+        out = os.path.join(self.tmp.name, "Export")
+        rows = ArmyBatch.check_all(ArmyBatch.find_army_files(self.root), self.root, out, workers=1, db=self.db)
+
+        self.assertEqual([r["path"] for r in rows],
+                         ["karten_text.json", "ohne_name.json", "ok.json", "upgrades_null.json"])
+        cards, no_name, ok, null_upgrades = rows
+        self.assertIn("AttributeError", cards["error"])
+        self.assertIn("KeyError", no_name["error"])
+        self.assertIn("TypeError", null_upgrades["error"])
+        self.assertIsNone(ok["error"])
+        self.assertEqual(os.listdir(out), ["ok.json"])
+        self.assertIn("4 Listen: 0 ohne Probleme, 0 mit geänderten Punkten, 3 nicht lesbar",
+                      ArmyBatch.format_report(rows))
+
+    def test_label_points(self):
+        self.assertEqual(ArmyBatch.label_points("DLT-19 (Schwer) (20 Pkt)"), 20)
+        self.assertEqual(ArmyBatch.label_points("Ohne Preis"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import json
+import logging
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.ArmyFormat import (ARMY_VERSION, compact_army, expand_army, is_compact, load_army_file,
+                                  save_army_file, upgrade_label)
+from utilities.GameEngine import build_army
+from utilities.LegionData import LegionDatabase
+
+
+class TestArmyFormat(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+        cls.db = LegionDatabase()  # eigene Instanz, die geteilte bleibt unberührt
+        logging.disable(logging.NOTSET)
+        cls.faction = "Rebellenallianz"
+        units = list(cls.db.unit_index[cls.faction].values())
+        cls.army = []
+        for unit in units[:6]:
+            upgrades = [u for slot in unit["slots"][:2] for u in cls.db.get_valid_upgrades(slot, unit["name"], cls.faction)[:1]]
+            cls.army.append({"name": unit["name"], "upgrades": [upgrade_label(u) for u in upgrades],
+                             "points": unit["points"] + sum(u["points"] for u in upgrades),
+                             "base_points": unit["points"],
+                             "minis": unit.get("minis", 1) + sum(1 for u in upgrades if u.get("adds_mini"))})
+        cls.legacy = {"faction": cls.faction, "total_points": sum(e["points"] for e in cls.army), "army": cls.army,
+                      "command_cards": cls.db.get_command_cards(cls.faction)[:7]}
+
+    def test_round_trip(self):
+        compact = compact_army(self.legacy, self.db)
+        self.assertTrue(is_compact(compact))
+        self.assertEqual(compact["version"], ARMY_VERSION)
+        self.assertTrue(all(isinstance(ref["id"], str) for ref in compact["units"]))
+
+        expanded, missing = expand_army(json.loads(json.dumps(compact)), self.db)
+        self.assertEqual(missing, [])
+        self.assertEqual(expanded["army"], self.army)
+        self.assertEqual(expanded["total_points"], self.legacy["total_points"])
+        self.assertEqual([c["name"] for c in expanded["command_cards"]],
+                         [c["name"] for c in self.legacy["command_cards"]])
+
+    def test_files_are_smaller_and_both_formats_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            new, old = os.path.join(tmp, "neu.json"), os.path.join(tmp, "alt.json")
+            save_army_file(new, self.legacy, self.db)
+            save_army_file(old, self.legacy, self.db, compact=False)
+            self.assertLess(os.path.getsize(new) * 5, os.path.getsize(old))
+            self.assertEqual(load_army_file(new, self.db)[0]["army"], load_army_file(old, self.db)[0]["army"])
+
+    def test_compact_prices_follow_catalog(self):
+        compact = compact_army(self.legacy, self.db)
+        unit = self.db.get_unit(self.faction, self.army[0]["name"])
+        original = unit["points"]
+        try:
+            unit["points"] = original + 7
+            expanded, _ = expand_army(compact, self.db)
+        finally:
+            unit["points"] = original
+        self.assertEqual(expanded["army"][0]["points"], self.army[0]["points"] + 7)
+
+    def test_unresolved_references(self):
+        compact = {"version": ARMY_VERSION, "faction": self.faction,
+                   "units": [{"id": "gibt-es-nicht"}, {"id": self.db.get_unit(self.faction, self.army[0]["name"])["id"],
+                                                     "upgrades": ["weg", {"name": "Eigenbau"}]}],
+                   "command_cards": ["keine-karte"]}
+        expanded, missing = expand_army(compact, self.db)
+        self.assertEqual(len(expanded["army"]), 1)
+        self.assertEqual(missing[0], "Einheit: gibt-es-nicht")
+        self.assertEqual(len(missing), 4)
+
+    def test_legacy_minis_from_upgrades(self):
+        """Alte Dateien ohne Figurenzahl: Figuren aus Einheit und Ausrüstung (nicht nur Katalog)."""
+        entry = next(e for e in self.army if e["minis"] > self.db.get_unit(self.faction, e["name"]).get("minis", 1))
+        legacy = {"faction": self.faction, "army": [{k: v for k, v in entry.items() if k != "minis"}]}
+        army = build_army(legacy, self.db)
+        self.assertEqual(army["units"][0]["minis"], entry["minis"])
+        self.assertEqual(army["units"][0]["upgrades"], entry["upgrades"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import itertools
+import logging
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.ArmyOptimizer import ArmyOptimizer, WoundScore, upgrade_label
+from utilities.LegionData import LegionDatabase
+
+
+class FakeDB:
+    """Kleine Datenbank: eine Einheit, Upgrades mit Punkten und Bewertung."""
+
+    def __init__(self):
+        self.upgrades = {
+            "Heavy": [{"name": "H1", "points": 20, "value": 5}, {"name": "H2", "points": 30, "value": 6},
+                      {"name": "H3", "points": 40, "value": 4}],
+            "Gear": [{"name": "G1", "points": 5, "value": 1}, {"name": "G2", "points": 10, "value": 3}],
+        }
+        self.unit = {"name": "Trupp", "points": 50, "minis": 4, "slots": ["Heavy", "Gear", "Gear"]}
+
+    def get_valid_upgrades(self, slot, unit_name, faction):
+        return self.upgrades[slot]
+
+    def get_unit(self, faction, name):
+        return self.unit if name == "Trupp" else None
+
+
+def value_score(unit, upgrades):
+    return sum(u["value"] for u in upgrades)
+
+
+class TestArmyOptimizer(unittest.TestCase):
+    def test_frontier_matches_brute_force(self):
+        db = FakeDB()
+        opt = ArmyOptimizer(db, score=value_score)
+        front = opt.frontier(db.unit, "F")
+        self.assertEqual(front[0][:2], (0, 0))
+        self.assertEqual([c for c, _, _ in front], sorted(c for c, _, _ in front))
+
+        for budget in range(0, 60, 3):
+            best = 0
+            for h, g1, g2 in itertools.product([None] + db.upgrades["Heavy"], [None] + db.upgrades["Gear"],
+                                               [None] + db.upgrades["Gear"]):
+                chosen = [u for u in (h, g1, g2) if u]
+                if g1 and g2 and g1 is g2:
+                    continue  # dasselbe Upgrade nicht doppelt
+                if sum(u["points"] for u in chosen) <= budget:
+                    best = max(best, value_score(None, chosen))
+            self.assertEqual(opt.optimize_unit(db.unit, "F", budget)[0], best, budget)
+
+    def test_army_respects_limit(self):
+        db = FakeDB()
+        opt = ArmyOptimizer(db, score=value_score)
+        entries = [{"name": "Trupp", "upgrades": [], "points": 50, "base_points": 50, "minis": 4} for _ in range(3)]
+        result = opt.optimize_army(entries, "F", limit=200)
+        self.assertLessEqual(sum(e["points"] for e in result), 200)
+        # 50 Punkte Budget: H1+G2 (30 -> 8) plus zweimal G2 (je 10 -> 3) = 14
+        total = sum(value_score(None, [u for slot in db.upgrades.values() for u in slot
+                                       if upgrade_label(u) in e["upgrades"]]) for e in result)
+        self.assertEqual(total, 14)
+        self.assertEqual(entries[0]["upgrades"], [])  # Eingabe unverändert
+
+        with self.assertRaises(ValueError):
+            opt.optimize_army(entries, "F", limit=100)
+
+    def test_army_compares_gains_over_base_score(self):
+        # Ohne Ausrüstung schon > 0: A gewinnt mit dem Upgrade 0.1, B gewinnt 2.0
+        db = FakeDB()
+        db.units = {"A": {"name": "A", "points": 50, "slots": ["Gear"], "base": 5.0, "gain": 0.1},
+                    "B": {"name": "B", "points": 50, "slots": ["Gear"], "base": 1.0, "gain": 2.0}}
+        db.upgrades = {"Gear": [{"name": "G", "points": 10}]}
+        db.get_unit = lambda faction, name: db.units.get(name)
+
+        def score(unit, upgrades):
+            return unit["base"] + unit["gain"] * len(upgrades)
+
+        opt = ArmyOptimizer(db, score=score)
+        entries = [{"name": n, "upgrades": [], "points": 50, "base_points": 50, "minis": 1} for n in ("A", "B")]
+        result = opt.optimize_army(entries, "F", limit=110)
+        self.assertEqual([e["upgrades"] for e in result], [[], ["G (10 Pkt)"]])
+
+
+class TestArmyOptimizerDatabase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+        cls.db = LegionDatabase()  # eigene Instanz, die geteilte bleibt unberührt
+        logging.disable(logging.NOTSET)
+
+    def army(self, faction, base_points):
+        entries, points = [], 0
+        for unit in list(self.db.unit_index[faction].values()) * 4:
+            if points + unit["points"] <= base_points:
+                entries.append({"name": unit["name"], "upgrades": [], "points": unit["points"],
+                                "base_points": unit["points"], "minis": unit.get("minis", 1)})
+                points += unit["points"]
+        return entries
+
+    def test_full_lists_are_fast_and_legal(self):
+        score = WoundScore()
+        for faction in self.db.unit_index:
+            for limit, max_seconds in ((800, 1.0), (1600, 3.0)):
+                opt = ArmyOptimizer(self.db, score)
+                entries = self.army(faction, limit - 60)
+                start = time.perf_counter()
+                result = opt.optimize_army(entries, faction, limit)
+                self.assertLess(time.perf_counter() - start, max_seconds)
+                self.assertLessEqual(sum(e["points"] for e in result), limit)
+
+                # Nie schlechter als ohne Ausrüstung
+                units = [self.db.get_unit(faction, e["name"]) for e in entries]
+                bare = sum(score(u, []) for u in units)
+                by_label = {upgrade_label(u): u for u in self.db.upgrades}
+                best = sum(score(u, [by_label[label] for label in e["upgrades"]]) for u, e in zip(units, result))
+                self.assertGreaterEqual(best, bare)
+
+
+if __name__ == '__main__':
+    unittest.main()
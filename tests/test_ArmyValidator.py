@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.ArmyValidator import ArmyValidator, CommandHand, upgrade_name
+
+
+class FakeDB:
+    def __init__(self):
+        self.units = {
+            "Vader": {"name": "Vader", "id": "darth-vader", "rank": "Commander", "points": 170, "unique": True},
+            "Offizier": {"name": "Offizier", "id": "officer", "rank": "Commander", "points": 50},
+            "Truppler": {"name": "Truppler", "id": "troopers", "rank": "Corps", "points": 60},
+        }
+        self.upgrades = [{"name": "Zielfernrohr", "points": 4},
+                         {"name": "Einzigartig", "points": 5, "unique": True}]
+        self.lookups = 0
+
+    def get_unit(self, faction, name):
+        self.lookups += 1
+        return self.units.get(name)
+
+
+def entry(name, points, upgrades=()):
+    return {"name": name, "upgrades": list(upgrades), "points": points, "base_points": points, "minis": 1}
+
+
+def card(name, pips, required=()):
+    return {"name": name, "pips": pips, "required": [{"id": r} for r in required]}
+
+
+class TestArmyValidator(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeDB()
+        self.validator = ArmyValidator(self.db, "Imperium")
+
+    def test_running_totals(self):
+        army = [entry("Vader", 170), entry("Truppler", 64, ["Zielfernrohr (4 Pkt)"]),
+                entry("Truppler", 60), entry("Truppler", 60)]
+        for e in army:
+            self.validator.add_unit(e)
+        self.assertEqual(self.validator.points, 354)
+        self.assertEqual(self.validator.violations(check_hand=False), [])
+
+        lookups = self.db.lookups
+        self.validator.remove_unit(army[2])
+        self.assertEqual(self.db.lookups, lookups)  # Entfernen ohne erneute Suche
+        self.assertEqual(self.validator.violations(check_hand=False), ["Mindestens 3x Korps (aktuell 2)"])
+
+    def test_limits_unique_and_preview(self):
+        for _ in range(3):
+            self.validator.add_unit(entry("Offizier", 300, ["Einzigartig (5 Pkt)"]))
+        problems = self.validator.violations(check_hand=False)
+        self.assertIn("Punkte: 900 / 800", problems)
+        self.assertIn("Höchstens 2x Kommandeur (aktuell 3)", problems)
+        self.assertIn("Ausrüstung 'Einzigartig' ist einzigartig (3x)", problems)
+
+        self.validator.reset("Imperium")
+        self.validator.add_unit(entry("Vader", 170))
+        self.assertEqual(self.validator.preview(entry("Vader", 170)), ["Einheit 'Vader' ist einzigartig (2x)"])
+        self.assertEqual(self.validator.points, 170)  # preview ändert die Summen nicht
+
+    def test_command_cards(self):
+        vader_card = card("Implacable", 1, ["darth-vader"])
+        self.assertFalse(self.validator.card_allowed(vader_card))
+        vader = entry("Vader", 170)
+        self.validator.add_unit(vader)
+        self.assertTrue(self.validator.card_allowed(vader_card))
+        self.assertTrue(self.validator.card_allowed(card("Ambush", 1)))
+
+        self.validator.hand = CommandHand([vader_card])
+        self.validator.remove_unit(vader)
+        self.assertIn("Kommandokarte 'Implacable' ohne passende Einheit", self.validator.violations())
+
+    def test_hand(self):
+        hand = CommandHand()
+        for i, pips in enumerate([1, 1, 2, 2, 3, 3, 4]):
+            self.assertTrue(hand.can_add(card(f"K{i}", pips)))
+            hand.add(card(f"K{i}", pips))
+        self.assertTrue(hand.is_valid)
+        self.assertFalse(hand.can_add(card("Noch eine", 1)))
+        hand.remove("K6")
+        self.assertFalse(hand.is_valid)
+        self.assertFalse(hand.can_add(card("K0", 4)))  # Name schon in der Hand
+        self.assertEqual(hand.status_text(), "1•: 2/2 | 2•: 2/2 | 3•: 2/2 | 4•: 0/1")
+
+    def test_upgrade_name(self):
+        self.assertEqual(upgrade_name("DLT-19 (Schwer) (24 Pkt)"), "DLT-19 (Schwer)")
+        self.assertEqual(upgrade_name("Ohne Punkte"), "Ohne Punkte")
+
+
+if __name__ == '__main__':
+    unittest.main()
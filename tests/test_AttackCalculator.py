@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.AttackCalculator import calculate_attack, AttackOutcome
+from utilities.DiceEngine import DiceEngine
+
+class TestAttackCalculator(unittest.TestCase):
+    def test_single_red_die(self):
+        """1 red die vs white defense: P(wound) = 7/8 * 5/6."""
+        outcome = calculate_attack({"red": 1})
+        self.assertAlmostEqual(outcome.chance_at_least(1), 7 / 8 * 5 / 6)
+        self.assertAlmostEqual(sum(outcome.wounds), 1.0)
+        # Suppression +1 if any hit/crit was rolled
+        self.assertAlmostEqual(outcome.expected_suppression, 7 / 8)
+
+    def test_surge_conversion(self):
+        """Surge to hit makes every red die a hit."""
+        outcome = calculate_attack({"red": 2}, attack_surge="hit", defense_die="Red", defense_surge=True)
+        # Every die hits, red defense with surge blocks 4/6
+        self.assertAlmostEqual(outcome.expected_wounds, 2 * 2 / 6)
+
+    def test_cover_and_blast(self):
+        """Cover cancels hits but not crits; Blast ignores cover."""
+        covered = calculate_attack({"red": 3}, cover=2)
+        blast = calculate_attack({"red": 3}, keywords={"Blast": 1}, cover=2)
+        self.assertLess(covered.expected_wounds, blast.expected_wounds)
+        self.assertAlmostEqual(blast.expected_wounds, calculate_attack({"red": 3}).expected_wounds)
+
+    def test_pierce_and_immunity(self):
+        base = calculate_attack({"black": 4}, defense_die="Red")
+        pierce = calculate_attack({"black": 4}, keywords={"Pierce": 2}, defense_die="Red")
+        immune = calculate_attack({"black": 4}, keywords={"Pierce": 2}, defense_die="Red",
+                                  target_keywords={"Immune: Pierce": 1})
+        self.assertGreater(pierce.expected_wounds, base.expected_wounds)
+        self.assertAlmostEqual(immune.expected_wounds, base.expected_wounds)
+
+    def test_impact_needs_armor(self):
+        no_armor = calculate_attack({"red": 2}, keywords={"Impact": 2}, cover=1)
+        armor = calculate_attack({"red": 2}, keywords={"Impact": 2}, cover=1, target_keywords={"Armor": 1})
+        self.assertGreater(armor.expected_wounds, no_armor.expected_wounds)
+
+    def test_dodge_and_high_velocity(self):
+        dodged = calculate_attack({"red": 3}, dodges=2)
+        hv = calculate_attack({"red": 3}, keywords={"High Velocity": 1}, dodges=2)
+        self.assertLess(dodged.expected_wounds, hv.expected_wounds)
+
+    def test_suppressive(self):
+        outcome = calculate_attack({"white": 1}, keywords={"Suppressive": 1})
+        self.assertAlmostEqual(outcome.suppression[0], 0.0)
+        self.assertAlmostEqual(outcome.suppression[1], 6 / 8)
+        self.assertAlmostEqual(outcome.suppression[2], 2 / 8)
+
+    def test_empty_pool(self):
+        outcome = calculate_attack({"red": 0})
+        self.assertEqual(outcome.wounds, [1.0])
+        self.assertEqual(outcome.expected_wounds, 0.0)
+
+    def test_percentile(self):
+        outcome = AttackOutcome([0.2, 0.5, 0.3], [1.0])
+        self.assertEqual(outcome.percentile(0.1), 0)
+        self.assertEqual(outcome.percentile(0.5), 1)
+        self.assertEqual(outcome.percentile(0.9), 2)
+
+    def test_aim_matches_simulation(self):
+        """Aim/Precise rerolls agree with a simulated roll of the same pipeline."""
+        pool = {"black": 4, "white": 2}
+        exact = calculate_attack(pool, keywords={"Precise": 1}, aims=1)
+        plain = calculate_attack(pool)
+        self.assertGreater(exact.expected_wounds, plain.expected_wounds)
+
+        engine = DiceEngine(seed=11)
+        n = 20000
+        total = 0
+        for _ in range(n // 1000):
+            for _ in range(1000):
+                r = engine.roll_attack(pool)
+                k = min(r["blank"] + r["surge"], 3)
+                from_blank = min(r["blank"], k)
+                r["blank"] -= from_blank
+                r["surge"] -= k - from_blank
+                for face, c in engine.reroll_attack(pool, k).items():
+                    r[face] += c
+                hits = r["hit"] + r["crit"]
+                total += hits - engine.roll_defense("white", hits)["block"]
+        self.assertAlmostEqual(total / n, exact.expected_wounds, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
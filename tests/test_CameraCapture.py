@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.CameraCapture import CameraCapture, SyntheticSource
+
+
+class TestCameraCapture(unittest.TestCase):
+    def make(self, source=None):
+        camera = CameraCapture(source or SyntheticSource(320, 240), interval=0.005, warmup=2)
+        self.addCleanup(camera.stop)
+        return camera
+
+    def test_latest_frame_from_memory(self):
+        source = SyntheticSource(320, 240)
+        camera = self.make(source).start()
+        first = camera.latest_frame()
+        self.assertEqual(first.shape, (240, 320, 3))
+        time.sleep(0.05)
+        second = camera.latest_frame()
+        # The thread keeps reading, so a newer frame replaces the old one
+        self.assertGreater(source.frames, 3)
+        self.assertFalse((first == second).all())
+        self.assertLess(camera.frame_age, 1.0)
+
+    def test_pil_is_rgb_and_downscaled(self):
+        camera = self.make()
+        image = camera.get_pil(max_size=(160, 160))
+        self.assertEqual(image.mode, "RGB")
+        self.assertEqual(image.size, (160, 120))
+        # Blue gradient in BGR must end up in the blue channel
+        self.assertGreater(image.getpixel((159, 119))[2], 200)
+
+    def test_jpeg_bytes(self):
+        data = self.make().get_jpeg(max_size=(64, 64), quality=70)
+        self.assertTrue(data.startswith(b"\xff\xd8"))
+
+    def test_failed_device(self):
+        camera = self.make(SyntheticSource(fail_open=True))
+        self.assertIsNone(camera.get_pil(timeout=1.0))
+        self.assertTrue(camera.failed)
+
+    def test_stop_releases_thread(self):
+        camera = self.make().start()
+        camera.latest_frame()
+        camera.stop()
+        self.assertFalse(camera.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
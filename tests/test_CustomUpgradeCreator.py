@@ -31,10 +31,11 @@ class TestCustomUpgradeCreator(unittest.TestCase):
         # For unit test purposes, we verify the load_data method works
         self.assertIsInstance(self.creator.upgrades_data, list)
 
+    @patch('utilities.CustomUpgradeCreator.LegionDatabase.invalidate_shared')
     @patch('utilities.CustomUpgradeCreator.json.dump')
     @patch('builtins.open', new_callable=mock_open)
     @patch('utilities.CustomUpgradeCreator.messagebox')
-    def test_save_data(self, mock_msg, mock_file, mock_json_dump):
+    def test_save_data(self, mock_msg, mock_file, mock_json_dump, mock_invalidate):
         """Test saving data completely."""
         self.creator.upgrades_data = [{"id": "2", "name": "New Upgrade"}]
         self.creator.save_data()
@@ -44,6 +45,21 @@ class TestCustomUpgradeCreator(unittest.TestCase):
         args, _ = mock_json_dump.call_args
         self.assertEqual(args[0], [{"id": "2", "name": "New Upgrade"}])
         mock_msg.showinfo.assert_called()
+        mock_invalidate.assert_called_once()
+
+    @patch('utilities.CustomUpgradeCreator.LegionDatabase.shared_upgrade_added')
+    @patch('utilities.CustomUpgradeCreator.LegionDatabase.invalidate_shared')
+    @patch('utilities.CustomUpgradeCreator.json.dump')
+    @patch('builtins.open', new_callable=mock_open)
+    @patch('utilities.CustomUpgradeCreator.messagebox')
+    def test_save_data_new_upgrade(self, mock_msg, mock_file, mock_json_dump, mock_invalidate, mock_added):
+        """A new upgrade is added incrementally instead of reloading the database."""
+        entry = {"id": "3", "name": "Brand New", "type": "Gear"}
+        self.creator.upgrades_data = [entry]
+        self.creator.save_data(new_upgrade=entry)
+
+        mock_added.assert_called_once_with(entry)
+        mock_invalidate.assert_not_called()
 
 if __name__ == '__main__':
     unittest.main()
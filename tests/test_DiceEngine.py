@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.DiceEngine import DiceEngine, face_probabilities, ATTACK_RESULTS
+
+class TestDiceEngine(unittest.TestCase):
+    def test_face_probabilities_match_rules(self):
+        """Face probabilities follow LegionRules.DICE_FACES."""
+        red = face_probabilities("red", "attack")
+        self.assertAlmostEqual(red[ATTACK_RESULTS.index("hit")], 6 / 8)
+        self.assertAlmostEqual(red.sum(), 1.0)
+        white_def = face_probabilities("white", "defense")
+        self.assertAlmostEqual(white_def[0], 1 / 6)
+
+    def test_unknown_die(self):
+        with self.assertRaises(ValueError):
+            face_probabilities("green", "attack")
+
+    def test_seed_is_reproducible(self):
+        """Same seed, same rolls."""
+        pool = {"red": 2, "black": 3, "white": 4}
+        a = DiceEngine(seed=42)
+        b = DiceEngine(seed=42)
+        self.assertEqual([a.roll_attack(pool) for _ in range(5)], [b.roll_attack(pool) for _ in range(5)])
+        self.assertEqual(a.roll_panic(10), b.roll_panic(10))
+
+    def test_roll_attack_counts(self):
+        """Single rolls return one result per die."""
+        engine = DiceEngine(seed=1)
+        result = engine.roll_attack({"red": 2, "black": 1, "white": 3})
+        self.assertEqual(sum(result.values()), 6)
+        self.assertEqual(set(result), {"crit", "hit", "surge", "blank"})
+        self.assertEqual(sum(engine.reroll_attack({"black": 2}, 3).values()), 3)
+        self.assertEqual(sum(engine.reroll_attack({}, 2).values()), 2)
+
+    def test_roll_defense(self):
+        engine = DiceEngine(seed=1)
+        result = engine.roll_defense("red", 5)
+        self.assertEqual(sum(result.values()), 5)
+        self.assertEqual(engine.roll_defense("white", 0), {"block": 0, "surge": 0, "blank": 0})
+
+    def test_batch_statistics(self):
+        """Batch means converge to the face probabilities."""
+        engine = DiceEngine(seed=7)
+        counts = engine.roll_attack_batch({"red": 4}, 200000)
+        self.assertEqual(counts.shape, (200000, 4))
+        self.assertTrue((counts.sum(axis=1) == 4).all())
+        mean_hits = counts[:, ATTACK_RESULTS.index("hit")].mean()
+        self.assertAlmostEqual(mean_hits, 4 * 6 / 8, places=2)
+
+    def test_defense_batch_variable_dice(self):
+        engine = DiceEngine(seed=3)
+        dice = np.array([0, 1, 5, 10])
+        counts = engine.roll_defense_batch("white", dice)
+        self.assertEqual(counts.sum(axis=1).tolist(), dice.tolist())
+
+    def test_panic_and_rally_bounds(self):
+        engine = DiceEngine(seed=5)
+        self.assertEqual(engine.roll_panic(0), 0)
+        self.assertLessEqual(engine.roll_panic(4), 4)
+        self.assertLessEqual(engine.roll_rally(3), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
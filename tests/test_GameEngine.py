@@ -0,0 +1,121 @@
+import unittest
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.GameEngine import GameState, RulesEngine, AttackResult, courage_value
+from utilities.DiceEngine import DiceEngine
+from utilities.LegionRules import LegionRules
+from tests.helpers import make_unit
+
+
+class TestRulesEngineKeywords(unittest.TestCase):
+    def test_get_keyword_map_prefers_parsed(self):
+        """A stored keyword_map is returned without re-parsing."""
+        engine = RulesEngine(DiceEngine(seed=1))
+        unit = {"info": "Durchschlagen 1", "keyword_map": {"Pierce": 1}}
+        self.assertIs(engine.get_keyword_map(unit), unit["keyword_map"])
+
+    def test_get_keyword_map_fallback(self):
+        """Units without keyword_map are parsed from info once."""
+        engine = RulesEngine(DiceEngine(seed=1), LegionRules)
+        unit = {"info": "Panzerung, Immunität: Durchschlagen, Taktisch 2"}
+
+        kw_map = engine.get_keyword_map(unit)
+        self.assertEqual(kw_map, {"Armor": 0, "Immune: Pierce": 1, "Tactical": 2})
+        self.assertIs(unit["keyword_map"], kw_map)
+
+
+class TestRulesEngineSteps(unittest.TestCase):
+    def setUp(self):
+        self.engine = RulesEngine(DiceEngine(seed=7))
+        self.state = GameState({"faction": "A", "units": [make_unit("A1"), make_unit("A2")]},
+                               {"faction": "B", "units": [make_unit("B1")]}, max_rounds=2)
+
+    def test_courage_value(self):
+        self.assertEqual(courage_value({"courage": "-"}), 1)
+        self.assertEqual(courage_value({"courage": "2"}), 2)
+
+    def test_order_pool_and_draw(self):
+        self.state.player_army["units"][0]["order_token"] = True
+        pool = self.engine.create_order_pool(self.state)
+        self.assertEqual(sorted(t["unit"]["name"] for t in pool), ["A2", "B1"])
+
+        token = self.engine.draw_order(self.state, "Opponent")
+        self.assertEqual(token["unit"]["name"], "B1")
+        self.assertIsNone(self.engine.draw_order(self.state, "Opponent"))
+
+    def test_turn_order_and_end_phase(self):
+        self.state.active_turn_player = "Player"
+        for u in self.state.opponent_army["units"]:
+            self.engine.activate_unit(self.state, u)
+        # Opponent is done, so the player keeps the turn
+        self.assertEqual(self.engine.next_turn(self.state), "Player")
+        for u in self.state.player_army["units"]:
+            self.engine.activate_unit(self.state, u)
+        self.assertIsNone(self.engine.next_turn(self.state))
+
+        unit = self.state.player_army["units"][0]
+        unit.update(aim=2, suppression=2)
+        self.state.round_number = 1
+        self.assertFalse(self.engine.end_phase(self.state))
+        self.assertEqual((unit["aim"], unit["suppression"], unit["activated"]), (0, 1, False))
+        self.assertEqual(self.state.round_number, 2)
+        self.assertTrue(self.engine.end_phase(self.state))
+
+    def test_suppression_reduces_white_first(self):
+        pool, removed = self.engine.apply_suppression_to_pool({"red": 1, "black": 1, "white": 1},
+                                                              {"suppression": 5})
+        self.assertEqual(removed, 2)
+        self.assertEqual(pool, {"red": 1, "black": 0, "white": 0})
+
+    def test_panic_test_without_excess(self):
+        unit = {"courage": 2, "suppression": 2}
+        panic = self.engine.panic_test(unit)
+        self.assertEqual((panic["dice"], panic["blanks"], panic["state"]), (0, 0, None))
+        self.assertNotIn("panic_state", unit)
+
+    def test_apply_damage_overflow(self):
+        target = make_unit("Target", hp=2, minis=3, points=60)
+        lost, points = RulesEngine.apply_damage(target, 5)
+        self.assertEqual((lost, points), (2, 40))
+        self.assertEqual((target["minis"], target["current_hp"]), (1, 1))
+
+    def test_apply_attack_scores_and_removes(self):
+        attacker = self.state.player_army["units"][0]
+        target = self.state.opponent_army["units"][0]
+        result = AttackResult()
+        result.wounds, result.suppression = 4, 1
+
+        applied = self.engine.apply_attack(self.state, attacker, target, result)
+        self.assertTrue(applied["destroyed"])
+        self.assertEqual(self.state.player_score, 40)
+        self.assertEqual(self.state.opponent_army["units"], [])
+
+    def test_resolve_attack_is_seeded(self):
+        attacker = make_unit("A", dice={"red": 2, "black": 0, "white": 0}, surge={"attack": "hit"})
+        target = make_unit("T", hp=3, minis=1)
+        a = RulesEngine(DiceEngine(seed=3)).resolve_attack(attacker, attacker["weapons"], target, aims=1)
+        b = RulesEngine(DiceEngine(seed=3)).resolve_attack(attacker, attacker["weapons"], target, aims=1)
+        self.assertEqual((a.results, a.wounds, a.log), (b.results, b.wounds, b.log))
+        self.assertEqual(a.suppression, 1 if a.total_hits > 0 else 0)
+        self.assertIn("Basis-Würfelpool", a.log)
+
+
+class TestHeadlessGame(unittest.TestCase):
+    def test_play_game(self):
+        engine = RulesEngine(DiceEngine(seed=11))
+        results = set()
+        for _ in range(20):
+            state = GameState({"faction": "A", "units": [make_unit("A1"), make_unit("A2")]},
+                              {"faction": "B", "units": [make_unit("B1"), make_unit("B2")]}, max_rounds=3)
+            results.add(engine.play_game(state))
+            self.assertLessEqual(state.round_number, 3)
+            self.assertTrue(all(u["minis"] > 0 for u in state.player_army["units"] + state.opponent_army["units"]))
+        self.assertTrue(results <= {"Player", "Opponent", "Draw"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.GameSave import GameSaver, load_game, write_snapshot, journal_path
+from utilities.GameEngine import GameState, RulesEngine
+from utilities.DiceEngine import DiceEngine
+from tests.helpers import make_unit
+
+
+RED_BLASTER = {"dice": {"red": 2, "black": 0, "white": 0}, "surge": {"attack": "hit"}}
+
+
+def make_state():
+    return GameState({"faction": "A", "units": [make_unit("A1", **RED_BLASTER), make_unit("A2", **RED_BLASTER)]},
+                     {"faction": "B", "units": [make_unit("B1", minis=2, **RED_BLASTER)],
+                      "command_cards": [{"name": "Ambush"}]},
+                     max_rounds=3)
+
+
+def comparable(state, extra=None):
+    """Vergleichbare Darstellung (JSON-normalisiert, Pool über die IDs)."""
+    return json.loads(json.dumps({
+        "state": {f: getattr(state, f) for f in ("round_number", "current_phase", "active_turn_player",
+                                                  "player_score", "opponent_score", "max_rounds")},
+        "armies": [state.player_army, state.opponent_army],
+        "pool": [[t["unit"]["uid"], t["side"]] for t in state.order_pool],
+        "extra": extra}))
+
+
+class TestGameSave(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "autosave.lsave")
+
+    def play_round(self, state, engine, saver, extra):
+        """Aktivierungen mit Checkpoint nach jeder Aktivierung."""
+        engine.start_command_phase(state)
+        saver.save(state, extra)
+        engine.create_order_pool(state)
+        engine.start_activation_phase(state)
+        saver.checkpoint(state, extra)
+        while True:
+            token = engine.draw_order(state)
+            if not token:
+                break
+            unit = token["unit"]
+            activation = engine.activate_unit(state, unit)
+            target = state.units("Opponent")[0] if state.units("Opponent") else None
+            if target is not None and state.side_of(unit) == "Player":
+                result = engine.resolve_attack(unit, unit["weapons"], target, aims=1)
+                engine.apply_attack(state, unit, target, result, aims_used=1)
+            engine.end_activation(state, unit, activation["panicked"])
+            extra["player_discard"].append({"name": f"Karte {len(extra['player_discard'])}"})
+            saver.checkpoint(state, extra)
+
+    def test_resume_matches_live_state(self):
+        state, extra = make_state(), {"player_hand": [], "player_discard": []}
+        engine = RulesEngine(DiceEngine(seed=7))
+        saver = GameSaver(self.path, compact_after=100)
+        self.addCleanup(saver.close)
+
+        self.play_round(state, engine, saver, extra)
+        state.player_score = 12
+        saver.checkpoint(state, extra)
+        saver.flush()
+
+        loaded, loaded_extra = load_game(self.path)
+        self.assertEqual(comparable(loaded, loaded_extra), comparable(state, extra))
+        self.assertGreater(saver.checkpoints, 1)
+        # Pool-Einträge verweisen auf die geladenen Einheiten selbst
+        for token in loaded.order_pool:
+            self.assertTrue(any(u is token["unit"] for u in loaded.units(token["side"])))
+
+    def test_checkpoint_is_small_delta(self):
+        state = make_state()
+        saver = GameSaver(self.path)
+        self.addCleanup(saver.close)
+        saver.save(state, {"player_hand": [{"name": "Ambush"}]})
+        self.assertIsNone(saver.checkpoint(state, {"player_hand": [{"name": "Ambush"}]}))
+
+        state.units("Player")[0]["suppression"] = 2
+        line = saver.checkpoint(state, {"player_hand": [{"name": "Ambush"}]})
+        delta = json.loads(line)
+        self.assertEqual(delta["units"], {"P1": {"suppression": 2}})
+        self.assertNotIn("extra", delta)
+        self.assertNotIn("weapons", line)
+
+    def test_compaction_and_stale_journal(self):
+        state = make_state()
+        saver = GameSaver(self.path, compact_after=2)
+        self.addCleanup(saver.close)
+        saver.save(state)
+        for i in range(3):
+            state.opponent_score = i + 1
+            saver.checkpoint(state)
+        saver.flush()
+        self.assertEqual(saver.generation, 2)
+        self.assertEqual(load_game(self.path)[0].opponent_score, 3)
+
+        # Neuer Basis-Snapshot ohne Journal-Reset: alte Journal-Zeilen gelten nicht mehr
+        state.opponent_score = 0
+        write_snapshot(self.path, state, generation=99)
+        self.assertEqual(load_game(self.path)[0].opponent_score, 0)
+
+    def test_removed_unit_and_truncated_journal(self):
+        state = make_state()
+        saver = GameSaver(self.path)
+        saver.save(state)
+        state.opponent_army["units"].clear()
+        saver.checkpoint(state)
+        saver.close()
+        with open(journal_path(self.path), "a", encoding="utf-8") as f:
+            f.write('{"gen": 1, "seq": 9, "state": {"round')
+
+        loaded, _ = load_game(self.path)
+        self.assertEqual(loaded.units("Opponent"), [])
+        self.assertEqual(loaded.opponent_army["command_cards"], [{"name": "Ambush"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
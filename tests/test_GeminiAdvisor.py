@@ -0,0 +1,119 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.GeminiAdvisor import (GeminiAdvisor, build_decision_prompt, shared_image,
+                                     DONE, FAILED, CANCELLED, TIMEOUT)
+
+
+class FakeRoot:
+    """Minimal stand-in for the Tk root: collects after() calls and runs them on pump()."""
+
+    def __init__(self):
+        self.calls = []
+        self.thread = threading.current_thread()
+
+    def after(self, ms, func):
+        self.calls.append(func)
+
+    def pump(self, timeout=2.0):
+        end = time.monotonic() + timeout
+        while self.calls and time.monotonic() < end:
+            calls, self.calls = self.calls, []
+            for func in calls:
+                assert threading.current_thread() is self.thread
+                func()
+            time.sleep(0.005)
+
+
+class StubBackend:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.prompts = []
+        self.release = threading.Event()
+
+    def generate(self, prompt, image=None):
+        self.prompts.append((prompt, image))
+        if self.delay:
+            self.release.wait(self.delay)
+        if self.fail:
+            raise RuntimeError("kaputt")
+        return f"PLAN: [Angriff] {prompt}"
+
+
+class TestGeminiAdvisor(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+
+    def make(self, backend, **kwargs):
+        advisor = GeminiAdvisor(self.root, backend=backend, poll_ms=1, **kwargs)
+        self.addCleanup(advisor.shutdown)
+        return advisor
+
+    def test_result_delivered_on_tk_thread(self):
+        results = []
+        advisor = self.make(StubBackend())
+        request = advisor.submit("Hallo", results.append)
+        self.root.pump()
+        self.assertEqual(results, ["PLAN: [Angriff] Hallo"])
+        self.assertEqual(request.status, DONE)
+
+    def test_errors_become_text(self):
+        results = []
+        advisor = self.make(StubBackend(fail=True))
+        request = advisor.submit("x", results.append)
+        self.root.pump()
+        self.assertEqual(request.status, FAILED)
+        self.assertTrue(results[0].startswith("Gemini Error:"))
+
+    def test_prefetch_is_reused(self):
+        backend = StubBackend()
+        advisor = self.make(backend)
+        advisor.prefetch("unit-1", "Prompt A", image_provider=lambda: "bild")
+        self.root.pump()
+
+        results = []
+        advisor.submit("Prompt A", results.append, key="unit-1")
+        self.root.pump()
+        self.assertEqual(results, ["PLAN: [Angriff] Prompt A"])
+        self.assertEqual(backend.prompts, [("Prompt A", "bild")])
+
+    def test_timeout_and_cancel(self):
+        backend = StubBackend(delay=5)
+        self.addCleanup(backend.release.set)
+        advisor = self.make(backend, timeout=0.05)
+
+        results = []
+        slow = advisor.submit("langsam", results.append, key="a")
+        cancelled = advisor.submit("egal", results.append, key="b")
+        cancelled.cancel()
+        self.root.pump()
+
+        self.assertEqual(slow.status, TIMEOUT)
+        self.assertEqual(cancelled.status, CANCELLED)
+        self.assertEqual(len(results), 1)
+        self.assertIn("Zeitüberschreitung", results[0])
+
+    def test_shared_image_captured_once(self):
+        calls = []
+        get = shared_image(lambda: calls.append(1) or "frame")
+        self.assertEqual((get(), get()), ("frame", "frame"))
+        self.assertEqual(len(calls), 1)
+
+    def test_build_decision_prompt(self):
+        unit = {"name": "Sturmtruppen", "current_hp": 1, "hp": 1, "upgrades": ["Granaten"],
+                "weapons": [{"name": "E-11", "range": [1, 3]}]}
+        prompt = build_decision_prompt(unit, "Runde: 2")
+        self.assertIn("Sturmtruppen", prompt)
+        self.assertIn("E-11 (Range [1, 3])", prompt)
+        self.assertIn("Runde: 2", prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+from PIL import Image
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.GeminiCache import GeminiCache, cache_key, normalize_prompt
+from utilities.GeminiRouter import GeminiBackend, ModelRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubClient:
+    """Local stand-in for genai.Client: answers per model, optionally offline."""
+
+    def __init__(self):
+        self.calls = []
+        self.offline = False
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, model, contents):
+        self.calls.append(model)
+        if self.offline:
+            raise ConnectionError("offline")
+        return SimpleNamespace(text=f"Antwort von {model}")
+
+
+class TestGeminiCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "gemini_cache.json")
+        self.clock = FakeClock()
+
+    def make(self, **kwargs):
+        return GeminiCache(self.path, clock=self.clock, **kwargs)
+
+    def test_key_normalizes_whitespace(self):
+        self.assertEqual(normalize_prompt("  Plan:\n\t Angriff  "), "Plan: Angriff")
+        self.assertEqual(cache_key("a  b\n", "m"), cache_key("a b", "m"))
+        self.assertNotEqual(cache_key("a b", "m1"), cache_key("a b", "m2"))
+
+    def test_key_includes_image(self):
+        red = Image.new("RGB", (4, 4), "red")
+        blue = Image.new("RGB", (4, 4), "blue")
+        self.assertEqual(cache_key("p", "m", red), cache_key("p", "m", red.copy()))
+        self.assertNotEqual(cache_key("p", "m", red), cache_key("p", "m", blue))
+        self.assertNotEqual(cache_key("p", "m", red), cache_key("p", "m"))
+
+    def test_hit_miss_and_persistence(self):
+        cache = self.make()
+        self.assertIsNone(cache.get("Prompt", "m"))
+        cache.put("Prompt", "m", "Antwort")
+        self.assertEqual(cache.get("Prompt", "m"), "Antwort")
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (1, 1))
+
+        reloaded = self.make()
+        self.assertEqual(reloaded.lookup("Prompt", ["x", "m"]), ("m", "Antwort"))
+
+    def test_lookup_counts_once_per_call(self):
+        cache = self.make()
+        image = Image.new("RGB", (4, 4), "red")
+        self.assertEqual(cache.lookup("Prompt", ["m1", "m2", "m3"], image), (None, None))
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (0, 1))
+
+        cache.put("Prompt", "m3", "Antwort", image)
+        self.assertEqual(cache.lookup("Prompt", ["m1", "m2", "m3"], image.copy()), ("m3", "Antwort"))
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (1, 1))
+
+    def test_ttl_expiry(self):
+        cache = self.make(ttl=60)
+        cache.put("Prompt", "m", "Antwort")
+        self.clock.now += 61
+        self.assertIsNone(cache.get("Prompt", "m"))
+        self.assertEqual(cache.stats["expired"], 1)
+
+    def test_lru_eviction(self):
+        cache = self.make(max_entries=2)
+        cache.put("a", "m", "1")
+        self.clock.now += 1
+        cache.put("b", "m", "2")
+        self.clock.now += 1
+        cache.get("a", "m")  # a is now more recent than b
+        self.clock.now += 1
+        cache.put("c", "m", "3")
+        self.assertIsNone(cache.get("b", "m"))
+        self.assertEqual(cache.get("a", "m"), "1")
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    def test_size_cap(self):
+        cache = self.make(max_bytes=10)
+        cache.put("a", "m", "12345")
+        self.clock.now += 1
+        cache.put("b", "m", "1234567")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("b", "m"), "1234567")
+
+    def test_backend_uses_cache_offline(self):
+        client = StubClient()
+        backend = GeminiBackend("key", models=["m1", "m2"], cache=self.make(), client=client,
+                                router=ModelRouter(persist=False))
+        self.assertEqual(backend.generate("Zug  planen"), "Antwort von m1")
+
+        client.offline = True
+        self.assertEqual(backend.generate("Zug planen"), "Antwort von m1")
+        self.assertEqual(client.calls, ["m1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
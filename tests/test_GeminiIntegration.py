@@ -64,10 +64,11 @@ class TestGeminiAvailability(unittest.TestCase):
         """Test that GEMINI constants are defined in MissionBuilder module."""
         # Import only the constants, not the class
         try:
-            from utilities import MissionBuilder
+            from utilities import MissionBuilder, GeminiRouter
             self.assertTrue(hasattr(MissionBuilder, 'GEMINI_AVAILABLE'))
-            self.assertTrue(hasattr(MissionBuilder, 'GEMINI_VERSION'))
-            self.assertIn(MissionBuilder.GEMINI_VERSION, [0, 1, 2])
+            # SDK-Erkennung liegt im GeminiRouter
+            self.assertEqual(MissionBuilder.GEMINI_AVAILABLE, GeminiRouter.GEMINI_AVAILABLE)
+            self.assertIn(GeminiRouter.GEMINI_VERSION, [0, 1, 2])
         except ImportError:
             # If module can't be imported, skip this test
             self.skipTest("MissionBuilder module has import dependencies")
@@ -0,0 +1,97 @@
+import unittest
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.GeminiRouter import ModelRouter, GeminiBackend, FAILURE_THRESHOLD, BASE_COOLDOWN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubClient:
+    """Local stand-in for genai.Client with per-model failures."""
+
+    def __init__(self, broken=()):
+        self.broken = dict(broken)
+        self.calls = []
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, model, contents):
+        self.calls.append(model)
+        if model in self.broken:
+            raise RuntimeError(self.broken[model])
+        return SimpleNamespace(text=f"Antwort von {model}")
+
+
+class TestModelRouter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.router = ModelRouter(persist=False, clock=self.clock)
+
+    def test_last_good_then_fastest(self):
+        self.router.record_success("b", 2.0)
+        self.router.record_success("c", 0.5)
+        self.assertEqual(self.router.order(["a", "b", "c"]), ["c", "b", "a"])
+        self.router.record_success("b", 2.0)
+        self.assertEqual(self.router.order(["a", "b", "c"]), ["b", "c", "a"])
+
+    def test_breaker_opens_and_half_opens(self):
+        for _ in range(FAILURE_THRESHOLD):
+            self.router.record_failure("a", TimeoutError("timeout"))
+        self.assertTrue(self.router.is_open("a"))
+        self.assertEqual(self.router.order(["a", "b"]), ["b"])
+
+        self.clock.now += BASE_COOLDOWN + 1
+        self.assertEqual(self.router.order(["a", "b"]), ["a", "b"])
+        # A failure while half-open trips again with a longer cooldown
+        self.router.record_failure("a", TimeoutError("timeout"))
+        self.clock.now += BASE_COOLDOWN + 1
+        self.assertTrue(self.router.is_open("a"))
+
+    def test_missing_model_opens_immediately(self):
+        self.router.record_failure("alt", RuntimeError("404 NOT_FOUND"))
+        self.assertTrue(self.router.is_open("alt"))
+
+    def test_all_open_still_returns_models(self):
+        self.router.record_failure("a", RuntimeError("404"))
+        self.clock.now += 1
+        self.router.record_failure("b", RuntimeError("404"))
+        self.assertEqual(self.router.order(["b", "a"]), ["a", "b"])
+
+    def test_state_persists(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "models.json")
+            ModelRouter(path).record_success("m2", 1.0)
+            reloaded = ModelRouter(path)
+        self.assertEqual(reloaded.last_good, "m2")
+        self.assertEqual(reloaded.order(["m1", "m2"]), ["m2", "m1"])
+
+
+class TestGeminiBackendRouting(unittest.TestCase):
+    def test_dead_model_is_skipped_on_next_call(self):
+        client = StubClient(broken={"dead": "404 model not found"})
+        backend = GeminiBackend("key", models=["dead", "live"], client=client,
+                                router=ModelRouter(persist=False))
+        self.assertEqual(backend.generate("a"), "Antwort von live")
+        self.assertEqual(backend.generate("b"), "Antwort von live")
+        self.assertEqual(client.calls, ["dead", "live", "live"])
+
+    def test_all_models_fail(self):
+        client = StubClient(broken={"m": "500 intern"})
+        backend = GeminiBackend("key", models=["m"], client=client, router=ModelRouter(persist=False))
+        with self.assertRaises(RuntimeError):
+            backend.generate("x")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,9 +6,19 @@ import sys
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import tempfile
+import shutil
+
 from utilities.LegionData import LegionDatabase
 
 class TestLegionData(unittest.TestCase):
+    def setUp(self):
+        # Mocked loaders must never be served from (or written to) the catalog cache
+        for name in ("load_cache", "save_cache"):
+            patcher = patch(f'utilities.LegionData.LegionDatabase.{name}', return_value=False)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     @patch('utilities.LegionData.LegionDatabase.load_catalog')
     @patch('utilities.LegionData.LegionDatabase.load_legacy') 
     @patch('utilities.LegionData.LegionDatabase.load_custom_units')
@@ -105,6 +115,204 @@ class TestLegionData(unittest.TestCase):
             self.assertNotIn("non_existent", db.units)
 
 
+class TestLegionDataCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        patcher = patch('utilities.LegionData.get_writable_path', return_value=self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cache_roundtrip(self):
+        """Second instance is served from the cache with identical content."""
+        db1 = LegionDatabase()
+        self.assertTrue(os.path.exists(db1.get_cache_path()))
+
+        with patch('utilities.LegionData.LegionDatabase.load_catalog') as mock_catalog:
+            db2 = LegionDatabase()
+            mock_catalog.assert_not_called()
+
+        self.assertEqual(db1.units, db2.units)
+        self.assertEqual(db1.upgrades, db2.upgrades)
+        self.assertEqual(db1.command_cards, db2.command_cards)
+        self.assertEqual(db1.battle_cards, db2.battle_cards)
+
+    def test_stale_cache_rebuilds(self):
+        """A changed fingerprint forces a full reload."""
+        LegionDatabase()
+        with patch('utilities.LegionData.LegionDatabase.get_cache_fingerprint', return_value=("changed",)), \
+             patch('utilities.LegionData.LegionDatabase.load_catalog') as mock_catalog:
+            LegionDatabase()
+            mock_catalog.assert_called_once()
+
+    def test_corrupt_cache_rebuilds(self):
+        """An unreadable cache file is ignored."""
+        db = LegionDatabase(use_cache=False)
+        with open(db.get_cache_path(), "wb") as f:
+            f.write(b"not a pickle")
+
+        db2 = LegionDatabase()
+        self.assertEqual(db.units, db2.units)
+
+    def test_keyword_maps_built(self):
+        """Every unit and weapon carries a parsed keyword_map after loading."""
+        db = LegionDatabase(use_cache=False)
+        for units in db.units.values():
+            for u in units:
+                self.assertIsInstance(u["keyword_map"], dict)
+                for w in u.get("weapons", []):
+                    self.assertIsInstance(w["keyword_map"], dict)
+
+    def test_use_cache_false(self):
+        """use_cache=False neither reads nor writes the cache."""
+        db = LegionDatabase(use_cache=False)
+        self.assertFalse(os.path.exists(db.get_cache_path()))
+
+
+class TestLegionDataShared(unittest.TestCase):
+    def setUp(self):
+        for name in ("load_cache", "save_cache"):
+            patcher = patch(f'utilities.LegionData.LegionDatabase.{name}', return_value=False)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        LegionDatabase._shared_instance = None
+        LegionDatabase._reload_listeners = []
+        self.addCleanup(setattr, LegionDatabase, "_shared_instance", None)
+        self.addCleanup(setattr, LegionDatabase, "_reload_listeners", [])
+
+    def test_shared_is_singleton(self):
+        """shared() builds the database once and returns the same object."""
+        db1 = LegionDatabase.shared()
+        db2 = LegionDatabase.shared()
+        self.assertIs(db1, db2)
+
+    def test_invalidate_without_instance(self):
+        """invalidate_shared() is a no-op before anything was built."""
+        LegionDatabase.invalidate_shared()
+        self.assertIsNone(LegionDatabase._shared_instance)
+
+    def test_invalidate_reloads_in_place(self):
+        """Windows holding the shared instance see reloaded data."""
+        db = LegionDatabase.shared()
+        db.units["Test"] = [{"name": "Stale"}]
+
+        LegionDatabase.invalidate_shared()
+
+        self.assertIs(LegionDatabase.shared(), db)
+        self.assertNotIn("Test", db.units)
+
+    def test_reload_listener(self):
+        """Listeners are called on invalidation and dropped once collected."""
+        calls = []
+
+        class Window:
+            def on_reload(self):
+                calls.append(True)
+
+        LegionDatabase.shared()
+        window = Window()
+        LegionDatabase.add_reload_listener(window.on_reload)
+
+        LegionDatabase.invalidate_shared()
+        self.assertEqual(len(calls), 1)
+
+        del window
+        LegionDatabase.invalidate_shared()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(LegionDatabase._reload_listeners, [])
+
+
+class TestLegionDataIndexes(unittest.TestCase):
+    def make_db(self, units, upgrades):
+        with patch('utilities.LegionData.LegionDatabase.load_cache', return_value=False), \
+             patch('utilities.LegionData.LegionDatabase.save_cache'), \
+             patch('utilities.LegionData.LegionDatabase.load_catalog'), \
+             patch('utilities.LegionData.LegionDatabase.load_legacy'), \
+             patch('utilities.LegionData.LegionDatabase.load_custom_units'), \
+             patch('utilities.LegionData.LegionDatabase.load_custom_command_cards'), \
+             patch('utilities.LegionData.LegionDatabase.load_custom_upgrades'), \
+             patch('utilities.LegionData.LegionDatabase.load_custom_battle_cards'):
+            db = LegionDatabase()
+        db.units = units
+        db.upgrades = upgrades
+        db.build_indexes()
+        return db
+
+    def test_unit_lookup(self):
+        """Units are found by faction/name and by id."""
+        trooper = {"name": "Stormtroopers", "id": "stormtroopers"}
+        db = self.make_db({"Galaktisches Imperium": [trooper]}, [])
+
+        self.assertIs(db.get_unit("Galaktisches Imperium", "Stormtroopers"), trooper)
+        self.assertIsNone(db.get_unit("Rebellenallianz", "Stormtroopers"))
+        self.assertIs(db.get_unit_by_id("stormtroopers"), trooper)
+        self.assertIs(db.get_unit_by_id("stormtroopers", "Galaktisches Imperium"), trooper)
+        self.assertIsNone(db.get_unit_by_id("stormtroopers", "Rebellenallianz"))
+
+    def test_upgrade_and_card_lookup(self):
+        """Upgrades by name/id and command cards by id or name, also after add_upgrade()."""
+        scope = {"name": "Zielfernrohr", "id": "targeting-scopes", "type": "Gear", "restricted_to": None}
+        db = self.make_db({}, [scope])
+        db.command_cards = [{"id": "ambush", "name": "Ambush"}, {"name": "Eigene Karte"}]
+        db.build_indexes()
+
+        self.assertIs(db.get_upgrade("Zielfernrohr"), scope)
+        self.assertIs(db.get_upgrade_by_id("targeting-scopes"), scope)
+        self.assertIs(db.get_command_card("ambush"), db.get_command_card("Ambush"))
+        self.assertIsNotNone(db.get_command_card("Eigene Karte"))
+
+        extra = {"name": "Eigenbau", "id": "custom-1", "type": "Gear", "restricted_to": None}
+        db.add_upgrade(extra)
+        self.assertIs(db.get_upgrade_by_id("custom-1"), extra)
+
+    def test_valid_upgrades_by_slot(self):
+        """get_valid_upgrades honours slot, unit, faction and force side restrictions."""
+        upgrades = [
+            {"name": "Open", "type": "Gear", "restricted_to": None},
+            {"name": "Unit Only", "type": "Gear", "restricted_to": ["Stormtroopers"]},
+            {"name": "Rebels Only", "type": "Gear", "restricted_to": ["Rebellenallianz"]},
+            {"name": "Dark", "type": "Force", "restricted_to": ["Dunkle Seite"]},
+            {"name": "Light", "type": "Force", "restricted_to": ["Helle Seite"]},
+        ]
+        db = self.make_db({}, upgrades)
+
+        gear = [u["name"] for u in db.get_valid_upgrades("Gear", "Stormtroopers", "Galaktisches Imperium")]
+        self.assertEqual(gear, ["Open", "Unit Only"])
+        force = [u["name"] for u in db.get_valid_upgrades("Force", "Darth Vader", "Galaktisches Imperium")]
+        self.assertEqual(force, ["Dark"])
+        force = [u["name"] for u in db.get_valid_upgrades("Force", "Luke Skywalker", "Rebellenallianz")]
+        self.assertEqual(force, ["Light"])
+        self.assertEqual(db.get_valid_upgrades("Comms", "Stormtroopers", "Galaktisches Imperium"), [])
+
+    def test_eligibility_table(self):
+        """The precomputed table matches the per-slot filter for known units."""
+        units = {"Galaktisches Imperium": [{"name": "Stormtroopers", "slots": ["Gear", "Comms"]}]}
+        upgrades = [
+            {"name": "Open", "type": "Gear", "restricted_to": None},
+            {"name": "Rebels Only", "type": "Gear", "restricted_to": ["Rebellenallianz"]},
+        ]
+        db = self.make_db(units, upgrades)
+
+        table = db.upgrade_eligibility["Galaktisches Imperium"]["Stormtroopers"]
+        self.assertEqual([u["name"] for u in table["Gear"]], ["Open"])
+        self.assertEqual(table["Comms"], [])
+
+    def test_add_upgrade_incremental(self):
+        """add_upgrade updates slot index and eligibility table in place."""
+        units = {
+            "Galaktisches Imperium": [{"name": "Stormtroopers", "slots": ["Gear"]}],
+            "Rebellenallianz": [{"name": "Rebel Troopers", "slots": ["Gear"]}],
+        }
+        db = self.make_db(units, [])
+
+        db.add_upgrade({"name": "Imperial Gear", "type": "Gear", "restricted_to": ["Galaktisches Imperium"]})
+
+        self.assertEqual([u["name"] for u in db.get_valid_upgrades("Gear", "Stormtroopers", "Galaktisches Imperium")], ["Imperial Gear"])
+        self.assertEqual(db.get_valid_upgrades("Gear", "Rebel Troopers", "Rebellenallianz"), [])
+        # Unknown units fall back to the slot index
+        self.assertEqual(len(db.get_valid_upgrades("Gear", "Custom", "Galaktisches Imperium")), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -29,5 +29,40 @@ class TestLegionRules(unittest.TestCase):
         self.assertTrue(hasattr(LegionRules, "CONDITIONS"))
         self.assertIn("suppressed", LegionRules.CONDITIONS)
 
+    def test_keyword_index_aliases(self):
+        """English, German and parametrized names resolve to the same keyword."""
+        index = LegionRules.get_keyword_index()
+        self.assertEqual(index["pierce"], "Pierce")
+        self.assertEqual(index["durchschlagen"], "Pierce")
+        self.assertEqual(index["danger sense"], "Danger Sense")
+        self.assertEqual(index["immunität: durchschlagen"], "Immune: Pierce")
+
+    def test_parse_keyword(self):
+        """Keyword strings are parsed into (canonical name, value)."""
+        self.assertEqual(LegionRules.parse_keyword("Pierce 1"), ("Pierce", 1))
+        self.assertEqual(LegionRules.parse_keyword("Durchschlagen 2"), ("Pierce", 2))
+        self.assertEqual(LegionRules.parse_keyword("High Velocity"), ("High Velocity", None))
+        self.assertEqual(LegionRules.parse_keyword("Immune: Pierce"), ("Immune: Pierce", None))
+        self.assertEqual(LegionRules.parse_keyword("Impact X"), ("Impact", None))
+        self.assertEqual(LegionRules.parse_keyword("Armor 1"), ("Armor", 1))
+
+    def test_get_keyword(self):
+        """get_keyword resolves English and German keyword strings."""
+        self.assertEqual(LegionRules.get_keyword("Pierce 1")["german"], "Durchschlagen")
+        self.assertEqual(LegionRules.get_keyword("Wucht 2")["name"], "Impact X")
+        self.assertEqual(LegionRules.get_keyword("Danger Sense 2")["german"], "Gefahrensinn")
+        self.assertIsNone(LegionRules.get_keyword("Unbekannt"))
+
+    def test_parse_keyword_list(self):
+        """Keyword lists and info strings become {canonical: value} maps."""
+        self.assertEqual(
+            LegionRules.parse_keyword_list("Panzerung, Immune Pierce, Wucht 2, Arsenal 2"),
+            {"Armor": 0, "Immune: Pierce": 1, "Impact": 2, "Arsenal": 2})
+        self.assertEqual(LegionRules.parse_keyword_list(["Pierce 1", "Durchschlagen 1", "Blast"]),
+                         {"Pierce": 2, "Blast": 1})
+        self.assertEqual(LegionRules.parse_keyword_list(""), {})
+        # "Panzerung" (alle Treffer) bleibt von "Panzerung 1" unterscheidbar
+        self.assertEqual(LegionRules.parse_keyword_list("Armor 1"), {"Armor": 1})
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import copy
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities import MatchEvents
+from utilities.MatchEvents import EventRecorder, Replay, assign_unit_ids, snapshot, attack_data
+from utilities.MatchLog import MatchLog
+from utilities.GameEngine import GameState, RulesEngine
+from utilities.DiceEngine import DiceEngine
+from tests.helpers import make_unit
+
+
+RED_BLASTER = {"dice": {"red": 2, "black": 0, "white": 0}, "surge": {"attack": "hit"}}
+
+
+def make_state():
+    return GameState({"faction": "A", "units": [make_unit("A1", **RED_BLASTER), make_unit("A2", **RED_BLASTER)]},
+                     {"faction": "B", "units": [make_unit("B1", minis=2, **RED_BLASTER)]}, max_rounds=3)
+
+
+class TestMatchEvents(unittest.TestCase):
+    def play(self, state, recorder, engine):
+        """Records a short game. Returns the events and the true snapshot after every event."""
+        events, truth = [], []
+
+        def record(kind, message, **data):
+            events.append(recorder.record(kind, message, data))
+            truth.append(copy.deepcopy(snapshot(state)))
+
+        record("game_start", "Start", seed=engine.dice.seed)
+        engine.start_command_phase(state)
+        record("phase", "Command")
+        engine.create_order_pool(state)
+        record("orders", "Orders")
+        for _ in range(6):
+            attacker, target = state.units("Player")[0], (state.units("Opponent") or [None])[0]
+            if target is None:
+                break
+            result = engine.resolve_attack(attacker, attacker["weapons"], target, aims=1)
+            applied = engine.apply_attack(state, attacker, target, result, aims_used=1)
+            record("attack", "Attack", **attack_data("Player", attacker, target, attacker["weapons"], result,
+                                                    figures_lost=applied["figures_lost"]))
+        engine.end_phase(state)
+        record("end_phase", "End")
+        return events, truth
+
+    def test_replay_rebuilds_every_index(self):
+        state = make_state()
+        assign_unit_ids(state)
+        self.assertEqual([u["uid"] for u in state.units("Opponent")], ["O1"])
+
+        events, truth = self.play(state, EventRecorder(state), RulesEngine(DiceEngine(seed=4)))
+
+        replay = Replay(events, keyframe_interval=2)
+        for i, expected in enumerate(truth):
+            self.assertEqual(replay.state_at(i), expected, f"event {i}")
+        self.assertIn("snapshot", events[0])
+        self.assertEqual(replay.find("game_start"), [0])
+
+    def test_jsonl_roundtrip_and_summary(self):
+        state = make_state()
+        assign_unit_ids(state)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "match.jsonl.gz")
+            log = MatchLog()
+            log.start(os.path.join(tmp, "match.txt"), events_path=path, state=state)
+            log.log("Start", "game_start", {"seed": 1})
+            target = state.units("Opponent")[0]
+            RulesEngine.apply_damage(target, 1)
+            state.player_score = 20
+            log.log("Treffer", "attack", {"side": "Player", "wounds": 1})
+            log.close()
+
+            events = MatchEvents.read_events(path)
+            summary = MatchEvents.summarize_match(path)
+
+        self.assertEqual([e["type"] for e in events], ["game_start", "attack"])
+        self.assertEqual(events[1]["delta"]["units"]["O1"]["minis"], 1)
+        self.assertEqual(Replay(events).state_at(1)["state"]["player_score"], 20)
+        self.assertEqual((summary["attacks"], summary["wounds"]["Player"], summary["player_score"]), (1, 1, 20))
+
+    def test_replay_requires_snapshot(self):
+        with self.assertRaises(ValueError):
+            Replay([{"type": "note"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
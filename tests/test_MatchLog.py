@@ -0,0 +1,60 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.MatchLog import MatchLog, LogWriter
+
+
+class TestLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "log.txt")
+
+    def read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_flush_writes_batched(self):
+        writer = LogWriter(self.path, mode="w", flush_interval=10)
+        self.addCleanup(writer.close)
+        for i in range(100):
+            writer.write(f"Zeile {i}")
+        writer.flush()
+        self.assertEqual(self.read(), [f"Zeile {i}" for i in range(100)])
+        self.assertLess(writer.batches, 100)
+
+    def test_close_drains_queue(self):
+        writer = LogWriter(self.path, mode="w")
+        writer.write("a")
+        writer.write("b")
+        writer.close()
+        writer.write("ignoriert")
+        self.assertEqual(self.read(), ["a", "b"])
+
+
+class TestMatchLog(unittest.TestCase):
+    def test_events_and_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "battle_log.txt")
+            log = MatchLog()
+            log.log("vor dem Start")
+            log.start(path, ["Kopf", ""])
+            event = log.log("Runde 1")
+            log.flush(wait=True)
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            log.close()
+
+        self.assertEqual(lines, ["Kopf", "", MatchLog.format(event)])
+        self.assertEqual([e["message"] for e in log.events], ["vor dem Start", "Runde 1"])
+        self.assertTrue(log.entries[1].endswith("] Runde 1"))
+        self.assertIsNone(log.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import unittest.mock
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities import MatchupSimulator
+from utilities.AttackCalculator import calculate_attack
+from utilities.DiceEngine import DiceEngine
+from tests.helpers import make_unit
+
+
+class TestMatchupSimulator(unittest.TestCase):
+    def setUp(self):
+        self.troopers = make_unit("Troopers", dice={"red": 0, "black": 0, "white": 1},
+                                  surge={"attack": "hit"}, defense="Red", in_play=False)
+        self.heavy = make_unit("Heavy", dice={"red": 2, "black": 0, "white": 0}, hp=5, minis=1, points=90,
+                               keyword_map={"Armor": 1}, in_play=False)
+
+    def test_resolve_matches_exact_calculator(self):
+        """Vectorized pipeline agrees with the exact distribution on average."""
+        attacker = MatchupSimulator.prepare_combatant(self.troopers, self.heavy)
+        target = MatchupSimulator.prepare_combatant(self.heavy, self.troopers)
+        n = 20000
+        pools = {"white": np.full(n, 4)}
+        wounds, suppression = MatchupSimulator.resolve_attacks(
+            DiceEngine(seed=3), pools, attacker, target, aims=np.ones(n, dtype=np.int64))
+        exact = calculate_attack({"white": 4}, attack_surge="hit", aims=1, target_keywords={"Armor": 1})
+        self.assertAlmostEqual(wounds.mean(), exact.expected_wounds, delta=0.05)
+        self.assertAlmostEqual(suppression.mean(), exact.expected_suppression, delta=0.02)
+
+    def test_chunk_is_seeded(self):
+        first = MatchupSimulator.prepare_combatant(self.troopers, self.heavy)
+        second = MatchupSimulator.prepare_combatant(self.heavy, self.troopers)
+        a = MatchupSimulator.simulate_chunk(first, second, 500, seed=11)
+        b = MatchupSimulator.simulate_chunk(first, second, 500, seed=11)
+        np.testing.assert_array_equal(a["ttk"][0], b["ttk"][0])
+        self.assertEqual(a["ttk"][0].sum(), 500)
+
+    def test_run_matchups_reports_progress(self):
+        calls = []
+        rows = MatchupSimulator.run_matchups([self.troopers], [self.heavy, self.troopers], samples=2000,
+                                             workers=1, seed=5, progress=lambda d, t: calls.append((d, t)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(calls[-1], (2, 2))
+        for row in rows:
+            self.assertAlmostEqual(row["wounds_per_100_points"], row["wounds_per_attack"] / 40 * 100)
+            self.assertAlmostEqual(sum(row["suppression"]), 1.0)
+            self.assertLessEqual(row["kill_chance"] + row["loss_chance"], 1.0)
+
+    def test_load_side_from_army_file(self):
+        db = unittest.mock.MagicMock()
+        db.get_unit.return_value = self.troopers
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "liste.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"faction": "Galaktisches Imperium",
+                           "army": [{"name": "Troopers", "points": 60, "minis": 5, "upgrades": []}]}, f)
+            units = MatchupSimulator.load_side(path, db)
+        self.assertEqual(units[0]["points"], 60)
+        self.assertEqual(units[0]["minis"], 5)
+        db.get_unit.assert_called_with("Galaktisches Imperium", "Troopers")
+
+    def test_load_side_unknown(self):
+        db = unittest.mock.MagicMock()
+        db.get_unit.return_value = None
+        db.units = {}
+        with self.assertRaises(ValueError):
+            MatchupSimulator.load_side("Imperium:Gibt es nicht", db)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,7 +20,7 @@ class TestMissionBuilder(unittest.TestCase):
         mock_tk.IntVar.return_value = MagicMock()
         
         # Mock database categories
-        instance = mock_db.return_value
+        instance = mock_db.shared.return_value
         instance.battle_cards = []
         instance.units = {"Empire": [], "Rebels": []}
         
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.PhasePanels import PanelStack, TurnPanel, ActivationPanel
+
+
+def widget_factory(*args, **kwargs):
+    return MagicMock()
+
+
+class TestPanelStack(unittest.TestCase):
+    def test_panels_are_built_once_and_survive_clear(self):
+        parent = MagicMock()
+        factory = MagicMock(side_effect=lambda p: MagicMock(frame=MagicMock(__str__=lambda s: ".turn")))
+        stack = PanelStack(parent)
+        stack.register("turn", factory)
+
+        panel = stack.show("turn")
+        self.assertIs(stack.show("turn"), panel)
+        self.assertEqual(factory.call_count, 1)
+        panel.frame.pack.assert_called_once()
+
+        leftover = MagicMock(__str__=lambda s: ".label")
+        parent.winfo_children.return_value = [panel.frame, leftover]
+        stack.clear()
+        leftover.destroy.assert_called_once()
+        panel.frame.destroy.assert_not_called()
+        panel.frame.pack_forget.assert_called()
+        self.assertIsNone(stack.current)
+
+
+@patch('utilities.PhasePanels.tk')
+class TestTurnPanel(unittest.TestCase):
+    def test_unit_buttons_are_reused(self, mock_tk):
+        mock_tk.Button.side_effect = widget_factory
+        panel = TurnPanel(MagicMock())
+        units = [("Aktiviere: A", MagicMock()), ("Aktiviere: B", MagicMock())]
+        panel.update(1, "SPIELER AM ZUG", "#2196F3", "Pool: 2", True, draw_command=MagicMock(), can_draw=True,
+                     units=units)
+        created = mock_tk.Button.call_count
+
+        for _ in range(10):
+            panel.update(1, "SPIELER AM ZUG", "#2196F3", "Pool: 1", True, units=units[1:])
+        self.assertEqual(mock_tk.Button.call_count, created)
+        panel.unit_buttons[0].config.assert_called_with(text="Aktiviere: B", command=units[1][1])
+        panel.unit_buttons[1].pack_forget.assert_called()
+
+    def test_ai_turn_hides_human_controls(self, mock_tk):
+        mock_tk.Frame.side_effect = widget_factory
+        mock_tk.Label.side_effect = widget_factory
+        panel = TurnPanel(MagicMock())
+        panel.update(2, "GEGNER (AI) AM ZUG", "#F44336", "Pool: 3", False)
+        panel.f_human.pack_forget.assert_called()
+        panel.lbl_ai.pack.assert_called()
+
+
+@patch('utilities.PhasePanels.tk')
+class TestActivationPanel(unittest.TestCase):
+    def test_modes_and_callbacks(self, mock_tk):
+        mock_tk.Frame.side_effect = widget_factory
+        on_action = MagicMock()
+        panel = ActivationPanel(MagicMock(), on_action, MagicMock(), MagicMock(), MagicMock())
+        created = mock_tk.Button.call_count
+
+        panel.update("Trupp", "blue", "Aktionen: 2", mode="actions")
+        panel.f_actions.pack.assert_called_once()
+        panel.f_ai.pack_forget.assert_called()
+        panel.update("Trupp", "blue", "Aktionen: 1", mode="actions")
+        panel.f_actions.pack.assert_called_once()  # Modus unverändert: kein Umpacken
+        panel.update("Droide", "red", "Aktionen: 2", mode="ai")
+        panel.f_ai.pack.assert_called_once()
+        self.assertEqual(mock_tk.Button.call_count, created)
+
+        # Aktions-Buttons sind beim Aufbau an die Aktion gebunden
+        move = next(c.kwargs["command"] for c in mock_tk.Button.call_args_list if c.kwargs.get("text") == "Bewegung")
+        move()
+        on_action.assert_called_once_with("Move")
+
+
+if __name__ == '__main__':
+    unittest.main()
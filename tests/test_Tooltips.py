@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.Tooltips import TooltipManager
+
+
+class FakeRoot:
+    """root.after/after_cancel ohne Tk: Rückrufe werden erst mit run() ausgeführt."""
+
+    def __init__(self):
+        self.pending = {}
+        self.delays = []
+        self._next = 0
+
+    def after(self, delay, callback):
+        self._next += 1
+        self.pending[self._next] = callback
+        self.delays.append(delay)
+        return self._next
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run(self):
+        pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            callback()
+
+
+class Event:
+    def __init__(self, y=0):
+        self.x_root, self.y_root, self.y = 100, 200, y
+
+
+@patch('utilities.Tooltips.tk')
+class TestTooltipManager(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+
+    def test_debounce_and_single_window(self, mock_tk):
+        tips = TooltipManager(self.root, delay=400, switch_delay=50)
+        for i in range(20):
+            tips.schedule(("tree", i), f"Einheit {i}", 0, 0)
+        self.assertEqual(len(self.root.pending), 1)  # nur der letzte Hover zählt
+        self.root.run()
+        self.assertTrue(tips.visible)
+        tips._label.config.assert_called_with(text="Einheit 19")
+
+        # Weitere Tooltips verwenden dasselbe Fenster, nur mit kurzer Wechsel-Verzögerung
+        tips.schedule(("tree", 1), "Einheit 1", 0, 0)
+        self.root.run()
+        tips.hide()
+        tips.schedule(("tree", 2), "Einheit 2", 0, 0)
+        self.root.run()
+        self.assertEqual(mock_tk.Toplevel.call_count, 1)
+        self.assertEqual(self.root.delays[-2:], [50, 400])
+        self.assertEqual(tips.window.withdraw.call_count, 2)  # versteckt erzeugt + einmal hide()
+
+    def test_lazy_text_and_empty_text(self, mock_tk):
+        tips = TooltipManager(self.root)
+        tips.schedule("cb", lambda: None, 0, 0)
+        self.root.run()
+        self.assertFalse(tips.visible)
+        mock_tk.Toplevel.assert_not_called()
+
+    def test_cached_formatter(self, mock_tk):
+        tips = TooltipManager(self.root, cache_size=2)
+        formatter = MagicMock(side_effect=lambda unit: f"Text {unit['name']}")
+        for _ in range(5):
+            self.assertEqual(tips.cached(("unit", "A"), formatter, {"name": "A"}), "Text A")
+        self.assertEqual(formatter.call_count, 1)
+        tips.cached(("unit", "B"), formatter, {"name": "B"})
+        tips.cached(("unit", "C"), formatter, {"name": "C"})
+        tips.cached(("unit", "A"), formatter, {"name": "A"})  # aus dem Cache verdrängt
+        self.assertEqual(formatter.call_count, 4)
+        tips.clear_cache()
+        tips.cached(("unit", "C"), formatter, {"name": "C"})
+        self.assertEqual(formatter.call_count, 5)
+
+    def test_bind_rows_ignores_motion_within_row(self, mock_tk):
+        tips = TooltipManager(self.root)
+        tree = MagicMock()
+        tree.identify_row.side_effect = lambda y: "I001" if y < 20 else "I002"
+        row_text = MagicMock(return_value="Zeile")
+        tips.bind_rows(tree, row_text)
+        on_motion = next(c.args[1] for c in tree.bind.call_args_list if c.args[0] == "<Motion>")
+
+        for y in range(0, 20, 2):
+            on_motion(Event(y))
+        self.assertEqual(len(self.root.delays), 1)
+        on_motion(Event(25))
+        self.assertEqual(len(self.root.delays), 2)
+        self.root.run()
+        row_text.assert_called_once_with("I002")
+
+
+if __name__ == '__main__':
+    unittest.main()
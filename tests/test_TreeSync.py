@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.TreeSync import TreeSync
+
+
+class FakeTree:
+    """Die von TreeSync genutzten ttk.Treeview-Methoden (ohne Display)."""
+
+    def __init__(self):
+        self.order = []
+        self.items = {}
+        self.calls = 0
+
+    def get_children(self, item=""):
+        return tuple(self.order)
+
+    def exists(self, iid):
+        return iid in self.items
+
+    def insert(self, parent, index, iid=None, values=()):
+        self.calls += 1
+        if iid in self.items:
+            raise ValueError(f"Item {iid} already exists")
+        self.order.insert(index if index != "end" else len(self.order), iid)
+        self.items[iid] = values
+        return iid
+
+    def item(self, iid, values=None):
+        self.calls += 1
+        self.items[iid] = values
+
+    def delete(self, *iids):
+        self.calls += 1
+        for iid in iids:
+            self.order.remove(iid)
+            del self.items[iid]
+
+    def move(self, iid, parent, index):
+        self.calls += 1
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+
+class TestTreeSync(unittest.TestCase):
+    def setUp(self):
+        self.tree = FakeTree()
+        self.model = TreeSync(self.tree)
+
+    def rows(self):
+        return [self.tree.items[iid] for iid in self.tree.order]
+
+    def test_only_changed_rows_are_touched(self):
+        self.model.sync([("P1", ("A", 4, "1/1")), ("P2", ("B", 2, "1/1"))])
+        self.tree.calls = 0
+        self.model.sync([("P1", ("A", 4, "1/1")), ("P2", ("B", 1, "1/1"))])
+        self.assertEqual(self.tree.calls, 1)
+        self.assertEqual(self.rows(), [("A", 4, "1/1"), ("B", 1, "1/1")])
+        self.assertEqual((self.model.inserted, self.model.updated), (2, 1))
+
+    def test_remove_insert_and_reorder(self):
+        self.model.sync([(k, (k,)) for k in "abc"])
+        ids = self.model.sync([(k, (k,)) for k in "dca"])
+        self.assertEqual(ids, ["d", "c", "a"])
+        self.assertEqual(self.tree.order, ["d", "c", "a"])
+        self.assertEqual(self.model.deleted, 1)
+
+        self.model.sync([])
+        self.assertEqual(self.tree.order, [])
+
+    def test_duplicate_keys(self):
+        ids = self.model.sync([("Trupp", (1,)), ("Trupp", (2,))])
+        self.assertEqual(ids, ["Trupp", "Trupp#1"])
+        self.assertEqual(self.rows(), [(1,), (2,)])
+
+    def test_clear(self):
+        self.model.sync([("a", (1,))])
+        self.model.clear()
+        self.model.sync([("a", (1,))])
+        self.assertEqual(self.tree.order, ["a"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+AI-Heuristiken des Game Companion ohne Tk-Abhängigkeiten.
+
+Die Entscheidungsbäume aus generate_ai_intention und der lokalen Logik des
+AI-Entscheiders liegen hier als reine Funktionen. Für Turniere (siehe
+AITournament) gibt es zu jeder Heuristik eine versionierte Policy im Format
+von RulesEngine.run_activation.
+"""
+
+# Intent-Codes (wie self.ai_intent im Game Companion)
+MOVE, MELEE, RANGED, AIM, DODGE = "Move", "Melee", "Ranged", "Aim", "Dodge"
+
+# Anzeigetexte für generate_ai_intention
+INTENTION_LABELS = {
+    "advance": "Bewegung (Doppel) auf nächsten Feind zu",
+    "melee": "Angriff (Nahkampf) wenn möglich",
+    "take_cover": "Bewegung in Deckung",
+    "dodge": "Ausweichen (Dodge)",
+    "retreat": "Bewegung (Rückzug/Deckung)",
+    "attack_threat": "Angriff auf nächste Bedrohung",
+    "aim": "Zielen (Aim)",
+    "attack_exposed": "Angriff auf Einheit mit wenig Deckung",
+}
+
+# Schritt -> Intent-Code für die Ausführung
+INTENTION_ACTIONS = {
+    "advance": MOVE, "melee": MELEE, "take_cover": MOVE, "dodge": DODGE,
+    "retreat": MOVE, "attack_threat": RANGED, "aim": AIM, "attack_exposed": RANGED,
+}
+
+
+def weapon_profile(unit):
+    """Maximale Reichweite und ob die Einheit eine reine Nahkampfwaffe (Reichweite 0-1) hat."""
+    is_melee = False
+    max_range = 0
+    for w in unit.get("weapons", []):
+        r = w["range"][1]
+        if r > max_range: max_range = r
+        if r == 1 and w["range"][0] == 0: is_melee = True
+    return max_range, is_melee
+
+
+def intention_steps(unit):
+    """Entscheidungsbaum von generate_ai_intention. Rückgabe: Liste von Schritt-Schlüsseln."""
+    max_range, is_melee = weapon_profile(unit)
+    hp_ratio = unit["current_hp"] / unit["hp"]
+
+    if is_melee and max_range < 2:
+        # Nahkämpfer
+        if hp_ratio > 0.5:
+            return ["advance", "melee"]
+        return ["take_cover", "dodge"]
+    # Fernkämpfer
+    if hp_ratio < 0.3:
+        return ["retreat", "attack_threat"]
+    return ["aim", "attack_exposed"]
+
+
+def local_decision(unit, distance, target_type, in_range):
+    """
+    Lokale Logik des AI-Entscheiders (ohne Gemini).
+    distance/target_type wie in den Auswahlfeldern des Dialogs.
+    Rückgabe: (Intent-Code, Plan-Text)
+    """
+    weapons = unit.get("weapons", [])
+    max_r = max([w["range"][1] for w in weapons]) if weapons else 0
+    is_melee_unit = any(w["range"][0] == 0 for w in weapons) and max_r < 3
+
+    if "Nahkampf" in distance:
+        return MELEE, "⚔️ Status: Im Nahkampf. \n-> Aktion: NAHKAMPF-ANGRIFF ausführen. Ziel auf Zerstörung fokussieren."
+    if target_type == "Missions-Marker" and "Range 1" not in distance:
+        return MOVE, "🏃 Ziel: Mission.\n-> Aktion: BEWEGUNG (Doppel) zum Marker."
+    if in_range:
+        if is_melee_unit and "Range 1-2" in distance:
+            return MELEE, "⚔️ Aggressiv (Nahkämpfer).\n-> Aktion: BEWEGUNG -> ANGRIFF (Charge) wenn möglich."
+        return RANGED, f"🎯 Feuerkampf.\n-> Aktion: ZIELEN -> ANGRIFF (Range {max_r}). Stationär bleiben für Deckung/Aim."
+    # Out of range
+    return MOVE, "🏃 Annäherung.\n-> Aktion: BEWEGUNG -> In Deckung gehen oder 2. Bewegung."
+
+
+def equipment_advice(unit):
+    """Hinweise zu Granaten/Zielfernrohren aus den Upgrade-Namen."""
+    advice = ""
+    for upg in unit.get("upgrades", []):
+        # Einfache Erkennung per String
+        u_str = str(upg).lower()
+        if "granat" in u_str or "grenade" in u_str:
+            advice += f"\n• Nutze {upg} (wenn Range 1)!"
+        elif "ziel" in u_str or "scope" in u_str:
+            advice += f"\n• Nutze {upg} für besseres Zielen."
+    return advice
+
+
+# --- Policies für die Headless-Engine ---
+
+def _attack(engine, state, unit, side, melee, best_target=False):
+    """Angriffsaktion für run_activation oder None, wenn keine Waffe/kein Ziel."""
+    if melee:
+        weapons = [w for w in unit.get("weapons", []) if w["range"][0] == 0]
+    else:
+        weapons = [w for w in unit.get("weapons", []) if w["range"][1] > 1]
+    enemies = [u for u in state.units("Opponent" if side == "Player" else "Player") if u["current_hp"] > 0]
+    if not weapons or not enemies:
+        return None
+    if best_target:
+        target = engine.rank_targets(unit, enemies, weapons, aims=unit.get("aim", 0))[0][0]
+    else:
+        target = min(enemies, key=lambda u: u.get("minis", 1) * u["hp"])
+    return ("Attack", target, weapons)
+
+
+def _to_actions(engine, state, unit, side, intents, best_target=False):
+    actions = []
+    for intent in intents:
+        if intent in (MELEE, RANGED):
+            attack = _attack(engine, state, unit, side, intent == MELEE, best_target)
+            if attack:
+                actions.append(attack)
+        else:
+            actions.append(intent)
+    return actions
+
+
+def intention_policy_v1(engine, state, unit, side, activation):
+    """generate_ai_intention: Schritte des Entscheidungsbaums nacheinander ausführen."""
+    intents = [INTENTION_ACTIONS[step] for step in intention_steps(unit)]
+    return _to_actions(engine, state, unit, side, intents)
+
+
+def local_policy_v1(engine, state, unit, side, activation):
+    """
+    Lokale Logik des AI-Entscheiders. Ohne Spielfeld gilt: Fernkämpfer stehen
+    auf mittlerer Distanz in Reichweite, Nahkämpfer auf kurzer Distanz.
+    Feuerkampf bedeutet Zielen -> Angriff auf das Ziel mit dem höchsten erwarteten Schaden.
+    """
+    max_range, _ = weapon_profile(unit)
+    distance = "Range 1-2 (Nah)" if max_range < 3 else "Range 3-4 (Mittel)"
+    intent, _ = local_decision(unit, distance, "Feind-Trupp", True)
+    intents = [AIM, RANGED] if intent == RANGED else [intent]
+    return _to_actions(engine, state, unit, side, intents, best_target=True)
+
+
+def baseline_policy(engine, state, unit, side, activation):
+    """Referenz: RulesEngine.default_policy (Zielen, dann Schuss auf das schwächste Ziel)."""
+    return engine.default_policy(state, unit, side, activation)
+
+
+# Versionierte Heuristiken für Turniere. Neue Versionen hier ergänzen statt alte zu ändern.
+HEURISTICS = {
+    "baseline": baseline_policy,
+    "intention-v1": intention_policy_v1,
+    "local-v1": local_policy_v1,
+}
@@ -0,0 +1,212 @@
+"""
+Self-Play-Turnier für die AI-Heuristiken (ohne GUI).
+
+Jede Heuristik aus AIHeuristics.HEURISTICS spielt gegen jede andere (auf
+beiden Seiten) mit allen Paarungen der gespeicherten Armeen und Missionen.
+Die Spiele laufen über die RulesEngine in parallelen Prozessen. Ausgegeben
+werden Siegquote, durchschnittliche Punkte und die Entscheidungszeit pro
+Heuristik-Version - als Regressions-Benchmark bei Änderungen an der AI.
+
+Aufruf (Beispiele):
+    python utilities/AITournament.py
+    python utilities/AITournament.py --armies Armeen/a.json Armeen/b.json --games 200 --heuristics baseline local-v1
+"""
+import argparse
+import copy
+import functools
+import glob
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Import dependencies with compatibility for both script and package modes
+try:
+    from .LegionData import LegionDatabase
+    from .DiceEngine import DiceEngine
+    from .GameEngine import GameState, RulesEngine, build_army
+    from .AIHeuristics import HEURISTICS
+    from .LegionUtils import get_writable_path
+except ImportError:
+    try:
+        from utilities.LegionData import LegionDatabase
+        from utilities.DiceEngine import DiceEngine
+        from utilities.GameEngine import GameState, RulesEngine, build_army
+        from utilities.AIHeuristics import HEURISTICS
+        from utilities.LegionUtils import get_writable_path
+    except ImportError:
+        from LegionData import LegionDatabase
+        from DiceEngine import DiceEngine
+        from GameEngine import GameState, RulesEngine, build_army
+        from AIHeuristics import HEURISTICS
+        from LegionUtils import get_writable_path
+
+DEFAULT_GAMES = 50
+DEFAULT_ROUNDS = 6
+
+
+def empty_stats():
+    return {"games": 0, "wins": 0, "draws": 0, "losses": 0, "points": 0,
+            "decisions": 0, "latency_total": 0.0, "latency_max": 0.0}
+
+
+def merge_stats(total, part):
+    """Addiert die Statistiken je Heuristik (latency_max als Maximum)."""
+    for name, stats in part.items():
+        target = total.setdefault(name, empty_stats())
+        for key, value in stats.items():
+            target[key] = max(target[key], value) if key == "latency_max" else target[key] + value
+    return total
+
+
+def _timed(policy, engine, stats):
+    """Policy mit Zeitmessung pro Entscheidung."""
+    def run(state, unit, side, activation):
+        start = time.perf_counter()
+        actions = policy(engine, state, unit, side, activation)
+        elapsed = time.perf_counter() - start
+        stats["decisions"] += 1
+        stats["latency_total"] += elapsed
+        stats["latency_max"] = max(stats["latency_max"], elapsed)
+        return actions
+    return run
+
+
+def play_series(army_a, army_b, heuristic_a, heuristic_b, games, seed, max_rounds=DEFAULT_ROUNDS):
+    """
+    Spielt games Partien heuristic_a (Player, army_a) gegen heuristic_b
+    (Opponent, army_b). Rückgabe: {Heuristik: Statistik}
+    """
+    engine = RulesEngine(DiceEngine(seed))
+    stats = {"Player": empty_stats(), "Opponent": empty_stats()}
+    policies = {"Player": _timed(HEURISTICS[heuristic_a], engine, stats["Player"]),
+                "Opponent": _timed(HEURISTICS[heuristic_b], engine, stats["Opponent"])}
+
+    for _ in range(games):
+        state = GameState(copy.deepcopy(army_a), copy.deepcopy(army_b), max_rounds=max_rounds)
+        winner = engine.play_game(state, policies)
+        for side, score in (("Player", state.player_score), ("Opponent", state.opponent_score)):
+            s = stats[side]
+            s["games"] += 1
+            s["points"] += score
+            if winner == "Draw":
+                s["draws"] += 1
+            elif winner == side:
+                s["wins"] += 1
+            else:
+                s["losses"] += 1
+
+    result = {}
+    merge_stats(result, {heuristic_a: stats["Player"]})
+    merge_stats(result, {heuristic_b: stats["Opponent"]})
+    return result
+
+
+def load_armies(paths, db):
+    """Armee-JSONs laden. Rückgabe: Liste von (Name, Armee)"""
+    armies = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            army = build_army(json.load(f), db)
+        if army["units"]:
+            armies.append((os.path.splitext(os.path.basename(path))[0], army))
+        else:
+            logging.warning(f"Armee ohne bekannte Einheiten übersprungen: {path}")
+    return armies
+
+
+def load_missions(paths):
+    """Missions-JSONs laden. Rückgabe: Liste von (Name, Runden)"""
+    missions = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        missions.append((os.path.splitext(os.path.basename(path))[0], int(data.get("rounds", DEFAULT_ROUNDS))))
+    return missions or [("Standard", DEFAULT_ROUNDS)]
+
+
+def run_tournament(armies, missions, heuristics, games=DEFAULT_GAMES, workers=None, seed=None, progress=None):
+    """
+    Jede Heuristik gegen jede (beide Sitzplätze) über alle Armee-Paarungen
+    (bei nur einer Armee: Spiegelmatch) und Missionen.
+    workers=1 spielt im aktuellen Prozess. Rückgabe: {Heuristik: Statistik}
+    """
+    army_pairs = list(itertools.permutations(armies, 2)) or [(armies[0], armies[0])]
+    heuristic_pairs = list(itertools.permutations(heuristics, 2)) or [(heuristics[0], heuristics[0])]
+    jobs = [(a, b, ha, hb, rounds)
+            for (ha, hb) in heuristic_pairs
+            for (_, a), (_, b) in army_pairs
+            for _, rounds in missions]
+    seeds = np.random.SeedSequence(seed).spawn(len(jobs))
+
+    total, done = {}, 0
+    calls = [functools.partial(play_series, a, b, ha, hb, games, int(sq.generate_state(1)[0]), rounds)
+             for (a, b, ha, hb, rounds), sq in zip(jobs, seeds)]
+
+    if workers == 1:
+        for call in calls:
+            merge_stats(total, call())
+            done += 1
+            if progress:
+                progress(done, len(calls))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(call) for call in calls]
+            for fut in as_completed(futures):
+                merge_stats(total, fut.result())
+                done += 1
+                if progress:
+                    progress(done, len(calls))
+    return total
+
+
+def format_report(stats):
+    lines = [f"{'Heuristik':<16} {'Spiele':>7} {'Sieg%':>6} {'Remis%':>7} {'Ø Punkte':>9} "
+             f"{'Ø Entscheidung':>15} {'Max':>9}"]
+    for name, s in sorted(stats.items(), key=lambda item: item[1]["wins"] / max(1, item[1]["games"]), reverse=True):
+        games = max(1, s["games"])
+        avg_latency = s["latency_total"] / max(1, s["decisions"]) * 1e6
+        lines.append(f"{name:<16} {s['games']:>7} {s['wins'] / games * 100:>5.1f}% {s['draws'] / games * 100:>6.1f}% "
+                     f"{s['points'] / games:>9.1f} {avg_latency:>12.1f} µs {s['latency_max'] * 1e3:>6.2f} ms")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI-vs-AI Turnier der Heuristiken (SW Legion)")
+    parser.add_argument("--armies", nargs="+", help="Armee-JSONs (Standard: alle im Ordner Armeen)")
+    parser.add_argument("--missions", nargs="*", help="Missions-JSONs (Standard: alle im Ordner Missions)")
+    parser.add_argument("--heuristics", nargs="+", default=list(HEURISTICS), choices=list(HEURISTICS))
+    parser.add_argument("-g", "--games", type=int, default=DEFAULT_GAMES, help="Spiele pro Paarung")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed für reproduzierbare Läufe")
+    args = parser.parse_args(argv)
+
+    army_paths = args.armies or sorted(glob.glob(os.path.join(get_writable_path("Armeen"), "**", "*.json"), recursive=True))
+    mission_paths = args.missions if args.missions is not None else \
+        sorted(glob.glob(os.path.join(get_writable_path("Missions"), "*.json")))
+
+    armies = load_armies(army_paths, LegionDatabase.shared())
+    if not armies:
+        parser.error("Keine Armeen gefunden (--armies oder Ordner Armeen).")
+    missions = load_missions(mission_paths)
+
+    start = time.time()
+
+    def progress(done, total):
+        print(f"\r[{done}/{total}] {done / total * 100:5.1f}% | {time.time() - start:.0f}s",
+              end="", file=sys.stderr, flush=True)
+
+    stats = run_tournament(armies, missions, args.heuristics, args.games, args.workers, args.seed, progress)
+    print(file=sys.stderr)
+    print(f"{len(armies)} Armeen, {len(missions)} Missionen, {args.games} Spiele pro Paarung")
+    print(format_report(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
 import os
 import logging
 
@@ -13,15 +12,30 @@ try:
     # Try relative imports first (when imported as part of utilities package)
     from .LegionData import LegionDatabase
     from .LegionUtils import get_writable_path
+    from .TreeSync import TreeSync
+    from .Tooltips import TooltipManager
+    from .ArmyOptimizer import ArmyOptimizer
+    from .ArmyValidator import ArmyValidator, CommandHand
+    from .ArmyFormat import load_army_file, save_army_file, upgrade_label
 except ImportError:
     try:
         # Try package imports (when running with MainMenu)
         from utilities.LegionData import LegionDatabase
         from utilities.LegionUtils import get_writable_path
+        from utilities.TreeSync import TreeSync
+        from utilities.Tooltips import TooltipManager
+        from utilities.ArmyOptimizer import ArmyOptimizer
+        from utilities.ArmyValidator import ArmyValidator, CommandHand
+        from utilities.ArmyFormat import load_army_file, save_army_file, upgrade_label
     except ImportError:
         # Fallback to absolute imports (when running as standalone script)
         from LegionData import LegionDatabase
         from LegionUtils import get_writable_path
+        from TreeSync import TreeSync
+        from Tooltips import TooltipManager
+        from ArmyOptimizer import ArmyOptimizer
+        from ArmyValidator import ArmyValidator, CommandHand
+        from ArmyFormat import load_army_file, save_army_file, upgrade_label
 
 # =============================================================================
 # TEIL 2: DIE BENUTZEROBERFLÄCHE (GUI) UND SPEICHER-LOGIK
@@ -29,14 +43,18 @@ except ImportError:
 
 class LegionArmyBuilder:
     def __init__(self, root):
-        self.db = LegionDatabase()
+        self.db = LegionDatabase.shared()
         self.root = root
         self.root.title("SW Legion: Army Architect v4.0 (Save/Load)")
         self.root.geometry("1200x1100")
 
-        # Tooltip-System initialisieren
-        self.tooltip_window = None
-        self.current_tooltip_widget = None
+        # Tooltip-System initialisieren (ein wiederverwendetes Fenster, Texte gecacht)
+        self.tooltips = TooltipManager(self.root)
+
+        # Ausrüstungs-Optimierer (Pareto-Fronten pro Einheit werden gecacht)
+        self.optimizer = ArmyOptimizer(self.db)
+        # Laufende Legalitätsprüfung (Punkte, Ränge, Einzigartigkeit, Kommandokarten)
+        self.validator = ArmyValidator(self.db)
 
         logging.info("ArmeeBuilder initialized.")
 
@@ -55,46 +73,30 @@ class LegionArmyBuilder:
         self.setup_ui()
         self.setup_tooltips()
 
+        # Einheitenliste aktualisieren, wenn Custom-Daten gespeichert werden
+        LegionDatabase.add_reload_listener(self.on_database_reloaded)
+
+    def on_database_reloaded(self):
+        """Wird nach LegionDatabase.invalidate_shared() aufgerufen"""
+        if self.root.winfo_exists():
+            self.tooltips.clear_cache()
+            self.optimizer.clear()
+            self.update_unit_list()
+            self.revalidate()
+
     def setup_tooltips(self):
-        """Initialisiert das Tooltip-System für Hover-Texte"""
-        self.tooltip_window = None
-        
-    def create_tooltip(self, widget, text):
-        """Fügt einem Widget einen Hover-Tooltip hinzu"""
-        def on_enter(event):
-            self.show_tooltip(event, text)
-        def on_leave(event):
-            self.hide_tooltip()
-            
-        widget.bind("<Enter>", on_enter)
-        widget.bind("<Leave>", on_leave)
-        
-    def show_tooltip(self, event, text):
-        """Zeigt Tooltip an"""
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-            
-        self.tooltip_window = tk.Toplevel(self.root)
-        self.tooltip_window.wm_overrideredirect(True)
-        
-        # Position relativ zur Maus
-        x = event.x_root + 10
-        y = event.y_root + 10
-        self.tooltip_window.geometry(f"+{x}+{y}")
-        
-        # Tooltip-Text mit Hintergrund
-        label = tk.Label(self.tooltip_window, text=text, 
-                        background="#ffffe0", foreground="black",
-                        font=("Arial", 9), justify="left",
-                        wraplength=300, relief="solid", borderwidth=1,
-                        padx=5, pady=3)
-        label.pack()
-        
-    def hide_tooltip(self):
-        """Versteckt Tooltip"""
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-            self.tooltip_window = None
+        """Hover-Tooltips für die Einheitenliste (Text pro Einheit gecacht)"""
+        def unit_row_tooltip(item):
+            values = self.tree_units.item(item, "values")
+            if not values:
+                return None
+            faction = self.current_faction.get()
+            unit_data = self.db.get_unit(faction, values[0])
+            if not unit_data:
+                return None
+            return self.tooltips.cached(("unit", faction, values[0]), self.format_unit_hover_tooltip, unit_data)
+
+        self.tooltips.bind_rows(self.tree_units, unit_row_tooltip)
 
     def setup_ui(self):
         # Haupt-Container (Split Panel)
@@ -123,6 +125,7 @@ class LegionArmyBuilder:
         self.tree_units.column("Punkte", width=50, anchor="center")
         self.tree_units.column("Rang", width=100)
         self.tree_units.pack(fill="both", expand=True, pady=5)
+        self.units_model = TreeSync(self.tree_units)
         
         # Scrollbar für Einheiten
         sb_units = ttk.Scrollbar(left_frame, orient="vertical", command=self.tree_units.yview)
@@ -131,44 +134,6 @@ class LegionArmyBuilder:
 
         self.tree_units.bind("<<TreeviewSelect>>", self.show_unit_stats)
         
-        # Hover-Tooltips für Einheiten
-        def show_unit_hover_tooltip(event):
-            item = self.tree_units.identify_row(event.y)
-            if item:
-                values = self.tree_units.item(item, "values")
-                if values:
-                    unit_name = values[0]
-                    faction = self.current_faction.get()
-                    unit_data = next((u for u in self.db.units[faction] if u["name"] == unit_name), None)
-                    
-                    if unit_data and self.tooltip_window is None:
-                        tooltip_text = self.format_unit_hover_tooltip(unit_data)
-                        
-                        x = event.x_root + 20
-                        y = event.y_root + 20
-                        
-                        self.tooltip_window = tk.Toplevel(self.tree_units)
-                        self.tooltip_window.wm_overrideredirect(True)
-                        self.tooltip_window.geometry(f"+{x}+{y}")
-                        
-                        tooltip_frame = tk.Frame(self.tooltip_window, bg="lightyellow", 
-                                               relief="solid", borderwidth=1)
-                        tooltip_frame.pack()
-                        
-                        tooltip_label = tk.Label(tooltip_frame, text=tooltip_text, 
-                                               bg="lightyellow", font=("Arial", 9), 
-                                               wraplength=300, justify="left")
-                        tooltip_label.pack(padx=5, pady=2)
-
-        def hide_unit_hover_tooltip(event):
-            if self.tooltip_window:
-                self.tooltip_window.destroy()
-                self.tooltip_window = None
-
-        self.tree_units.bind("<Motion>", show_unit_hover_tooltip)
-        self.tree_units.bind("<Leave>", hide_unit_hover_tooltip)
-        self.tree_units.bind("<Button-1>", hide_unit_hover_tooltip)
-
         # 3. Info Box (erweitert für detaillierte Einheiten-Info)
         info_frame = tk.Frame(left_frame)
         info_frame.pack(fill="both", expand=True, pady=5)
@@ -226,6 +191,7 @@ class LegionArmyBuilder:
         self.tree_army.column("Upgrades", width=260)
         self.tree_army.column("Punkte", width=60, anchor="center")
         self.tree_army.pack(fill="both", expand=True, pady=5)
+        self.army_model = TreeSync(self.tree_army)
 
         # Untere Buttons
         btn_frame = tk.Frame(right_frame, bg="#f0f0f0")
@@ -234,9 +200,16 @@ class LegionArmyBuilder:
         btn_del = tk.Button(btn_frame, text="Entfernen", command=self.remove_unit, bg="#ffcccc")
         btn_del.pack(side=tk.LEFT)
 
+        btn_optimize = tk.Button(btn_frame, text="⚙ Ausrüstung optimieren", command=self.optimize_army, bg="#9C27B0", fg="white")
+        btn_optimize.pack(side=tk.RIGHT)
+
         # Gesamtpunkte
         self.lbl_total = tk.Label(right_frame, text="Gesamtpunkte: 0 / 800", font=("Segoe UI", 16, "bold"), bg="#f0f0f0", fg="#333")
-        self.lbl_total.pack(pady=20)
+        self.lbl_total.pack(pady=(20, 0))
+        self.lbl_ranks = tk.Label(right_frame, text="", font=("Segoe UI", 9), bg="#f0f0f0", fg="#555")
+        self.lbl_ranks.pack()
+        self.lbl_violations = tk.Label(right_frame, text="", font=("Segoe UI", 9), bg="#f0f0f0", fg="#c62828", justify="left", wraplength=500)
+        self.lbl_violations.pack(pady=(0, 10))
 
         # Text-Display für Command Cards und Ausrüstung
         info_text_frame = tk.LabelFrame(right_frame, text="📖 Details", font=("Arial", 10, "bold"))
@@ -295,10 +268,8 @@ class LegionArmyBuilder:
             }
             
             try:
-                # Ensure directory exists
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(save_data, f, indent=4, ensure_ascii=False)
+                # Kompaktes Format: nur Einheiten-/Upgrade-/Karten-IDs (siehe ArmyFormat)
+                save_army_file(file_path, save_data, self.db)
                 logging.info(f"Army saved to {file_path}")
                 messagebox.showinfo("Erfolg", f"Armee erfolgreich gespeichert unter:\n{file_path}")
             except Exception as e:
@@ -315,8 +286,8 @@ class LegionArmyBuilder:
 
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                # Kompakte (IDs) und alte Dateien (Anzeige-Texte) werden gelesen
+                data, missing = load_army_file(file_path, self.db)
                 
                 # Daten Validieren
                 faction = data.get("faction")
@@ -331,11 +302,15 @@ class LegionArmyBuilder:
                     # 3. Armee setzen
                     self.current_army_list = army_list
                     self.current_command_cards = cards
+                    self.validator.reset(faction, army_list, cards)
                     self.btn_cards.config(text=f"Kommandokarten wählen ({len(cards)}/7)")
                     # 4. GUI Rechts aktualisieren
                     self.refresh_army_view()
                     
-                    messagebox.showinfo("Geladen", f"Armee '{faction}' geladen. Du kannst sie nun bearbeiten!")
+                    if missing:
+                        messagebox.showwarning("Geladen", f"Armee '{faction}' geladen, aber nicht mehr im Katalog:\n" + "\n".join(missing))
+                    else:
+                        messagebox.showinfo("Geladen", f"Armee '{faction}' geladen. Du kannst sie nun bearbeiten!")
                 else:
                     messagebox.showerror("Fehler", "Ungültiges Dateiformat. JSON enthält keine Fraktion oder Armee.")
 
@@ -345,11 +320,8 @@ class LegionArmyBuilder:
     # --- GUI UPDATE FUNKTIONEN ---
 
     def update_unit_list(self, event=None):
-        # Treeview leeren
-        for item in self.tree_units.get_children():
-            self.tree_units.delete(item)
-        
         faction = self.current_faction.get()
+        units_sorted = []
         if faction in self.db.units:
             units = self.db.units[faction]
             # Sortierreihenfolge definieren
@@ -358,9 +330,11 @@ class LegionArmyBuilder:
             # Sortieren
             units_sorted = sorted(units, key=lambda x: order.get(x["rank"], 99))
             
-            # Einfügen
-            for u in units_sorted:
-                self.tree_units.insert("", "end", values=(u["name"], u["points"], u["rank"]))
+        # Nur geänderte Zeilen einfügen/entfernen (Schlüssel: Fraktion + Einheitenname)
+        self.units_model.sync((f"{faction}|{u['name']}", (u["name"], u["points"], u["rank"])) for u in units_sorted)
+
+        if faction != self.validator.faction:
+            self.revalidate()
 
     def show_unit_stats(self, event):
         selected = self.tree_units.focus()
@@ -376,7 +350,7 @@ class LegionArmyBuilder:
         faction = self.current_faction.get()
         
         # Einheit in DB suchen
-        unit_data = next((u for u in self.db.units[faction] if u["name"] == name), None)
+        unit_data = self.db.get_unit(faction, name)
         
         if unit_data:
             # Erstelle detaillierte Einheiten-Beschreibung
@@ -446,38 +420,8 @@ class LegionArmyBuilder:
         return text
 
     def create_tooltip(self, widget, text):
-        """Erstellt ein Hover-Tooltip für ein Widget im Army Builder"""
-        def show_tooltip(event):
-            if self.tooltip_window:
-                self.tooltip_window.destroy()
-            
-            x = widget.winfo_rootx() + 20
-            y = widget.winfo_rooty() + 20
-            
-            self.tooltip_window = tk.Toplevel(widget)
-            self.tooltip_window.wm_overrideredirect(True)
-            self.tooltip_window.geometry(f"+{x}+{y}")
-            
-            # Tooltip-Inhalt
-            tooltip_frame = tk.Frame(self.tooltip_window, bg="lightyellow", 
-                                   relief="solid", borderwidth=1)
-            tooltip_frame.pack()
-            
-            tooltip_label = tk.Label(tooltip_frame, text=text, bg="lightyellow", 
-                                   font=("Arial", 9), wraplength=350, justify="left")
-            tooltip_label.pack(padx=5, pady=2)
-            
-            self.current_tooltip_widget = widget
-
-        def hide_tooltip(event):
-            if self.tooltip_window:
-                self.tooltip_window.destroy()
-                self.tooltip_window = None
-            self.current_tooltip_widget = None
-
-        widget.bind("<Enter>", show_tooltip)
-        widget.bind("<Leave>", hide_tooltip)
-        widget.bind("<ButtonPress>", hide_tooltip)
+        """Erstellt ein Hover-Tooltip für ein Widget im Army Builder (Text oder Funktion)"""
+        self.tooltips.bind(widget, text)
 
     def format_upgrade_tooltip_text(self, upgrade_data):
         """Formatiert Ausrüstungs-Tooltip für Army Builder"""
@@ -500,52 +444,6 @@ class LegionArmyBuilder:
         
         return tooltip_text
         
-    def is_command_card_valid_for_army(self, command_card, army_unit_names, faction):
-        """Prüft ob Command Card für die aktuelle Armee verfügbar ist"""
-        if not command_card:
-            return False
-        
-        # Immer verfügbare generische Command Cards (Standing Orders, etc.)
-        generic_cards = ["Standing Orders", "Ambush", "Push", "Assault"]
-        card_name = command_card.get('name', '')
-        
-        if card_name in generic_cards:
-            return True
-            
-        # Prüfe auf Einheiten-spezifische Beschränkungen
-        restricted_to = command_card.get('restricted_to_unit', [])
-        if restricted_to:
-            # Card ist nur für bestimmte Einheiten verfügbar
-            for unit_id in restricted_to:
-                # Finde Einheit im DB und prüfe Namen
-                for unit in self.db.units.get(faction, []):
-                    if (unit.get('id') == unit_id or unit.get('name') == unit_id) and unit.get('name') in army_unit_names:
-                        return True
-            return False
-        
-        # Prüfe auf Rang-Beschränkungen
-        card_text = command_card.get('text', '').lower()
-        
-        # Kommandeur-spezifische Cards
-        if 'commander' in card_text or 'kommandeur' in card_text:
-            # Prüfe ob Kommandeur in Armee
-            for unit_name in army_unit_names:
-                unit_data = next((u for u in self.db.units.get(faction, []) if u.get('name') == unit_name), None)
-                if unit_data and unit_data.get('rank') == 'Commander':
-                    return True
-            return False
-        
-        # Operative-spezifische Cards
-        if 'operative' in card_text:
-            for unit_name in army_unit_names:
-                unit_data = next((u for u in self.db.units.get(faction, []) if u.get('name') == unit_name), None)
-                if unit_data and unit_data.get('rank') == 'Operative':
-                    return True
-            return False
-            
-        # Standardmäßig alle anderen Cards verfügbar wenn keine spezifischen Beschränkungen
-        return True
-
     def display_card_details(self, command_card):
         """Zeigt Command Card Details im Text-Widget an"""
         if not command_card:
@@ -664,7 +562,7 @@ class LegionArmyBuilder:
         vals = self.tree_units.item(selected, "values")
         unit_name = vals[0]
         faction = self.current_faction.get()
-        unit_data = next((u for u in self.db.units[faction] if u["name"] == unit_name), None)
+        unit_data = self.db.get_unit(faction, unit_name)
         
         if not unit_data: return
 
@@ -778,7 +676,7 @@ class LegionArmyBuilder:
             upgrade_map = {} # Map um vom Namen auf die Punkte zu kommen
             
             for upg in valid_upgrades:
-                display_str = f"{upg['name']} ({upg['points']} Pkt)"
+                display_str = upgrade_label(upg)
                 options.append(display_str)
                 upgrade_map[display_str] = upg
             
@@ -786,44 +684,15 @@ class LegionArmyBuilder:
             cb = ttk.Combobox(frame, textvariable=var, values=options, state="readonly", width=40)
             cb.pack(side=tk.RIGHT, fill="x", expand=True)
             
-            # Tooltip für Combobox hinzufügen
-            def create_upgrade_tooltip(combo_widget, upgrade_mapping):
-                def show_upgrade_tooltip(event):
-                    current_selection = combo_widget.get()
-                    if current_selection and current_selection != "--- Leer ---":
-                        upgrade_data = upgrade_mapping.get(current_selection)
-                        if upgrade_data:
-                            tooltip_text = self.format_upgrade_tooltip_text(upgrade_data)
-                            if self.tooltip_window:
-                                self.tooltip_window.destroy()
-                            
-                            x = combo_widget.winfo_rootx() + 20
-                            y = combo_widget.winfo_rooty() + 20
-                            
-                            self.tooltip_window = tk.Toplevel(combo_widget)
-                            self.tooltip_window.wm_overrideredirect(True)
-                            self.tooltip_window.geometry(f"+{x}+{y}")
-                            
-                            tooltip_frame = tk.Frame(self.tooltip_window, bg="lightyellow", 
-                                                   relief="solid", borderwidth=1)
-                            tooltip_frame.pack()
-                            
-                            tooltip_label = tk.Label(tooltip_frame, text=tooltip_text, 
-                                                   bg="lightyellow", font=("Arial", 9), 
-                                                   wraplength=350, justify="left")
-                            tooltip_label.pack(padx=5, pady=2)
-
-                def hide_upgrade_tooltip(event):
-                    if self.tooltip_window:
-                        self.tooltip_window.destroy()
-                        self.tooltip_window = None
-
-                combo_widget.bind("<Enter>", show_upgrade_tooltip)
-                combo_widget.bind("<Leave>", hide_upgrade_tooltip)
-                combo_widget.bind("<<ComboboxSelected>>", hide_upgrade_tooltip)
-                combo_widget.bind("<Button-1>", hide_upgrade_tooltip)
-            
-            create_upgrade_tooltip(cb, upgrade_map)
+            # Tooltip für Combobox hinzufügen (Text der aktuellen Auswahl, gecacht pro Ausrüstung)
+            def upgrade_tooltip(combo_widget=cb, upgrade_mapping=upgrade_map):
+                upgrade_data = upgrade_mapping.get(combo_widget.get())
+                if not upgrade_data:
+                    return None
+                return self.tooltips.cached(("upgrade", upgrade_data.get("name")),
+                                            self.format_upgrade_tooltip_text, upgrade_data)
+
+            self.create_tooltip(cb, upgrade_tooltip)
             
             # Event für Upgrade-Auswahl und Text-Display
             def on_upgrade_select(event, combo_widget=cb, mapping=upgrade_map):
@@ -841,10 +710,13 @@ class LegionArmyBuilder:
             
             cb.bind("<<ComboboxSelected>>", on_upgrade_select)
             cb.bind("<Button-1>", lambda e, combo=cb, mapping=upgrade_map: top.after(100, lambda: on_upgrade_select(None, combo, mapping)))
+            # Tooltip bei Auswahl/Klick ausblenden (nach den eigenen Bindings, sonst überschrieben)
+            cb.bind("<<ComboboxSelected>>", self.tooltips.hide, add="+")
+            cb.bind("<Button-1>", self.tooltips.hide, add="+")
             
             selectors.append({"var": var, "map": upgrade_map})
 
-        def add_confirmed():
+        def build_entry():
             total_cost = unit_data["points"]
             chosen_upgrades_list = []
             # NEU: Extra Minis berechnen
@@ -862,45 +734,109 @@ class LegionArmyBuilder:
             
             final_minis = base_minis + extra_minis
 
-            # Zur Armee hinzufügen
-            self.current_army_list.append({
+            return {
                 "name": unit_name,
                 "upgrades": chosen_upgrades_list,
                 "points": total_cost,
                 "base_points": unit_data["points"],
                 "minis": final_minis
-            })
+            }
+
+        lbl_preview = tk.Label(top, text="", font=("Segoe UI", 9), justify="left", wraplength=760)
+        lbl_preview.pack(side="bottom", fill="x", padx=10)
+
+        def update_preview(*args):
+            # Nur dieser Eintrag wird probeweise zu den laufenden Summen addiert
+            entry = build_entry()
+            problems = self.validator.preview(entry)
+            text = f"Einheit: {entry['points']} Pkt | Armee danach: {self.validator.points + entry['points']} / {self.validator.rules['points']}"
+            if problems:
+                text += "\n⚠ " + " | ".join(problems)
+            lbl_preview.config(text=text, fg="#c62828" if problems else "#333")
+
+        for sel in selectors:
+            sel["var"].trace_add("write", update_preview)
+        update_preview()
+
+        def add_confirmed():
+            # Zur Armee hinzufügen
+            entry = build_entry()
+            self.current_army_list.append(entry)
+            self.validator.add_unit(entry)
             self.refresh_army_view()
             top.destroy()
 
+        def fill_best():
+            # Budget: was bis zum Limit noch frei ist (mindestens leere Ausrüstung)
+            budget = self.validator.rules["points"] - self.total_points - unit_data["points"]
+            _, best = self.optimizer.optimize_unit(unit_data, faction, budget)
+            for sel in selectors:
+                sel["var"].set("--- Leer ---")
+            for upg in best:
+                label = upgrade_label(upg)
+                for sel in selectors:
+                    if label in sel["map"] and sel["var"].get() == "--- Leer ---":
+                        sel["var"].set(label)
+                        break
+
         tk.Button(top, text="HINZUFÜGEN", bg="#4CAF50", fg="white", font=("Segoe UI", 12, "bold"), command=add_confirmed).pack(side="bottom", fill="x", pady=10, padx=10)
+        tk.Button(top, text="⚙ Beste Ausrüstung (verbleibende Punkte)", bg="#9C27B0", fg="white", command=fill_best).pack(side="bottom", fill="x", padx=10)
 
     def refresh_army_view(self):
-        # Liste leeren
-        for item in self.tree_army.get_children():
-            self.tree_army.delete(item)
-            
         self.total_points = 0
+        rows = []
         
         for idx, unit in enumerate(self.current_army_list):
             upg_str = ", ".join(unit["upgrades"]) if unit["upgrades"] else "-"
             # Minis abrufen oder defaulten falls altes Savefile
             minis = unit.get("minis", "?")
-            self.tree_army.insert("", "end", values=(idx+1, unit["name"], minis, upg_str, unit["points"]))
+            rows.append((f"a{id(unit)}", (idx+1, unit["name"], minis, upg_str, unit["points"])))
             self.total_points += unit["points"]
-            
-        self.lbl_total.config(text=f"Gesamtpunkte: {self.total_points} / 800")
+
+        # Nur geänderte Zeilen aktualisieren (Schlüssel: der Listeneintrag selbst)
+        self.army_model.sync(rows)
+
+        limit = self.validator.rules["points"]
+        self.lbl_total.config(text=f"Gesamtpunkte: {self.total_points} / {limit}")
         
         # Farbliche Warnung bei Überpunktzahl
-        if self.total_points > 800:
+        if self.total_points > limit:
             self.lbl_total.config(fg="red")
         else:
             self.lbl_total.config(fg="#333")
 
+        # Regelverstöße aus den laufenden Summen des Validators
+        self.lbl_ranks.config(text=self.validator.rank_summary())
+        problems = self.validator.violations()
+        if problems:
+            self.lbl_violations.config(text="⚠ " + "\n⚠ ".join(problems), fg="#c62828")
+        else:
+            self.lbl_violations.config(text="✔ Armee ist gültig", fg="#2e7d32")
+
+    def revalidate(self):
+        """Validator komplett neu aufbauen (Fraktionswechsel, neu geladene Datenbank)."""
+        self.validator.reset(self.current_faction.get(), self.current_army_list, self.current_command_cards)
+        self.refresh_army_view()
+
+    def optimize_army(self):
+        """Ausrüstung aller Einheiten neu wählen (maximale erwartete Wunden beim Punktelimit des Validators)."""
+        if not self.current_army_list:
+            return
+        try:
+            optimized = self.optimizer.optimize_army(self.current_army_list, self.current_faction.get(),
+                                                     self.validator.rules["points"])
+        except ValueError as e:
+            messagebox.showwarning("Optimierung nicht möglich", str(e))
+            return
+        self.current_army_list[:] = optimized
+        self.validator.reset(self.current_faction.get(), self.current_army_list, self.current_command_cards)
+        self.refresh_army_view()
+
     def remove_unit(self):
         selected = self.tree_army.focus()
         if not selected: return
         idx = self.tree_army.index(selected)
+        self.validator.remove_unit(self.current_army_list[idx])
         del self.current_army_list[idx]
         self.refresh_army_view()
 
@@ -962,17 +898,9 @@ class LegionArmyBuilder:
         tv_sel.column("Pips", width=30, anchor="center")
         tv_sel.pack(fill="both", expand=True)
 
-        # Load Cards und filtere basierend auf Armee-Einheiten
+        # Load Cards und filtere basierend auf Armee-Einheiten (vorhandene IDs im Validator)
         all_cards = self.db.get_command_cards(faction)
-        valid_pool = []
-        
-        # Sammle alle Einheitennamen in der aktuellen Armee
-        army_unit_names = [unit['name'] for unit in self.current_army_list]
-        
-        for c in all_cards:
-            # Prüfe ob Command Card für die Armee verfügbar ist
-            if self.is_command_card_valid_for_army(c, army_unit_names, faction):
-                valid_pool.append(c)
+        valid_pool = [c for c in all_cards if self.validator.card_allowed(c)]
 
         # Sort by pips
         valid_pool.sort(key=lambda x: x.get("pips", 0))
@@ -995,35 +923,28 @@ class LegionArmyBuilder:
             if selection:
                 item = event.widget.item(selection)
                 card_name = item["values"][0]
-                card = next((c for c in temp_selected if c["name"] == card_name), None)
+                card = next((c for c in hand.cards if c["name"] == card_name), None)
                 if card:
                     self.display_card_details(card)
         
         tv_avail.bind("<<TreeviewSelect>>", on_card_select)
         tv_sel.bind("<<TreeviewSelect>>", on_selected_card_select)
 
-        temp_selected = list(self.current_command_cards)
+        # Hand mit laufender Pip-Zählung
+        hand = CommandHand(self.current_command_cards)
 
         def update_status():
-            count = len(temp_selected)
+            count = len(hand)
             f_right.config(text=f"Gewählte Hand ({count}/7)")
 
             # Repopulate selection list
             for item in tv_sel.get_children(): tv_sel.delete(item)
-            for c in temp_selected:
+            for c in hand.cards:
                 tv_sel.insert("", "end", values=(c["name"], c["pips"]))
 
-            # Check constraints
-            pips = [c.get("pips", 0) for c in temp_selected]
-            c1 = pips.count(1)
-            c2 = pips.count(2)
-            c3 = pips.count(3)
-            c4 = pips.count(4)
-
-            valid = (c1 == 2 and c2 == 2 and c3 == 2 and c4 == 1)
-            status_txt = f"1•: {c1}/2 | 2•: {c2}/2 | 3•: {c3}/2 | 4•: {c4}/1"
+            status_txt = hand.status_text()
 
-            if valid:
+            if hand.is_valid:
                 lbl_status.config(text=f"GÜLTIG: {status_txt}", fg="green")
                 btn_confirm.config(state=tk.NORMAL)
             else:
@@ -1040,11 +961,10 @@ class LegionArmyBuilder:
             card = next((c for c in valid_pool if c["name"] == name), None)
             if not card: return
 
-            if len(temp_selected) >= 7: return
-            # Check unique name in list
-            if any(c["name"] == card["name"] for c in temp_selected): return
+            # Hand voll, Pip-Wert voll oder Karte schon gewählt
+            if not hand.can_add(card): return
 
-            temp_selected.append(card)
+            hand.add(card)
             update_status()
 
         def remove_card():
@@ -1053,16 +973,14 @@ class LegionArmyBuilder:
             item = tv_sel.item(sel)
             name = item["values"][0]
 
-            # Remove by name
-            for i, c in enumerate(temp_selected):
-                if c["name"] == name:
-                    del temp_selected[i]
-                    break
+            hand.remove(name)
             update_status()
 
         def confirm():
-            self.current_command_cards = temp_selected
-            self.btn_cards.config(text=f"Kommandokarten wählen ({len(temp_selected)}/7)")
+            self.current_command_cards = list(hand.cards)
+            self.validator.hand = CommandHand(self.current_command_cards)
+            self.btn_cards.config(text=f"Kommandokarten wählen ({len(hand)}/7)")
+            self.refresh_army_view()
             top.destroy()
 
         tk.Button(f_mid, text=">>", command=add_card).pack(pady=20)
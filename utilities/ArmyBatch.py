@@ -0,0 +1,254 @@
+"""
+Stapelprüfung gespeicherter Armeelisten (ohne GUI).
+
+Lädt alle Armee-JSONs unterhalb eines Ordners (Standard: der "Armeen"-Ordner
+des Army Builders) parallel, berechnet die Punkte mit dem aktuellen Katalog
+neu, meldet Einheiten, Ausrüstung und Kommandokarten, die es nicht mehr gibt,
+sowie Regelverstöße (ArmyValidator) und gibt eine Übersichtstabelle aus.
+Optional werden die neu bepreisten Listen in einen Ausgabeordner exportiert
+(gleiche Ordnerstruktur, Format wie "Speichern" im Army Builder).
+
+Aufruf (Beispiele):
+    python utilities/ArmyBatch.py
+    python utilities/ArmyBatch.py Armeen/ --csv bericht.csv
+    python utilities/ArmyBatch.py Armeen/ --out Armeen_neu/ -w 4
+    python utilities/ArmyBatch.py Armeen/ --out Armeen_kompakt/ --compact
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from .LegionData import LegionDatabase
+    from .LegionUtils import get_writable_path
+    from .ArmyFormat import expand_army, is_compact, price_entry, save_army_file
+    from .ArmyValidator import ArmyValidator, upgrade_name
+except ImportError:
+    try:
+        from utilities.LegionData import LegionDatabase
+        from utilities.LegionUtils import get_writable_path
+        from utilities.ArmyFormat import expand_army, is_compact, price_entry, save_army_file
+        from utilities.ArmyValidator import ArmyValidator, upgrade_name
+    except ImportError:
+        from LegionData import LegionDatabase
+        from LegionUtils import get_writable_path
+        from ArmyFormat import expand_army, is_compact, price_entry, save_army_file
+        from ArmyValidator import ArmyValidator, upgrade_name
+
+CHUNK_SIZE = 250  # Dateien pro Auftrag an einen Worker-Prozess (kleinere Sammlungen: ohne Pool)
+LABEL_POINTS = re.compile(r"\((-?\d+) Pkt\)$")
+
+_worker_db = None
+
+
+def find_army_files(root):
+    """Alle *.json unterhalb von root (sortiert, damit Berichte stabil sind)."""
+    paths = []
+    for folder, _, files in os.walk(root):
+        paths.extend(os.path.join(folder, name) for name in files if name.lower().endswith(".json"))
+    return sorted(paths)
+
+
+def label_points(label):
+    """Punkte aus dem gespeicherten Anzeige-Text 'Name (X Pkt)' (0, falls nicht lesbar)."""
+    match = LABEL_POINTS.search(label)
+    return int(match.group(1)) if match else 0
+
+
+def reprice_army(data, db, upgrades=None):
+    """
+    Armee (Format von save_army) mit den aktuellen Katalogpreisen.
+    Rückgabe: (neue Daten, fehlende Einträge). Unbekannte Einheiten/Ausrüstung
+    behalten ihren gespeicherten Preis.
+    """
+    faction = data.get("faction")
+    if upgrades is None:
+        upgrades = {u["name"]: u for u in db.upgrades}
+    missing = []
+    army = []
+    for entry in data.get("army", []):
+        unit = db.get_unit(faction, entry["name"])
+        if unit is None:
+            missing.append(f"Einheit: {entry['name']}")
+            army.append(dict(entry))
+            continue
+
+        resolved, unknown = [], []
+        for label in entry.get("upgrades", []):
+            upgrade = upgrades.get(upgrade_name(label))
+            if upgrade is None:
+                missing.append(f"Ausrüstung: {label}")
+                unknown.append(label)
+            else:
+                resolved.append(upgrade)
+        priced = price_entry(unit, resolved)
+        priced["upgrades"] += unknown
+        priced["points"] += sum(label_points(label) for label in unknown)
+        army.append({**entry, **priced})
+
+    known_cards = {c["name"] for c in db.get_command_cards(faction)} if faction else set()
+    for card in data.get("command_cards", []):
+        if card.get("name") not in known_cards:
+            missing.append(f"Kommandokarte: {card.get('name')}")
+
+    repriced = {**data, "army": army, "total_points": sum(e["points"] for e in army)}
+    return repriced, missing
+
+
+def check_army(path, db, root=None, out_dir=None, upgrades=None, compact=False):
+    """
+    Eine Datei (altes oder kompaktes Format) prüfen und ggf. exportieren
+    (compact=True: im kompakten ID-Format). Rückgabe: Zeile für den Bericht.
+    """
+    row = {"path": os.path.relpath(path, root) if root else path, "faction": "", "units": 0,
+           "old_points": 0, "new_points": 0, "changed": 0, "missing": [], "violations": [], "error": None}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not data.get("faction") or (data.get("army") is None and not is_compact(data)):
+            raise ValueError("keine Fraktion oder Armee")
+    except (OSError, ValueError) as e:
+        row["error"] = str(e)
+        return row
+
+    # Kompakte Dateien werden über die Katalog-IDs aufgelöst (und sind danach schon aktuell bepreist).
+    # Defekte Einträge (fehlende Felder, falsche Typen) ergeben eine Fehlerzeile statt den Lauf abzubrechen.
+    try:
+        data, unresolved = expand_army(data, db)
+        repriced, missing = reprice_army(data, db, upgrades)
+        validator = ArmyValidator(db)
+        validator.reset(data["faction"], repriced["army"], data.get("command_cards", []))
+        old_army = data["army"]
+        row.update({
+            "faction": data["faction"],
+            "units": len(old_army),
+            "old_points": sum(e.get("points", 0) for e in old_army),
+            "new_points": repriced["total_points"],
+            "changed": sum(1 for old, new in zip(old_army, repriced["army"]) if old.get("points") != new["points"]),
+            "missing": unresolved + missing,
+            "violations": validator.violations(),
+        })
+
+        if out_dir:
+            target = os.path.join(out_dir, os.path.relpath(path, root) if root else os.path.basename(path))
+            save_army_file(target, repriced, db, compact=compact)
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _init_worker():
+    """Jeder Worker lädt die Datenbank einmal (über den Katalog-Cache)."""
+    global _worker_db
+    logging.disable(logging.INFO)
+    _worker_db = LegionDatabase()
+
+
+def check_chunk(paths, root=None, out_dir=None, db=None, compact=False):
+    db = db or _worker_db
+    upgrades = {u["name"]: u for u in db.upgrades}
+    return [check_army(path, db, root, out_dir, upgrades, compact) for path in paths]
+
+
+def check_all(paths, root=None, out_dir=None, workers=None, db=None, progress=None, compact=False):
+    """
+    Prüft alle Dateien in Blöcken auf einem Prozess-Pool (workers=1 oder nur
+    ein Block: im aktuellen Prozess mit db). progress(done, total) nach jedem Block.
+    Rückgabe: Berichtszeilen in der Reihenfolge von paths.
+    """
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    results = [None] * len(chunks)
+    done = 0
+
+    def collect(i, rows):
+        nonlocal done
+        results[i] = rows
+        done += len(rows)
+        if progress:
+            progress(done, len(paths))
+
+    if workers == 1 or len(chunks) <= 1:
+        db = db or LegionDatabase.shared()
+        for i, chunk in enumerate(chunks):
+            collect(i, check_chunk(chunk, root, out_dir, db, compact))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(check_chunk, chunk, root, out_dir, None, compact): i
+                       for i, chunk in enumerate(chunks)}
+            for fut in as_completed(futures):
+                collect(futures[fut], fut.result())
+
+    return [row for rows in results for row in rows]
+
+
+def format_report(rows):
+    """Tabelle: eine Zeile pro Datei, darunter Fehler/fehlende Einträge/Verstöße."""
+    lines = [f"{'Datei':<48} {'Fraktion':<24} {'Einh.':>5} {'Alt':>5} {'Neu':>5} {'Δ':>5}  Status"]
+    for r in rows:
+        if r["error"]:
+            lines.append(f"{r['path'][:48]:<48} {'':<24} {'':>5} {'':>5} {'':>5} {'':>5}  FEHLER: {r['error']}")
+            continue
+        problems = len(r["missing"]) + len(r["violations"])
+        status = "OK" if not problems else f"{problems} Problem(e)"
+        lines.append(f"{r['path'][:48]:<48} {r['faction'][:24]:<24} {r['units']:>5} {r['old_points']:>5} "
+                     f"{r['new_points']:>5} {r['new_points'] - r['old_points']:>+5}  {status}")
+        for text in r["missing"]:
+            lines.append(f"    ✗ nicht gefunden: {text}")
+        for text in r["violations"]:
+            lines.append(f"    ⚠ {text}")
+
+    ok = sum(1 for r in rows if not r["error"] and not r["missing"] and not r["violations"])
+    changed = sum(1 for r in rows if not r["error"] and r["new_points"] != r["old_points"])
+    lines.append(f"\n{len(rows)} Listen: {ok} ohne Probleme, {changed} mit geänderten Punkten, "
+                 f"{sum(1 for r in rows if r['error'])} nicht lesbar")
+    return "\n".join(lines)
+
+
+def write_csv(rows, path):
+    fields = ["path", "faction", "units", "old_points", "new_points", "changed", "missing", "violations", "error"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({**r, "missing": "; ".join(r["missing"]), "violations": "; ".join(r["violations"]),
+                             "error": r["error"] or ""})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gespeicherte Armeelisten prüfen und neu bepreisen (SW Legion)")
+    parser.add_argument("root", nargs="?", default=None, help="Ordner mit Armee-JSONs (Standard: Armeen)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--out", help="Neu bepreiste Listen in diesen Ordner exportieren")
+    parser.add_argument("--compact", action="store_true", help="Export im kompakten ID-Format (Standard: altes Format)")
+    parser.add_argument("--csv", help="Bericht zusätzlich als CSV speichern")
+    args = parser.parse_args(argv)
+
+    root = args.root or get_writable_path("Armeen")
+    if not os.path.isdir(root):
+        parser.error(f"Ordner nicht gefunden: {root}")
+    if args.out and os.path.abspath(args.out) == os.path.abspath(root):
+        parser.error("--out darf nicht der Eingabeordner sein")
+
+    paths = find_army_files(root)
+    start = time.time()
+
+    def progress(done, total):
+        print(f"\r[{done}/{total}] {time.time() - start:.1f}s", end="", file=sys.stderr, flush=True)
+
+    rows = check_all(paths, root, args.out, args.workers, progress=progress, compact=args.compact)
+    print(file=sys.stderr)
+    print(format_report(rows))
+    if args.csv:
+        write_csv(rows, args.csv)
+        print(f"CSV gespeichert: {args.csv}")
+    return 0 if all(not r["error"] and not r["missing"] and not r["violations"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Kompaktes Speicherformat für Armeelisten (ID-Referenzen).
+
+Bisher speichert der Army Builder jede Einheit mit Anzeige-Texten und Preisen
+("Legacy", Version 1):
+    {"faction", "total_points", "army": [{"name", "upgrades": ["Name (X Pkt)"],
+     "points", "base_points", "minis"}], "command_cards": [vollständige Karten]}
+
+Das kompakte Format (Version 2) enthält nur Referenzen auf den Katalog:
+    {"version": 2, "faction": "...",
+     "units": [{"id": "stormtroopers", "upgrades": ["dlt-19-stormtrooper", ...]}, ...],
+     "command_cards": ["ambush", ...]}
+
+Punkte, Figuren und Namen werden beim Laden über die Katalog-Indizes neu
+bestimmt und sind damit auch nach Katalog-Änderungen exakt. Einträge ohne ID
+(eigene Einheiten/Ausrüstung) werden als {"name": ...} referenziert.
+expand_army() liefert immer das Legacy-Format, das Army Builder, Game
+Companion und die Werkzeuge verwenden.
+"""
+import json
+import os
+
+try:
+    from .ArmyValidator import upgrade_name
+except ImportError:
+    try:
+        from utilities.ArmyValidator import upgrade_name
+    except ImportError:
+        from ArmyValidator import upgrade_name
+
+ARMY_VERSION = 2
+
+
+def upgrade_label(upgrade):
+    """Anzeige-Text eines Upgrades wie in den Dropdowns des Army Builders."""
+    return f"{upgrade['name']} ({upgrade['points']} Pkt)"
+
+
+def is_compact(data):
+    return isinstance(data, dict) and data.get("version", 1) >= ARMY_VERSION and "units" in data
+
+
+def price_entry(unit, upgrades):
+    """Armee-Eintrag (Legacy-Format) aus Katalog-Einheit und Upgrade-Dicts."""
+    return {
+        "name": unit["name"],
+        "upgrades": [upgrade_label(u) for u in upgrades],
+        "points": unit["points"] + sum(u["points"] for u in upgrades),
+        "base_points": unit["points"],
+        "minis": unit.get("minis", 1) + sum(1 for u in upgrades if u.get("adds_mini")),
+    }
+
+
+def compact_army(data, db):
+    """Legacy-Armee -> kompaktes Format (unbekannte Einträge werden per Name referenziert)."""
+    faction = data.get("faction")
+    units = []
+    for entry in data.get("army", []):
+        unit = db.get_unit(faction, entry["name"])
+        ref = {"id": unit["id"]} if unit and unit.get("id") else {"name": entry["name"]}
+        upgrades = []
+        for label in entry.get("upgrades", []):
+            name = upgrade_name(label)
+            upgrade = db.get_upgrade(name)
+            upgrades.append(upgrade["id"] if upgrade and upgrade.get("id") else {"name": name})
+        if upgrades:
+            ref["upgrades"] = upgrades
+        units.append(ref)
+    cards = [c.get("id") or c.get("name") for c in data.get("command_cards", [])]
+    return {"version": ARMY_VERSION, "faction": faction, "units": units, "command_cards": cards}
+
+
+def _resolve_upgrade(ref, db):
+    if isinstance(ref, dict):
+        return db.get_upgrade(ref.get("name")), ref.get("name")
+    return db.get_upgrade_by_id(ref), ref
+
+
+def expand_army(data, db):
+    """
+    Kompakte oder Legacy-Armee -> Legacy-Format mit Katalogwerten.
+    Rückgabe: (Armee, nicht auflösbare Einträge). Bei Legacy-Dateien bleiben
+    gespeicherte Preise erhalten; fehlende Figurenzahlen werden aus Einheit
+    und Ausrüstung berechnet.
+    """
+    faction = data.get("faction")
+    if not is_compact(data):
+        army = []
+        for entry in data.get("army", []):
+            entry = dict(entry)
+            unit = db.get_unit(faction, entry.get("name")) if "minis" not in entry else None
+            if unit:
+                upgrades = [db.get_upgrade(upgrade_name(label)) for label in entry.get("upgrades", [])]
+                entry["minis"] = unit.get("minis", 1) + sum(1 for u in upgrades if u and u.get("adds_mini"))
+            army.append(entry)
+        return {**data, "army": army}, []
+
+    missing = []
+    army = []
+    for ref in data.get("units", []):
+        if "id" in ref:
+            unit, key = db.get_unit_by_id(ref["id"], faction), ref["id"]
+        else:
+            unit, key = db.get_unit(faction, ref.get("name")), ref.get("name")
+        if unit is None:
+            missing.append(f"Einheit: {key}")
+            continue
+        upgrades = []
+        for upgrade_ref in ref.get("upgrades", []):
+            upgrade, key = _resolve_upgrade(upgrade_ref, db)
+            if upgrade is None:
+                missing.append(f"Ausrüstung: {key} ({unit['name']})")
+            else:
+                upgrades.append(upgrade)
+        army.append(price_entry(unit, upgrades))
+
+    cards = []
+    for key in data.get("command_cards", []):
+        card = db.get_command_card(key)
+        if card is None:
+            missing.append(f"Kommandokarte: {key}")
+        else:
+            cards.append(card)
+
+    return {"faction": faction, "total_points": sum(e["points"] for e in army), "army": army,
+            "command_cards": cards}, missing
+
+
+def load_army_file(path, db):
+    """Armee-JSON (beide Formate) laden. Rückgabe: (Legacy-Armee, nicht auflösbare Einträge)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("Ungültiges Dateiformat")
+    return expand_army(data, db)
+
+
+def save_army_file(path, data, db, compact=True):
+    """Legacy-Armee speichern, standardmäßig im kompakten Format (atomar über .tmp)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        if compact:
+            json.dump(compact_army(data, db), f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
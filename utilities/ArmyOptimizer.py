@@ -0,0 +1,237 @@
+"""
+Ausrüstungs-Optimierer für den Army Builder.
+
+Füllt die Upgrade-Slots einer Einheit oder einer ganzen Armee unter einem
+Punktelimit so, dass eine Bewertung (Standard: erwartete Wunden des besten
+Fernkampf-Profils, siehe AttackCalculator) maximal wird.
+
+Vorgehen:
+1. Pro Slot werden Upgrades mit gleicher Wirkung (Signatur) zusammengefasst;
+   nur das billigste bleibt übrig, teurere mit gleicher Wirkung können nie
+   besser sein.
+2. Pro Einheit werden die verbleibenden Kombinationen per Tiefensuche
+   aufgezählt und auf die Pareto-Front (Kosten -> beste Bewertung) reduziert.
+   Die Front wird pro Einheitenname zwischengespeichert.
+3. Für die Armee wird ein Rucksack-Problem mit einer Auswahl pro Einheit über
+   das verbleibende Punktebudget gelöst (DP mit numpy, danach Rückverfolgung).
+
+Die Upgrades der Datenbank enthalten keine eigenen Waffenprofile; die
+Standardbewertung berücksichtigt daher zusätzliche Figuren (adds_mini) und
+Keywords der Upgrades, die der AttackCalculator kennt.
+"""
+import logging
+
+import numpy as np
+
+try:
+    from .LegionRules import LegionRules
+    from .AttackCalculator import calculate_attack
+    from .MatchupSimulator import select_weapons
+    from .ArmyFormat import upgrade_label
+except ImportError:
+    try:
+        from utilities.LegionRules import LegionRules
+        from utilities.AttackCalculator import calculate_attack
+        from utilities.MatchupSimulator import select_weapons
+        from utilities.ArmyFormat import upgrade_label
+    except ImportError:
+        from LegionRules import LegionRules
+        from AttackCalculator import calculate_attack
+        from MatchupSimulator import select_weapons
+        from ArmyFormat import upgrade_label
+
+DEFAULT_LIMIT = 800
+
+
+def upgrade_keywords(upgrade):
+    """keyword_map eines Upgrades (vorhanden oder aus der Keyword-Liste/-Dict abgeleitet)."""
+    if upgrade.get("keyword_map"):
+        return upgrade["keyword_map"]
+    keywords = upgrade.get("keywords") or []
+    if isinstance(keywords, dict):
+        keywords = [f"{name} {value}".strip() for name, value in keywords.items()]
+    return LegionRules.parse_keyword_list(keywords)
+
+
+def adds_fighter(upgrade):
+    """Zusätzliche Figur, die mitkämpft (Nichtkombattanten wie Medidroiden zählen nicht)."""
+    return bool(upgrade.get("adds_mini")) and "Noncombatant" not in upgrade_keywords(upgrade)
+
+
+class WoundScore:
+    """
+    Erwartete Wunden der Einheit mit einer Ausrüstung gegen einen Standard-Verteidiger.
+
+    Aufruf: score(unit, upgrades) -> float. signature(upgrade) beschreibt alles,
+    was die Bewertung an einem Upgrade sieht; Upgrades mit gleicher Signatur sind
+    für den Optimierer austauschbar.
+    """
+
+    def __init__(self, defense_die="White", aims=0, cover=0, melee=False):
+        self.defense_die = defense_die
+        self.aims = aims
+        self.cover = cover
+        self.melee = melee
+        self._cache = {}
+
+    def signature(self, upgrade):
+        return adds_fighter(upgrade), tuple(sorted(upgrade_keywords(upgrade).items()))
+
+    def __call__(self, unit, upgrades):
+        minis = unit.get("minis", 1) + sum(1 for u in upgrades if adds_fighter(u))
+        extra_kw = {}
+        for upgrade in upgrades:
+            for name, val in upgrade_keywords(upgrade).items():
+                extra_kw[name] = extra_kw.get(name, 0) + val
+
+        best = 0.0
+        for weapon in select_weapons(unit, self.melee):
+            kw_map = dict(unit.get("keyword_map", {}))
+            for source in (weapon.get("keyword_map", {}), extra_kw):
+                for name, val in source.items():
+                    kw_map[name] = kw_map.get(name, 0) + val
+            pool = {c: n * minis for c, n in weapon["dice"].items()}
+            surge = unit.get("surge", {}).get("attack")
+            key = (tuple(sorted(pool.items())), tuple(sorted(kw_map.items())), surge)
+            wounds = self._cache.get(key)
+            if wounds is None:
+                wounds = self._cache[key] = calculate_attack(
+                    pool, kw_map, attack_surge=surge, aims=self.aims, cover=self.cover,
+                    defense_die=self.defense_die).expected_wounds
+            best = max(best, wounds)
+        return best
+
+
+class ArmyOptimizer:
+    """Beste Ausrüstung für Einheiten und Armeen unter einem Punktelimit."""
+
+    def __init__(self, db, score=None):
+        self.db = db
+        self.score = score or WoundScore()
+        self._frontiers = {}
+
+    def clear(self):
+        """Zwischengespeicherte Fronten verwerfen (z.B. nach dem Neuladen der Datenbank)."""
+        self._frontiers.clear()
+
+    def _signature(self, upgrade):
+        signature = getattr(self.score, "signature", None)
+        # Ohne Signatur ist jedes Upgrade verschieden (keine Zusammenfassung)
+        return signature(upgrade) if signature else upgrade["name"]
+
+    def slot_options(self, unit, faction):
+        """Pro Slot die Kandidaten: je Signatur die billigsten (so viele wie gleichartige Slots)."""
+        slots = unit.get("slots", [])
+        options = []
+        for slot in slots:
+            keep = slots.count(slot)
+            by_signature = {}
+            upgrades = self.db.get_valid_upgrades(slot, unit["name"], faction)
+            for upgrade in sorted(upgrades, key=lambda u: u["points"]):
+                group = by_signature.setdefault(self._signature(upgrade), [])
+                if len(group) < keep:
+                    group.append(upgrade)
+            options.append([u for group in by_signature.values() for u in group])
+        return options
+
+    def frontier(self, unit, faction):
+        """
+        Pareto-Front der Einheit: Liste von (Kosten, Bewertung, Upgrades) mit
+        steigenden Kosten und streng steigender Bewertung. Der erste Eintrag ist
+        immer die leere Ausrüstung.
+        """
+        key = (faction, unit["name"])
+        if key in self._frontiers:
+            return self._frontiers[key]
+
+        options = self.slot_options(unit, faction)
+        combos = []
+
+        def search(i, cost, chosen):
+            if i == len(options):
+                combos.append((cost, self.score(unit, chosen), tuple(chosen)))
+                return
+            search(i + 1, cost, chosen)
+            names = {u["name"] for u in chosen}
+            for upgrade in options[i]:
+                if upgrade["name"] not in names:
+                    chosen.append(upgrade)
+                    search(i + 1, cost + upgrade["points"], chosen)
+                    chosen.pop()
+
+        search(0, 0, [])
+        combos.sort(key=lambda c: (c[0], -c[1]))
+        front = []
+        for cost, score, chosen in combos:
+            if not front or score > front[-1][1] + 1e-9:
+                front.append((cost, score, list(chosen)))
+        self._frontiers[key] = front
+        logging.debug("Optimierer: %s - %d Kombinationen, %d auf der Front", unit["name"], len(combos), len(front))
+        return front
+
+    def optimize_unit(self, unit, faction, budget):
+        """Beste Ausrüstung mit höchstens budget Punkten: (Bewertung, Upgrades)."""
+        best = (0.0, [])
+        for cost, score, chosen in self.frontier(unit, faction):
+            if cost > budget:
+                break
+            best = (score, chosen)
+        return best
+
+    def optimize_army(self, entries, faction, limit=DEFAULT_LIMIT):
+        """
+        Neue Armeeliste (Format des Army Builders) mit optimaler Ausrüstung.
+        Die Einheiten bleiben gleich, nur upgrades/points/minis ändern sich.
+        Wirft ValueError, wenn die Einheiten schon ohne Ausrüstung zu teuer sind.
+        """
+        units = []
+        for entry in entries:
+            unit = self.db.get_unit(faction, entry["name"])
+            if unit is None:
+                raise ValueError(f"Einheit nicht gefunden: {entry['name']} ({faction})")
+            units.append(unit)
+
+        budget = limit - sum(u["points"] for u in units)
+        if budget < 0:
+            raise ValueError(f"Die Einheiten kosten ohne Ausrüstung schon {limit - budget} / {limit} Punkte.")
+
+        # dp[b] = beste Gesamtbewertung mit höchstens b Punkten für Ausrüstung
+        dp = np.zeros(budget + 1)
+        choices = []
+        fronts = [self.frontier(unit, faction) for unit in units]
+        for front in fronts:
+            # Ohne Ausrüstung zählt die Einheit mit ihrer Grundbewertung
+            new = dp + front[0][1]
+            choice = np.zeros(budget + 1, dtype=np.int16)
+            for k, (cost, score, _) in enumerate(front[1:], start=1):
+                if cost > budget:
+                    break
+                candidate = dp[:budget + 1 - cost] + score
+                better = candidate > new[cost:] + 1e-9
+                new[cost:][better] = candidate[better]
+                choice[cost:][better] = k
+            dp = new
+            choices.append(choice)
+
+        # Rückverfolgung
+        remaining = budget
+        picks = [0] * len(units)
+        for i in range(len(units) - 1, -1, -1):
+            k = int(choices[i][remaining])
+            picks[i] = k
+            remaining -= fronts[i][k][0]
+
+        result = []
+        for entry, unit, front, k in zip(entries, units, fronts, picks):
+            cost, _, chosen = front[k]
+            new_entry = dict(entry)
+            new_entry.update({
+                "upgrades": [upgrade_label(u) for u in chosen],
+                "points": unit["points"] + cost,
+                "base_points": unit["points"],
+                "minis": unit.get("minis", 1) + sum(1 for u in chosen if u.get("adds_mini")),
+            })
+            result.append(new_entry)
+        logging.info("Optimierer: %d Einheiten, Bewertung %.2f, %d Punkte", len(result), float(dp[budget]),
+                     sum(e["points"] for e in result))
+        return result
@@ -0,0 +1,214 @@
+"""
+Regelbasierte, inkrementelle Prüfung von Armeelisten.
+
+ArmyValidator führt laufende Summen (Punkte, Einheiten pro Rang, einzigartige
+Einheiten/Ausrüstung, vorhandene Einheiten-IDs und die Kommandokarten-Hand)
+und aktualisiert sie bei jedem Hinzufügen/Entfernen, statt die ganze Liste neu
+zu durchsuchen. violations() liest nur die Summen aus.
+
+Armee-Einträge haben das Format des Army Builders:
+{"name", "upgrades": ["Name (X Pkt)", ...], "points", "base_points", "minis"}
+"""
+from collections import Counter
+
+# Punktelimit und Rang-Grenzen (min, max) je Spielformat
+STANDARD = {
+    "name": "Standard",
+    "points": 800,
+    "ranks": {"Commander": (1, 2), "Operative": (0, 2), "Corps": (3, 6),
+              "Special Forces": (0, 3), "Support": (0, 3), "Heavy": (0, 2)},
+}
+GRAND_ARMY = {
+    "name": "Grand Army",
+    "points": 1600,
+    "ranks": {"Commander": (2, 4), "Operative": (0, 4), "Corps": (6, 10),
+              "Special Forces": (0, 5), "Support": (0, 5), "Heavy": (0, 4)},
+}
+
+RANK_NAMES = {"Commander": "Kommandeur", "Operative": "Agent", "Corps": "Korps",
+              "Special Forces": "Spezialeinheit", "Support": "Unterstützung", "Heavy": "Schwer"}
+
+# Kommandokarten-Hand: Anzahl Karten pro Pip-Wert
+HAND_PIPS = {1: 2, 2: 2, 3: 2, 4: 1}
+HAND_SIZE = sum(HAND_PIPS.values())
+
+
+def upgrade_name(label):
+    """'Name (X Pkt)' -> 'Name' (Einträge der Armeeliste speichern den Anzeige-Text)."""
+    name, sep, rest = label.rpartition(" (")
+    return name if sep and rest.endswith("Pkt)") else label
+
+
+def card_requirements(card):
+    """(alle benötigten Einheiten-IDs, mindestens eine von) einer Kommandokarte."""
+    required = {r.get("id") if isinstance(r, dict) else r for r in card.get("required") or []}
+    any_of = {r.get("id") if isinstance(r, dict) else r for r in card.get("restricted_to_unit") or []}
+    return required, any_of
+
+
+class CommandHand:
+    """Kommandokarten-Hand mit laufender Pip-Zählung (2x 1•, 2x 2•, 2x 3•, 1x 4•)."""
+
+    def __init__(self, cards=()):
+        self.cards = []
+        self.pips = Counter()
+        for card in cards:
+            self.add(card)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def can_add(self, card):
+        pips = card.get("pips", 0)
+        return (len(self.cards) < HAND_SIZE
+                and self.pips[pips] < HAND_PIPS.get(pips, 0)
+                and all(c["name"] != card["name"] for c in self.cards))
+
+    def add(self, card):
+        self.cards.append(card)
+        self.pips[card.get("pips", 0)] += 1
+
+    def remove(self, name):
+        for i, card in enumerate(self.cards):
+            if card["name"] == name:
+                del self.cards[i]
+                self.pips[card.get("pips", 0)] -= 1
+                return card
+        return None
+
+    @property
+    def is_valid(self):
+        return all(self.pips[p] == n for p, n in HAND_PIPS.items()) and len(self.cards) == HAND_SIZE
+
+    def status_text(self):
+        return " | ".join(f"{p}•: {self.pips[p]}/{n}" for p, n in HAND_PIPS.items())
+
+
+class ArmyValidator:
+    """Laufende Legalitätsprüfung einer Armee (Punkte, Ränge, Einzigartigkeit, Kommandokarten)."""
+
+    def __init__(self, db, faction=None, rules=STANDARD):
+        self.db = db
+        self.rules = rules
+        self.reset(faction)
+
+    def reset(self, faction, entries=(), cards=()):
+        """Alle Summen neu aufbauen (Laden, Fraktionswechsel, Optimierer)."""
+        self.faction = faction
+        self.points = 0
+        self.ranks = Counter()
+        self.unique = Counter()
+        self.unit_ids = Counter()
+        self.unknown = Counter()
+        self._entries = {}
+        self._upgrade_index = None
+        for entry in entries:
+            self.add_unit(entry)
+        self.hand = CommandHand(cards)
+
+    def _upgrade(self, label):
+        if self._upgrade_index is None:
+            self._upgrade_index = {u["name"]: u for u in self.db.upgrades}
+        return self._upgrade_index.get(upgrade_name(label))
+
+    def _contribution(self, entry):
+        """Was ein Armee-Eintrag zu den Summen beiträgt (einmal pro Eintrag bestimmt)."""
+        unit = self.db.get_unit(self.faction, entry["name"]) if self.faction else None
+        unique = []
+        if unit and unit.get("unique"):
+            unique.append(("Einheit", unit["name"]))
+        for label in entry.get("upgrades", []):
+            upgrade = self._upgrade(label)
+            if upgrade and upgrade.get("unique"):
+                unique.append(("Ausrüstung", upgrade["name"]))
+        return {
+            "points": entry.get("points", 0),
+            "rank": unit.get("rank") if unit else None,
+            "id": unit.get("id") if unit else None,
+            "unique": unique,
+            "name": entry["name"],
+        }
+
+    def add_unit(self, entry):
+        c = self._entries[id(entry)] = self._contribution(entry)
+        self._apply(c, 1)
+
+    def remove_unit(self, entry):
+        c = self._entries.pop(id(entry), None)
+        if c is not None:
+            self._apply(c, -1)
+
+    def _apply(self, c, sign):
+        self.points += sign * c["points"]
+        if c["rank"]:
+            self.ranks[c["rank"]] += sign
+        else:
+            self.unknown[c["name"]] += sign
+        if c["id"]:
+            self.unit_ids[c["id"]] += sign
+        for key in c["unique"]:
+            self.unique[key] += sign
+
+    # --- Kommandokarten ---
+
+    def card_allowed(self, card):
+        """Karte spielbar, wenn alle benötigten (bzw. eine der erlaubten) Einheiten in der Armee sind."""
+        if not card:
+            return False
+        required, any_of = card_requirements(card)
+        if any(self.unit_ids[uid] <= 0 for uid in required):
+            return False
+        if any_of and not any(self.unit_ids[uid] > 0 or self._has_name(uid) for uid in any_of):
+            return False
+        return True
+
+    def _has_name(self, name):
+        # Alte Daten: restricted_to_unit enthält Einheitennamen statt IDs
+        return any(c["name"] == name for c in self._entries.values())
+
+    # --- Auswertung ---
+
+    def rank_summary(self):
+        return " | ".join(f"{RANK_NAMES[r]}: {self.ranks[r]} ({lo}-{hi})" for r, (lo, hi) in self.rules["ranks"].items())
+
+    def violations(self, check_hand=True, minimums=True):
+        """Liste lesbarer Regelverstöße (leer = gültig)."""
+        problems = []
+        limit = self.rules["points"]
+        if self.points > limit:
+            problems.append(f"Punkte: {self.points} / {limit}")
+        for rank, (lo, hi) in self.rules["ranks"].items():
+            count = self.ranks[rank]
+            if count < lo and minimums:
+                problems.append(f"Mindestens {lo}x {RANK_NAMES[rank]} (aktuell {count})")
+            elif count > hi:
+                problems.append(f"Höchstens {hi}x {RANK_NAMES[rank]} (aktuell {count})")
+        for (kind, name), count in sorted(self.unique.items()):
+            if count > 1:
+                problems.append(f"{kind} '{name}' ist einzigartig ({count}x)")
+        for name, count in sorted(self.unknown.items()):
+            if count > 0:
+                problems.append(f"Unbekannte Einheit: {name}")
+        if check_hand:
+            if not self.hand.is_valid:
+                problems.append(f"Kommandokarten: {self.hand.status_text()}")
+            for card in self.hand.cards:
+                if not self.card_allowed(card):
+                    problems.append(f"Kommandokarte '{card['name']}' ohne passende Einheit")
+        return problems
+
+    @property
+    def is_valid(self):
+        return not self.violations()
+
+    def preview(self, entry):
+        """
+        Verstöße, die durch das Hinzufügen von entry entstehen könnten (Punkte,
+        Rang-Maximum, Einzigartigkeit). Die Summen bleiben unverändert.
+        """
+        c = self._contribution(entry)
+        self._apply(c, 1)
+        try:
+            return self.violations(check_hand=False, minimums=False)
+        finally:
+            self._apply(c, -1)
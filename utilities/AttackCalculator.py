@@ -0,0 +1,171 @@
+from math import comb
+
+import numpy as np
+
+# Import dice tables with compatibility for both script and package modes
+try:
+    from .DiceEngine import face_probabilities, ATTACK_COLORS
+except ImportError:
+    try:
+        from utilities.DiceEngine import face_probabilities, ATTACK_COLORS
+    except ImportError:
+        from DiceEngine import face_probabilities, ATTACK_COLORS
+
+# Indizes in face_probabilities(..., "attack") (Reihenfolge ATTACK_RESULTS)
+CRIT, HIT, SURGE, BLANK = 0, 1, 2, 3
+
+
+class AttackOutcome:
+    """Wahrscheinlichkeitsverteilung von Wunden und Niederhalten eines Angriffs."""
+
+    def __init__(self, wounds, suppression):
+        # wounds[i] = P(genau i Wunden), suppression[i] = P(genau i Niederhalten)
+        self.wounds = wounds
+        self.suppression = suppression
+
+    @property
+    def expected_wounds(self):
+        return float(sum(i * p for i, p in enumerate(self.wounds)))
+
+    @property
+    def expected_suppression(self):
+        return float(sum(i * p for i, p in enumerate(self.suppression)))
+
+    def chance_at_least(self, wounds):
+        """P(mindestens `wounds` Wunden)."""
+        return float(sum(self.wounds[wounds:]))
+
+    def percentile(self, q):
+        """Kleinste Wundenzahl w mit P(Wunden <= w) >= q (q zwischen 0 und 1)."""
+        total = 0.0
+        for i, p in enumerate(self.wounds):
+            total += p
+            if total >= q - 1e-12:
+                return i
+        return len(self.wounds) - 1
+
+    def summary(self):
+        """Kurzer Anzeigetext für den Angriffsdialog."""
+        return (f"Ø {self.expected_wounds:.2f} Wunden | "
+                f"≥1 Wunde: {self.chance_at_least(1) * 100:.0f}% | "
+                f"Median {self.percentile(0.5)}, 90%: {self.percentile(0.9)} | "
+                f"Ø Niederhalten {self.expected_suppression:.2f}")
+
+
+def _add_die(dist, probs):
+    """Faltet einen Angriffswürfel in die Verteilung dist[crit, hit, surge] ein."""
+    out = dist * probs[BLANK]
+    out[1:, :, :] += dist[:-1, :, :] * probs[CRIT]
+    out[:, 1:, :] += dist[:, :-1, :] * probs[HIT]
+    out[:, :, 1:] += dist[:, :, :-1] * probs[SURGE]
+    return out
+
+
+def roll_distribution(die_probs, size):
+    """
+    Verteilung von (crit, hit, surge) über eine Liste von Würfel-Wahrscheinlichkeiten.
+    Blanks ergeben sich aus der Würfelanzahl. Rückgabe: Array (size+1)^3.
+    """
+    dist = np.zeros((size + 1,) * 3)
+    dist[0, 0, 0] = 1.0
+    for probs in die_probs:
+        dist = _add_die(dist, probs)
+    return dist
+
+
+def calculate_attack(pool, keywords=None, attack_surge=None, aims=0, cover=0, dodges=0,
+                     defense_die="White", defense_surge=False, target_keywords=None):
+    """
+    Exakte Verteilung eines Angriffs nach derselben Reihenfolge wie der
+    Angriffsdialog im Game Companion:
+
+    Wurf -> Zielen (Reroll 2 + Präzise je Marker) -> Kritisch X -> Surge-Umwandlung
+    -> Wucht gegen Panzerung -> Deckung (Explosion/Scharfschütze) -> Ausweichen
+    (Hochgeschwindigkeit) -> Verteidigungswurf mit Surge -> Durchschlagen
+    (Immunität: Durchschlagen) -> Niederhalten (Niederhaltend).
+
+    pool: {"red": x, "black": y, "white": z} (bereits nach Niederhalten reduziert)
+    keywords / target_keywords: keyword_map (englischer Name -> Wert)
+    """
+    keywords = keywords or {}
+    target_keywords = target_keywords or {}
+
+    colors = [c for c in ATTACK_COLORS if pool.get(c, 0) > 0]
+    n = sum(pool.get(c, 0) for c in colors)
+    suppressive = keywords.get("Suppressive", 0)
+    if n == 0:
+        return AttackOutcome([1.0], _suppression_dist(0.0, suppressive))
+
+    color_probs = {c: face_probabilities(c, "attack") for c in colors}
+    dist = roll_distribution([color_probs[c] for c in colors for _ in range(pool[c])], n)
+
+    # ZIELEN: Blanks (und Surges ohne Umwandlung) werden mit Würfeln neu geworfen,
+    # deren Farbe zufällig gemäß Pool-Zusammensetzung gewählt wird.
+    reroll_cap = aims * (2 + keywords.get("Precise", 0))
+    if reroll_cap > 0:
+        mix = sum(color_probs[c] * pool[c] for c in colors) / n
+        reroll_dists = [roll_distribution([mix] * k, k) for k in range(min(n, reroll_cap) + 1)]
+        rerolled = np.zeros_like(dist)
+        for c, h, s in zip(*np.nonzero(dist)):
+            p = dist[c, h, s]
+            blanks = n - c - h - s
+            rerollable_surges = 0 if attack_surge else s
+            k = min(blanks + rerollable_surges, reroll_cap)
+            s_left = s - max(0, k - blanks)
+            rerolled[c:c + k + 1, h:h + k + 1, s_left:s_left + k + 1] += p * reroll_dists[k]
+        dist = rerolled
+
+    critical = keywords.get("Critical", 0)
+    impact = keywords.get("Impact", 0) if "Armor" in target_keywords else 0
+    cover_val = 0 if keywords.get("Blast", 0) > 0 else max(0, cover - keywords.get("Sharpshooter", 0))
+    dodge_val = 0 if keywords.get("High Velocity", 0) > 0 else dodges
+
+    # Nach dem Angriffswurf zählt nur noch (verbleibende Treffer, Treffer > 0)
+    remaining = np.zeros((n + 1, 2))
+    for c, h, s in zip(*np.nonzero(dist)):
+        p = dist[c, h, s]
+        converted = min(s, critical)
+        c, s = c + converted, s - converted
+        if attack_surge == "hit":
+            h += s
+        elif attack_surge == "crit":
+            c += s
+        converted = min(h, impact)
+        c, h = c + converted, h - converted
+        total_hits = c + h
+        h -= min(h, cover_val)
+        hits_remaining = max(0, c + h - dodge_val)
+        remaining[hits_remaining, 1 if total_hits > 0 else 0] += p
+
+    # VERTEIDIGUNG
+    def_probs = face_probabilities(defense_die.lower(), "defense")
+    p_block = def_probs[0] + (def_probs[1] if defense_surge else 0.0)
+    pierce = 0 if "Immune: Pierce" in target_keywords else keywords.get("Pierce", 0)
+
+    wounds = np.zeros(n + 1)
+    for hits in range(n + 1):
+        p_hits = remaining[hits].sum()
+        if p_hits == 0:
+            continue
+        for blocks in range(hits + 1):
+            p = comb(hits, blocks) * p_block ** blocks * (1 - p_block) ** (hits - blocks)
+            wounds[hits - max(0, blocks - pierce)] += p_hits * p
+
+    p_any_hit = remaining[:, 1].sum()
+    return AttackOutcome(_trim(wounds), _suppression_dist(p_any_hit, suppressive))
+
+
+def _suppression_dist(p_any_hit, suppressive):
+    """Niederhalten: +1 bei mindestens einem Treffer, plus Niederhaltend X."""
+    dist = [0.0] * (suppressive + 2)
+    dist[suppressive] += 1.0 - p_any_hit
+    dist[suppressive + 1] += p_any_hit
+    return _trim(np.array(dist))
+
+
+def _trim(dist):
+    """Entfernt Null-Wahrscheinlichkeiten am Ende und gibt eine Liste zurück."""
+    values = [float(p) for p in dist]
+    while len(values) > 1 and values[-1] < 1e-15:
+        values.pop()
+    return values
@@ -0,0 +1,165 @@
+"""
+Dauerhafte Webcam-Aufnahme für die AI-Züge.
+
+Ein Hintergrund-Thread hält das Gerät offen und liest fortlaufend; das
+neueste Bild liegt im Speicher und wird bei Bedarf als PIL-Image oder
+direkt als JPEG-Bytes (ohne Temp-Datei) ausgegeben, optional verkleinert.
+Statt einer echten Kamera kann eine SyntheticSource eingesetzt werden
+(Tests, Rechner ohne Webcam).
+"""
+import io
+import logging
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+WARMUP_FRAMES = 5
+READ_INTERVAL = 0.03    # Sekunden zwischen zwei Lesevorgängen
+FIRST_FRAME_TIMEOUT = 3.0
+JPEG_QUALITY = 85
+
+
+class OpenCVSource:
+    """Webcam über cv2.VideoCapture (liefert BGR-Frames)."""
+
+    def __init__(self, device=0):
+        self.device = device
+        self.cap = None
+
+    def open(self):
+        if not CV2_AVAILABLE:
+            return False
+        self.cap = cv2.VideoCapture(self.device)
+        return self.cap.isOpened()
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class SyntheticSource:
+    """Künstliche Bildquelle (BGR) mit Bildzähler: jeder Frame ist anders."""
+
+    def __init__(self, width=640, height=480, fail_open=False):
+        self.width = width
+        self.height = height
+        self.fail_open = fail_open
+        self.frames = 0
+
+    def open(self):
+        return not self.fail_open
+
+    def read(self):
+        self.frames += 1
+        frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        frame[:, :, 0] = np.linspace(0, 255, self.width, dtype=np.uint8)  # Blau-Verlauf
+        frame[: self.height // 4, : self.width // 4, 2] = self.frames % 256  # Zähler im roten Kanal
+        return True, frame
+
+    def release(self):
+        pass
+
+
+class CameraCapture:
+    """Hält die Bildquelle offen und stellt das jeweils neueste Bild bereit (threadsicher)."""
+
+    def __init__(self, source=None, device=0, interval=READ_INTERVAL, warmup=WARMUP_FRAMES):
+        self.source = source or OpenCVSource(device)
+        self.interval = interval
+        self.warmup = warmup
+        self._frame = None
+        self._frame_time = 0.0
+        self._lock = threading.Lock()
+        self._first_frame = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.failed = False
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return self
+        self._stop.clear()
+        self._first_frame.clear()
+        self.failed = False
+        self._thread = threading.Thread(target=self._run, name="camera-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _run(self):
+        try:
+            if not self.source.open():
+                logging.warning("Camera: Gerät konnte nicht geöffnet werden")
+                self.failed = True
+                self._first_frame.set()
+                return
+            for _ in range(self.warmup):
+                self.source.read()
+            while not self._stop.is_set():
+                ok, frame = self.source.read()
+                if ok and frame is not None:
+                    with self._lock:
+                        self._frame = frame
+                        self._frame_time = time.monotonic()
+                    self._first_frame.set()
+                self._stop.wait(self.interval)
+        except Exception as e:
+            logging.error(f"Camera error: {e}")
+            self.failed = True
+            self._first_frame.set()
+        finally:
+            self.source.release()
+
+    def latest_frame(self, timeout=FIRST_FRAME_TIMEOUT):
+        """Neuestes Bild als BGR-Array (Kopie) oder None. Startet die Aufnahme bei Bedarf."""
+        if not self.running and self._frame is None:
+            self.start()
+        self._first_frame.wait(timeout)
+        with self._lock:
+            return None if self._frame is None else self._frame.copy()
+
+    @property
+    def frame_age(self):
+        """Alter des neuesten Bildes in Sekunden (None ohne Bild)."""
+        with self._lock:
+            return None if self._frame is None else time.monotonic() - self._frame_time
+
+    def get_pil(self, max_size=None, timeout=FIRST_FRAME_TIMEOUT):
+        """Neuestes Bild als RGB-PIL-Image, auf max_size=(B, H) verkleinert."""
+        frame = self.latest_frame(timeout)
+        if frame is None:
+            return None
+        image = Image.fromarray(np.ascontiguousarray(frame[:, :, ::-1]))
+        if max_size:
+            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        return image
+
+    def get_jpeg(self, max_size=None, quality=JPEG_QUALITY, timeout=FIRST_FRAME_TIMEOUT):
+        """Neuestes Bild als JPEG-Bytes (ohne Umweg über eine Datei)."""
+        image = self.get_pil(max_size, timeout)
+        if image is None:
+            return None
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality)
+        return buffer.getvalue()
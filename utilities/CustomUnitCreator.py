@@ -7,13 +7,16 @@ import uuid
 # Import utilities with compatibility for both script and package modes
 try:
     # Try relative imports first (when imported as part of utilities package)
+    from .LegionData import LegionDatabase
     from .LegionUtils import get_data_path, get_writable_path
 except ImportError:
     try:
         # Try package imports (when running with MainMenu)
+        from utilities.LegionData import LegionDatabase
         from utilities.LegionUtils import get_data_path, get_writable_path
     except ImportError:
         # Fallback to absolute imports (when running as standalone script)
+        from LegionData import LegionDatabase
         from LegionUtils import get_data_path, get_writable_path
 
 class CustomUnitCreator:
@@ -41,6 +44,8 @@ class CustomUnitCreator:
         try:
             with open(self.custom_units_file, "w", encoding="utf-8") as f:
                 json.dump(self.units_data, f, indent=4, ensure_ascii=False)
+            # Offene Fenster (Armee Builder, Game Companion) sehen die Änderung sofort
+            LegionDatabase.invalidate_shared()
             messagebox.showinfo("Erfolg", "Daten erfolgreich gespeichert!")
         except Exception as e:
             messagebox.showerror("Fehler", f"Fehler beim Speichern: {e}")
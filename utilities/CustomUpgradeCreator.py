@@ -7,13 +7,16 @@ import uuid
 # Import utilities with compatibility for both script and package modes
 try:
     # Try relative imports first (when imported as part of utilities package)
+    from .LegionData import LegionDatabase
     from .LegionUtils import get_data_path
 except ImportError:
     try:
         # Try package imports (when running with MainMenu)
+        from utilities.LegionData import LegionDatabase
         from utilities.LegionUtils import get_data_path
     except ImportError:
         # Fallback to absolute imports (when running as standalone script)
+        from LegionData import LegionDatabase
         from LegionUtils import get_data_path
 
 class CustomUpgradeCreator:
@@ -37,10 +40,16 @@ class CustomUpgradeCreator:
             messagebox.showerror("Fehler", f"Fehler beim Laden der Daten: {e}")
             return []
 
-    def save_data(self):
+    def save_data(self, new_upgrade=None):
         try:
             with open(self.custom_file, "w", encoding="utf-8") as f:
                 json.dump(self.upgrades_data, f, indent=4, ensure_ascii=False)
+            # Offene Fenster (Armee Builder, Game Companion) sehen die Änderung sofort
+            if new_upgrade:
+                # Neues Upgrade: nur inkrementell eintragen
+                LegionDatabase.shared_upgrade_added(new_upgrade)
+            else:
+                LegionDatabase.invalidate_shared()
             messagebox.showinfo("Erfolg", "Daten erfolgreich gespeichert!")
         except Exception as e:
             messagebox.showerror("Fehler", f"Fehler beim Speichern: {e}")
@@ -240,11 +249,12 @@ class CustomUpgradeCreator:
                     new_entry["id"] = self.current_id
                     self.upgrades_data[i] = new_entry
                     break
+            self.save_data()
         else:
             self.upgrades_data.append(new_entry)
             self.current_id = new_entry["id"]
+            self.save_data(new_upgrade=new_entry)
 
-        self.save_data()
         self.refresh_listbox()
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+import logging
+import secrets
+
+import numpy as np
+
+# Import LegionRules with compatibility for both script and package modes
+try:
+    from .LegionRules import LegionRules
+except ImportError:
+    try:
+        from utilities.LegionRules import LegionRules
+    except ImportError:
+        from LegionRules import LegionRules
+
+# Ergebnis-Reihenfolge der Zählvektoren (Spalten in den Batch-Funktionen)
+ATTACK_RESULTS = ("crit", "hit", "surge", "blank")
+DEFENSE_RESULTS = ("block", "surge", "blank")
+ATTACK_COLORS = ("red", "black", "white")
+
+
+def face_probabilities(color, type_):
+    """
+    Wahrscheinlichkeiten je Ergebnis eines Würfels aus LegionRules.DICE_FACES.
+    type_ ist "attack" oder "defense". Reihenfolge wie ATTACK_RESULTS/DEFENSE_RESULTS.
+    """
+    faces = LegionRules.get_dice_distribution(color, type_)
+    if not faces:
+        raise ValueError(f"Unbekannter Würfel: {color} {type_}")
+    results = ATTACK_RESULTS if type_ == "attack" else DEFENSE_RESULTS
+    return np.array([faces.count(r) / len(faces) for r in results])
+
+
+class DiceEngine:
+    """
+    Vektorisierte Würfel-Engine auf Basis von LegionRules.DICE_FACES.
+
+    Einzelwürfe (Angriffsdialog, Panik, Sammeln) und Batch-Würfe für
+    Simulationen nutzen denselben seedbaren Zufallsgenerator. Ein Pool wird
+    nicht Würfel für Würfel geworfen, sondern pro Farbe als Multinomial-
+    Ziehung über die Würfelseiten.
+    """
+
+    def __init__(self, seed=None):
+        self.reseed(seed)
+        self.attack_probs = {c: face_probabilities(c, "attack") for c in ATTACK_COLORS}
+        self.defense_probs = {c: face_probabilities(c, "defense") for c in ("red", "white")}
+
+    def reseed(self, seed=None):
+        """Setzt den Generator zurück. Ohne Seed wird einer erzeugt (für Logs/Replays)."""
+        self.seed = seed if seed is not None else secrets.randbits(32)
+        self.rng = np.random.default_rng(self.seed)
+        logging.info(f"DiceEngine seeded with {self.seed}")
+
+    # --- Batch-Würfe (Simulation) ---
+
+    def roll_attack_batch(self, pool, n):
+        """
+        Wirft einen Angriffspool n-mal. pool = {"red": x, "black": y, "white": z}.
+        Rückgabe: int-Array (n, 4) mit Zählungen in ATTACK_RESULTS-Reihenfolge.
+        """
+        counts = np.zeros((n, len(ATTACK_RESULTS)), dtype=np.int64)
+        for color, dice in pool.items():
+            if dice > 0:
+                counts += self.rng.multinomial(dice, self.attack_probs[color.lower()], size=n)
+        return counts
+
+    def roll_attack_pools(self, pools):
+        """
+        Wirft n verschiedene Angriffspools auf einmal.
+        pools = {"red": Array (n,), "black": ..., "white": ...} mit Würfelanzahl je Zeile.
+        Rückgabe: int-Array (n, 4) in ATTACK_RESULTS-Reihenfolge.
+        """
+        counts = None
+        for color, dice in pools.items():
+            dice = np.atleast_1d(np.asarray(dice, dtype=np.int64))
+            rolled = self.rng.multinomial(dice, self.attack_probs[color.lower()])
+            counts = rolled if counts is None else counts + rolled
+        return counts
+
+    def roll_defense_batch(self, color, dice):
+        """
+        Wirft Verteidigungswürfel mit variabler Anzahl pro Zeile.
+        dice: int oder Array (n,). Rückgabe: int-Array (n, 3) in DEFENSE_RESULTS-Reihenfolge.
+        """
+        dice = np.atleast_1d(np.asarray(dice, dtype=np.int64))
+        return self.rng.multinomial(dice, self.defense_probs[color.lower()])
+
+    def roll_d6_batch(self, dice, target=1):
+        """Zählt Ergebnisse <= target auf dice W6 (Array oder int), z.B. Panik/Sammeln."""
+        dice = np.atleast_1d(np.asarray(dice, dtype=np.int64))
+        return self.rng.binomial(dice, target / 6.0)
+
+    # --- Einzelwürfe (Spiel) ---
+
+    def roll_attack(self, pool):
+        """Wirft einen Angriffspool einmal. Rückgabe: {"crit", "hit", "surge", "blank"}."""
+        counts = self.roll_attack_batch(pool, 1)[0]
+        return {r: int(c) for r, c in zip(ATTACK_RESULTS, counts)}
+
+    def reroll_attack(self, pool, count):
+        """
+        Wirft count Würfel neu, deren Farben zufällig gemäß Zusammensetzung
+        des Pools gewählt werden (wie bei Zielen ohne Würfelauswahl).
+        """
+        colors = [c for c in ATTACK_COLORS if pool.get(c, 0) > 0]
+        if not colors:
+            colors, weights = ["white"], np.array([1.0])
+        else:
+            weights = np.array([pool[c] for c in colors], dtype=float)
+            weights /= weights.sum()
+        per_color = self.rng.multinomial(count, weights)
+        return self.roll_attack({c: int(k) for c, k in zip(colors, per_color)})
+
+    def roll_defense(self, color, count):
+        """Wirft count Verteidigungswürfel. Rückgabe: {"block", "surge", "blank"}."""
+        if count <= 0:
+            return {r: 0 for r in DEFENSE_RESULTS}
+        counts = self.roll_defense_batch(color, count)[0]
+        return {r: int(c) for r, c in zip(DEFENSE_RESULTS, counts)}
+
+    def roll_d6(self, count, target=1):
+        """Anzahl der Würfe <= target auf count W6."""
+        if count <= 0:
+            return 0
+        return int(self.roll_d6_batch(count, target)[0])
+
+    def roll_panic(self, count):
+        """Panik-Würfel: jede 1 auf einem W6 zählt als Blank."""
+        return self.roll_d6(count, target=1)
+
+    def roll_rally(self, suppression):
+        """Sammeln: weißer Verteidigungswürfel je Marker, Block/Surge entfernt einen."""
+        result = self.roll_defense("white", suppression)
+        return result["block"] + result["surge"]
@@ -6,55 +6,25 @@ import random
 import os
 import logging
 import sys
-import threading
-
-# Optional Libraries for AI/Camera
-GEMINI_IMPORT_ERROR = None
-try:
-    import sys
-    # FORCE site-packages to be checked first for 'google' to avoid shadowing issues
-    site_pkgs = [p for p in sys.path if 'site-packages' in p]
-    for p in site_pkgs:
-        if p not in sys.path:
-            sys.path.insert(0, p)
-            
-    # Try importing google directly first to check namespace
-    import google
-    
-    from google import genai
-    GEMINI_AVAILABLE = True
-    GEMINI_VERSION = 2
-    logging.info("Gemini: Using google-genai (v2/new SDK)")
-except ImportError as e:
-    GEMINI_IMPORT_ERROR = f"google-genai fail: {e}"
-    logging.warning(f"GameCompanion: google-genai import failed: {e}")
-    try:
-        import google.generativeai as genai
-        GEMINI_AVAILABLE = True
-        GEMINI_VERSION = 1
-        logging.info("Gemini: Using google.generativeai (v1/old SDK)")
-    except ImportError as e2:
-        GEMINI_IMPORT_ERROR += f" | google.generativeai fail: {e2}"
-        logging.warning(f"GameCompanion: google.generativeai import failed: {e2}")
-        GEMINI_AVAILABLE = False
-        GEMINI_VERSION = 0
-except Exception as e:
-    GEMINI_IMPORT_ERROR = f"Critical Import Error: {e}"
-    logging.error(f"GameCompanion: CRITICAL error during Gemini import: {e}")
-    GEMINI_AVAILABLE = False
-    GEMINI_VERSION = 0
-
-try:
-    import cv2
-    CV2_AVAILABLE = True
-except ImportError:
-    CV2_AVAILABLE = False
 
 # Import utilities modules with compatibility for both script and package modes
 try:
     # Try relative imports first (when imported as part of utilities package)
     from .LegionData import LegionDatabase
     from .LegionRules import LegionRules
+    from .DiceEngine import DiceEngine
+    from .GameEngine import GameState, RulesEngine, build_army, other_side
+    from .AIHeuristics import intention_steps, INTENTION_LABELS, local_decision, equipment_advice
+    from .GeminiAdvisor import GeminiAdvisor, build_decision_prompt, shared_image
+    from .GeminiRouter import GEMINI_AVAILABLE, GEMINI_VERSION, GEMINI_IMPORT_ERROR
+    from .GeminiCache import shared_cache
+    from .CameraCapture import CameraCapture, CV2_AVAILABLE
+    from .MatchLog import MatchLog
+    from .MatchEvents import assign_unit_ids, unit_ref, attack_data
+    from .GameSave import GameSaver, load_game, write_snapshot, SAVE_EXTENSION
+    from .TreeSync import TreeSync
+    from .PhasePanels import PanelStack, TurnPanel, ActivationPanel
+    from .Tooltips import TooltipManager
     from .LegionUtils import get_writable_path, get_gemini_key
     logging.info("GameCompanion: Using relative imports")
 except ImportError:
@@ -62,12 +32,38 @@ except ImportError:
         # Try package imports (when running with MainMenu)
         from utilities.LegionData import LegionDatabase
         from utilities.LegionRules import LegionRules
+        from utilities.DiceEngine import DiceEngine
+        from utilities.GameEngine import GameState, RulesEngine, build_army, other_side
+        from utilities.AIHeuristics import intention_steps, INTENTION_LABELS, local_decision, equipment_advice
+        from utilities.GeminiAdvisor import GeminiAdvisor, build_decision_prompt, shared_image
+        from utilities.GeminiRouter import GEMINI_AVAILABLE, GEMINI_VERSION, GEMINI_IMPORT_ERROR
+        from utilities.GeminiCache import shared_cache
+        from utilities.CameraCapture import CameraCapture, CV2_AVAILABLE
+        from utilities.MatchLog import MatchLog
+        from utilities.MatchEvents import assign_unit_ids, unit_ref, attack_data
+        from utilities.GameSave import GameSaver, load_game, write_snapshot, SAVE_EXTENSION
+        from utilities.TreeSync import TreeSync
+        from utilities.PhasePanels import PanelStack, TurnPanel, ActivationPanel
+        from utilities.Tooltips import TooltipManager
         from utilities.LegionUtils import get_writable_path, get_gemini_key
         logging.info("GameCompanion: Using package imports")
     except ImportError:
         # Fallback to absolute imports (when running as standalone script)
         from LegionData import LegionDatabase
         from LegionRules import LegionRules
+        from DiceEngine import DiceEngine
+        from GameEngine import GameState, RulesEngine, build_army, other_side
+        from AIHeuristics import intention_steps, INTENTION_LABELS, local_decision, equipment_advice
+        from GeminiAdvisor import GeminiAdvisor, build_decision_prompt, shared_image
+        from GeminiRouter import GEMINI_AVAILABLE, GEMINI_VERSION, GEMINI_IMPORT_ERROR
+        from GeminiCache import shared_cache
+        from CameraCapture import CameraCapture, CV2_AVAILABLE
+        from MatchLog import MatchLog
+        from MatchEvents import assign_unit_ids, unit_ref, attack_data
+        from GameSave import GameSaver, load_game, write_snapshot, SAVE_EXTENSION
+        from TreeSync import TreeSync
+        from PhasePanels import PanelStack, TurnPanel, ActivationPanel
+        from Tooltips import TooltipManager
         from LegionUtils import get_writable_path, get_gemini_key
         logging.info("GameCompanion: Using absolute imports")
 
@@ -86,15 +82,44 @@ except ImportError:
 
 from PIL import Image, ImageTk
 
+
+def _state_property(name):
+    """Leitet ein Attribut an den GameState weiter (UI und Regel-Engine teilen den Zustand)."""
+    return property(lambda self: getattr(self.state, name),
+                    lambda self, value: setattr(self.state, name, value))
+
+
 class GameCompanion:
+    # Spielzustand liegt im GameState, die Tk-Oberfläche treibt die RulesEngine an
+    player_army = _state_property("player_army")
+    opponent_army = _state_property("opponent_army")
+    round_number = _state_property("round_number")
+    current_phase = _state_property("current_phase")
+    priority_player = _state_property("priority_player")
+    active_turn_player = _state_property("active_turn_player")
+    order_pool = _state_property("order_pool")
+    player_score = _state_property("player_score")
+    opponent_score = _state_property("opponent_score")
+
+    # Vorbelegung im AI-Entscheider: (Ziel, Distanz, in Reichweite)
+    AI_DEFAULT_OBSERVATION = ("Feind-Trupp", "Range 3-4", True)
+    # Maximale Bildgröße für Gemini-Anfragen (Kamerabild wird verkleinert)
+    GEMINI_IMAGE_SIZE = (1024, 768)
+    # Match-Ereignisse als .jsonl.gz statt .jsonl schreiben
+    COMPRESS_MATCH_EVENTS = False
+    # Autosave nach jeder Aktivierung (Ordner "Saves")
+    AUTOSAVE_NAME = "autosave" + SAVE_EXTENSION
+
     def __init__(self, root, mission_file=None):
-        self.db = LegionDatabase()
+        self.db = LegionDatabase.shared()
         self.rules = LegionRules
+        self.dice = DiceEngine()
+        self.state = GameState()
+        self.engine = RulesEngine(self.dice, self.rules)
         self.root = root
 
-        # Tooltip-System initialisieren
-        self.tooltip_window = None
-        self.current_tooltip_widget = None
+        # Tooltip-System initialisieren (ein wiederverwendetes Fenster, Texte gecacht)
+        self.tooltips = TooltipManager(self.root)
 
         logging.info("GameCompanion initialized.")
         self.root.title("SW Legion: Game Companion & AI Simulator (v2.0 Rules)")
@@ -120,33 +145,38 @@ class GameCompanion:
             logging.warning(f"Could not load icon: {e}")
             pass
 
-        # Game State
-        self.player_army = {"faction": "", "units": []}
-        self.opponent_army = {"faction": "", "units": []}
+        # Game State (Armeen, Runde, Phase, Priorität, Befehlspool, Punkte: self.state)
         self.mission_data = None  # Initialize mission_data
 
         # New State Variables
-        self.round_number = 0
-        self.current_phase = "Setup" # Setup, Command, Activation, End
         self.player_hand = [] # List of Command Cards
         self.opponent_hand = []
         self.player_discard = []
         self.opponent_discard = []
         self.current_command_card = None # {"player": card, "opponent": card}
-        self.priority_player = "Player" # or "Opponent" (Blue Player)
+        self.game_over = False
+
+        # Spielstand: Basis-Snapshot + Checkpoint nach jeder Aktivierung
+        self.autosaver = None
+        self._autosave_close_bound = False
 
-        # Log Data
-        self.match_log_history = []
+        # Log Data (Ereignisliste + Log-Datei, geschrieben im Hintergrund)
+        self.match_log = MatchLog()
+        self._log_close_bound = False
         self.match_start_time = None
-        self.current_log_filepath = None
 
-        # Order Pool: Liste von Tupeln (UnitObject, "Player" oder "Opponent")
-        self.order_pool = []
         self.active_unit = None
         self.active_side = None # "Player" oder "Opponent"
 
         self.ai_enabled = tk.BooleanVar(value=True)
 
+        # Armee-Listen: Zeilenmodell pro Treeview (inkrementelle Aktualisierung)
+        self.tree_models = {}
+
+        # Gemini-Anfragen laufen im Hintergrund (erst bei Bedarf erzeugt)
+        self.gemini_advisor = None
+        self.camera = None
+
         self.setup_ui()
         
         # Auto-load mission if provided
@@ -168,22 +198,39 @@ class GameCompanion:
                 pass
                 
         filename = f"{timestamp}_battle_log.txt"
-        self.current_log_filepath = os.path.join(log_dir, filename)
-        
+        filepath = os.path.join(log_dir, filename)
+
+        header = [f"Star Wars Legion Match Log - {now.strftime('%d.%m.%Y %H:%M')}",
+                  "==================================================", ""]
+        if self.mission_data:
+            header.append(f"Mission: {self.mission_data.get('name', 'N/A')}")
+        header.append(f"Würfel-Seed: {self.dice.seed}")
+        header.append("--- Event Log Started ---")
+
+        # Typisierte Ereignisse mit Zustands-Deltas für Replay/Auswertung
+        events_path = filepath.replace(".txt", ".jsonl.gz" if self.COMPRESS_MATCH_EVENTS else ".jsonl")
+        assign_unit_ids(self.state)
+
         try:
-            with open(self.current_log_filepath, "w", encoding="utf-8") as f:
-                f.write(f"Star Wars Legion Match Log - {now.strftime('%d.%m.%Y %H:%M')}\n")
-                f.write("==================================================\n\n")
-                if self.mission_data:
-                    f.write(f"Mission: {self.mission_data.get('name', 'N/A')}\n")
-                f.write("--- Event Log Started ---\n")
-            
-            logging.info(f"Match log initialized: {self.current_log_filepath}")
-            self.log_event("Match Log Initialized.")
-            
+            self.match_log.start(filepath, header, events_path=events_path, state=self.state)
+            if not self._log_close_bound:
+                self.root.bind("<Destroy>", self._close_match_log, add="+")
+                self._log_close_bound = True
+            logging.info(f"Match log initialized: {filepath}")
+            self.log_event("Match Log Initialized.", "game_start", seed=self.dice.seed,
+                           mission=(self.mission_data or {}).get("name"),
+                           player_faction=self.player_army.get("faction"),
+                           opponent_faction=self.opponent_army.get("faction"),
+                           max_rounds=self.state.max_rounds)
+
         except Exception as e:
             logging.error(f"Failed to initialize match log: {e}")
-            self.current_log_filepath = None
+
+    def _close_match_log(self, event=None):
+        """Fenster wird geschlossen: restliche Log-Zeilen schreiben."""
+        if event is not None and event.widget is not self.root:
+            return
+        self.match_log.close()
 
     def save_match_log(self):
         """Speichert den Match-Verlauf in log/{datum}battle.txt"""
@@ -213,11 +260,9 @@ class GameCompanion:
                 f.write(f"Final Score: Player {self.player_score} - {self.opponent_score} Opponent\n\n")
                 
                 f.write("--- Event Log ---\n")
-                # If we have a structured log list, print it. If not, maybe we just didn't track events yet in this session.
-                # Since we just added self.match_log_history, it will be empty unless we fill it.
-                # So let's write what we have, or a placeholder if empty.
-                if hasattr(self, 'match_log_history') and self.match_log_history:
-                    for entry in self.match_log_history:
+                # Ereignisse aus der zentralen Liste (oder Platzhalter, wenn noch nichts passiert ist)
+                if self.match_log.events:
+                    for entry in self.match_log.entries:
                         f.write(f"{entry}\n")
                 else:
                     f.write("No detailed events logged in this session.\n")
@@ -229,24 +274,127 @@ class GameCompanion:
             messagebox.showerror("Error", f"Fehler beim Speichern des Logs: {e}")
             logging.error(f"Failed to save match log: {e}")
 
-    def log_event(self, message):
-        """Helper to add event to log history and file immediately"""
-        import datetime
-        ts = datetime.datetime.now().strftime("%H:%M:%S")
-        entry = f"[{ts}] {message}"
-        
-        if not hasattr(self, 'match_log_history'):
-            self.match_log_history = []
-        self.match_log_history.append(entry)
-        logging.info(f"MATCH_EVENT: {message}")
-        
-        # Write to file immediately if active
-        if getattr(self, 'current_log_filepath', None):
-            try:
-                with open(self.current_log_filepath, "a", encoding="utf-8") as f:
-                    f.write(entry + "\n")
-            except Exception as e:
-                logging.error(f"Failed to append to log file: {e}")
+    def log_event(self, message, kind="note", **data):
+        """
+        Ereignis in die Match-Historie aufnehmen (Dateien werden im Hintergrund geschrieben).
+        kind/data ergeben das typisierte Ereignis der JSONL-Datei (siehe MatchEvents).
+        """
+        self.match_log.log(message, kind, data)
+
+    def save_extra(self, full=True):
+        """
+        Spielstand-Teile außerhalb des GameState (Hände, Ablagestapel, Kommandokarten,
+        Würfel-Zustand). Die Mission ändert sich nie und steht nur im Basis-Snapshot.
+        """
+        extra = {"player_hand": self.player_hand, "opponent_hand": self.opponent_hand,
+                 "player_discard": self.player_discard, "opponent_discard": self.opponent_discard,
+                 "current_command_card": self.current_command_card,
+                 "ai_enabled": self.ai_enabled.get(), "game_over": self.game_over,
+                 "dice": {"seed": self.dice.seed, "rng": self.dice.rng.bit_generator.state}}
+        if full:
+            extra["mission_data"] = self.mission_data
+        return extra
+
+    def autosave(self, full=False):
+        """Autosave: full=True schreibt einen Basis-Snapshot, sonst nur das Delta (Hintergrund)."""
+        try:
+            if self.autosaver is None:
+                self.autosaver = GameSaver(os.path.join(get_writable_path("Saves"), self.AUTOSAVE_NAME))
+                if not self._autosave_close_bound:
+                    self.root.bind("<Destroy>", self._close_autosave, add="+")
+                    self._autosave_close_bound = True
+            if full:
+                self.autosaver.save(self.state, self.save_extra())
+            else:
+                self.autosaver.checkpoint(self.state, self.save_extra(full=False))
+        except Exception as e:
+            logging.error(f"Autosave failed: {e}")
+
+    def _close_autosave(self, event=None):
+        """Fenster wird geschlossen: restliche Checkpoints schreiben."""
+        if event is not None and event.widget is not self.root:
+            return
+        if self.autosaver:
+            self.autosaver.close()
+
+    def save_game(self):
+        """Aktuellen Spielstand in eine Datei speichern (zwischen zwei Aktivierungen)."""
+        if self.current_phase not in ("Command", "Activation", "End"):
+            messagebox.showwarning("Spielstand", "Speichern ist erst ab der ersten Kommandophase möglich.")
+            return
+        if self.active_unit:
+            messagebox.showwarning("Spielstand", "Bitte zuerst die laufende Aktivierung beenden.")
+            return
+
+        filepath = filedialog.asksaveasfilename(initialdir=get_writable_path("Saves"),
+                                                defaultextension=SAVE_EXTENSION,
+                                                filetypes=[("Spielstand", "*" + SAVE_EXTENSION)])
+        if not filepath:
+            return
+        try:
+            write_snapshot(filepath, self.state, self.save_extra())
+            self.log_event(f"Spielstand gespeichert: {os.path.basename(filepath)}", "save", path=filepath)
+            messagebox.showinfo("Spielstand", f"Spielstand gespeichert:\n{os.path.basename(filepath)}")
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Fehler beim Speichern des Spielstands: {e}")
+            logging.error(f"Failed to save game: {e}")
+
+    def resume_game(self):
+        """Spielstand (Autosave oder gespeicherte Datei) laden und dort weiterspielen."""
+        if self.autosaver:
+            self.autosaver.flush()  # Autosave-Journal vollständig auf der Platte
+
+        filepath = filedialog.askopenfilename(initialdir=get_writable_path("Saves"),
+                                              filetypes=[("Spielstand", "*" + SAVE_EXTENSION)])
+        if not filepath:
+            return
+        try:
+            state, extra = load_game(filepath)
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Spielstand konnte nicht geladen werden: {e}")
+            logging.error(f"Failed to load game {filepath}: {e}")
+            return
+        self.restore_game(state, extra)
+        logging.info(f"Game resumed from {filepath}")
+
+    def restore_game(self, state, extra):
+        """Geladenen Spielstand übernehmen und die Oberfläche der gespeicherten Phase zeigen."""
+        self.state = state
+        self.player_hand = extra.get("player_hand", [])
+        self.opponent_hand = extra.get("opponent_hand", [])
+        self.player_discard = extra.get("player_discard", [])
+        self.opponent_discard = extra.get("opponent_discard", [])
+        self.current_command_card = extra.get("current_command_card")
+        self.mission_data = extra.get("mission_data")
+        self.ai_enabled.set(extra.get("ai_enabled", True))
+        self.game_over = extra.get("game_over", False)
+        dice = extra.get("dice")
+        if dice:
+            self.dice.seed = dice["seed"]
+            self.dice.rng.bit_generator.state = dice["rng"]
+        self.active_unit = None
+        self.active_side = None
+
+        if self.mission_data and self.mission_data.get("scenario_text"):
+            self.btn_show_scenario.config(state=tk.NORMAL)
+
+        self.initialize_match_log()
+        self.log_event(f"Spielstand geladen: Runde {self.round_number}, {self.current_phase}", "resume",
+                       round=self.round_number, phase=self.current_phase)
+        self.autosave(full=True)
+        self.update_trees()
+        self.update_score_display()
+
+        self.panels.clear()
+        if self.current_phase == "Command":
+            if self.current_command_card:
+                self.issue_orders_ui()
+            else:
+                self.show_command_phase()
+        elif self.current_phase == "Activation":
+            self.start_turn()
+        else:
+            self.show_round_end_controls(self.game_over)
 
     def setup_ui(self):
         # Top Menü Leiste
@@ -285,6 +433,12 @@ class GameCompanion:
         btn_log = tk.Button(self.score_frame, text="💾 LOG", command=self.save_match_log, bg="#607D8B", fg="white", font=("Segoe UI", 8))
         btn_log.pack(side="right", padx=5)
 
+        # Spielstand speichern / fortsetzen
+        btn_save = tk.Button(self.score_frame, text="💾 SPEICHERN", command=self.save_game, bg="#607D8B", fg="white", font=("Segoe UI", 8))
+        btn_save.pack(side="right", padx=5)
+        btn_resume = tk.Button(self.score_frame, text="📂 FORTSETZEN", command=self.resume_game, bg="#607D8B", fg="white", font=("Segoe UI", 8))
+        btn_resume.pack(side="right", padx=5)
+
         # Haupt-Container
         self.paned = tk.PanedWindow(self.root, orient=tk.HORIZONTAL)
         self.paned.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -299,6 +453,12 @@ class GameCompanion:
         self.frame_center = tk.Frame(self.paned, width=600, relief=tk.SUNKEN, bd=1, bg="#fafafa")
         self.paned.add(self.frame_center)
 
+        # Dauerhafte Panels für Zug-Auswahl und aktive Einheit (werden nur umgeschaltet)
+        self.panels = PanelStack(self.frame_center)
+        self.panels.register("turn", TurnPanel)
+        self.panels.register("activation", lambda parent: ActivationPanel(
+            parent, self.perform_action, self.pass_current_unit, self.end_activation, self.take_manual_control))
+
         # Initialer Bildschirm in der Mitte
         self.lbl_center_info = tk.Label(self.frame_center, text="Bitte Armeen laden und Spiel starten", font=("Segoe UI", 14), bg="#fafafa")
         self.lbl_center_info.place(relx=0.5, rely=0.4, anchor="center")
@@ -408,10 +568,15 @@ class GameCompanion:
         keywords_frame = tk.LabelFrame(scrollable_frame, text="⭐ Fähigkeiten & Schlüsselwörter", font=("Arial", 12, "bold"))
         keywords_frame.pack(fill="x", padx=10, pady=5)
         
-        keywords = unit.get('keywords', [])
+        keywords = self.get_keyword_map(unit)
         if keywords:
-            for keyword in keywords:
-                keyword_text = f"• {keyword}"
+            for keyword, value in keywords.items():
+                rule_kw = self.rules.KEYWORDS.get(keyword)
+                label = rule_kw["german"] if rule_kw else keyword
+                # "X"-Keywords ohne Zahl (Wert 0, z.B. Panzerung) ohne Zahl anzeigen
+                if (rule_kw and rule_kw["name"].endswith(" X") and value) or (not rule_kw and value > 1):
+                    label = f"{label} {value}"
+                keyword_text = f"• {label}"
                 # Beschreibung für bekannte Schlüsselwörter hinzufügen
                 desc = self.get_keyword_description(keyword)
                 if desc:
@@ -526,7 +691,7 @@ class GameCompanion:
     def get_keyword_description(self, keyword):
         """Gibt Beschreibung für bekannte Schlüsselwörter zurück"""
         descriptions = {
-            "Armor": "Reduziert Treffer um 1 (außer bei kritischen Treffern)",
+            "Armor": "Hebt alle Treffer auf (außer kritischen Treffern)",
             "Armor X": "Reduziert Treffer um X (außer bei kritischen Treffern)", 
             "Arsenal X": "Kann bis zu X verschiedene Waffen pro Angriff verwenden",
             "Charge": "+1 Angriffs-Würfel bei Nahkampf nach Bewegung",
@@ -557,7 +722,16 @@ class GameCompanion:
             "Uncanny Luck X": "Kann X Verteidigungswürfel neu werfen",
             "Weak Point X": "Angriffe gegen Fahrzeuge erhalten Pierce X"
         }
-        return descriptions.get(keyword, "")
+        if keyword in descriptions:
+            return descriptions[keyword]
+
+        # "Pierce 1" / "Durchschlagen 1" -> "Pierce X" über den Keyword-Index
+        canonical, _ = self.rules.parse_keyword(keyword)
+        desc = descriptions.get(f"{canonical} X") or descriptions.get(canonical)
+        if desc:
+            return desc
+        rule_kw = self.rules.KEYWORDS.get(canonical)
+        return rule_kw["effect"] if rule_kw else ""
 
     def get_upgrade_description(self, upgrade_name):
         """Gibt Beschreibung für bekannte Upgrades zurück"""
@@ -595,41 +769,8 @@ class GameCompanion:
         return descriptions.get(marker_type, "Unbekannter Effekt")
 
     def create_hover_tooltip(self, widget, text):
-        """Fügt einem Widget einen Hover-Tooltip hinzu"""
-        def on_enter(event):
-            self.show_hover_tooltip(event, text)
-        def on_leave(event):
-            self.hide_hover_tooltip()
-            
-        widget.bind("<Enter>", on_enter)
-        widget.bind("<Leave>", on_leave)
-        
-    def show_hover_tooltip(self, event, text):
-        """Zeigt Hover-Tooltip an"""
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-            
-        self.tooltip_window = tk.Toplevel(self.root)
-        self.tooltip_window.wm_overrideredirect(True)
-        
-        # Position relativ zur Maus
-        x = event.x_root + 10
-        y = event.y_root + 10
-        self.tooltip_window.geometry(f"+{x}+{y}")
-        
-        # Tooltip-Text mit Hintergrund
-        label = tk.Label(self.tooltip_window, text=text, 
-                        background="#ffffe0", foreground="black",
-                        font=("Arial", 9), justify="left",
-                        wraplength=400, relief="solid", borderwidth=1,
-                        padx=8, pady=5)
-        label.pack()
-        
-    def hide_hover_tooltip(self):
-        """Versteckt Hover-Tooltip"""
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-            self.tooltip_window = None
+        """Fügt einem Widget einen Hover-Tooltip hinzu (Text oder Funktion, erst beim Anzeigen formatiert)"""
+        self.tooltips.bind(widget, text)
 
     def has_usable_equipment(self, unit):
         """Prüft ob die Einheit nutzbare Ausrüstung hat"""
@@ -849,35 +990,9 @@ class GameCompanion:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
 
-            faction = data.get("faction")
-            army_list = data.get("army", [])
-            command_cards = data.get("command_cards", [])
-
             # Einheiten mit DB-Stats anreichern
-            enriched_units = []
-            for item in army_list:
-                # Originale Daten aus DB holen
-                db_unit = self.find_unit_in_db(item["name"], faction)
-                if db_unit:
-                    # Kombiniere gespeicherte Daten (Upgrades, Punkte) mit statischen Daten (Waffen, Speed...)
-                    full_unit = {**db_unit, **item} # Merge
-                    # Zustand hinzufügen
-                    full_unit["current_hp"] = full_unit["hp"]
-                    full_unit["activated"] = False
-                    full_unit["suppression"] = 0
-
-                    # Minis berechnen falls nicht im Save (Kompatibilität)
-                    if "minis" not in full_unit:
-                        base = db_unit.get("minis", 1)
-                        extra = 0
-                        # Check upgrades in 'item' (das gespeicherte Objekt hat 'upgrades' Liste von Strings)
-                        # Leider haben wir hier nur Strings "Name (Punkte)". Wir müssten matchen.
-                        # Vereinfachung: Wir nehmen base wenn nicht gespeichert.
-                        full_unit["minis"] = base
-
-                    enriched_units.append(full_unit)
-                else:
-                    print(f"Warnung: Einheit {item['name']} nicht in DB gefunden.")
+            army = build_army(data, self.db)
+            faction, enriched_units, command_cards = army["faction"], army["units"], army["command_cards"]
 
             # Speichern
             if is_player:
@@ -894,65 +1009,69 @@ class GameCompanion:
             messagebox.showerror("Fehler", f"Fehler beim Laden: {e}")
 
     def find_unit_in_db(self, name, faction):
-        if faction in self.db.units:
-            for u in self.db.units[faction]:
-                if u["name"] == name:
-                    return u
-        return None
+        return self.db.get_unit(faction, name)
+
+    def get_keyword_map(self, data):
+        """Vorab geparste Keywords einer Einheit oder Waffe (englischer Name -> Wert)"""
+        return self.engine.get_keyword_map(data)
 
     def update_tree(self, tree, units):
-        for item in tree.get_children():
-            tree.delete(item)
-        for u in units:
-            if u.get("activated"):
-                status = "Aktiviert"
-            elif u.get("order_token"):
-                status = "Offener Befehl"
-            else:
-                status = "Bereit"
-            
-            # Add markers to status
-            markers = []
-            if u.get("aim", 0) > 0:
-                markers.append(f"🎯{u['aim']}")
-            if u.get("dodge", 0) > 0:
-                markers.append(f"💨{u['dodge']}")
-            if u.get("suppression", 0) > 0:
-                markers.append(f"📉{u['suppression']}")
-            if u.get("standby", False):
-                markers.append("⏸️")
-            
-            # PANIC-Zustand anzeigen
-            panic_state = u.get("panic_state", "")
-            if panic_state == "retreat":
-                markers.append("🏃 RÜCKZUG")
-            elif panic_state == "suppressed":
-                markers.append("😰 UNTERDRÜCKT")
-            
-            # Courage vs Suppression Check
-            try:
-                courage_value = u.get("courage", 1)
-                if courage_value == "-" or courage_value == "" or courage_value is None:
-                    courage = 1
-                else:
-                    courage = int(courage_value)
-                suppression = int(u.get("suppression", 0))
-                if suppression >= courage and not panic_state:
-                    markers.append("💀 PANIC!")
-            except (ValueError, TypeError):
-                # Fallback wenn Courage nicht als Zahl verfügbar
-                pass
-            
-            if markers:
-                status += f" {' '.join(markers)}"
-            
-            minis = u.get("minis", 1)
-            # Zeige eliminated Status
-            if minis <= 0:
-                status = "💀 ELIMINATED"
-                tree.insert("", "end", values=(f"❌ {u['name']}", 0, "0/0", status))
+        """Aktualisiert nur Zeilen, deren Status, HP, Marker oder Figuren sich geändert haben."""
+        model = self.tree_models.get(tree)
+        if model is None:
+            model = self.tree_models[tree] = TreeSync(tree)
+        model.sync((u.get("uid") or f"u{id(u)}", self.unit_row(u)) for u in units)
+
+    @staticmethod
+    def unit_row(u):
+        """Zeilenwerte (Name, Figuren, HP, Status) einer Einheit in der Armee-Liste."""
+        if u.get("activated"):
+            status = "Aktiviert"
+        elif u.get("order_token"):
+            status = "Offener Befehl"
+        else:
+            status = "Bereit"
+        
+        # Add markers to status
+        markers = []
+        if u.get("aim", 0) > 0:
+            markers.append(f"🎯{u['aim']}")
+        if u.get("dodge", 0) > 0:
+            markers.append(f"💨{u['dodge']}")
+        if u.get("suppression", 0) > 0:
+            markers.append(f"📉{u['suppression']}")
+        if u.get("standby", False):
+            markers.append("⏸️")
+        
+        # PANIC-Zustand anzeigen
+        panic_state = u.get("panic_state", "")
+        if panic_state == "retreat":
+            markers.append("🏃 RÜCKZUG")
+        elif panic_state == "suppressed":
+            markers.append("😰 UNTERDRÜCKT")
+        
+        # Courage vs Suppression Check
+        try:
+            courage_value = u.get("courage", 1)
+            if courage_value == "-" or courage_value == "" or courage_value is None:
+                courage = 1
             else:
-                tree.insert("", "end", values=(u["name"], minis, f"{u['current_hp']}/{u['hp']}", status))
+                courage = int(courage_value)
+            suppression = int(u.get("suppression", 0))
+            if suppression >= courage and not panic_state:
+                markers.append("💀 PANIC!")
+        except (ValueError, TypeError):
+            # Fallback wenn Courage nicht als Zahl verfügbar
+            pass
+        
+        if markers:
+            status += f" {' '.join(markers)}"
+        
+        minis = u.get("minis", 1)
+        # Zeige eliminated Status
+        if minis <= 0:
+            return (f"❌ {u['name']}", 0, "0/0", "💀 ELIMINATED")
+        return (u["name"], minis, f"{u['current_hp']}/{u['hp']}", status)
 
     def init_game(self):
         logging.info("Starting new game initialization...")
@@ -963,6 +1082,8 @@ class GameCompanion:
 
         logging.info(f"Armies loaded. Player: {len(self.player_army['units'])} units, Opponent: {len(self.opponent_army['units'])} units.")
         
+        self.game_over = False
+
         # Initialize Log
         self.initialize_match_log()
         self.log_event(f"Game Started. Player Units: {len(self.player_army['units'])}, Opponent Units: {len(self.opponent_army['units'])}")
@@ -970,8 +1091,7 @@ class GameCompanion:
              self.log_event(f"Mission: {self.mission_data.get('name', 'Unknown')}")
 
         # UI aufräumen
-        for widget in self.frame_center.winfo_children():
-            widget.destroy()
+        self.panels.clear()
 
         # Start Setup Phase
         logging.info("Entering Setup Phase...")
@@ -992,7 +1112,7 @@ class GameCompanion:
 
             # Refresh Setup if in Setup Phase
             if self.current_phase == "Setup":
-                for widget in self.frame_center.winfo_children(): widget.destroy()
+                self.panels.clear()
                 self.start_setup_phase()
 
             # Enable Scenario Button
@@ -1404,16 +1524,17 @@ class GameCompanion:
         self.start_command_phase()
 
     def start_command_phase(self):
-        self.current_phase = "Command"
-        self.log_event(f"--- START ROUND {self.round_number}: COMMAND PHASE ---")
-
         # Reset units for the round
-        for u in self.player_army["units"] + self.opponent_army["units"]:
-            u["activated"] = False
-            u["order_token"] = False
-
+        self.engine.start_command_phase(self.state)
+        self.log_event(f"--- START ROUND {self.round_number}: COMMAND PHASE ---", "phase", phase="Command")
+        self.match_log.flush()  # Phasenwechsel: Log-Datei sichern (im Hintergrund)
+        self.current_command_card = None
+        self.autosave(full=True)  # Rundenbeginn: neuer Basis-Snapshot
+        self.show_command_phase()
+
+    def show_command_phase(self):
         # UI
-        for widget in self.frame_center.winfo_children(): widget.destroy()
+        self.panels.clear()
 
         tk.Label(self.frame_center, text=f"RUNDE {self.round_number}: Kommandophase", font=("Segoe UI", 16, "bold")).pack(pady=10)
 
@@ -1439,7 +1560,8 @@ class GameCompanion:
             btn.pack(pady=2, fill="x")
             
             # Hover-Tooltip für Command Cards hinzufügen
-            self.create_hover_tooltip(btn, self.format_command_card_tooltip(card))
+            self.create_hover_tooltip(btn, lambda c=card: self.tooltips.cached(
+                ("card", c.get("name")), self.format_command_card_tooltip, c))
 
         btn_play = tk.Button(self.frame_center, text="Karte Spielen", command=self.resolve_command_cards, bg="#2196F3", fg="white", font=("Segoe UI", 12, "bold"))
         btn_play.pack(pady=20)
@@ -1498,27 +1620,24 @@ class GameCompanion:
         o_pips = o_card.get("pips", 4)
         
         # LOGGING
-        self.log_event(f"Command Phase: Player executes '{p_card['name']}' ({p_pips}) vs Opponent '{o_card['name']}' ({o_pips}).")
-
-        if p_pips < o_pips:
-            self.priority_player = "Player"
+        self.log_event(f"Command Phase: Player executes '{p_card['name']}' ({p_pips}) vs Opponent '{o_card['name']}' ({o_pips}).",
+                       "command_card", player_card=p_card['name'], player_pips=p_pips,
+                       opponent_card=o_card['name'], opponent_pips=o_pips)
+
+        priority, tie = self.engine.resolve_priority(self.state, p_pips, o_pips)
+        self.log_event(f"Priority: {priority}{' (Gleichstand)' if tie else ''}", "priority", side=priority, tie=tie)
+        if tie:
+            msg = f"Gleichstand! {('Spieler' if priority == 'Player' else 'Gegner')} gewinnt den Wurf."
+        elif priority == "Player":
             msg = "Spieler hat Priorität!"
-        elif o_pips < p_pips:
-            self.priority_player = "Opponent"
-            msg = "Gegner hat Priorität!"
         else:
-            # Tie: Roll red die? Random for now.
-            roll = random.choice(["Player", "Opponent"])
-            self.priority_player = roll
-            msg = f"Gleichstand! {('Spieler' if roll == 'Player' else 'Gegner')} gewinnt den Wurf."
+            msg = "Gegner hat Priorität!"
 
         # Show Result UI
         # Tooltip cleanup
-        if getattr(self, 'tooltip_window', None):
-            self.tooltip_window.destroy()
-            self.tooltip_window = None
+        self.tooltips.hide()
             
-        for widget in self.frame_center.winfo_children(): widget.destroy()
+        self.panels.clear()
 
         tk.Label(self.frame_center, text=f"RUNDE {self.round_number}: Kommandokarten", font=("Segoe UI", 16, "bold")).pack(pady=10)
         
@@ -1766,40 +1885,6 @@ class GameCompanion:
         # Update UI
         self.update_trees()
 
-    def create_hover_tooltip(self, widget, text):
-        """Erstellt ein Hover-Tooltip für ein Widget"""
-        def show_tooltip(event):
-            if self.tooltip_window:
-                self.tooltip_window.destroy()
-            
-            x, y, _, _ = widget.bbox("insert") if hasattr(widget, 'bbox') else (0, 0, 0, 0)
-            x += widget.winfo_rootx() + 20
-            y += widget.winfo_rooty() + 20
-            
-            self.tooltip_window = tk.Toplevel(widget)
-            self.tooltip_window.wm_overrideredirect(True)
-            self.tooltip_window.geometry(f"+{x}+{y}")
-            
-            # Tooltip-Inhalt
-            tooltip_frame = tk.Frame(self.tooltip_window, bg="lightyellow", relief="solid", borderwidth=1)
-            tooltip_frame.pack()
-            
-            tooltip_label = tk.Label(tooltip_frame, text=text, bg="lightyellow", 
-                                   font=("Arial", 9), wraplength=400, justify="left")
-            tooltip_label.pack(padx=5, pady=2)
-            
-            self.current_tooltip_widget = widget
-
-        def hide_tooltip(event):
-            if self.tooltip_window:
-                self.tooltip_window.destroy()
-                self.tooltip_window = None
-            self.current_tooltip_widget = None
-
-        widget.bind("<Enter>", show_tooltip)
-        widget.bind("<Leave>", hide_tooltip)
-        widget.bind("<ButtonPress>", hide_tooltip)  # Verstecke bei Klick
-
     def format_command_card_tooltip(self, card):
         """Formatiert Command Card Information für Tooltip"""
         if not card:
@@ -1943,7 +2028,7 @@ class GameCompanion:
         return selected_card[0]
 
     def issue_orders_ui(self):
-        for widget in self.frame_center.winfo_children(): widget.destroy()
+        self.panels.clear()
 
         tk.Label(self.frame_center, text="Befehle erteilen", font=("Segoe UI", 16, "bold")).pack(pady=10)
 
@@ -1989,17 +2074,11 @@ class GameCompanion:
         # 2. Apply Opponent Orders
         if self.ai_enabled.get():
             # AI Orders (Simple Logic)
-            pips = self.current_command_card["opponent"].get("pips", 4)
-            ai_orders_count = 3 if pips == 3 else (2 if pips == 2 else 1)
-
             # AI prioritizes Commander/Operative then Heavy then Special then Corps
-            ai_units = [u for u in self.opponent_army["units"] if u["current_hp"] > 0]
-            # Sort by rank priority (Commander=1...)
-            rank_prio = {"Commander": 1, "Operative": 1, "Heavy": 2, "Special Forces": 3, "Support": 4, "Corps": 5}
-            ai_units.sort(key=lambda x: rank_prio.get(x.get("rank"), 99))
-
-            for i in range(min(len(ai_units), ai_orders_count)):
-                ai_units[i]["order_token"] = True
+            pips = self.current_command_card["opponent"].get("pips", 4)
+            self.engine.issue_ai_orders(self.state, "Opponent", pips)
+            # Gemini-Empfehlungen laufen parallel im Hintergrund an
+            self.prefetch_ai_advice()
         else:
             # Manueller Opponent - Befehle wählen lassen
             self.select_opponent_orders()
@@ -2067,41 +2146,33 @@ class GameCompanion:
         order_dialog.wait_window()
 
     def create_order_pool(self):
-        self.order_pool = []
         # Add units WITHOUT order token to pool
-        for u in self.player_army["units"]:
-            if u["current_hp"] > 0 and not u.get("order_token"):
-                self.order_pool.append({"unit": u, "side": "Player"})
-
-        for u in self.opponent_army["units"]:
-            if u["current_hp"] > 0 and not u.get("order_token"):
-                self.order_pool.append({"unit": u, "side": "Opponent"})
-
-        random.shuffle(self.order_pool)
+        self.engine.create_order_pool(self.state)
+        self.log_event(f"Orders issued. Order pool: {len(self.order_pool)} tokens.", "orders",
+                       ordered=[unit_ref(u) for side in ("Player", "Opponent") for u in self.state.units(side)
+                                if u.get("order_token")],
+                       pool=[dict(unit_ref(t["unit"]), side=t["side"]) for t in self.order_pool])
         self.update_trees()
 
     def start_activation_phase(self):
-        self.current_phase = "Activation"
-        self.log_event(f"--- FASE CHANGE: ACTIVATION PHASE (Round {self.round_number}) ---")
-        self.active_turn_player = self.priority_player
+        self.engine.start_activation_phase(self.state)
+        self.log_event(f"--- FASE CHANGE: ACTIVATION PHASE (Round {self.round_number}) ---", "phase", phase="Activation")
+        self.match_log.flush()
+        self.autosave()
         self.start_turn()
 
     def start_turn(self):
-        # UI Refresh
-        for widget in self.frame_center.winfo_children(): widget.destroy()
-
-        tk.Label(self.frame_center, text=f"RUNDE {self.round_number}: Aktivierungsphase", font=("Segoe UI", 16, "bold")).pack(pady=10)
+        # Persistentes Panel: nur Texte und Befehle werden neu gesetzt
+        panel = self.panels.show("turn")
 
         turn_color = "#2196F3" if self.active_turn_player == "Player" else "#F44336"
         turn_text = "SPIELER AM ZUG" if self.active_turn_player == "Player" else "GEGNER (AI) AM ZUG"
-        tk.Label(self.frame_center, text=turn_text, font=("Segoe UI", 20, "bold"), fg=turn_color).pack(pady=10)
 
         # Info Box
         face_up_p = sum(1 for u in self.player_army['units'] if u.get('order_token') and not u.get('activated'))
         face_up_o = sum(1 for u in self.opponent_army['units'] if u.get('order_token') and not u.get('activated'))
         pool_count = len(self.order_pool)
-
-        tk.Label(self.frame_center, text=f"Pool: {pool_count} | Offene Befehle: P={face_up_p}, G={face_up_o}", bg="#eee", padx=10).pack(pady=5)
+        info = f"Pool: {pool_count} | Offene Befehle: P={face_up_p}, G={face_up_o}"
 
         # Actions
         # Check if Human (Player) OR AI is disabled (Human Opponent)
@@ -2110,79 +2181,42 @@ class GameCompanion:
         if is_human_turn:
             turn_label = "Spieler Optionen" if self.active_turn_player == "Player" else "Gegner (Manuell) Optionen"
 
-            # Player Options: Activate Face-Up OR Draw
-            f_acts = tk.Frame(self.frame_center)
-            f_acts.pack(pady=20)
-
-            tk.Label(f_acts, text=turn_label, font=("bold")).pack(pady=5)
-
-            # Draw Button
-            state_draw = tk.NORMAL if pool_count > 0 else tk.DISABLED
-
             # Decide which pool to draw from based on active turn player
             cmd_draw = self.player_draw_pool if self.active_turn_player == "Player" else self.opponent_draw_pool_manual
 
-            tk.Button(f_acts, text="Vom Stapel ziehen (Zufall)", command=cmd_draw, bg="#FF9800", fg="white", font=("bold"), state=state_draw, width=25).pack(pady=5)
-
-            # Face Up Buttons
+            # Face Up Buttons (players alternate after each unit, no big pass button)
             current_army = self.player_army if self.active_turn_player == "Player" else self.opponent_army
-            face_up_count = face_up_p if self.active_turn_player == "Player" else face_up_o
-
-            if face_up_count > 0:
-                tk.Label(f_acts, text="--- Wähle Einheit (Offener Befehl) ---").pack(pady=10)
-                for u in current_army["units"]:
-                    if u.get("order_token") and not u.get("activated") and u["current_hp"] > 0:
-                        tk.Button(f_acts, text=f"Aktiviere: {u['name']}", command=lambda unit=u: self.activate_unit(unit, self.active_turn_player)).pack(fill="x", pady=2)
-
-            # No big pass button - players alternate after each unit
+            face_up_units = [(f"Aktiviere: {u['name']}", lambda unit=u: self.activate_unit(unit, self.active_turn_player))
+                             for u in current_army["units"]
+                             if u.get("order_token") and not u.get("activated") and u["current_hp"] > 0]
 
+            panel.update(self.round_number, turn_text, turn_color, info, True, options_text=turn_label,
+                         draw_command=cmd_draw, can_draw=pool_count > 0, units=face_up_units)
         else:
             # AI Turn
-            tk.Label(self.frame_center, text="AI denkt nach...", font=("italic")).pack(pady=20)
+            panel.update(self.round_number, turn_text, turn_color, info, False)
             self.root.after(1000, self.ai_take_turn)
 
     def player_draw_pool(self):
-        # Filter pool for player
-        player_tokens = [t for t in self.order_pool if t["side"] == "Player"]
-        if not player_tokens:
+        # Draw one (pool is shuffled)
+        token = self.engine.draw_order(self.state, "Player")
+        if not token:
             messagebox.showinfo("Info", "Keine Befehlsmarker im Pool.")
             return
 
-        # Draw one
-        token = player_tokens[0] # They are shuffled
-        self.order_pool.remove(token) # Remove from main list
-
         self.activate_unit(token["unit"], "Player")
 
     def opponent_draw_pool_manual(self):
-        # Filter pool for opponent
-        opp_tokens = [t for t in self.order_pool if t["side"] == "Opponent"]
-        if not opp_tokens:
+        token = self.engine.draw_order(self.state, "Opponent")
+        if not token:
             messagebox.showinfo("Info", "Keine Befehlsmarker im Pool.")
             return
 
-        token = opp_tokens[0]
-        self.order_pool.remove(token)
         self.activate_unit(token["unit"], "Opponent")
 
     def ai_take_turn(self):
-        # AI Logic
-        # 1. Face Up?
-        candidates_face_up = [u for u in self.opponent_army["units"] if u.get("order_token") and not u.get("activated") and u["current_hp"] > 0]
-
-        unit_to_activate = None
-
-        if candidates_face_up:
-            # Pick highest rank
-            # Sort logic...
-            unit_to_activate = candidates_face_up[0] # Simplification
-        else:
-            # Draw from pool
-            ai_tokens = [t for t in self.order_pool if t["side"] == "Opponent"]
-            if ai_tokens:
-                token = ai_tokens[0]
-                self.order_pool.remove(token)
-                unit_to_activate = token["unit"]
+        # AI Logic: Face-up orders first, otherwise draw from pool
+        unit_to_activate = self.engine.choose_activation(self.state, "Opponent")
 
         if unit_to_activate:
             logging.info(f"AI activating unit: {unit_to_activate['name']}")
@@ -2202,98 +2236,33 @@ class GameCompanion:
 
     def pass_turn(self):
         # This is for the big "Pass Turn" button - mark all remaining units as activated
-        current_army = self.player_army if self.active_turn_player == "Player" else self.opponent_army
-        
-        for unit in current_army["units"]:
-            if not unit.get("activated") and unit["current_hp"] > 0:
-                unit["activated"] = True
-        
-        # Remove current player's tokens from order pool
-        self.order_pool = [t for t in self.order_pool if t["side"] != self.active_turn_player]
-        
-        # Check if all units are activated
-        p_remaining = any(not u.get("activated") and u["current_hp"] > 0 for u in self.player_army["units"])
-        o_remaining = any(not u.get("activated") and u["current_hp"] > 0 for u in self.opponent_army["units"])
-        
-        if not p_remaining and not o_remaining:
+        next_side = self.engine.pass_turn(self.state)
+        self.autosave()
+        if next_side is None:
             # All units activated - end round
             self.end_phase()
         else:
-            # Check if other player still has units
-            if (self.active_turn_player == "Player" and o_remaining) or (self.active_turn_player == "Opponent" and p_remaining):
-                # Other player continues
-                self.active_turn_player = "Opponent" if self.active_turn_player == "Player" else "Player"
-                self.start_turn()
-            else:
-                # Both sides are done - end round
-                self.end_phase()
+            # Other player continues
+            self.start_turn()
 
     def activate_unit(self, unit, side):
         self.active_unit = unit
         self.active_side = side
-        self.actions_remaining = 2
-
-        unit["activated"] = True
-        unit["order_token"] = False # Flip down
-
-        # UI for Activation
-        for widget in self.frame_center.winfo_children(): widget.destroy()
-
-        tk.Label(self.frame_center, text=f"AKTIV: {unit['name']}", font=("Segoe UI", 18, "bold"), fg=("blue" if side=="Player" else "red")).pack(pady=10)
-
-        # 1. Start of Activation Effects (Placeholder)
 
-        # 2. Rally Step
-        self.perform_rally(unit)
+        # Flip order down, Rally Step, Panic/Suppression check
+        activation = self.engine.activate_unit(self.state, unit)
+        self.log_event(f"Activation: {unit['name']} ({side}), {activation['actions']} actions.", "activation",
+                       side=side, unit=unit_ref(unit), **activation)
+        self.actions_remaining = activation["actions"]
+        self.is_panicked = activation["panicked"]
+        self.is_suppressed = activation["suppressed"]
 
-        # 3. Actions UI
+        # UI for Activation (persistentes Panel, Actions UI füllt es)
+        self.panels.show("activation")
         self.update_actions_ui()
 
         # AI automation is triggered within update_actions_ui()
 
-    def perform_rally(self, unit):
-        suppression = unit.get("suppression", 0)
-        courage = unit.get("courage", "-")
-
-        # Remove suppression = Roll white dice equal to suppression
-        if suppression > 0:
-            removed = 0
-            # Sim roll
-            for _ in range(suppression):
-                r = random.randint(1, 6)
-                if r in [1, 2]: # Block or Surge (approx for White Defense Rally?)
-                    # Rally rule: "Werfe 1 weißen Verteidigungswürfel für jeden Niederhalten-Marker. Für jede Abwehr oder Verteidigungsenergie entfernt sie 1."
-                    # White Def: 1 Block, 1 Surge. Faces 1, 2. (Assuming 1-6 map: 1=Block, 2=Surge, 3-6=Blank)
-                    removed += 1
-
-            unit["suppression"] = max(0, suppression - removed)
-            # Log?
-
-        # Check Panic
-        self.is_panicked = False
-        try:
-            if courage == "-" or courage == "" or courage is None:
-                c_val = 1
-            else:
-                c_val = int(courage)
-            if unit["suppression"] >= 2 * c_val:
-                self.is_panicked = True
-        except (ValueError, TypeError):
-            pass
-
-        # Suppressed?
-        self.is_suppressed = False
-        try:
-            if courage == "-" or courage == "" or courage is None:
-                c_val = 1
-            else:
-                c_val = int(courage)
-            if unit["suppression"] >= c_val:
-                self.is_suppressed = True
-                self.actions_remaining -= 1
-        except (ValueError, TypeError):
-            pass
-
     def update_actions_ui(self):
         # Check if frame_center still exists and active_unit is valid
         try:
@@ -2302,13 +2271,6 @@ class GameCompanion:
         except tk.TclError:
             return
             
-        # Clear specific frame or rebuild
-        # Simplified: rebuild center bottom
-        # ...
-
-        f_status = tk.Frame(self.frame_center, bg="#eee", pady=5)
-        f_status.pack(fill="x")
-
         # Show current unit's markers
         aim_count = self.active_unit.get("aim", 0)
         dodge_count = self.active_unit.get("dodge", 0)
@@ -2321,48 +2283,23 @@ class GameCompanion:
             status_text += f" | 💨 Ausweichen: {dodge_count}"
         if suppression_count > 0:
             status_text += f" | 📉 Niederhalten: {suppression_count}"
-            
-        tk.Label(f_status, text=status_text, font=("bold"), bg="#eee").pack()
-        
-        if self.is_panicked:
-            tk.Label(f_status, text="PANIK! Keine Aktionen.", fg="red", bg="#eee").pack()
-        if self.is_suppressed:
-            tk.Label(f_status, text="NIEDERGEHALTEN (-1 Aktion)", fg="orange", bg="#eee").pack()
 
-        f_acts = tk.Frame(self.frame_center)
-        f_acts.pack(pady=10)
+        human_control = (self.active_side == "Player" or (self.active_side == "Opponent" and not self.ai_enabled.get())
+                         or getattr(self, 'manual_override', False))
+        if human_control:
+            mode = "actions" if not self.is_panicked and self.actions_remaining > 0 else "done"
+        elif self.active_side == "Opponent" and self.ai_enabled.get():
+            mode = "ai"
+        else:
+            mode = None
 
-        if (self.active_side == "Player" or (self.active_side == "Opponent" and not self.ai_enabled.get()) or getattr(self, 'manual_override', False)) and not self.is_panicked and self.actions_remaining > 0:
-            btn_cfg = {"font": ("Segoe UI", 10), "width": 15, "bg": "#2196F3", "fg": "white"}
+        panel = self.panels.show("activation")
+        panel.update(self.active_unit["name"], "blue" if self.active_side == "Player" else "red", status_text,
+                     panicked=self.is_panicked, suppressed=self.is_suppressed, mode=mode,
+                     manual_opponent=self.active_side == "Opponent")
 
-            if self.active_side == "Opponent":
-                tk.Label(f_acts, text="Manueller Opponent-Modus:", font=("Segoe UI", 12, "bold"), fg="orange").grid(row=0, column=0, columnspan=2, pady=5)
-                start_row = 1
-            else:
-                start_row = 0
-
-            tk.Button(f_acts, text="Bewegung", command=lambda: self.perform_action("Move"), **btn_cfg).grid(row=start_row, column=0, padx=5, pady=5)
-            tk.Button(f_acts, text="Angriff", command=lambda: self.perform_action("Attack"), **btn_cfg).grid(row=start_row, column=1, padx=5, pady=5)
-            tk.Button(f_acts, text="Zielen (Aim)", command=lambda: self.perform_action("Aim"), **btn_cfg).grid(row=start_row+1, column=0, padx=5, pady=5)
-            tk.Button(f_acts, text="Ausweichen (Dodge)", command=lambda: self.perform_action("Dodge"), **btn_cfg).grid(row=start_row+1, column=1, padx=5, pady=5)
-            tk.Button(f_acts, text="Bereitschaft", command=lambda: self.perform_action("Standby"), **btn_cfg).grid(row=start_row+2, column=0, padx=5, pady=5)
-            tk.Button(f_acts, text="Erholung", command=lambda: self.perform_action("Recover"), **btn_cfg).grid(row=start_row+2, column=1, padx=5, pady=5)
-            tk.Button(f_acts, text="Interaktion", command=lambda: self.perform_action("Interact"), bg="#795548", fg="white", font=("Segoe UI", 10), width=15).grid(row=start_row+3, column=0, padx=5, pady=5)
-            tk.Button(f_acts, text="Nahkampf", command=lambda: self.perform_action("Melee"), bg="#8D6E63", fg="white", font=("Segoe UI", 10), width=15).grid(row=start_row+3, column=1, padx=5, pady=5)
-
-            # Pass Button für einzelne Einheit
-            tk.Button(f_acts, text="Einheit Passen", command=self.pass_current_unit, bg="#FF9800", fg="white", font=("bold")).grid(row=start_row+4, column=0, padx=5, pady=5)
-            tk.Button(f_acts, text="Aktivierung Beenden", command=self.end_activation, bg="#F44336", fg="white", font=("bold")).grid(row=start_row+4, column=1, padx=5, pady=5)
-
-        elif (self.active_side == "Player" or (self.active_side == "Opponent" and not self.ai_enabled.get()) or getattr(self, 'manual_override', False)) and (self.is_panicked or self.actions_remaining <= 0):
-             tk.Button(f_acts, text="Einheit Passen", command=self.pass_current_unit, bg="#FF9800", fg="white", font=("bold")).pack(pady=5)
-             tk.Button(f_acts, text="Aktivierung Beenden", command=self.end_activation, bg="#F44336", fg="white", font=("bold")).pack()
-        elif self.active_side == "Opponent" and self.ai_enabled.get():
-            # AI ist aktiv - zeige Status
-            tk.Label(f_acts, text="🤖 AI denkt nach...", font=("Segoe UI", 14, "bold"), fg="blue").pack(pady=20)
-            tk.Button(f_acts, text="AI Überspringen (Manuell übernehmen)", 
-                     command=self.take_manual_control, bg="#FF5722", fg="white").pack(pady=10)
-            
+        if mode == "ai":
+            # AI ist aktiv - Panel zeigt den Status
             # Auto-Trigger next AI action
             # Prevent re-opening dialog if AI is currently executing a multi-step plan
             if getattr(self, 'ai_executing_plan', False):
@@ -2465,22 +2402,10 @@ class GameCompanion:
         # Reset manual override
         if hasattr(self, 'manual_override'):
             del self.manual_override
-            
-        # End effects
-        if self.is_panicked:
-            # Remove suppression = courage
-            try:
-                courage_value = self.active_unit.get("courage", 1)
-                if courage_value == "-" or courage_value == "" or courage_value is None:
-                    val = 1
-                else:
-                    val = int(courage_value)
-                self.active_unit["suppression"] = max(0, self.active_unit["suppression"] - val)
-            except: pass
 
-        # Mark unit as activated
+        # End effects (panicked units remove suppression = courage), mark unit as activated
         if self.active_unit:
-            self.active_unit["activated"] = True
+            self.engine.end_activation(self.state, self.active_unit, self.is_panicked)
             logging.info(f"Unit {self.active_unit['name']} finished activation")
             # Update tree to show new status
             self.update_trees()
@@ -2493,25 +2418,13 @@ class GameCompanion:
     
     def check_and_continue_turn(self):
         self.active_unit = None
-        
-        # Check if all units are activated
-        p_remaining = any(not u.get("activated") and u["current_hp"] > 0 for u in self.player_army["units"])
-        o_remaining = any(not u.get("activated") and u["current_hp"] > 0 for u in self.opponent_army["units"])
-        
-        if not p_remaining and not o_remaining:
+
+        next_side = self.engine.next_turn(self.state)
+        self.autosave()  # Checkpoint nach jeder Aktivierung (nur das Delta)
+        if next_side is None:
             # All units activated - end round
             self.end_phase()
         else:
-            # Switch to the other player
-            self.active_turn_player = "Opponent" if self.active_turn_player == "Player" else "Player"
-            
-            # Check if current player has remaining units
-            current_remaining = p_remaining if self.active_turn_player == "Player" else o_remaining
-            
-            if not current_remaining:
-                # Current player has no units left, switch back to other player
-                self.active_turn_player = "Opponent" if self.active_turn_player == "Player" else "Player"
-            
             # Continue with next turn
             self.start_turn()
     
@@ -2697,140 +2610,90 @@ class GameCompanion:
         tk.Button(button_frame, text="Abbrechen", command=top.destroy, 
                  bg="#9E9E9E", fg="white").pack(side="left", padx=5)
 
-    def capture_webcam_image(self, filename="turn_capture.jpg"):
-        if not CV2_AVAILABLE:
-            return None
-        
-        try:
-            cap = cv2.VideoCapture(0)
-            if not cap.isOpened():
-                return None
-            
-            # Warmup
-            for _ in range(5): cap.read()
-            
-            ret, frame = cap.read()
-            cap.release()
-            
-            if ret:
-                path = os.path.join(os.getcwd(), filename)
-                cv2.imwrite(path, frame)
-                return path
-            return None
-        except Exception as e:
-            logging.error(f"Camera error: {e}")
+    def get_camera(self):
+        """Dauerhafte Kamera-Aufnahme (startet beim ersten Zugriff, None ohne OpenCV)."""
+        if self.camera is None and CV2_AVAILABLE:
+            self.camera = CameraCapture().start()
+            self.root.bind("<Destroy>", self._stop_camera, add="+")
+        return self.camera
+
+    def _stop_camera(self, event=None):
+        if event is not None and event.widget is not self.root:
+            return
+        if self.camera:
+            self.camera.stop()
+            self.camera = None
+
+    def capture_webcam_pil(self, downscale=True):
+        """Neuestes Webcam-Bild als PIL-Image (für Gemini verkleinert) oder None."""
+        camera = self.get_camera()
+        if camera is None:
             return None
+        return camera.get_pil(max_size=self.GEMINI_IMAGE_SIZE if downscale else None)
+
+    def get_gemini_advisor(self):
+        """Gemini-Dienst mit dauerhaftem Client (None, wenn Bibliothek oder API Key fehlen)."""
+        if self.gemini_advisor is None and GEMINI_AVAILABLE:
+            api_key = get_gemini_key()
+            if api_key:
+                # Antworten landen im gemeinsamen Cache (wiederholte Züge, Offline-Spiel)
+                self.gemini_advisor = GeminiAdvisor(self.root, api_key=api_key, cache=shared_cache())
+                self.root.bind("<Destroy>", self._shutdown_gemini_advisor, add="+")
+        return self.gemini_advisor
+
+    def _shutdown_gemini_advisor(self, event=None):
+        if event is not None and event.widget is not self.root:
+            return
+        if self.gemini_advisor:
+            if self.gemini_advisor.backend.cache is not None:
+                logging.info(self.gemini_advisor.backend.cache.summary())
+            self.gemini_advisor.shutdown()
+            self.gemini_advisor = None
+
+    def build_gemini_context(self, target_type, distance, in_range):
+        """Situationsbeschreibung für Gemini (manuelle Beobachtung + Spielstand)."""
+        p_units_alive = len([u for u in self.player_army.get("units", []) if u.get("current_hp", 0) > 0])
+        o_units_alive = len([u for u in self.opponent_army.get("units", []) if u.get("current_hp", 0) > 0])
+
+        game_state = (
+            f"Runde: {self.round_number} (Phase: Activation)\n"
+            f"Punkte: Player {self.player_score} vs Opponent {self.opponent_score}\n"
+            f"Einheiten verbleibend: Player {p_units_alive}, Opponent {o_units_alive}\n"
+            f"Aktuelle Karte: {self.current_command_card}"
+        )
 
-    def ask_gemini_decision(self, unit, context_str, use_camera=True):
-        if not GEMINI_AVAILABLE:
-            return "Gemini Bibliothek fehlt."
-            
-        api_key = get_gemini_key()
-        if not api_key:
-            return "Kein API Key gefunden (gemini_key.txt fehlt oder ist leer)"
-            
-        try:
-            # Construct Prompt
-            upgrades_list = [u if isinstance(u, str) else u.get('name') for u in unit.get('upgrades', [])]
-            keywords_list = unit.get('keywords', [])
-            
-            prompt = f"""
-            Du bist ein Star Wars Legion AI Assistent. Entscheide den zug für diese Einheit:
-            Name: {unit.get('name')}
-            Typ: {unit.get('type', 'Trooper')}
-            Waffen: {[w['name'] + ' (Range ' + str(w['range']) + ')' for w in unit.get('weapons', [])]}
-            Keywords: {keywords_list}
-            Upgrades: {upgrades_list}
-            Status: HP {unit.get('current_hp')}/{unit.get('hp')}, Suppression: {unit.get('suppression', 0)}
-            
-            Situation & Spielablauf:
-            {context_str}
-            
-            Gib EINE kurze, taktisch kluge Anweisung (2-3 Sätze). Fokus auf Missionsziele oder Eliminierung.
-            Nutze aktive Fähigkeiten der Upgrades wenn sinnvoll!
-            
-            Antworte im Format:
-            "PLAN: [Bewegung/Angriff/Zielen/Ausweichen/Bereitschaft]"
-            "Erklärung: ..."
-            """
-            
-            # Helper to get image (Common)
-            pil_img = None
-            if use_camera:
-                img_path = self.capture_webcam_image()
-                if img_path:
-                    img = cv2.imread(img_path)
-                    if img is not None:
-                        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                        from PIL import Image
-                        pil_img = Image.fromarray(img_rgb)
-
-            # Execute based on SDK Version
-            logging.info(f"Gemini: Starting request with version {GEMINI_VERSION}")
-            if GEMINI_VERSION == 2:
-                # New google-genai SDK
-                msg = f"DEBUG: Using google-genai SDK (Client Mode)"
-                print(msg)
-                logging.info(msg)
-                client = genai.Client(api_key=api_key)
-                contents = [prompt]
-                if pil_img:
-                    contents.append(pil_img)
-                    logging.info("Gemini: Image attached to request")
-                    
-                # Try multiple models in case of 404 or deprecation
-                models_to_try = ['gemini-3-flash-preview', 'gemini-3-pro-preview', 'gemini-2.5-flash', 'gemini-2.0-flash']
-                response = None
-                last_err = None
+        return (
+            f"Manuelle Beobachtung:\n"
+            f"• Ziel-Priorität: {target_type}\n"
+            f"• Distanz: {distance}\n"
+            f"• Waffenreichweite: {'Ja' if in_range else 'Nein'}\n\n"
+            f"-- SPIELVERLAUF / STATUS --\n{game_state}"
+        )
 
-                for model_name in models_to_try:
-                    try:
-                        msg = f"DEBUG: Trying Gemini Model: {model_name}"
-                        print(msg)
-                        logging.info(msg)
-                        response = client.models.generate_content(
-                            model=model_name,
-                            contents=contents
-                        )
-                        if response:
-                            msg = f"DEBUG: Success with {model_name}"
-                            print(msg)
-                            logging.info(msg)
-                            break
-                    except Exception as e:
-                        msg = f"DEBUG: Failed with {model_name}: {e}"
-                        print(msg)
-                        logging.warning(msg)
-                        last_err = e
-                
-                if response:
-                    return response.text
-                else:
-                    # If all failed, raise the last error to be caught below
-                    logging.error(f"Gemini: All models failed. Last error: {last_err}")
-                    raise last_err
-                
-            else:
-                # Old google-generativeai SDK
-                msg = "DEBUG: Using legacy google.generativeai SDK"
-                print(msg)
-                logging.info(msg)
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel('gemini-1.5-flash') 
-                
-                if pil_img:
-                    logging.info("Gemini: Image attached (legacy)")
-                    response = model.generate_content([prompt, pil_img])
-                else:
-                    response = model.generate_content(prompt)
-                
-                return response.text
+    def gemini_request_key(self, unit, target_type, distance, in_range):
+        """Schlüssel, unter dem Anfragen (auch Prefetches) wiederverwendet werden."""
+        return (self.round_number, id(unit), target_type, distance, bool(in_range))
 
-        except Exception as e:
-            err_msg = f"Gemini Error: {e}"
-            print(err_msg)
-            logging.error(err_msg, exc_info=True)
-            return err_msg
+    def prefetch_ai_advice(self):
+        """
+        Kommandophase: Gemini-Empfehlungen für alle AI-Einheiten mit Befehl
+        parallel vorab anfragen (mit der Standard-Beobachtung des AI-Dialogs).
+        """
+        ai_set = (self.mission_data or {}).get("ai_settings", {})
+        if not ai_set.get("gemini_enabled", True):
+            return
+        advisor = self.get_gemini_advisor()
+        if not advisor:
+            return
+
+        target_type, distance, in_range = self.AI_DEFAULT_OBSERVATION
+        # Kamera im Tk-Thread starten, Bild holen dann im Worker (ein Bild für alle Einheiten)
+        camera = shared_image(self.capture_webcam_pil) if ai_set.get("camera_enabled", True) and self.get_camera() else None
+        context = self.build_gemini_context(target_type, distance, in_range)
+        for unit in self.opponent_army.get("units", []):
+            if unit.get("order_token") and unit.get("current_hp", 0) > 0:
+                key = self.gemini_request_key(unit, target_type, distance, in_range)
+                advisor.prefetch(key, build_decision_prompt(unit, context), image_provider=camera)
 
     def ai_perform_actions(self):
         unit_name = self.active_unit["name"]
@@ -2854,15 +2717,15 @@ class GameCompanion:
         f_ctx.pack(fill="x", padx=10, pady=5)
         
         tk.Label(f_ctx, text="Was ist das nächste relevante Ziel?").grid(row=0, column=0, sticky="w")
-        var_target_type = tk.StringVar(value="Feind-Trupp")
+        var_target_type = tk.StringVar(value=self.AI_DEFAULT_OBSERVATION[0])
         ttk.Combobox(f_ctx, textvariable=var_target_type, values=["Feind-Trupp", "Missions-Marker", "Fahrzeug", "Rückzug"]).grid(row=0, column=1, sticky="w")
         
         tk.Label(f_ctx, text="Distanz zum Ziel/Feind?").grid(row=1, column=0, sticky="w")
-        var_dist = tk.StringVar(value="Range 3-4")
+        var_dist = tk.StringVar(value=self.AI_DEFAULT_OBSERVATION[1])
         ttk.Combobox(f_ctx, textvariable=var_dist, values=["Nahkampf (Engaged)", "Range 1-2 (Nah)", "Range 3-4 (Mittel)", "Range 5+ (Fern)"]).grid(row=1, column=1, sticky="w")
         
         tk.Label(f_ctx, text="Ist Feind in Waffen-Reichweite?").grid(row=2, column=0, sticky="w")
-        var_in_range = tk.BooleanVar(value=True)
+        var_in_range = tk.BooleanVar(value=self.AI_DEFAULT_OBSERVATION[2])
         tk.Checkbutton(f_ctx, variable=var_in_range).grid(row=2, column=1, sticky="w")
 
         # --- STEP 2: DECISION ---
@@ -2876,49 +2739,20 @@ class GameCompanion:
         self.ai_intent = "Hold"
         
         def run_local_logic():
-            # Basic logical deduction
-            u_type = self.active_unit.get("type", "Trooper").lower()
-            weapons = self.active_unit.get("weapons", [])
-            max_r = max([w["range"][1] for w in weapons]) if weapons else 0
-            is_melee_unit = any(w["range"][0] == 0 for w in weapons) and max_r < 3
-            upgrades = self.active_unit.get("upgrades", [])
-            
-            dist = var_dist.get()
-            target = var_target_type.get()
-            
-            plan = ""
-            equipment_advice = ""
-            
-            # Equipment Scheck
-            if upgrades:
-                for upg in upgrades:
-                    # Einfache Erkennung per String
-                    u_str = str(upg).lower()
-                    if "granat" in u_str or "grenade" in u_str:
-                        equipment_advice += f"\n• Nutze {upg} (wenn Range 1)!"
-                    elif "ziel" in u_str or "scope" in u_str:
-                         equipment_advice += f"\n• Nutze {upg} für besseres Zielen."
-
-            if "Nahkampf" in dist: 
-                plan = "⚔️ Status: Im Nahkampf. \n-> Aktion: NAHKAMPF-ANGRIFF ausführen. Ziel auf Zerstörung fokussieren."
-                self.ai_intent = "Melee"
-            elif target == "Missions-Marker" and "Range 1" not in dist:
-                plan = "🏃 Ziel: Mission.\n-> Aktion: BEWEGUNG (Doppel) zum Marker."
-                self.ai_intent = "Move"
-            elif var_in_range.get():
-                if is_melee_unit and "Range 1-2" in dist:
-                     plan = "⚔️ Aggressiv (Nahkämpfer).\n-> Aktion: BEWEGUNG -> ANGRIFF (Charge) wenn möglich."
-                     self.ai_intent = "Melee"
-                else: 
-                     plan = f"🎯 Feuerkampf.\n-> Aktion: ZIELEN -> ANGRIFF (Range {max_r}). Stationär bleiben für Deckung/Aim."
-                     self.ai_intent = "Ranged"
-            else:
-                # Out of range
-                plan = "🏃 Annäherung.\n-> Aktion: BEWEGUNG -> In Deckung gehen oder 2. Bewegung."
-                self.ai_intent = "Move"
-            
-            if equipment_advice:
-                plan += f"\n\n🎒 AUSRÜSTUNG:{equipment_advice}"
+            # Basic logical deduction (Entscheidung in AIHeuristics.local_decision)
+            self.ai_intent, plan = local_decision(self.active_unit, var_dist.get(),
+                                                  var_target_type.get(), var_in_range.get())
+            if self.ai_intent == "Ranged":
+                # Ziele nach erwartetem Schaden vergleichen
+                ranked = self.rank_attack_targets(self.active_unit)
+                if ranked:
+                    best, outcome = ranked[0]
+                    plan += f"\n-> Bestes Ziel: {best['name']} (Ø {outcome.expected_wounds:.1f} Wunden)"
+
+            # Equipment Check
+            advice = equipment_advice(self.active_unit)
+            if advice:
+                plan += f"\n\n🎒 AUSRÜSTUNG:{advice}"
                 
             lbl_recommendation.config(text=plan, fg="black", font=("Segoe UI", 11, "bold"))
             
@@ -2941,33 +2775,22 @@ class GameCompanion:
             # Disable button (try/except because btn_gemini might not be assigned yet if called too early, but usually fine)
             try: btn_gemini.config(state="disabled")
             except: pass
-            
-            dialog.update()
-            
-            # Gather Game State Summary (Main Thread)
-            p_units_alive = len([u for u in self.player_army.get("units", []) if u.get("current_hp", 0) > 0])
-            o_units_alive = len([u for u in self.opponent_army.get("units", []) if u.get("current_hp", 0) > 0])
-            
-            game_state = (
-                f"Runde: {self.round_number} (Phase: {self.current_phase})\n"
-                f"Punkte: Player {self.player_score} vs Opponent {self.opponent_score}\n"
-                f"Einheiten verbleibend: Player {p_units_alive}, Opponent {o_units_alive}\n"
-                f"Aktuelle Karte: {self.current_command_card}"
-            )
-
-            context = (
-                f"Manuelle Beobachtung:\n"
-                f"• Ziel-Priorität: {var_target_type.get()}\n"
-                f"• Distanz: {var_dist.get()}\n"
-                f"• Waffenreichweite: {'Ja' if var_in_range.get() else 'Nein'}\n\n"
-                f"-- SPIELVERLAUF / STATUS --\n{game_state}"
-            )
-            
-            # Context Captures
-            unit_ref = self.active_unit
-            cam_flag = camera_on
-            
+
+            advisor = self.get_gemini_advisor()
+            if not advisor:
+                lbl_recommendation.config(text="Kein API Key gefunden (gemini_key.txt fehlt oder ist leer)", fg="red")
+                try: btn_gemini.config(state="normal")
+                except: pass
+                return
+
+            # Gleiche Beobachtung wie beim Prefetch der Kommandophase -> vorhandene Antwort nutzen
+            key = self.gemini_request_key(self.active_unit, var_target_type.get(), var_dist.get(), var_in_range.get())
+            context = self.build_gemini_context(var_target_type.get(), var_dist.get(), var_in_range.get())
+            camera = self.capture_webcam_pil if camera_on and self.get_camera() else None
+
             def complete_callback(advice):
+                if not dialog.winfo_exists():
+                    return
                 lbl_recommendation.config(text=f"🤖 GEMINI SAGT:\n{advice}", fg="purple")
                 
                 # Robust Intent Parsing
@@ -3052,17 +2875,10 @@ class GameCompanion:
                 except: 
                     pass
 
-            def task():
-                try:
-                    advice_result = self.ask_gemini_decision(unit_ref, context, use_camera=cam_flag)
-                except Exception as e:
-                    advice_result = f"Error during AI Request: {e}"
-                
-                # Schedule update on main thread
-                dialog.after(0, lambda: complete_callback(advice_result))
-
-            # Start Background Thread
-            threading.Thread(target=task, daemon=True).start()
+            request = advisor.submit(build_decision_prompt(self.active_unit, context), complete_callback,
+                                     image_provider=camera, key=key)
+            # Dialog geschlossen -> Antwort verwerfen statt auf zerstörte Widgets zu schreiben
+            dialog.bind("<Destroy>", lambda e: request.cancel() if e.widget is dialog else None, add="+")
 
         btn_local = tk.Button(f_dec, text="⚡ Logik-Analyse", command=run_local_logic, bg="#ddd")
         btn_local.pack(side="left", padx=5)
@@ -3077,7 +2893,7 @@ class GameCompanion:
             
             def show_import_error():
                 msg = GEMINI_IMPORT_ERROR if GEMINI_IMPORT_ERROR else "Unknown Import Error"
-                messagebox.showerror("Gemini Import Error", f"Gemini Library could not be loaded:\n\n{msg}\n\nPlease install 'google-genai' or 'google-generativeai'.")
+                messagebox.showerror("Gemini Import Error", f"Gemini Library could not be loaded:\n\n{msg}\n\nPlease install 'google-genai', 'google-generativeai' or 'requests'.")
                 
             btn_gemini = tk.Button(f_dec, text=err_text, command=show_import_error, bg="#ffebee")
             btn_gemini.pack(side="left", padx=5)
@@ -3331,42 +3147,24 @@ class GameCompanion:
             final_speed = max_speed
             if var_terrain.get() == "Difficult":
                 # Check Unhindered
-                if "Ungehindert" in unit.get("info", "") or "Unhindered" in unit.get("info", ""):
-                    pass
-                else:
+                if "Unhindered" not in self.get_keyword_map(unit):
                     final_speed = max(1, final_speed - 1)
 
             # Save Cover Status
             unit["cover_status"] = var_cover_status.get()
 
             # Apply Keywords
-            info_txt = unit.get("info", "")
-
-            # Tactical -> Aim
-            # "Taktisch X" or "Tactical X"
-            tac_val = 0
-            if "Taktisch" in info_txt:
-                # Parse value? Simple check
-                # Assume "Taktisch 1" usually.
-                # Regex would be better but simple string check:
-                parts = info_txt.split(",")
-                for p in parts:
-                    if "Taktisch" in p:
-                        try: tac_val = int(p.strip().split(" ")[1])
-                        except: tac_val = 1
+            kw_map = self.get_keyword_map(unit)
+
+            # Tactical -> Aim ("Taktisch X" or "Tactical X")
+            tac_val = kw_map.get("Tactical", 0)
 
             if tac_val > 0:
                 unit["aim"] = unit.get("aim", 0) + tac_val
                 messagebox.showinfo("Taktisch", f"Einheit erhält {tac_val} Zielmarker durch Bewegung.")
 
             # Agile -> Dodge
-            agile_val = 0
-            if "Agil" in info_txt or "Agile" in info_txt:
-                 parts = info_txt.split(",")
-                 for p in parts:
-                    if "Agil" in p:
-                        try: agile_val = int(p.strip().split(" ")[1])
-                        except: agile_val = 1
+            agile_val = kw_map.get("Agile", 0)
 
             if agile_val > 0:
                 unit["dodge"] = unit.get("dodge", 0) + agile_val
@@ -3387,36 +3185,26 @@ class GameCompanion:
         tk.Button(top, text=f"Bewegung durchführen (Max Speed {max_speed})", command=confirm_move, bg="#4CAF50", fg="white").pack(pady=20)
 
     def end_phase(self):
-        self.current_phase = "End"
-        self.log_event(f"--- END PHASE (Round {self.round_number}) ---")
-        for widget in self.frame_center.winfo_children(): widget.destroy()
+        self.log_event(f"--- END PHASE (Round {self.round_number}) ---", "phase", phase="End")
+        self.match_log.flush()
+        self.panels.clear()
 
         tk.Label(self.frame_center, text=f"Ende Runde {self.round_number}", font=("Segoe UI", 20, "bold")).pack(pady=20)
 
-        # 1. Cleanup
-        log = []
-        all_units = self.player_army["units"] + self.opponent_army["units"]
-        for u in all_units:
-            # Remove Green Tokens
-            if u.get("aim", 0) > 0: u["aim"] = 0
-            if u.get("dodge", 0) > 0: u["dodge"] = 0
-            if u.get("standby"): u["standby"] = False
-
-            # Remove 1 Suppression
-            if u.get("suppression", 0) > 0:
-                u["suppression"] -= 1
-
-            # Reset Activation
-            u["activated"] = False
-            u["order_token"] = False
+        # 1. Cleanup (Marker, 1 Niederhalten, Bereitmachen) - use configurable max rounds
+        self.state.max_rounds = self.mission_data.get('rounds', 6) if self.mission_data else 6
+        game_over = self.engine.end_phase(self.state)
+        self.game_over = game_over
+        self.autosave()
 
+        log = []
         log.append("• Marker entfernt (Zielen, Ausweichen, Bereitschaft).")
         log.append("• 1 Niederhalten-Marker von jeder Einheit entfernt.")
         log.append("• Alle Einheiten bereitgemacht.")
         log.append("• Kommandokarten abgelegt.")
         
         # LOGGING
-        self.log_event("End Phase Cleanup completed. Tokens removed, units reset.")
+        self.log_event("End Phase Cleanup completed. Tokens removed, units reset.", "end_phase", game_over=game_over)
 
 
         tk.Label(self.frame_center, text="\n".join(log), bg="#e3f2fd", padx=20, pady=20, justify="left", font=("Segoe UI", 12)).pack(pady=10)
@@ -3430,14 +3218,17 @@ class GameCompanion:
             self.lbl_active_stats.config(text="")
         self.active_unit = None
 
-        # Next Round Button - use configurable max rounds
-        max_rounds = self.mission_data.get('rounds', 6) if self.mission_data else 6
-        if self.round_number >= max_rounds:
-            tk.Label(self.frame_center, text=f"SPIELENDE (Runde {max_rounds} erreicht)", font=("Segoe UI", 24, "bold"), fg="red").pack(pady=20)
-            self.log_event("GAME OVER - Max rounds reached.")
+        if game_over:
+            self.log_event("GAME OVER - Max rounds reached.", "game_over",
+                           player_score=self.player_score, opponent_score=self.opponent_score)
+        self.show_round_end_controls(game_over)
+
+    def show_round_end_controls(self, game_over):
+        # Next Round Button
+        if game_over:
+            tk.Label(self.frame_center, text=f"SPIELENDE (Runde {self.state.max_rounds} erreicht)", font=("Segoe UI", 24, "bold"), fg="red").pack(pady=20)
             tk.Button(self.frame_center, text="Spiel beenden", command=self.root.destroy, bg="#F44336", fg="white").pack()
         else:
-            self.round_number += 1
             tk.Button(self.frame_center, text=f"Start Runde {self.round_number}", command=self.start_command_phase, bg="#4CAF50", fg="white", font=("Segoe UI", 14, "bold")).pack(pady=20)
 
     def draw_order(self):
@@ -3448,13 +3239,16 @@ class GameCompanion:
             return
 
         # Ziehen
-        drawn = self.order_pool.pop(0)
+        drawn = self.engine.draw_order(self.state)
+        if not drawn:
+            return
         unit = drawn["unit"]
         side = drawn["side"]
 
         self.active_unit = unit
         self.active_side = side
         unit["activated"] = True
+        self.log_event(f"Order drawn: {unit['name']} ({side})", "order_drawn", side=side, unit=unit_ref(unit))
 
         # UI Updates (safe check if labels exist)
         color = "#2196F3" if side == "Player" else "#F44336"
@@ -3484,38 +3278,8 @@ class GameCompanion:
             self.show_ai_intention(unit["name"], intention)
 
     def generate_ai_intention(self, unit):
-        # Einfache Logik basierend auf Einheitentyp
-        # Check ob Nahkämpfer (Range 0-1 Waffe vorhanden?)
-        is_melee = False
-        max_range = 0
-        if "weapons" in unit:
-            for w in unit["weapons"]:
-                r = w["range"][1]
-                if r > max_range: max_range = r
-                if r == 1 and w["range"][0] == 0: is_melee = True
-
-        hp_ratio = unit["current_hp"] / unit["hp"]
-
-        actions = []
-
-        # Logik Baum
-        if is_melee and max_range < 2:
-            # Nahkämpfer
-            if hp_ratio > 0.5:
-                actions.append("Bewegung (Doppel) auf nächsten Feind zu")
-                actions.append("Angriff (Nahkampf) wenn möglich")
-            else:
-                actions.append("Bewegung in Deckung")
-                actions.append("Ausweichen (Dodge)")
-        else:
-            # Fernkämpfer
-            if hp_ratio < 0.3:
-                 actions.append("Bewegung (Rückzug/Deckung)")
-                 actions.append("Angriff auf nächste Bedrohung")
-            else:
-                 # Standard
-                 actions.append("Zielen (Aim)")
-                 actions.append("Angriff auf Einheit mit wenig Deckung")
+        # Einfache Logik basierend auf Einheitentyp (Entscheidungsbaum in AIHeuristics)
+        actions = [INTENTION_LABELS[step] for step in intention_steps(unit)]
 
         # Zufallselement
         if not actions:
@@ -3538,10 +3302,9 @@ class GameCompanion:
         tk.Button(top, text="OK", command=top.destroy, bg="#F44336", fg="white", width=10).pack(pady=10)
 
     def update_trees(self):
-        if self.player_army["units"]:
-            self.update_tree(self.tree_player, self.player_army["units"])
-        if self.opponent_army["units"]:
-            self.update_tree(self.tree_opponent, self.opponent_army["units"])
+        # Nur geänderte Zeilen werden angefasst (TreeSync), leere Armeen leeren die Liste
+        self.update_tree(self.tree_player, self.player_army["units"])
+        self.update_tree(self.tree_opponent, self.opponent_army["units"])
 
     def update_score_display(self):
         """Aktualisiere die Punkteanzeige"""
@@ -3685,10 +3448,35 @@ class GameCompanion:
         lbl_log = tk.Label(frame_result, text="Drücke 'WÜRFELN'...", bg="#e0f7fa", justify=tk.LEFT, font=("Consolas", 10))
         lbl_log.pack(anchor="w")
 
+        lbl_expected = tk.Label(frame_result, text="", bg="#e0f7fa", fg="#00695c", justify=tk.LEFT, font=("Consolas", 9))
+        lbl_expected.pack(anchor="w")
+
+        # ERWARTETER SCHADEN (exakte Verteilung vor dem Wurf)
+        def update_expected(*args):
+            if self.attack_rolled:
+                return
+            selected = [w["data"] for w in weapon_vars if w["var"].get()]
+            target_unit = next((u for u in targets if u["name"] == cb_target.get()), None)
+            if not selected or not target_unit:
+                lbl_expected.config(text="")
+                return
+            try:
+                outcome = self.calculate_attack_outcome(unit, selected, target_unit, aims=var_aim.get(),
+                                                        cover=var_cover.get(), dodges=var_dodge.get(),
+                                                        defense_die=var_def_die.get())
+                lbl_expected.config(text=f"📊 Erwartet: {outcome.summary()}")
+            except (tk.TclError, ValueError) as e:
+                # z.B. leeres Spinbox-Feld während der Eingabe
+                logging.debug(f"Expected damage not available: {e}")
+
+        for var in [w["var"] for w in weapon_vars] + [var_aim, var_cover, var_dodge, var_def_die]:
+            var.trace_add("write", update_expected)
+        cb_target.bind("<<ComboboxSelected>>", update_expected, add="+")
+        update_expected()
+
         # LOGIK
         def roll_attack():
             # 1. Pool bilden - KORREKTUR: Für jede Miniatur im Trupp
-            pool = {"red": 0, "black": 0, "white": 0}
             selected_weapons = [w for w in weapon_vars if w["var"].get()]
 
             if not selected_weapons:
@@ -3707,382 +3495,64 @@ class GameCompanion:
             elif panic_state == "suppressed":
                 log_text += "⚠️ Einheit ist unterdrückt - reduzierte Effektivität\n"
 
-            # Keywords sammeln
-            kw_map = {}
-
-            # Unit Keywords
-            for k in unit.get("info", "").split(","):
-                k=k.strip()
-                if not k: continue
-                parts = k.split(" ")
-                name = parts[0]
-                val = 1
-                if len(parts) > 1:
-                    try: val = int(parts[1])
-                    except: pass
-                kw_map[name] = kw_map.get(name, 0) + val
-
-            # Weapon Keywords und Pool pro Miniatur
-            for w in selected_weapons:
-                wd = w["data"]
-                # Würfel für jede Miniatur im Trupp hinzufügen
-                for color, count in wd["dice"].items():
-                    pool[color] += count * current_minis  # KORREKTUR: Multipliziere mit Miniaturenanzahl
-                for k in wd.get("keywords", []):
-                    k=k.strip()
-                    if not k: continue
-                    parts = k.split(" ")
-                    name = parts[0]
-                    val = 1
-                    if len(parts) > 1:
-                        try: val = int(parts[1])
-                        except: pass
-                    kw_map[name] = kw_map.get(name, 0) + val
-
-            log_text += f"Basis-Würfelpool: {pool}\n"
-            
-            # SUPPRESSION-EFFEKTE auf Angreifer anwenden
-            pool, suppression_log = self.apply_suppression_to_pool(pool, unit)
-            if suppression_log:
-                log_text += suppression_log
-
-            # WÜRFELN (Angriff)
-            results = {"crit": 0, "hit": 0, "surge": 0, "blank": 0}
-
-            def roll_legion_atk(color):
-                r = random.randint(1, 8)
-                if color == "red":
-                    if r == 1: return "crit"
-                    if 2 <= r <= 7: return "hit"
-                    return "surge"
-                if color == "black":
-                    if r == 1: return "crit"
-                    if 2 <= r <= 4: return "hit"
-                    if r == 5: return "surge"
-                    return "blank"
-                if color == "white":
-                    if r == 1: return "crit"
-                    if r == 2: return "hit"
-                    if r == 3: return "surge"
-                    return "blank"
-                return "blank"
-
-            # Roll initial pool
-            for color, count in pool.items():
-                for _ in range(count):
-                    results[roll_legion_atk(color)] += 1
-
-            log_text += f"Wurfergebnis: {results}\n"
-            
-            # LOGGING (Battle Log)
-            battle_log_entry = f"Attack Logic: Base Pool {pool} -> Results {results}"
-            # We don't log to file yet, wait effectively until damage calculation finishes or log intermediate?
-            # Let's log initial roll.
-            # But 'self' is the GameCompanion instance? Yes, nested function.
-            # self.log_event(battle_log_entry) # Maybe too spammy? Let's verify final result.
-
-            # --- KEYWORD LOGIC ---
-
-            # PRECISE (Präzise) -> Aim Reroll Modifier
-            aims = var_aim.get()
-            precise_val = kw_map.get("Precise", 0) + kw_map.get("Präzise", 0)
-            reroll_per_token = 2 + precise_val
-
-            if aims > 0:
-                dice_to_reroll = min(results["blank"] + results["surge"], aims * reroll_per_token) # Reroll blank and surge (if not surging)
-                # Check surge conversion
-                surge_chart = unit.get("surge", {})
-                atk_surge = surge_chart.get("attack")
-
-                # Don't reroll surge if we convert it
-                if atk_surge:
-                    dice_to_reroll = min(results["blank"], aims * reroll_per_token)
-
-                if dice_to_reroll > 0:
-                     log_text += f"Zielen (Präzise {precise_val}): {dice_to_reroll} Würfel neu...\n"
-                     # Simple: Assume blanks are rerolled
-                     results["blank"] = max(0, results["blank"] - dice_to_reroll)
-
-                     choices = []
-                     for c, n in pool.items(): choices.extend([c]*n)
-                     if not choices: choices = ["white"] # Fallback
-
-                     for _ in range(dice_to_reroll):
-                         results[roll_legion_atk(random.choice(choices))] += 1
-                     log_text += f"Nach Reroll: {results}\n"
-
-            # CRITICAL (Kritisch) -> Surge to Crit
-            crit_x = kw_map.get("Critical", 0) + kw_map.get("Kritisch", 0)
-            if crit_x > 0 and results["surge"] > 0:
-                converted = min(results["surge"], crit_x)
-                results["surge"] -= converted
-                results["crit"] += converted
-                log_text += f"Kritisch {crit_x}: {converted} Surge -> Crit\n"
-
-            # NATIVE SURGE
-            surge_chart = unit.get("surge", {})
-            atk_surge = surge_chart.get("attack")
-            if results["surge"] > 0:
-                if atk_surge == "hit":
-                    results["hit"] += results["surge"]
-                    log_text += f"Surge -> Hit ({results['surge']})\n"
-                    results["surge"] = 0
-                elif atk_surge == "crit":
-                    results["crit"] += results["surge"]
-                    log_text += f"Surge -> Crit ({results['surge']})\n"
-                    results["surge"] = 0
-
-            # IMPACT (Wucht) -> Hit to Crit if Armor
-            impact_val = kw_map.get("Impact", 0) + kw_map.get("Wucht", 0)
-
-            # Check Target Armor
+            # Gesamte Angriffsauflösung (Pool, Niederhalten, Keywords, Verteidigung) in der RulesEngine
             target_unit = next((u for u in targets if u["name"] == cb_target.get()), None)
-            target_info = target_unit.get("info", "") if target_unit else ""
-            has_armor = "Armor" in target_info or "Panzerung" in target_info
-
-            if has_armor and impact_val > 0:
-                converted = min(results["hit"], impact_val)
-                results["hit"] -= converted
-                results["crit"] += converted
-                log_text += f"Wucht {impact_val} (vs Panzerung): {converted} Hit -> Crit\n"
-
-            # --- DEFENSE START ---
-
-            total_hits = results["hit"] + results["crit"]
-            log_text += f"TREFFER POOL: {total_hits} (Hits: {results['hit']}, Crits: {results['crit']})\n"
-
-            # SHARPSHOOTER (Scharfschütze) -> Cover Reduction
-            ss_val = kw_map.get("Sharpshooter", 0) + kw_map.get("Scharfschütze", 0)
-
-            # BLAST (Explosion) -> Ignore Cover
-            blast_val = kw_map.get("Blast", 0) + kw_map.get("Explosion", 0)
-
-            cover_val = var_cover.get()
-            if blast_val > 0:
-                cover_val = 0
-                log_text += "Explosion: Deckung ignoriert.\n"
-            else:
-                if ss_val > 0 and cover_val > 0:
-                    cover_val = max(0, cover_val - ss_val)
-                    log_text += f"Scharfschütze {ss_val}: Deckung reduziert auf {cover_val}.\n"
-
-            # APPLY COVER
-            hits_removed_by_cover = min(results["hit"], cover_val) # Cover only hits
-            results["hit"] -= hits_removed_by_cover
-            if hits_removed_by_cover > 0:
-                log_text += f"Deckung zieht {hits_removed_by_cover} Hits ab.\n"
-
-            # DODGE
-            dodges = var_dodge.get()
-            # High Velocity check
-            hv_val = kw_map.get("High Velocity", 0) + kw_map.get("Hochgeschwindigkeit", 0)
-            if hv_val > 0:
-                dodges = 0
-                log_text += "Hochgeschwindigkeit: Ausweichen ignoriert.\n"
-
-            hits_remaining = results["hit"] + results["crit"]
-            if dodges > 0:
-                removed = min(hits_remaining, dodges)
-                log_text += f"Dodge ({dodges}) verhindert {removed} Treffer.\n"
-                hits_remaining -= removed
+            weapons = [w["data"] for w in selected_weapons]
+            result = self.engine.resolve_attack(unit, weapons, target_unit,
+                                                aims=var_aim.get(), cover=var_cover.get(),
+                                                dodges=var_dodge.get(), defense_die=var_def_die.get())
+            log_text += result.log
+            wounds, suppr_val = result.wounds, result.suppression
 
             # Disable Roll Button
             self.attack_rolled = True
             btn_roll.config(state=tk.DISABLED)
 
-            if hits_remaining <= 0:
-                log_text += "ANGRIFF ABGEWEHRT (Keine Hits übrig)."
+            if result.hits_remaining <= 0:
                 lbl_log.config(text=log_text, fg="blue")
-                # Even if 0 damage, we might want to apply "Attack Complete" state or Suppressive?
-                # Check Suppressive logic below.
-                # If 0 hits, standard suppression is 0, but keyword applies.
-                # Fallthrough to apply button logic
-
-            # ROLL DEFENSE
-            if hits_remaining > 0:
-                def_die_type = var_def_die.get()
-                blocks = 0
-                def_surges = 0
-                def_blanks = 0
-
-                for _ in range(hits_remaining):
-                    r = random.randint(1, 6)
-                    if def_die_type == "Red":
-                        if r <= 3: blocks += 1
-                        elif r == 4: def_surges += 1
-                        else: def_blanks += 1
-                    else: # White
-                        if r == 1: blocks += 1
-                        elif r == 2: def_surges += 1
-                        else: def_blanks += 1
-
-                log_text += f"\nVerteidigungswurf ({hits_remaining} Würfel {def_die_type}):\nBlocks: {blocks}, Surges: {def_surges}, Blanks: {def_blanks}\n"
-
-                # DEFENSE SURGE
-                has_surge_block = False
-                if target_unit:
-                    sc = target_unit.get("surge", {})
-                    if sc.get("defense") == "block":
-                        has_surge_block = True
-
-                if has_surge_block:
-                    blocks += def_surges
-                    log_text += f"Surge -> Block ({def_surges})\n"
-
-                # PIERCE (Durchschlagen)
-                pierce_val = kw_map.get("Pierce", 0) + kw_map.get("Durchschlagen", 0)
-
-                # Immune: Pierce check
-                immune_pierce = "Immune: Pierce" in target_info or "Immunität: Durchschlagen" in target_info
-
-                if pierce_val > 0 and blocks > 0:
-                    if immune_pierce:
-                        log_text += "Ziel ist Immun gegen Durchschlagen.\n"
-                    else:
-                        canceled = min(blocks, pierce_val)
-                        blocks -= canceled
-                        log_text += f"Pierce {pierce_val} bricht {canceled} Blocks!\n"
-
-                # FINAL WOUNDS
-                wounds = max(0, hits_remaining - blocks)
-                log_text += f"\nSCHADEN: {wounds}"
             else:
-                wounds = 0
-
-            # SUPPRESSION - Erweiterte Mechanik
-            suppr_val = 0
-            # Standard: Wenn mindestens 1 Hit/Crit Ergebnis nach Verteidigung
-            if total_hits > 0:
-                suppr_val += 1
-
-            # Keyword: Suppressive - Gibt +1 Suppression auch bei 0 Schaden
-            suppressive_val = kw_map.get("Suppressive", 0) + kw_map.get("Niederhaltend", 0)
-            if suppressive_val > 0:
-                suppr_val += suppressive_val
-                
-            # Minimum 1 Suppression wenn Suppressive Waffe verwendet wurde
-            if suppressive_val > 0 and suppr_val == 0:
-                suppr_val = 1
-
-            if suppr_val > 0:
-                log_text += f"\n📉 Niederhalten: +{suppr_val}"
-                if suppressive_val > 0:
-                    log_text += f" (inkl. Niederhaltend {suppressive_val})"
-
-            lbl_log.config(text=log_text, fg="red" if wounds > 0 else ("orange" if suppr_val > 0 else "green"))
+                lbl_log.config(text=log_text, fg="red" if wounds > 0 else ("orange" if suppr_val > 0 else "green"))
 
             # Apply Button
             if target_unit and (wounds > 0 or suppr_val > 0):
                 def apply_result():
-                    eliminated_points = 0
-                    
+                    old_minis = target_unit.get("minis", 1)  # Store for logging
+                    aim_used = var_aim.get()
+                    dodges_available = var_dodge.get()
+
+                    applied = self.engine.apply_attack(self.state, unit, target_unit, result,
+                                                       aims_used=aim_used, dodges_used=dodges_available)
+                    figures_lost, eliminated_points = applied["figures_lost"], applied["points"]
+                    self.log_event(f"Attack: '{unit['name']}' -> '{target_unit['name']}': {wounds} wounds, {suppr_val} suppression.",
+                                   "attack", **attack_data(self.state.side_of(unit), unit, target_unit, weapons, result,
+                                                           aims_used=aim_used, dodges_used=dodges_available,
+                                                           figures_lost=figures_lost, points=eliminated_points,
+                                                           destroyed=applied["destroyed"]))
+
                     if wounds > 0:
-                        remaining_damage = wounds
-                        current_hp = target_unit["current_hp"]
-                        old_minis = target_unit.get("minis", 1)  # Store for logging
-                        current_minis = old_minis # Temp
-                        max_hp = target_unit["hp"]
-                        
-                        # Berechne Figuren-Verluste durch Überschaden
-                        figures_lost = 0
-                        
-                        while remaining_damage > 0 and current_minis > 0:
-                            if remaining_damage >= current_hp:
-                                # Aktuelle Figur stirbt
-                                remaining_damage -= current_hp
-                                figures_lost += 1
-                                current_minis -= 1
-                                current_hp = max_hp  # Nächste Figur hat volle HP
-                            else:
-                                # Aktuelle Figur überlebt mit reduzierter HP
-                                current_hp -= remaining_damage
-                                remaining_damage = 0
-                        
-                        # Update Einheit
-                        target_unit["minis"] = current_minis
-                        target_unit["current_hp"] = current_hp
-                        
                         # LOGGING DAMAGE
-                        loss_msg = f"Damage: Target '{target_unit['name']}' took {wounds} wounds. Minis: {old_minis} -> {current_minis}."
+                        loss_msg = f"Damage: Target '{target_unit['name']}' took {wounds} wounds. Minis: {old_minis} -> {target_unit['minis']}."
                         self.log_event(loss_msg)
 
-                        # Punkte berechnen wenn Figuren sterben
                         if figures_lost > 0:
-                            # Versuche verschiedene Möglichkeiten für Einheitskosten
-                            unit_cost = target_unit.get("cost", 0)
-                            if unit_cost == 0:
-                                unit_cost = target_unit.get("points", 0)
-                            if unit_cost == 0:
-                                unit_cost = target_unit.get("pts", 0)
-                            if unit_cost == 0:
-                                # Fallback: Schätzung basierend auf Rang
-                                rank = target_unit.get("rank", "Corps")
-                                cost_estimates = {
-                                    "Commander": 200, "Operative": 150, 
-                                    "Corps": 60, "Special Forces": 80, 
-                                    "Support": 40, "Heavy": 200
-                                }
-                                unit_cost = cost_estimates.get(rank, 60)
-                            
-                            original_minis = target_unit.get("original_minis", target_unit.get("minis", 1) + figures_lost)
-                            target_unit["original_minis"] = original_minis  # Speichere Original für Punkteberechnung
-                            points_per_figure = unit_cost / original_minis if original_minis > 0 else 0
-                            eliminated_points = int(figures_lost * points_per_figure)
-                            
-                            # Punkte dem Angreifer gutschreiben
-                            if unit in self.player_army["units"]:
-                                # Spieler greift an, Spieler erhält Punkte (Korrektur: Punkte gehen an den, der tötet)
-                                self.player_score = getattr(self, 'player_score', 0) + eliminated_points
-                            else:
-                                # Opponent greift an, Opponent erhält Punkte
-                                self.opponent_score = getattr(self, 'opponent_score', 0) + eliminated_points
-                            
                             # Aktualisiere Punkteanzeige
                             self.update_score_display()
-                        
+
                         # Meldungen
-                        if current_minis <= 0:
-                            # Einheit vollständig eliminiert - aus Liste entfernen
-                            if target_unit in self.player_army["units"]:
-                                self.player_army["units"].remove(target_unit)
-                            elif target_unit in self.opponent_army["units"]:
-                                self.opponent_army["units"].remove(target_unit)
+                        if applied["destroyed"]:
                             messagebox.showwarning("Truppe vernichtet!", 
                                 f"{target_unit['name']} wurde vollständig eliminiert!\n{eliminated_points} Punkte gutgeschrieben!")
                         elif figures_lost > 0:
                             messagebox.showinfo("Verluste!", 
-                                f"{target_unit['name']}: {figures_lost} Figur(en) eliminiert!\nVerbleibende: {current_minis}\n{eliminated_points} Punkte gutgeschrieben!")
+                                f"{target_unit['name']}: {figures_lost} Figur(en) eliminiert!\nVerbleibende: {target_unit['minis']}\n{eliminated_points} Punkte gutgeschrieben!")
                         
+                    current_suppression = target_unit.get("suppression", 0)
                     if suppr_val > 0:
-                        target_unit["suppression"] = target_unit.get("suppression", 0) + suppr_val
                         # LOGGING SUPPRESSION
-                        self.log_event(f"Suppression: '{target_unit['name']}' gained {suppr_val}. Total: {target_unit['suppression']}")
-
-                    # Remove used Aim markers
-                    aim_used = var_aim.get()
-                    if aim_used > 0:
-                        unit["aim"] = max(0, unit.get("aim", 0) - aim_used)
-
-                    # Remove used Dodge markers (they were already calculated in the attack)
-                    dodges_available = var_dodge.get()
-                    if dodges_available > 0:
-                        # Dodge markers are consumed when used, clear them
-                        target_unit["dodge"] = 0
+                        self.log_event(f"Suppression: '{target_unit['name']}' gained {suppr_val}. Total: {current_suppression}")
 
                     # PANIC TEST - Wenn Suppression >= Courage
-                    current_suppression = target_unit.get("suppression", 0)
-                    try:
-                        courage_value = target_unit.get("courage", 1)
-                        if courage_value == "-" or courage_value == "" or courage_value is None:
-                            courage = 1
-                        else:
-                            courage = int(courage_value)
-                    except (ValueError, TypeError):
-                        courage = 1  # Default fallback
-                    
-                    panic_message = ""
-                    if current_suppression >= courage:
-                        panic_message = self.perform_panic_test(target_unit)
+                    panic_message = self.format_panic_result(applied["panic"]) if applied["panic"] else ""
 
                     self.update_trees()
                     message = f"{target_unit['name']}:\n-{wounds} HP\n+{suppr_val} Suppression (Total: {current_suppression})\nZielmarker verbraucht: {aim_used}"
@@ -4090,7 +3560,8 @@ class GameCompanion:
                         message += f"\nAusweichen-Marker verbraucht: {dodges_available}"
                     if panic_message:
                         message += f"\n\n🚨 PANIC TEST:\n{panic_message}"
-                        self.log_event(f"Panic Test: '{target_unit['name']}' -> {panic_message}")
+                        self.log_event(f"Panic Test: '{target_unit['name']}' -> {panic_message}", "panic",
+                                       unit=unit_ref(target_unit), **applied["panic"])
                     
                     # Schließe Fenster SOFORT nach dem Anwenden
                     top.destroy()
@@ -4104,7 +3575,8 @@ class GameCompanion:
             else:
                 def close_no_effect():
                     # Consumes action even if missed
-                    self.log_event(f"Attack Result: No effect on '{target_unit['name'] if target_unit else 'Unknown Target'}'.")
+                    self.log_event(f"Attack Result: No effect on '{target_unit['name'] if target_unit else 'Unknown Target'}'.",
+                                   "attack", **attack_data(self.state.side_of(unit), unit, target_unit, weapons, result))
                     top.destroy()
                     on_complete()
                 
@@ -4116,94 +3588,57 @@ class GameCompanion:
 
     def perform_panic_test(self, unit):
         """Führe einen Panic-Test durch wenn Suppression >= Courage"""
-        import random
-        
-        suppression = unit.get("suppression", 0)
-        
-        # Robuste Courage-Konvertierung
-        try:
-            courage_value = unit.get("courage", 1)
-            if courage_value == "-" or courage_value == "" or courage_value is None:
-                courage = 1  # Standard-Fallback
-            else:
-                courage = int(courage_value)
-        except (ValueError, TypeError):
-            courage = 1  # Fallback bei ungültigen Werten
-            
-        panic_dice = suppression - courage
-        
-        # Würfle Panic-Würfel (weiße Würfel)
-        results = []
-        for _ in range(panic_dice):
-            roll = random.randint(1, 6)
-            if roll == 1:
-                results.append("blank")
-            else:
-                results.append("success")
-        
-        panic_count = results.count("blank")
-        message = f"Mut: {courage}, Niederhalten: {suppression}\n"
-        message += f"Panic-Würfel: {panic_dice} ({results.count('blank')} blanks)\n\n"
-        
-        if panic_count == 0:
+        return self.format_panic_result(self.engine.panic_test(unit))
+
+    def format_panic_result(self, panic):
+        """Anzeigetext für ein Ergebnis von RulesEngine.panic_test"""
+        message = f"Mut: {panic['courage']}, Niederhalten: {panic['suppression']}\n"
+        message += f"Panic-Würfel: {panic['dice']} ({panic['blanks']} blanks)\n\n"
+
+        if panic["state"] is None:
             message += "✅ KEIN PANIC - Einheit hält Stand!"
-            return message
-        
-        # Panic-Effekte je nach Anzahl der blanks
-        if panic_count >= 2:
+        elif panic["state"] == "retreat":
             # Schwere Panik: Rückzug
             message += "🔥 SCHWERE PANIK (2+ blanks):\n"
             message += "• Einheit muss sich zurückziehen\n"
             message += "• Verliert alle Marker außer Suppression\n"
             message += "• Kann diese Runde nicht mehr aktivieren"
-            
-            # Entferne alle Marker außer Suppression
-            unit["aim"] = 0
-            unit["dodge"] = 0
-            unit["standby"] = 0
-            unit["panic_state"] = "retreat"  # Zustand für AI/UI
-            
         else:
             # Leichte Panik: Suppression bleibt
             message += "⚠️ LEICHTE PANIK (1 blank):\n"
             message += "• Einheit ist unterdrückt\n"
             message += "• Verliert 1 Aktion diese Runde\n"
             message += "• Kann nicht zielen"
-            
-            # Entferne alle Aim-Marker
-            unit["aim"] = 0
-            unit["panic_state"] = "suppressed"  # Zustand für AI/UI
-        
         return message
     
+    def build_attack_pool(self, unit, weapons):
+        """Würfelpool (Waffenwürfel x Miniaturen) und Keywords, siehe RulesEngine. Rückgabe: (pool, kw_map)"""
+        return self.engine.build_attack_pool(unit, weapons)
+
+    def calculate_attack_outcome(self, unit, weapons, target_unit, aims=0, cover=0, dodges=0, defense_die=None):
+        """Exakte Schadensverteilung eines Angriffs (ohne zu würfeln), z.B. für Vorschau und AI"""
+        return self.engine.calculate_attack_outcome(unit, weapons, target_unit, aims, cover, dodges, defense_die)
+
+    def rank_attack_targets(self, unit, aims=1):
+        """Sortiert lebende Gegner-Einheiten nach erwartetem Schaden der Fernkampfwaffen"""
+        weapons = [w for w in unit.get("weapons", []) if w["range"][1] > 1]
+        if not weapons:
+            return []
+        enemies = self.player_army["units"] if unit in self.opponent_army["units"] else self.opponent_army["units"]
+        return self.engine.rank_targets(unit, enemies, weapons, aims=aims)
+
     def check_suppression_effects(self, unit):
         """Prüfe Suppression-Effekte auf Würfelpool"""
-        suppression = unit.get("suppression", 0)
-        if suppression == 0:
-            return 0
-            
-        # Für jedes Suppression-Token: -1 Angriffswürfel
-        return min(suppression, 2)  # Maximum 2 Würfel Reduktion
+        return self.engine.check_suppression_effects(unit)
     
     def apply_suppression_to_pool(self, pool, unit):
         """Reduziere Würfelpool basierend auf Suppression"""
-        reduction = self.check_suppression_effects(unit)
-        if reduction == 0:
-            return pool, ""
-            
-        # Reduziere Würfel (Priorität: weiß -> schwarz -> rot)
         original_total = sum(pool.values())
-        log = f"🚫 Suppression-Effekt: -{reduction} Würfel\n"
-        
-        for color in ["white", "black", "red"]:
-            while reduction > 0 and pool[color] > 0:
-                pool[color] -= 1
-                reduction -= 1
-                
-        new_total = sum(pool.values())
-        if new_total < original_total:
-            log += f"Würfelpool reduziert: {original_total} → {new_total}\n"
-            
+        pool, removed = self.engine.apply_suppression_to_pool(pool, unit)
+        if removed == 0:
+            return pool, ""
+        log = f"🚫 Suppression-Effekt: -{self.check_suppression_effects(unit)} Würfel\n"
+        log += f"Würfelpool reduziert: {original_total} → {sum(pool.values())}\n"
         return pool, log
 
     def check_standby_reactions(self):
@@ -4510,12 +3945,15 @@ class GameCompanion:
         # Schaden berechnen
         damage = max(0, hits - blocks)
         
-        # LOGGING MELEE
-        self.log_event(f"Melee: '{attacker_name}' vs '{target_name}'. Attack ({attack_dice} dice) -> {hits} hits. Defense ({defense_dice} dice) -> {blocks} blocks. Damage: {damage}.")
-
         # Schaden anwenden
+        side = self.state.side_of(attacker)
         if damage > 0:
             self.apply_figure_damage(target_unit, damage)
+
+        # LOGGING MELEE (nach dem Schaden, damit das Ereignis-Delta ihn enthält)
+        self.log_event(f"Melee: '{attacker_name}' vs '{target_name}'. Attack ({attack_dice} dice) -> {hits} hits. Defense ({defense_dice} dice) -> {blocks} blocks. Damage: {damage}.",
+                       "melee", side=side, attacker=unit_ref(attacker), target=unit_ref(target_unit),
+                       attack_dice=attack_dice, hits=hits, defense_dice=defense_dice, blocks=blocks, wounds=damage)
         
         # Zurückschlag (falls Ziel noch lebt)
         counter_damage = 0
@@ -4527,7 +3965,9 @@ class GameCompanion:
             
             if counter_damage > 0:
                 self.apply_figure_damage(attacker, counter_damage)
-                self.log_event(f"Melee Counter-Attack: '{target_name}' deals {counter_damage} damage back to '{attacker_name}'.")
+                self.log_event(f"Melee Counter-Attack: '{target_name}' deals {counter_damage} damage back to '{attacker_name}'.",
+                               "melee_counter", side=other_side(side) if side else None, attacker=unit_ref(target_unit),
+                               target=unit_ref(attacker), hits=counter_hits, blocks=counter_blocks, wounds=counter_damage)
         
         # Ergebnis anzeigen
         result_text = f"Nahkampf: {attacker_name} vs {target_name}\n\n"
@@ -0,0 +1,685 @@
+"""
+Regel-Engine und Spielzustand ohne GUI.
+
+Der Game Companion (Tk) treibt diese Engine über explizite Schrittfunktionen
+an: Kommandophase, Befehlspool, Aktivierung (Sammeln/Panik), Angriff,
+Schaden und Endphase. Dieselben Funktionen erlauben komplette Spiele ohne
+Display zu simulieren (siehe play_game).
+"""
+import logging
+
+# Import dependencies with compatibility for both script and package modes
+try:
+    from .LegionRules import LegionRules
+    from .DiceEngine import DiceEngine
+    from .AttackCalculator import calculate_attack
+    from .ArmyFormat import expand_army
+except ImportError:
+    try:
+        from utilities.LegionRules import LegionRules
+        from utilities.DiceEngine import DiceEngine
+        from utilities.AttackCalculator import calculate_attack
+        from utilities.ArmyFormat import expand_army
+    except ImportError:
+        from LegionRules import LegionRules
+        from DiceEngine import DiceEngine
+        from AttackCalculator import calculate_attack
+        from ArmyFormat import expand_army
+
+SIDES = ("Player", "Opponent")
+
+# AI-Befehlspriorität in der Kommandophase (kleiner = zuerst)
+RANK_PRIORITY = {"Commander": 1, "Operative": 1, "Heavy": 2, "Special Forces": 3, "Support": 4, "Corps": 5}
+
+# Fallback-Kosten pro Rang, falls eine Einheit keine Punkte hat
+RANK_COST_ESTIMATES = {"Commander": 200, "Operative": 150, "Corps": 60,
+                       "Special Forces": 80, "Support": 40, "Heavy": 200}
+
+
+def other_side(side):
+    return "Opponent" if side == "Player" else "Player"
+
+
+def courage_value(unit):
+    """Mut einer Einheit als Zahl ('-', leer oder ungültig zählt als 1)."""
+    value = unit.get("courage", 1)
+    if value == "-" or value == "" or value is None:
+        return 1
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 1
+
+
+def build_army(data, db):
+    """
+    Gespeicherte Armee (JSON-Inhalt, kompakt oder alt) mit den Katalogwerten
+    anreichern und den Spielzustand der Einheiten initialisieren.
+    Rückgabe: {"faction", "units", "command_cards"}
+    """
+    data, missing = expand_army(data, db)
+    for text in missing:
+        logging.warning(f"Nicht im Katalog: {text}")
+    faction = data.get("faction")
+    units = []
+    for item in data.get("army", []):
+        db_unit = db.get_unit(faction, item["name"])
+        if not db_unit:
+            logging.warning(f"Einheit {item['name']} nicht in DB gefunden.")
+            continue
+        # Kombiniere gespeicherte Daten (Upgrades, Punkte) mit statischen Daten (Waffen, Speed...)
+        unit = {**db_unit, **item}
+        unit["current_hp"] = unit["hp"]
+        unit["activated"] = False
+        unit["suppression"] = 0
+        # Figuren inkl. Ausrüstung berechnet expand_army; Katalogwert nur als Rückfall
+        unit.setdefault("minis", db_unit.get("minis", 1))
+        units.append(unit)
+    return {"faction": faction, "units": units, "command_cards": data.get("command_cards", [])}
+
+
+class GameState:
+    """
+    Kompakter Spielzustand: beide Armeen (Einheiten-Dicts), Runde, Phase,
+    Priorität, Befehlspool und Punkte. Enthält keine Tk-Objekte.
+    """
+
+    def __init__(self, player_army=None, opponent_army=None, max_rounds=6):
+        self.player_army = player_army or {"faction": "", "units": []}
+        self.opponent_army = opponent_army or {"faction": "", "units": []}
+        self.round_number = 0
+        self.max_rounds = max_rounds
+        self.current_phase = "Setup"  # Setup, Command, Activation, End
+        self.priority_player = "Player"
+        self.active_turn_player = "Player"
+        # Befehlspool: Liste von {"unit": Einheit, "side": "Player"/"Opponent"}
+        self.order_pool = []
+        self.player_score = 0
+        self.opponent_score = 0
+
+    def army(self, side):
+        return self.player_army if side == "Player" else self.opponent_army
+
+    def units(self, side):
+        return self.army(side)["units"]
+
+    def side_of(self, unit):
+        """Seite einer Einheit (Identitätsvergleich) oder None."""
+        for side in SIDES:
+            if any(u is unit for u in self.units(side)):
+                return side
+        return None
+
+    def living_units(self, side):
+        return [u for u in self.units(side) if u["current_hp"] > 0]
+
+    def has_remaining(self, side):
+        """Hat die Seite in dieser Runde noch nicht aktivierte Einheiten?"""
+        return any(not u.get("activated") and u["current_hp"] > 0 for u in self.units(side))
+
+    def add_score(self, side, points):
+        if side == "Player":
+            self.player_score += points
+        else:
+            self.opponent_score += points
+
+
+class AttackResult:
+    """Ergebnis eines aufgelösten Angriffs (vor dem Anwenden auf das Ziel)."""
+
+    def __init__(self):
+        self.pool = {}
+        self.results = {}
+        self.total_hits = 0
+        self.hits_remaining = 0
+        self.defense = None
+        self.wounds = 0
+        self.suppression = 0
+        self.log = ""
+
+
+class RulesEngine:
+    """
+    Reine Spiellogik des Game Companion. Alle Würfe laufen über eine
+    (seedbare) DiceEngine, der Zustand liegt in GameState bzw. den
+    Einheiten-Dicts.
+    """
+
+    def __init__(self, dice=None, rules=LegionRules):
+        self.dice = dice or DiceEngine()
+        self.rules = rules
+
+    # --- Keywords & Würfelpool ---
+
+    def get_keyword_map(self, data):
+        """Vorab geparste Keywords einer Einheit oder Waffe (englischer Name -> Wert)"""
+        kw_map = data.get("keyword_map")
+        if kw_map is None:
+            # Ältere Spielstände / manuell angelegte Einheiten ohne geparste Keywords
+            kw_map = self.rules.parse_keyword_list(data.get("info") or data.get("keywords", []))
+            data["keyword_map"] = kw_map
+        return kw_map
+
+    def build_attack_pool(self, unit, weapons):
+        """
+        Bildet den Würfelpool (Waffenwürfel x Miniaturen) und sammelt die
+        geparsten Keywords von Einheit und Waffen. Rückgabe: (pool, kw_map)
+        """
+        pool = {"red": 0, "black": 0, "white": 0}
+        kw_map = dict(self.get_keyword_map(unit))
+        current_minis = unit.get("current_minis", unit.get("minis", 1))
+
+        for wd in weapons:
+            # Würfel für jede Miniatur im Trupp hinzufügen
+            for color, count in wd["dice"].items():
+                pool[color] += count * current_minis
+            for name, val in self.get_keyword_map(wd).items():
+                kw_map[name] = kw_map.get(name, 0) + val
+        return pool, kw_map
+
+    @staticmethod
+    def check_suppression_effects(unit):
+        """Für jedes Niederhalten -1 Angriffswürfel, maximal 2."""
+        return min(unit.get("suppression", 0), 2)
+
+    def apply_suppression_to_pool(self, pool, unit):
+        """Reduziert den Pool (weiß -> schwarz -> rot). Rückgabe: (pool, entfernte Würfel)"""
+        reduction = self.check_suppression_effects(unit)
+        removed = 0
+        for color in ["white", "black", "red"]:
+            while reduction > 0 and pool[color] > 0:
+                pool[color] -= 1
+                reduction -= 1
+                removed += 1
+        return pool, removed
+
+    def calculate_attack_outcome(self, unit, weapons, target_unit, aims=0, cover=0, dodges=0, defense_die=None):
+        """Exakte Schadensverteilung eines Angriffs (ohne zu würfeln), z.B. für Vorschau und AI"""
+        pool, kw_map = self.build_attack_pool(unit, weapons)
+        pool, _ = self.apply_suppression_to_pool(pool, unit)
+        return calculate_attack(
+            pool, kw_map,
+            attack_surge=unit.get("surge", {}).get("attack"),
+            aims=aims, cover=cover, dodges=dodges,
+            defense_die=defense_die or target_unit.get("defense", "White"),
+            defense_surge=target_unit.get("surge", {}).get("defense") == "block",
+            target_keywords=self.get_keyword_map(target_unit))
+
+    def rank_targets(self, unit, enemies, weapons, aims=1):
+        """Sortiert lebende Ziele nach erwartetem Schaden. Rückgabe: [(Ziel, AttackOutcome)]"""
+        ranked = []
+        for target in enemies:
+            if target.get("current_hp", 0) <= 0:
+                continue
+            outcome = self.calculate_attack_outcome(unit, weapons, target, aims=aims,
+                                                    cover=target.get("cover_status", 0),
+                                                    dodges=target.get("dodge", 0))
+            ranked.append((target, outcome))
+        ranked.sort(key=lambda item: item[1].expected_wounds, reverse=True)
+        return ranked
+
+    # --- Kommandophase ---
+
+    def start_command_phase(self, state):
+        state.current_phase = "Command"
+        for u in state.player_army["units"] + state.opponent_army["units"]:
+            u["activated"] = False
+            u["order_token"] = False
+
+    def resolve_priority(self, state, player_pips, opponent_pips):
+        """Weniger Pips = Priorität, bei Gleichstand entscheidet der Zufall. Rückgabe: (Seite, Gleichstand)"""
+        if player_pips < opponent_pips:
+            state.priority_player = "Player"
+        elif opponent_pips < player_pips:
+            state.priority_player = "Opponent"
+        else:
+            state.priority_player = SIDES[int(self.dice.rng.integers(2))]
+            return state.priority_player, True
+        return state.priority_player, False
+
+    def issue_ai_orders(self, state, side, pips):
+        """AI vergibt Befehle nach Rang-Priorität (3 Pips: 3, 2 Pips: 2, sonst 1)."""
+        count = 3 if pips == 3 else (2 if pips == 2 else 1)
+        units = state.living_units(side)
+        units.sort(key=lambda x: RANK_PRIORITY.get(x.get("rank"), 99))
+        for u in units[:count]:
+            u["order_token"] = True
+        return units[:count]
+
+    def create_order_pool(self, state):
+        """Alle lebenden Einheiten ohne offenen Befehl kommen gemischt in den Pool."""
+        state.order_pool = []
+        for side in SIDES:
+            for u in state.units(side):
+                if u["current_hp"] > 0 and not u.get("order_token"):
+                    state.order_pool.append({"unit": u, "side": side})
+        self.dice.rng.shuffle(state.order_pool)
+        return state.order_pool
+
+    # --- Aktivierungsphase ---
+
+    def start_activation_phase(self, state):
+        state.current_phase = "Activation"
+        state.active_turn_player = state.priority_player
+
+    def draw_order(self, state, side=None):
+        """Zieht den nächsten Befehlsmarker (optional nur von side). Rückgabe: Token oder None"""
+        # Marker vernichteter Einheiten verfallen
+        state.order_pool = [t for t in state.order_pool if t["unit"].get("minis", 1) > 0]
+        for token in state.order_pool:
+            if side is None or token["side"] == side:
+                state.order_pool.remove(token)
+                return token
+        return None
+
+    def choose_activation(self, state, side):
+        """AI-Wahl: zuerst offene Befehle, sonst vom Stapel ziehen. Rückgabe: Einheit oder None"""
+        face_up = [u for u in state.units(side)
+                   if u.get("order_token") and not u.get("activated") and u["current_hp"] > 0]
+        if face_up:
+            return face_up[0]
+        token = self.draw_order(state, side)
+        return token["unit"] if token else None
+
+    def rally(self, unit):
+        """
+        Sammeln: je Niederhalten ein weißer Würfel, Block/Surge entfernt einen.
+        Rückgabe: (entfernt, in Panik, niedergehalten)
+        """
+        suppression = unit.get("suppression", 0)
+        removed = 0
+        if suppression > 0:
+            removed = self.dice.roll_rally(suppression)
+            unit["suppression"] = max(0, suppression - removed)
+        courage = courage_value(unit)
+        current = unit.get("suppression", 0)
+        return removed, current >= 2 * courage, current >= courage
+
+    def activate_unit(self, state, unit):
+        """
+        Befehl umdrehen, Sammeln, Panik/Niederhalten prüfen.
+        Rückgabe: {"rallied", "panicked", "suppressed", "actions"}
+        """
+        unit["activated"] = True
+        unit["order_token"] = False
+        removed, panicked, suppressed = self.rally(unit)
+        return {"rallied": removed, "panicked": panicked, "suppressed": suppressed,
+                "actions": 1 if suppressed else 2}
+
+    def end_activation(self, state, unit, panicked=False):
+        """Panische Einheiten entfernen Niederhalten in Höhe ihres Muts."""
+        if panicked:
+            unit["suppression"] = max(0, unit.get("suppression", 0) - courage_value(unit))
+        unit["activated"] = True
+
+    def next_turn(self, state):
+        """
+        Wechselt die Seite nach einer Aktivierung. Rückgabe: nächste Seite oder
+        None, wenn alle Einheiten aktiviert sind (Endphase).
+        """
+        if not state.has_remaining("Player") and not state.has_remaining("Opponent"):
+            return None
+        nxt = other_side(state.active_turn_player)
+        if not state.has_remaining(nxt):
+            nxt = state.active_turn_player
+        state.active_turn_player = nxt
+        return nxt
+
+    def pass_turn(self, state):
+        """Aktive Seite passt für den Rest der Runde. Rückgabe wie next_turn."""
+        side = state.active_turn_player
+        for unit in state.units(side):
+            if not unit.get("activated") and unit["current_hp"] > 0:
+                unit["activated"] = True
+        state.order_pool = [t for t in state.order_pool if t["side"] != side]
+        return self.next_turn(state)
+
+    # --- Endphase ---
+
+    def end_phase(self, state):
+        """
+        Marker entfernen, 1 Niederhalten abbauen, Einheiten bereitmachen.
+        Rückgabe: True wenn das Spiel vorbei ist, sonst wird die Runde erhöht.
+        """
+        state.current_phase = "End"
+        for u in state.player_army["units"] + state.opponent_army["units"]:
+            if u.get("aim", 0) > 0: u["aim"] = 0
+            if u.get("dodge", 0) > 0: u["dodge"] = 0
+            if u.get("standby"): u["standby"] = False
+            if u.get("suppression", 0) > 0:
+                u["suppression"] -= 1
+            u["activated"] = False
+            u["order_token"] = False
+
+        if state.round_number >= state.max_rounds:
+            return True
+        state.round_number += 1
+        return False
+
+    # --- Panik ---
+
+    def panic_test(self, unit):
+        """
+        Panik-Test (Niederhalten >= Mut): je Überschuss ein W6, jede 1 ist ein Blank.
+        2+ Blanks: Rückzug, 1 Blank: niedergehalten.
+        Rückgabe: {"courage", "suppression", "dice", "blanks", "state"}
+        """
+        suppression = unit.get("suppression", 0)
+        courage = courage_value(unit)
+        panic_dice = suppression - courage
+        blanks = self.dice.roll_panic(panic_dice)
+
+        state = None
+        if blanks >= 2:
+            # Entferne alle Marker außer Suppression
+            unit["aim"] = 0
+            unit["dodge"] = 0
+            unit["standby"] = 0
+            state = "retreat"
+        elif blanks == 1:
+            unit["aim"] = 0
+            state = "suppressed"
+        if state:
+            unit["panic_state"] = state
+        return {"courage": courage, "suppression": suppression, "dice": panic_dice,
+                "blanks": blanks, "state": state}
+
+    # --- Angriff ---
+
+    def resolve_attack(self, unit, weapons, target_unit, aims=0, cover=0, dodges=0, defense_die=None):
+        """
+        Würfelt einen kompletten Angriff nach der Reihenfolge des Angriffsdialogs
+        und protokolliert jeden Schritt. Das Ziel wird nicht verändert (siehe apply_attack).
+        """
+        res = AttackResult()
+        lines = []
+
+        pool, kw_map = self.build_attack_pool(unit, weapons)
+        lines.append(f"Basis-Würfelpool: {pool}")
+
+        original_total = sum(pool.values())
+        pool, removed = self.apply_suppression_to_pool(pool, unit)
+        if removed:
+            lines.append(f"🚫 Suppression-Effekt: -{self.check_suppression_effects(unit)} Würfel")
+            lines.append(f"Würfelpool reduziert: {original_total} → {sum(pool.values())}")
+        res.pool = pool
+
+        # WÜRFELN (Angriff) - ganzer Pool in einem Wurf über die DiceEngine
+        results = self.dice.roll_attack(pool)
+        lines.append(f"Wurfergebnis: {results}")
+
+        atk_surge = unit.get("surge", {}).get("attack")
+
+        # PRECISE (Präzise) -> Aim Reroll Modifier
+        precise_val = kw_map.get("Precise", 0)
+        if aims > 0:
+            # Reroll blank and surge (if not surging) - don't reroll surge if we convert it
+            rerollable_surges = 0 if atk_surge else results["surge"]
+            dice_to_reroll = min(results["blank"] + rerollable_surges, aims * (2 + precise_val))
+            if dice_to_reroll > 0:
+                lines.append(f"Zielen (Präzise {precise_val}): {dice_to_reroll} Würfel neu...")
+                # Blanks zuerst, danach nicht umwandelbare Surges
+                from_blanks = min(results["blank"], dice_to_reroll)
+                results["blank"] -= from_blanks
+                results["surge"] -= dice_to_reroll - from_blanks
+                for face, count in self.dice.reroll_attack(pool, dice_to_reroll).items():
+                    results[face] += count
+                lines.append(f"Nach Reroll: {results}")
+
+        # CRITICAL (Kritisch) -> Surge to Crit
+        crit_x = kw_map.get("Critical", 0)
+        if crit_x > 0 and results["surge"] > 0:
+            converted = min(results["surge"], crit_x)
+            results["surge"] -= converted
+            results["crit"] += converted
+            lines.append(f"Kritisch {crit_x}: {converted} Surge -> Crit")
+
+        # NATIVE SURGE
+        if results["surge"] > 0:
+            if atk_surge == "hit":
+                results["hit"] += results["surge"]
+                lines.append(f"Surge -> Hit ({results['surge']})")
+                results["surge"] = 0
+            elif atk_surge == "crit":
+                results["crit"] += results["surge"]
+                lines.append(f"Surge -> Crit ({results['surge']})")
+                results["surge"] = 0
+
+        # IMPACT (Wucht) -> Hit to Crit if Armor
+        impact_val = kw_map.get("Impact", 0)
+        target_kw = self.get_keyword_map(target_unit) if target_unit else {}
+        if "Armor" in target_kw and impact_val > 0:
+            converted = min(results["hit"], impact_val)
+            results["hit"] -= converted
+            results["crit"] += converted
+            lines.append(f"Wucht {impact_val} (vs Panzerung): {converted} Hit -> Crit")
+
+        # --- DEFENSE START ---
+        total_hits = results["hit"] + results["crit"]
+        lines.append(f"TREFFER POOL: {total_hits} (Hits: {results['hit']}, Crits: {results['crit']})")
+
+        # BLAST (Explosion) ignoriert Deckung, SHARPSHOOTER (Scharfschütze) reduziert sie
+        ss_val = kw_map.get("Sharpshooter", 0)
+        cover_val = cover
+        if kw_map.get("Blast", 0) > 0:
+            cover_val = 0
+            lines.append("Explosion: Deckung ignoriert.")
+        elif ss_val > 0 and cover_val > 0:
+            cover_val = max(0, cover_val - ss_val)
+            lines.append(f"Scharfschütze {ss_val}: Deckung reduziert auf {cover_val}.")
+
+        hits_removed_by_cover = min(results["hit"], cover_val)  # Cover only hits
+        results["hit"] -= hits_removed_by_cover
+        if hits_removed_by_cover > 0:
+            lines.append(f"Deckung zieht {hits_removed_by_cover} Hits ab.")
+
+        # DODGE (Hochgeschwindigkeit ignoriert Ausweichen)
+        if kw_map.get("High Velocity", 0) > 0:
+            dodges = 0
+            lines.append("Hochgeschwindigkeit: Ausweichen ignoriert.")
+        hits_remaining = results["hit"] + results["crit"]
+        if dodges > 0:
+            removed = min(hits_remaining, dodges)
+            lines.append(f"Dodge ({dodges}) verhindert {removed} Treffer.")
+            hits_remaining -= removed
+
+        wounds = 0
+        if hits_remaining <= 0:
+            lines.append("ANGRIFF ABGEWEHRT (Keine Hits übrig).")
+        else:
+            def_die_type = defense_die or (target_unit or {}).get("defense", "White")
+            def_roll = self.dice.roll_defense("red" if def_die_type == "Red" else "white", hits_remaining)
+            res.defense = def_roll
+            blocks = def_roll["block"]
+            lines.append("")
+            lines.append(f"Verteidigungswurf ({hits_remaining} Würfel {def_die_type}):")
+            lines.append(f"Blocks: {blocks}, Surges: {def_roll['surge']}, Blanks: {def_roll['blank']}")
+
+            # DEFENSE SURGE
+            if target_unit and target_unit.get("surge", {}).get("defense") == "block":
+                blocks += def_roll["surge"]
+                lines.append(f"Surge -> Block ({def_roll['surge']})")
+
+            # PIERCE (Durchschlagen), außer Immunität: Durchschlagen
+            pierce_val = kw_map.get("Pierce", 0)
+            if pierce_val > 0 and blocks > 0:
+                if "Immune: Pierce" in target_kw:
+                    lines.append("Ziel ist Immun gegen Durchschlagen.")
+                else:
+                    canceled = min(blocks, pierce_val)
+                    blocks -= canceled
+                    lines.append(f"Pierce {pierce_val} bricht {canceled} Blocks!")
+
+            wounds = max(0, hits_remaining - blocks)
+            lines.append("")
+            lines.append(f"SCHADEN: {wounds}")
+
+        # SUPPRESSION: +1 bei mindestens einem Treffer, plus Niederhaltend X
+        suppr_val = 1 if total_hits > 0 else 0
+        suppressive_val = kw_map.get("Suppressive", 0)
+        suppr_val += suppressive_val
+        if suppr_val > 0:
+            line = f"📉 Niederhalten: +{suppr_val}"
+            if suppressive_val > 0:
+                line += f" (inkl. Niederhaltend {suppressive_val})"
+            lines.append("")
+            lines.append(line)
+
+        res.results = results
+        res.total_hits = total_hits
+        res.hits_remaining = max(0, hits_remaining)
+        res.wounds = wounds
+        res.suppression = suppr_val
+        res.log = "\n".join(lines)
+        return res
+
+    @staticmethod
+    def apply_damage(target_unit, wounds):
+        """
+        Verteilt Wunden auf die Figuren (Überschaden tötet weitere Figuren).
+        Rückgabe: (verlorene Figuren, eliminierte Punkte)
+        """
+        remaining_damage = wounds
+        current_hp = target_unit["current_hp"]
+        current_minis = target_unit.get("minis", 1)
+        max_hp = target_unit["hp"]
+        figures_lost = 0
+
+        while remaining_damage > 0 and current_minis > 0:
+            if remaining_damage >= current_hp:
+                # Aktuelle Figur stirbt, nächste Figur hat volle HP
+                remaining_damage -= current_hp
+                figures_lost += 1
+                current_minis -= 1
+                current_hp = max_hp
+            else:
+                current_hp -= remaining_damage
+                remaining_damage = 0
+
+        target_unit["minis"] = current_minis
+        target_unit["current_hp"] = current_hp
+
+        eliminated_points = 0
+        if figures_lost > 0:
+            unit_cost = target_unit.get("cost", 0) or target_unit.get("points", 0) or target_unit.get("pts", 0)
+            if unit_cost == 0:
+                # Fallback: Schätzung basierend auf Rang
+                unit_cost = RANK_COST_ESTIMATES.get(target_unit.get("rank", "Corps"), 60)
+            original_minis = target_unit.get("original_minis", current_minis + figures_lost)
+            target_unit["original_minis"] = original_minis  # Für spätere Punkteberechnung
+            points_per_figure = unit_cost / original_minis if original_minis > 0 else 0
+            eliminated_points = int(figures_lost * points_per_figure)
+        return figures_lost, eliminated_points
+
+    def apply_attack(self, state, attacker, target_unit, result, aims_used=0, dodges_used=0):
+        """
+        Wendet ein AttackResult an: Schaden, Punkte für den Angreifer, Entfernen
+        vernichteter Einheiten, Niederhalten, verbrauchte Marker und Panik-Test.
+        Rückgabe: {"figures_lost", "points", "destroyed", "panic"}
+        """
+        outcome = {"figures_lost": 0, "points": 0, "destroyed": False, "panic": None}
+
+        if result.wounds > 0:
+            figures_lost, points = self.apply_damage(target_unit, result.wounds)
+            outcome["figures_lost"], outcome["points"] = figures_lost, points
+            if figures_lost > 0:
+                state.add_score(state.side_of(attacker) or "Opponent", points)
+            if target_unit.get("minis", 1) <= 0:
+                # Einheit vollständig eliminiert - aus Liste entfernen
+                side = state.side_of(target_unit)
+                if side:
+                    state.units(side).remove(target_unit)
+                outcome["destroyed"] = True
+
+        if result.suppression > 0:
+            target_unit["suppression"] = target_unit.get("suppression", 0) + result.suppression
+
+        if aims_used > 0:
+            attacker["aim"] = max(0, attacker.get("aim", 0) - aims_used)
+        if dodges_used > 0:
+            target_unit["dodge"] = 0
+
+        if target_unit.get("suppression", 0) >= courage_value(target_unit):
+            outcome["panic"] = self.panic_test(target_unit)
+        return outcome
+
+    # --- Headless-Spiel ---
+
+    def default_policy(self, state, unit, side, activation):
+        """
+        Einfache AI ohne Karte/Positionen: Zielen, dann Fernkampf auf die
+        lebende Gegnereinheit mit den wenigsten verbleibenden Lebenspunkten.
+        Rückgabe: Liste von Aktionen ("Aim", ("Attack", Ziel, Waffen)).
+        """
+        enemies = [u for u in state.units(other_side(side)) if u["current_hp"] > 0]
+        weapons = [w for w in unit.get("weapons", []) if w["range"][1] > 1] or unit.get("weapons", [])
+        if not enemies or not weapons or unit.get("panic_state") == "retreat":
+            return []
+        target = min(enemies, key=lambda u: u.get("minis", 1) * u["hp"])
+        actions = ["Aim"] if activation["actions"] > 1 and not activation["suppressed"] else []
+        actions.append(("Attack", target, weapons))
+        return actions
+
+    def run_activation(self, state, unit, side, policy=None):
+        """Führt eine komplette Aktivierung ohne UI aus."""
+        policy = policy or self.default_policy
+        activation = self.activate_unit(state, unit)
+        if not activation["panicked"]:
+            for action in policy(state, unit, side, activation)[:activation["actions"]]:
+                if action == "Aim":
+                    unit["aim"] = unit.get("aim", 0) + 1
+                elif action == "Dodge":
+                    unit["dodge"] = unit.get("dodge", 0) + 1
+                elif action == "Standby":
+                    unit["standby"] = True
+                elif isinstance(action, str):
+                    # Bewegung u.ä.: ohne Spielfeld keine Wirkung, verbraucht aber die Aktion
+                    continue
+                elif action[0] == "Attack":
+                    _, target, weapons = action
+                    if target.get("minis", 1) <= 0:
+                        continue
+                    result = self.resolve_attack(unit, weapons, target, aims=unit.get("aim", 0),
+                                                 cover=target.get("cover_status", 0),
+                                                 dodges=target.get("dodge", 0))
+                    self.apply_attack(state, unit, target, result, aims_used=unit.get("aim", 0),
+                                      dodges_used=target.get("dodge", 0))
+        self.end_activation(state, unit, activation["panicked"])
+
+    def play_game(self, state, policy=None, pips=(2, 2)):
+        """
+        Spielt ein komplettes Spiel ohne UI: Kommandophase (AI-Befehle),
+        abwechselnde Aktivierungen und Endphase bis max_rounds oder bis eine
+        Seite ausgelöscht ist. policy: eine Policy für beide Seiten oder
+        {"Player": ..., "Opponent": ...}. Rückgabe: "Player", "Opponent" oder "Draw".
+        """
+        policies = policy if isinstance(policy, dict) else {s: policy for s in SIDES}
+        state.round_number = max(state.round_number, 1)
+        while True:
+            self.start_command_phase(state)
+            self.resolve_priority(state, *pips)
+            for side, side_pips in zip(SIDES, pips):
+                self.issue_ai_orders(state, side, side_pips)
+            self.create_order_pool(state)
+            self.start_activation_phase(state)
+
+            side = state.active_turn_player
+            while side is not None:
+                unit = self.choose_activation(state, side)
+                if unit is None:
+                    # Keine Marker mehr, aber nicht aktivierte Einheiten (z.B. nach Panik)
+                    side = self.pass_turn(state)
+                    continue
+                self.run_activation(state, unit, side, policies[side])
+                if not state.living_units("Player") or not state.living_units("Opponent"):
+                    break
+                side = self.next_turn(state)
+
+            if self.end_phase(state) or not state.living_units("Player") or not state.living_units("Opponent"):
+                break
+
+        if state.player_score == state.opponent_score:
+            return "Draw"
+        winner = "Player" if state.player_score > state.opponent_score else "Opponent"
+        logging.debug(f"Headless game finished after round {state.round_number}: {winner}")
+        return winner
@@ -0,0 +1,252 @@
+"""
+Spielstand speichern und fortsetzen (Snapshot + inkrementelle Checkpoints).
+
+Ein Spielstand besteht aus einem Basis-Snapshot (gzip-JSON: beide Armeen mit
+vollständigen Einheiten-Dicts, Runde, Phase, Befehlspool als Einheiten-IDs,
+Hände, Ablagestapel, Würfel-Zustand) und einem Journal daneben (JSON Lines).
+Nach jeder Aktivierung wird nur das Delta der geänderten Felder an das
+Journal gehängt - serialisiert im Tk-Thread, geschrieben vom LogWriter im
+Hintergrund. Nach COMPACT_AFTER Checkpoints (und zu Rundenbeginn) entsteht
+ein neuer Basis-Snapshot, das Journal beginnt von vorn.
+
+Beim Laden werden die Einheiten direkt aus dem Snapshot übernommen, die
+Datenbank wird dafür nicht benötigt.
+"""
+import datetime
+import gzip
+import json
+import logging
+import os
+
+try:
+    from .GameEngine import GameState, SIDES
+    from .MatchEvents import STATE_FIELDS, SIDE_PREFIX, assign_unit_ids
+    from .MatchLog import LogWriter
+except ImportError:
+    try:
+        from utilities.GameEngine import GameState, SIDES
+        from utilities.MatchEvents import STATE_FIELDS, SIDE_PREFIX, assign_unit_ids
+        from utilities.MatchLog import LogWriter
+    except ImportError:
+        from GameEngine import GameState, SIDES
+        from MatchEvents import STATE_FIELDS, SIDE_PREFIX, assign_unit_ids
+        from MatchLog import LogWriter
+
+SAVE_VERSION = 1
+SAVE_EXTENSION = ".lsave"
+COMPACT_AFTER = 50  # Checkpoints bis zum nächsten Basis-Snapshot
+SAVED_STATE_FIELDS = STATE_FIELDS + ("max_rounds",)
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def journal_path(path):
+    return path + ".journal"
+
+
+def _side_of_uid(uid):
+    for side, prefix in SIDE_PREFIX.items():
+        if uid.startswith(prefix):
+            return side
+    return None
+
+
+def _encode(state, extra):
+    """Jeder Wert einzeln als JSON-Text - Vergleich und Delta ohne deepcopy."""
+    units = {}
+    for side in SIDES:
+        for unit in state.units(side):
+            units[unit["uid"]] = {k: _dumps(v) for k, v in unit.items()}
+    return {"state": {f: _dumps(getattr(state, f)) for f in SAVED_STATE_FIELDS},
+            "units": units,
+            "order_pool": _dumps([[t["unit"].get("uid"), t["side"]] for t in state.order_pool]),
+            "extra": {k: _dumps(v) for k, v in (extra or {}).items()}}
+
+
+def _delta(old, new):
+    """Delta zweier _encode-Ergebnisse als JSON-Text-Fragmente (None ohne Änderung)."""
+    parts = {}
+    state = {k: v for k, v in new["state"].items() if old["state"].get(k) != v}
+    if state:
+        parts["state"] = state
+    units, added, drop = {}, {}, {}
+    for uid, fields in new["units"].items():
+        before = old["units"].get(uid)
+        if before is None:
+            added[uid] = fields
+            continue
+        changed = {k: v for k, v in fields.items() if before.get(k) != v}
+        if changed:
+            units[uid] = changed
+        gone = [k for k in before if k not in fields]
+        if gone:
+            drop[uid] = _dumps(gone)
+    if units:
+        parts["units"] = units
+    if added:
+        parts["added"] = added
+    if drop:
+        parts["drop"] = drop
+    removed = [uid for uid in old["units"] if uid not in new["units"]]
+    if removed:
+        parts["removed"] = _dumps(removed)
+    if old["order_pool"] != new["order_pool"]:
+        parts["order_pool"] = new["order_pool"]
+    extra = {k: v for k, v in new["extra"].items() if old["extra"].get(k) != v}
+    if extra:
+        parts["extra"] = extra
+    return parts or None
+
+
+def _join(parts):
+    """Verschachtelte JSON-Text-Fragmente zu einem JSON-Objekt zusammensetzen."""
+    items = []
+    for key, value in parts.items():
+        text = _join(value) if isinstance(value, dict) else value
+        items.append(f"{_dumps(key)}:{text}")
+    return "{" + ",".join(items) + "}"
+
+
+def snapshot_document(state, extra=None, generation=0):
+    """Vollständiger Spielstand als JSON-fähiges Dict."""
+    assign_unit_ids(state)
+    return {"v": SAVE_VERSION, "gen": generation,
+            "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "state": {f: getattr(state, f) for f in SAVED_STATE_FIELDS},
+            "armies": {side: state.army(side) for side in SIDES},
+            "order_pool": [[t["unit"].get("uid"), t["side"]] for t in state.order_pool],
+            "extra": dict(extra or {})}
+
+
+def write_snapshot(path, state, extra=None, generation=0):
+    """Basis-Snapshot atomar schreiben (gzip-JSON)."""
+    text = _dumps(snapshot_document(state, extra, generation))
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=5) as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return len(text)
+
+
+def apply_checkpoint(doc, delta):
+    """Journal-Delta auf ein Snapshot-Dokument anwenden (in place)."""
+    index = {u["uid"]: u for side in SIDES for u in doc["armies"][side]["units"]}
+    doc["state"].update(delta.get("state", {}))
+    for uid, changed in delta.get("units", {}).items():
+        if uid in index:
+            index[uid].update(changed)
+    for uid, unit in delta.get("added", {}).items():
+        side = _side_of_uid(uid)
+        if side and uid not in index:
+            doc["armies"][side]["units"].append(unit)
+    for uid, keys in delta.get("drop", {}).items():
+        for key in keys:
+            index.get(uid, {}).pop(key, None)
+    removed = set(delta.get("removed", []))
+    if removed:
+        for side in SIDES:
+            army = doc["armies"][side]
+            army["units"] = [u for u in army["units"] if u.get("uid") not in removed]
+    if "order_pool" in delta:
+        doc["order_pool"] = delta["order_pool"]
+    doc["extra"].update(delta.get("extra", {}))
+    doc["seq"] = delta.get("seq", doc.get("seq"))
+    return doc
+
+
+def read_document(path):
+    """Basis-Snapshot lesen und passende Journal-Einträge anwenden."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        doc = json.load(f)
+    if doc.get("v", 0) > SAVE_VERSION:
+        raise ValueError(f"Spielstand-Version {doc.get('v')} wird nicht unterstützt")
+    journal = journal_path(path)
+    if os.path.exists(journal):
+        with open(journal, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    delta = json.loads(line)
+                except json.JSONDecodeError:
+                    # Abgebrochene letzte Zeile (Absturz beim Schreiben)
+                    logging.warning(f"Spielstand-Journal {journal}: unvollständige Zeile ignoriert")
+                    break
+                if delta.get("gen") == doc.get("gen"):
+                    apply_checkpoint(doc, delta)
+    return doc
+
+
+def state_from_document(doc):
+    """GameState aus einem Snapshot-Dokument (Befehlspool über die Einheiten-IDs)."""
+    state = GameState(doc["armies"]["Player"], doc["armies"]["Opponent"])
+    for field, value in doc["state"].items():
+        setattr(state, field, value)
+    index = {u.get("uid"): u for side in SIDES for u in state.units(side)}
+    state.order_pool = [{"unit": index[uid], "side": side} for uid, side in doc["order_pool"] if uid in index]
+    return state
+
+
+def load_game(path):
+    """Spielstand laden. Rückgabe: (GameState, extra)."""
+    doc = read_document(path)
+    return state_from_document(doc), doc.get("extra", {})
+
+
+class GameSaver:
+    """
+    Autosave in eine Datei: save() schreibt einen Basis-Snapshot, checkpoint()
+    hängt nur das Delta seit dem letzten Stand an das Journal an.
+    """
+
+    def __init__(self, path, compact_after=COMPACT_AFTER):
+        self.path = path
+        self.compact_after = compact_after
+        self.generation = 0
+        self.checkpoints = 0
+        self._seq = 0
+        self._last = None
+        self._journal = None
+
+    def save(self, state, extra=None):
+        """Neuer Basis-Snapshot, Journal beginnt neu."""
+        self.generation += 1
+        assign_unit_ids(state)
+        size = write_snapshot(self.path, state, extra, self.generation)
+        if self._journal:
+            self._journal.close()
+        self._journal = LogWriter(journal_path(self.path), mode="w")
+        self._last = _encode(state, extra)
+        self.checkpoints = 0
+        logging.debug(f"Spielstand gespeichert: {self.path} ({size} Zeichen, Generation {self.generation})")
+        return size
+
+    def checkpoint(self, state, extra=None):
+        """Delta seit dem letzten Stand anhängen. Rückgabe: geschriebene Zeile oder None."""
+        if self._last is None:
+            self.save(state, extra)
+            return None
+        assign_unit_ids(state)
+        current = _encode(state, extra)
+        parts = _delta(self._last, current)
+        if not parts:
+            return None
+        self._seq += 1
+        line = _join({"gen": str(self.generation), "seq": str(self._seq), **parts})
+        self._journal.write(line)
+        self._last = current
+        self.checkpoints += 1
+        if self.checkpoints >= self.compact_after:
+            self.save(state, extra)
+        return line
+
+    def flush(self, wait=True):
+        if self._journal:
+            self._journal.flush(wait=wait)
+
+    def close(self):
+        if self._journal:
+            self._journal.close()
+            self._journal = None
@@ -0,0 +1,221 @@
+"""
+Nicht-blockierender Gemini-Berater für den Game Companion.
+
+Das GeminiBackend (siehe GeminiRouter) hält den Client über die ganze
+Sitzung. Der GeminiAdvisor führt Anfragen in einem Thread-Pool aus,
+überwacht Timeouts, erlaubt Abbrechen und liefert die Antworten über
+root.after im Tk-Thread aus. Mehrere Einheiten können so bereits in der
+Kommandophase parallel vorab angefragt werden (prefetch).
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .GeminiRouter import GeminiBackend, DEFAULT_TIMEOUT
+except ImportError:
+    try:
+        from utilities.GeminiRouter import GeminiBackend, DEFAULT_TIMEOUT
+    except ImportError:
+        from GeminiRouter import GeminiBackend, DEFAULT_TIMEOUT
+
+DEFAULT_WORKERS = 3
+POLL_MS = 100
+
+# Status einer AdviceRequest
+PENDING, DONE, FAILED, CANCELLED, TIMEOUT = "pending", "done", "failed", "cancelled", "timeout"
+
+
+def build_decision_prompt(unit, context_str):
+    """Prompt für die Zugentscheidung einer Einheit (AI-Dialog und Vorab-Anfragen der Kommandophase)."""
+    upgrades_list = [u if isinstance(u, str) else u.get('name') for u in unit.get('upgrades', [])]
+    keywords_list = unit.get('keywords') or unit.get('info', '')
+
+    return f"""
+            Du bist ein Star Wars Legion AI Assistent. Entscheide den zug für diese Einheit:
+            Name: {unit.get('name')}
+            Typ: {unit.get('type', 'Trooper')}
+            Waffen: {[w['name'] + ' (Range ' + str(w['range']) + ')' for w in unit.get('weapons', [])]}
+            Keywords: {keywords_list}
+            Upgrades: {upgrades_list}
+            Status: HP {unit.get('current_hp')}/{unit.get('hp')}, Suppression: {unit.get('suppression', 0)}
+
+            Situation & Spielablauf:
+            {context_str}
+
+            Gib EINE kurze, taktisch kluge Anweisung (2-3 Sätze). Fokus auf Missionsziele oder Eliminierung.
+            Nutze aktive Fähigkeiten der Upgrades wenn sinnvoll!
+
+            Antworte im Format:
+            "PLAN: [Bewegung/Angriff/Zielen/Ausweichen/Bereitschaft]"
+            "Erklärung: ..."
+            """
+
+
+def shared_image(provider):
+    """
+    Macht einen Bild-Provider threadsicher einmalig: alle Prefetch-Anfragen
+    einer Kommandophase teilen sich dieselbe Kameraaufnahme.
+    """
+    lock = threading.Lock()
+    cache = []
+
+    def get():
+        with lock:
+            if not cache:
+                cache.append(provider() if provider else None)
+            return cache[0]
+    return get
+
+
+class AdviceRequest:
+    """Eine laufende oder abgeschlossene Anfrage an den GeminiAdvisor."""
+
+    def __init__(self, key, prompt, image_provider, timeout):
+        self.key = key
+        self.prompt = prompt
+        self.image_provider = image_provider
+        self.deadline = time.monotonic() + timeout
+        self.status = PENDING
+        self.result = None
+        self.callbacks = []
+        self.future = None
+
+    @property
+    def done(self):
+        return self.status != PENDING
+
+    @property
+    def ok(self):
+        return self.status == DONE
+
+    def cancel(self):
+        """Abbrechen: läuft die Anfrage schon, wird ihr Ergebnis verworfen."""
+        if self.status == PENDING:
+            self.status = CANCELLED
+            self.callbacks.clear()
+            if self.future:
+                self.future.cancel()
+
+
+class GeminiAdvisor:
+    """
+    Anfrage-Warteschlange für Gemini. Alle Callbacks laufen im Tk-Thread
+    (root.after) und erhalten den Antworttext bzw. "Gemini Error: ...".
+    """
+
+    def __init__(self, root, backend=None, api_key=None, workers=DEFAULT_WORKERS,
+                 timeout=DEFAULT_TIMEOUT, poll_ms=POLL_MS, cache=None):
+        self.root = root
+        self.backend = backend or GeminiBackend(api_key, timeout, cache=cache)
+        self.timeout = timeout
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini")
+        self._results = queue.Queue()
+        self._requests = {}
+        self._active = set()
+        self._polling = False
+
+    # --- Öffentliche API (nur aus dem Tk-Thread aufrufen) ---
+
+    def submit(self, prompt, callback=None, image_provider=None, key=None, timeout=None):
+        """
+        Anfrage einreihen. Mit key wird eine laufende oder bereits beantwortete
+        Anfrage gleichen Schlüssels wiederverwendet (Prefetch-Treffer).
+        """
+        request = self._requests.get(key) if key is not None else None
+        if request is None or request.status in (CANCELLED, TIMEOUT, FAILED):
+            request = AdviceRequest(key, prompt, image_provider, timeout or self.timeout)
+            if key is not None:
+                self._requests[key] = request
+            self._active.add(request)
+            request.future = self._executor.submit(self._run, request)
+            self._ensure_polling()
+
+        if callback:
+            if request.done:
+                self.root.after(0, lambda: callback(request.result))
+            else:
+                request.callbacks.append(callback)
+        return request
+
+    def prefetch(self, key, prompt, image_provider=None):
+        """Antwort vorab anfordern; später per submit(key=...) oder get(key) abholen."""
+        return self.submit(prompt, image_provider=image_provider, key=key)
+
+    def get(self, key):
+        return self._requests.get(key)
+
+    def cancel(self, key):
+        request = self._requests.pop(key, None)
+        if request:
+            request.cancel()
+
+    def cancel_all(self):
+        for request in list(self._active) + list(self._requests.values()):
+            request.cancel()
+        self._requests.clear()
+        self._active.clear()
+
+    def shutdown(self):
+        """Offene Anfragen verwerfen und Worker beenden (beim Schließen des Fensters)."""
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- Intern ---
+
+    def _run(self, request):
+        """Worker-Thread: Bild holen und Backend abfragen, Ergebnis in die Queue legen."""
+        if request.status != PENDING:
+            return
+        try:
+            image = request.image_provider() if request.image_provider else None
+            self._results.put((request, self.backend.generate(request.prompt, image), None))
+        except Exception as e:
+            self._results.put((request, None, e))
+
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Tk-Thread: fertige Anfragen ausliefern und Timeouts prüfen."""
+        while True:
+            try:
+                request, text, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if request.status != PENDING:
+                continue  # abgebrochen oder bereits abgelaufen
+            if error is not None:
+                logging.error(f"Gemini Error: {error}")
+                self._finish(request, FAILED, f"Gemini Error: {error}")
+            else:
+                self._finish(request, DONE, text)
+
+        now = time.monotonic()
+        for request in list(self._active):
+            if request.status != PENDING:
+                self._active.discard(request)
+            elif now >= request.deadline:
+                logging.warning(f"Gemini: Timeout für Anfrage {request.key}")
+                request.future.cancel()
+                self._finish(request, TIMEOUT, "Gemini Error: Zeitüberschreitung der Anfrage")
+
+        if self._active:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def _finish(self, request, status, result):
+        request.status, request.result = status, result
+        self._active.discard(request)
+        callbacks, request.callbacks = request.callbacks, []
+        for callback in callbacks:
+            try:
+                callback(result)
+            except Exception as e:
+                logging.error(f"Gemini callback error: {e}", exc_info=True)
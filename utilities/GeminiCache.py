@@ -0,0 +1,178 @@
+"""
+Persistenter Antwort-Cache für Gemini-Anfragen.
+
+Schlüssel: SHA-256 aus normalisiertem Prompt (Leerraum zusammengefasst),
+Modellname und Bild-Hash. Einträge verfallen nach ttl Sekunden; bei
+Überschreiten von max_entries/max_bytes werden die am längsten nicht
+genutzten Einträge verdrängt (LRU). Der Cache liegt als JSON im
+beschreibbaren Ordner "cache" und wird atomar ersetzt, damit wiederholte
+Szenarien und Spielzüge auch offline sofort beantwortet werden.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+try:
+    from .LegionUtils import get_writable_path
+except ImportError:
+    try:
+        from utilities.LegionUtils import get_writable_path
+    except ImportError:
+        from LegionUtils import get_writable_path
+
+CACHE_FILE = "gemini_cache.json"
+CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_TTL = 30 * 24 * 3600  # 30 Tage
+
+
+def normalize_prompt(prompt):
+    """Leerraum zusammenfassen, damit Einrückungen/Zeilenumbrüche den Schlüssel nicht ändern."""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def image_hash(image):
+    """Hash eines Bildes (PIL-Image, Bytes oder Dateipfad); None ohne Bild."""
+    if image is None:
+        return None
+    if isinstance(image, (bytes, bytearray)):
+        data = bytes(image)
+    elif isinstance(image, str):
+        with open(image, "rb") as f:
+            data = f.read()
+    else:
+        # PIL-Image: Pixeldaten plus Größe/Modus
+        data = f"{image.mode}:{image.size}".encode() + image.tobytes()
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hashed_key(normalized, model, digest):
+    parts = [normalized, model or "", digest or ""]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+def cache_key(prompt, model, image=None):
+    return _hashed_key(normalize_prompt(prompt), model, image_hash(image))
+
+
+class GeminiCache:
+    """Threadsicherer LRU/TTL-Cache mit Treffer-Zählern (stats)."""
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl=DEFAULT_TTL, clock=time.time):
+        self.path = path or os.path.join(get_writable_path("cache"), CACHE_FILE)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return {}
+            return data.get("entries", {})
+        except Exception as e:
+            logging.warning(f"Could not read Gemini cache, starting empty: {e}")
+            return {}
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "entries": self._entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"Could not write Gemini cache: {e}")
+
+    def _expired(self, entry, now):
+        return self.ttl is not None and now - entry["created"] > self.ttl
+
+    def _find(self, keys):
+        """Erste gültige Antwort unter keys (zählt genau einen Treffer oder Fehlschlag)."""
+        with self._lock:
+            now = self.clock()
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry and self._expired(entry, now):
+                    del self._entries[key]
+                    self.stats["expired"] += 1
+                    entry = None
+                if entry is not None:
+                    entry["last_used"] = now
+                    self.stats["hits"] += 1
+                    return entry
+            self.stats["misses"] += 1
+            return None
+
+    def get(self, prompt, model, image=None):
+        """Gespeicherte Antwort oder None (zählt Treffer/Fehlschläge)."""
+        entry = self._find([cache_key(prompt, model, image)])
+        return entry["response"] if entry else None
+
+    def lookup(self, prompt, models, image=None):
+        """
+        Erster Treffer über mehrere Modelle. Rückgabe: (Modell, Antwort) oder (None, None).
+        Prompt und Bild werden einmal gehasht; die Suche zählt als ein Treffer/Fehlschlag.
+        """
+        normalized, digest = normalize_prompt(prompt), image_hash(image)
+        entry = self._find([_hashed_key(normalized, model, digest) for model in models])
+        return (entry["model"], entry["response"]) if entry else (None, None)
+
+    def put(self, prompt, model, response, image=None):
+        if not response:
+            return
+        key = cache_key(prompt, model, image)
+        with self._lock:
+            now = self.clock()
+            self._entries[key] = {"model": model, "response": response, "created": now, "last_used": now,
+                                  "size": len(response.encode("utf-8"))}
+            self._evict(now)
+            self._save()
+
+    def _evict(self, now):
+        for key in [k for k, e in self._entries.items() if self._expired(e, now)]:
+            del self._entries[key]
+            self.stats["expired"] += 1
+        total = sum(e["size"] for e in self._entries.values())
+        lru = sorted(self._entries, key=lambda k: self._entries[k]["last_used"])
+        while lru and (len(self._entries) > self.max_entries or total > self.max_bytes):
+            key = lru.pop(0)
+            total -= self._entries.pop(key)["size"]
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def summary(self):
+        s = self.stats
+        lookups = s["hits"] + s["misses"]
+        rate = s["hits"] / lookups * 100 if lookups else 0.0
+        return f"Gemini-Cache: {len(self)} Einträge, {s['hits']} Treffer / {s['misses']} Fehlschläge ({rate:.0f}%)"
+
+
+_shared_cache = None
+
+
+def shared_cache():
+    """Gemeinsamer Cache für Mission Builder und Game Companion."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = GeminiCache()
+    return _shared_cache
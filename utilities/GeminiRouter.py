@@ -0,0 +1,266 @@
+"""
+Gemeinsamer Gemini-Client mit Modell-Routing.
+
+GeminiBackend ist der eine Client für Mission Builder und Game Companion
+(google-genai, altes google.generativeai oder REST über requests) und fragt
+die Modelle in der Reihenfolge des ModelRouter ab.
+
+Der ModelRouter merkt sich pro Modell Latenz (gleitender Mittelwert),
+Erfolge und Fehlschläge und hält je Modell einen Circuit Breaker: nach
+wiederholten Fehlern (bzw. sofort bei 404/"not found") wird das Modell für
+eine wachsende Wartezeit übersprungen. Anfragen gehen zuerst an das zuletzt
+funktionierende bzw. schnellste gesunde Modell. Der Zustand liegt im Ordner
+"cache", damit ein Neustart nicht wieder alle toten Modelle abklappert.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+GEMINI_IMPORT_ERROR = None
+try:
+    from google import genai
+    GEMINI_VERSION = 2
+except ImportError as e:
+    try:
+        import google.generativeai as genai
+        GEMINI_VERSION = 1
+    except ImportError as e2:
+        genai = None
+        GEMINI_VERSION = 0
+        GEMINI_IMPORT_ERROR = f"google-genai: {e} | google.generativeai: {e2}"
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError as e:
+    REQUESTS_AVAILABLE = False
+    if GEMINI_IMPORT_ERROR:
+        GEMINI_IMPORT_ERROR += f" | requests: {e}"
+
+# Mindestens ein Transportweg (SDK oder REST) -> GeminiBackend(...).available
+GEMINI_AVAILABLE = GEMINI_VERSION > 0 or REQUESTS_AVAILABLE
+
+try:
+    from .LegionUtils import get_writable_path
+except ImportError:
+    try:
+        from utilities.LegionUtils import get_writable_path
+    except ImportError:
+        from LegionUtils import get_writable_path
+
+# Modelle je Schnittstelle (Reihenfolge = Startreihenfolge ohne Messwerte)
+GEMINI_MODELS = ['gemini-3-flash-preview', 'gemini-3-pro-preview', 'gemini-2.5-flash', 'gemini-2.0-flash']
+LEGACY_MODELS = ['gemini-2.0-flash', 'gemini-1.5-flash-latest', 'gemini-1.5-pro', 'gemini-1.5-flash']
+REST_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={key}"
+
+DEFAULT_TIMEOUT = 45.0  # Sekunden bis eine Anfrage als gescheitert gilt
+STATE_FILE = "gemini_models.json"
+FAILURE_THRESHOLD = 2        # Fehler in Folge bis der Breaker öffnet
+BASE_COOLDOWN = 60.0         # Sekunden, verdoppelt sich bei jedem erneuten Öffnen
+MAX_COOLDOWN = 24 * 3600.0
+DEAD_MODEL_COOLDOWN = 24 * 3600.0  # 404: Modell existiert (nicht mehr)
+LATENCY_SMOOTHING = 0.3      # Gewicht der neuesten Messung
+
+
+def is_model_missing(error):
+    text = str(error).lower()
+    return "404" in text or "not found" in text or "not_found" in text
+
+
+class ModelRouter:
+    """Reihenfolge der Modelle nach Gesundheit und Latenz (threadsicher)."""
+
+    def __init__(self, path=None, clock=time.time, persist=True):
+        if persist and not path:
+            path = os.path.join(get_writable_path("cache"), STATE_FILE)
+        self.path = path
+        self.clock = clock
+        self.persist = persist
+        self._lock = threading.Lock()
+        self.models = {}
+        self.last_good = None
+        self._load()
+
+    def _load(self):
+        if not (self.persist and os.path.exists(self.path)):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.models = data.get("models", {})
+            self.last_good = data.get("last_good")
+        except Exception as e:
+            logging.warning(f"Could not read Gemini model state: {e}")
+
+    def _save(self):
+        if not self.persist:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"last_good": self.last_good, "models": self.models}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"Could not write Gemini model state: {e}")
+
+    def _stats(self, model):
+        return self.models.setdefault(model, {"latency": None, "successes": 0, "failures": 0,
+                                              "trips": 0, "open_until": 0.0})
+
+    def is_open(self, model, now=None):
+        """True, solange der Breaker des Modells offen ist (Modell wird übersprungen)."""
+        stats = self.models.get(model)
+        return bool(stats) and stats["open_until"] > (self.clock() if now is None else now)
+
+    def order(self, candidates):
+        """
+        Gesunde Modelle: zuletzt funktionierendes zuerst, dann nach Latenz,
+        unbekannte in Listenreihenfolge. Sind alle offen, wird das am frühesten
+        wieder freie zuerst versucht statt gar keins.
+        """
+        with self._lock:
+            now = self.clock()
+            healthy = [m for m in candidates if not self.is_open(m, now)]
+            if not healthy:
+                return sorted(candidates, key=lambda m: self.models[m]["open_until"])
+
+            def rank(item):
+                index, model = item
+                latency = self.models.get(model, {}).get("latency")
+                return (model != self.last_good, latency is None, latency or 0.0, index)
+
+            return [m for _, m in sorted(enumerate(healthy), key=rank)]
+
+    def record_success(self, model, latency):
+        with self._lock:
+            stats = self._stats(model)
+            prev = stats["latency"]
+            stats["latency"] = latency if prev is None else \
+                (1 - LATENCY_SMOOTHING) * prev + LATENCY_SMOOTHING * latency
+            stats["successes"] += 1
+            stats["failures"] = 0
+            stats["trips"] = 0
+            stats["open_until"] = 0.0
+            self.last_good = model
+            self._save()
+
+    def record_failure(self, model, error=None):
+        with self._lock:
+            stats = self._stats(model)
+            stats["failures"] += 1
+            now = self.clock()
+            if error is not None and is_model_missing(error):
+                cooldown = DEAD_MODEL_COOLDOWN
+            elif stats["failures"] >= FAILURE_THRESHOLD:
+                cooldown = min(MAX_COOLDOWN, BASE_COOLDOWN * 2 ** stats["trips"])
+            else:
+                cooldown = 0.0
+            if cooldown:
+                stats["trips"] += 1
+                stats["open_until"] = now + cooldown
+                logging.warning(f"Gemini: Modell {model} für {cooldown:.0f}s gesperrt ({error})")
+            if self.last_good == model:
+                self.last_good = None
+            self._save()
+
+
+_shared_router = None
+
+
+def shared_router():
+    """Gemeinsamer Router für Mission Builder und Game Companion."""
+    global _shared_router
+    if _shared_router is None:
+        _shared_router = ModelRouter()
+    return _shared_router
+
+
+class GeminiBackend:
+    """
+    Hält den Gemini-Client (einmal pro Sitzung) und führt Anfragen synchron
+    aus: erst Cache, dann die Modelle in Router-Reihenfolge.
+    """
+
+    def __init__(self, api_key, timeout=DEFAULT_TIMEOUT, models=None, cache=None, client=None, router=None):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.cache = cache  # optionaler GeminiCache
+        self.router = router or shared_router()
+        self._client = client
+        self.transport = "client" if client is not None else \
+            {2: "client", 1: "legacy"}.get(GEMINI_VERSION, "rest" if REQUESTS_AVAILABLE else None)
+        self.models = list(models or (LEGACY_MODELS if self.transport == "legacy" else GEMINI_MODELS))
+        self._legacy_models = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return self.transport is not None
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                if self.transport == "client":
+                    # HTTP-Timeout in Millisekunden, damit hängende Worker-Threads enden
+                    self._client = genai.Client(api_key=self.api_key,
+                                                http_options={"timeout": int(self.timeout * 1000)})
+                elif self.transport == "legacy":
+                    genai.configure(api_key=self.api_key)
+                    self._client = genai
+            return self._client
+
+    def _call(self, model_name, prompt, image):
+        """Eine Anfrage an ein bestimmtes Modell über die verfügbare Schnittstelle."""
+        if self.transport == "rest":
+            if image is not None:
+                logging.info("Gemini (REST): Bild wird nicht mitgesendet")
+            response = requests.post(REST_URL.format(model=model_name, key=self.api_key),
+                                     headers={'Content-Type': 'application/json'},
+                                     json={"contents": [{"parts": [{"text": prompt}]}]},
+                                     timeout=self.timeout)
+            if response.status_code != 200:
+                raise RuntimeError(f"{response.status_code} - {response.text}")
+            return response.json()['candidates'][0]['content']['parts'][0]['text']
+
+        client = self._get_client()
+        contents = [prompt, image] if image is not None else [prompt]
+        if self.transport == "legacy":
+            with self._lock:
+                model = self._legacy_models.get(model_name)
+                if model is None:
+                    model = self._legacy_models[model_name] = client.GenerativeModel(model_name)
+            return model.generate_content(contents if image is not None else prompt).text
+        response = client.models.generate_content(model=model_name, contents=contents)
+        if not response:
+            raise RuntimeError(f"No response from {model_name}")
+        return response.text
+
+    def generate(self, prompt, image=None):
+        """Antworttext für prompt (optional mit PIL-Bild). Wirft die letzte Exception, wenn alle Modelle scheitern."""
+        if self.cache is not None:
+            model_name, cached = self.cache.lookup(prompt, self.models, image)
+            if cached is not None:
+                logging.info(f"Gemini: Cache hit ({model_name})")
+                return cached
+        if not self.available:
+            raise RuntimeError("Gemini Bibliothek fehlt.")
+
+        last_err = None
+        for model_name in self.router.order(self.models):
+            start = time.perf_counter()
+            try:
+                logging.info(f"Gemini ({self.transport}): Trying model {model_name}")
+                text = self._call(model_name, prompt, image)
+            except Exception as e:
+                logging.warning(f"Gemini: Failed with {model_name}: {e}")
+                self.router.record_failure(model_name, e)
+                last_err = e
+                continue
+            self.router.record_success(model_name, time.perf_counter() - start)
+            logging.info(f"Gemini: Success with {model_name}")
+            if self.cache is not None:
+                self.cache.put(prompt, model_name, text, image)
+            return text
+        raise last_err or RuntimeError("No response from Gemini")
@@ -1,29 +1,59 @@
 import json
 import os
+import sys
 import logging
+import pickle
+import hashlib
+import weakref
 
 try:
     # Try package imports (when running from MainMenu)
     from utilities.LegionRules import LegionRules
-    from utilities.LegionUtils import get_data_path
+    from utilities.LegionUtils import get_data_path, get_writable_path
 except ImportError:
     try:
         # Try relative imports (when imported as package sibling)
         from .LegionRules import LegionRules
-        from .LegionUtils import get_data_path
+        from .LegionUtils import get_data_path, get_writable_path
     except ImportError:
         # Fallback to absolute imports (when running as standalone script in utilities/)
         from LegionRules import LegionRules
-        from LegionUtils import get_data_path
+        from LegionUtils import get_data_path, get_writable_path
+
+# Bump when the normalized unit/upgrade layout changes, so old caches are discarded.
+CACHE_VERSION = 4
+CACHE_FILE = "catalog_cache.pkl"
+SOURCE_FILES = [
+    "db/catalog.json",
+    "db/custom_units.json",
+    "db/custom_command_cards.json",
+    "db/custom_upgrades.json",
+    "db/custom_battle_cards.json",
+]
+
+DARK_SIDE_FACTIONS = {"Galaktisches Imperium", "Separatistenallianz", "Schattenkollektiv"}
+LIGHT_SIDE_FACTIONS = {"Rebellenallianz", "Galaktische Republik"}
 
 class LegionDatabase:
-    def __init__(self):
+    # Process-wide instance shared by all windows (see shared()/invalidate_shared())
+    _shared_instance = None
+    _reload_listeners = []
+
+    def __init__(self, use_cache=True):
         logging.info("Initializing LegionDatabase...")
+        self.use_cache = use_cache
         self.rules = LegionRules
         self.units = {}
         self.upgrades = []
         self.command_cards = []
         self.battle_cards = []
+        self.unit_index = {}
+        self.unit_id_index = {}
+        self.upgrade_index = {}
+        self.upgrade_id_index = {}
+        self.command_card_index = {}
+        self.upgrades_by_type = {}
+        self.upgrade_eligibility = {}
 
         # --- TRANSLATION MAP (Generated from previous data) ---
         self.translations = {
@@ -169,12 +199,241 @@ class LegionDatabase:
         ]
         """
 
-        self.load_catalog()
-        self.load_legacy()
-        self.load_custom_units()
-        self.load_custom_command_cards()
-        self.load_custom_upgrades()
-        self.load_custom_battle_cards()
+        self.load_all()
+
+    @classmethod
+    def shared(cls):
+        """Returns the process-wide database, building it on first use."""
+        if cls._shared_instance is None:
+            cls._shared_instance = cls()
+        return cls._shared_instance
+
+    @classmethod
+    def invalidate_shared(cls):
+        """
+        Reloads the shared database in place after custom data was saved,
+        so every open window sees the change. Registered listeners are
+        notified afterwards. Does nothing if no window has built it yet.
+        """
+        if cls._shared_instance is None:
+            return
+
+        cls._shared_instance.reload()
+        cls.notify_reload_listeners()
+
+    @classmethod
+    def shared_upgrade_added(cls, upgrade):
+        """
+        Adds a newly created custom upgrade to the shared database without
+        reloading every source. Edits and deletions use invalidate_shared().
+        """
+        if cls._shared_instance is None:
+            return
+
+        cls._shared_instance.add_upgrade(dict(upgrade))
+        cls.notify_reload_listeners()
+
+    @classmethod
+    def notify_reload_listeners(cls):
+        """Calls all live reload listeners and drops collected ones."""
+        alive = []
+        for ref in cls._reload_listeners:
+            callback = ref()
+            if callback is None:
+                continue
+            alive.append(ref)
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"Error in database reload listener: {e}", exc_info=True)
+        cls._reload_listeners = alive
+
+    @classmethod
+    def add_reload_listener(cls, callback):
+        """Registers a callback for invalidate_shared(). Bound methods are held weakly."""
+        if hasattr(callback, "__self__"):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = weakref.ref(callback)
+        cls._reload_listeners.append(ref)
+
+    def reload(self):
+        """Discards all loaded data and reads every source again."""
+        logging.info("Reloading LegionDatabase...")
+        self.units = {}
+        self.upgrades = []
+        self.command_cards = []
+        self.battle_cards = []
+        self.load_all()
+
+    def load_all(self):
+        """Loads all data, from the compiled cache if it is still valid."""
+        if not (self.use_cache and self.load_cache()):
+            self.load_catalog()
+            self.load_legacy()
+            self.load_custom_units()
+            self.load_custom_command_cards()
+            self.load_custom_upgrades()
+            self.load_custom_battle_cards()
+            self.build_keyword_maps()
+
+            if self.use_cache:
+                self.save_cache()
+
+        self.build_indexes()
+
+    def build_keyword_maps(self):
+        """
+        Parses unit "info" strings and weapon keyword lists once into
+        "keyword_map" dicts (canonical English name -> int value), so the
+        attack logic does not need to split strings on every roll.
+        """
+        for units in self.units.values():
+            for u in units:
+                u["keyword_map"] = self.rules.parse_keyword_list(u.get("info", ""))
+                for w in u.get("weapons", []):
+                    w["keyword_map"] = self.rules.parse_keyword_list(w.get("keywords", []))
+
+    def build_indexes(self):
+        """
+        Builds hash indexes over the loaded data: units by (faction, name)
+        and (faction, id), upgrades by slot type with their restriction sets.
+        Must be rebuilt (reload()) whenever units/upgrades are replaced.
+        """
+        self.unit_index = {}
+        self.unit_id_index = {}
+        for faction, units in self.units.items():
+            by_name = self.unit_index.setdefault(faction, {})
+            by_id = self.unit_id_index.setdefault(faction, {})
+            for u in units:
+                # First entry wins, same as the former linear scans
+                by_name.setdefault(u.get("name"), u)
+                if u.get("id"):
+                    by_id.setdefault(u["id"], u)
+
+        self.upgrade_index = {}
+        self.upgrade_id_index = {}
+        for upg in self.upgrades:
+            self.index_upgrade(upg)
+
+        # Kommandokarten per ID und Name (eigene Karten haben oft keine ID)
+        self.command_card_index = {}
+        for card in self.command_cards:
+            for key in (card.get("id"), card.get("name")):
+                if key:
+                    self.command_card_index.setdefault(key, card)
+
+        self.upgrades_by_type = {}
+        for upg in self.upgrades:
+            restrictions = upg.get("restricted_to")
+            restriction_set = frozenset(restrictions) if restrictions else None
+            self.upgrades_by_type.setdefault(str(upg.get("type")), []).append((upg, restriction_set))
+
+        self.build_upgrade_eligibility()
+
+    def get_unit(self, faction_name, unit_name):
+        """Returns the unit dict for faction/name or None."""
+        return self.unit_index.get(faction_name, {}).get(unit_name)
+
+    def get_unit_by_id(self, unit_id, faction_name=None):
+        """Returns the unit dict for an id, optionally limited to one faction."""
+        if faction_name is not None:
+            return self.unit_id_index.get(faction_name, {}).get(unit_id)
+        for by_id in self.unit_id_index.values():
+            if unit_id in by_id:
+                return by_id[unit_id]
+        return None
+
+    def index_upgrade(self, upgrade):
+        """Upgrade in die Namens- und ID-Indizes aufnehmen (erster Eintrag gewinnt)."""
+        self.upgrade_index.setdefault(upgrade.get("name"), upgrade)
+        if upgrade.get("id"):
+            self.upgrade_id_index.setdefault(upgrade["id"], upgrade)
+
+    def get_upgrade(self, name):
+        """Returns the upgrade dict for a name or None."""
+        return self.upgrade_index.get(name)
+
+    def get_upgrade_by_id(self, upgrade_id):
+        """Returns the upgrade dict for an id or None."""
+        return self.upgrade_id_index.get(upgrade_id)
+
+    def get_command_card(self, key):
+        """Returns the command card for an id or name or None."""
+        return self.command_card_index.get(key)
+
+    def get_cache_path(self):
+        """Returns the path of the compiled catalog cache (writable location)."""
+        return os.path.join(get_writable_path("cache"), CACHE_FILE)
+
+    def get_cache_fingerprint(self):
+        """
+        Builds a key over every input of the normalized database:
+        source files (mtime + size), the embedded legacy data and the
+        code that translates it (LegionData/LegionRules).
+        """
+        sources = []
+        rules_file = getattr(sys.modules.get(self.rules.__module__), "__file__", None)
+        module_files = [__file__, rules_file]
+
+        for path in [get_data_path(f) for f in SOURCE_FILES] + module_files:
+            if not path:
+                continue
+            try:
+                st = os.stat(path)
+                sources.append((os.path.basename(path), st.st_mtime_ns, st.st_size))
+            except OSError:
+                sources.append((os.path.basename(path), None, None))
+
+        legacy_hash = hashlib.sha1((self.legacy_units_json + self.legacy_upgrades_json).encode("utf-8")).hexdigest()
+        return (CACHE_VERSION, tuple(sources), legacy_hash)
+
+    def load_cache(self):
+        """
+        Loads units, upgrades and cards from the compiled cache.
+        Returns True on a valid hit, False if the cache is missing or stale.
+        """
+        cache_path = self.get_cache_path()
+        if not os.path.exists(cache_path):
+            return False
+
+        try:
+            with open(cache_path, "rb") as f:
+                data = pickle.load(f)
+
+            if data.get("fingerprint") != self.get_cache_fingerprint():
+                logging.info("Catalog cache is stale, rebuilding...")
+                return False
+
+            self.units = data["units"]
+            self.upgrades = data["upgrades"]
+            self.command_cards = data["command_cards"]
+            self.battle_cards = data["battle_cards"]
+            logging.info(f"Loaded LegionDatabase from cache {cache_path}.")
+            return True
+
+        except Exception as e:
+            logging.warning(f"Could not read catalog cache, rebuilding: {e}")
+            return False
+
+    def save_cache(self):
+        """Writes the normalized database to the compiled cache (atomic replace)."""
+        cache_path = self.get_cache_path()
+        data = {
+            "fingerprint": self.get_cache_fingerprint(),
+            "units": self.units,
+            "upgrades": self.upgrades,
+            "command_cards": self.command_cards,
+            "battle_cards": self.battle_cards,
+        }
+        tmp_path = cache_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+            logging.info(f"Catalog cache written to {cache_path}.")
+        except Exception as e:
+            logging.warning(f"Could not write catalog cache: {e}")
 
     def load_custom_battle_cards(self):
         """Loads custom battle cards from custom_battle_cards.json."""
@@ -405,6 +664,7 @@ class LegionDatabase:
                     "defense": u.get("defense", "White").title(),
                     "surge": {"attack": surge_atk, "defense": surge_def},
                     "weapons": weapons,
+                    "unique": u.get("is_unique", False),
                     "id": uid # Store ID for internal use
                 }
 
@@ -464,6 +724,7 @@ class LegionDatabase:
                     "points": upg.get("points", 0),
                     "restricted_to": restrictions,
                     "adds_mini": adds_mini,
+                    "unique": upg.get("is_unique", False),
                     "id": uid,
                     "text": upg.get("text", ""),  # WICHTIG: Text-Feld hinzufügen
                     "keywords": upg.get("keywords", []),
@@ -521,43 +782,65 @@ class LegionDatabase:
         except Exception as e:
              print(f"Error loading legacy upgrades: {e}")
 
+    @staticmethod
+    def is_upgrade_allowed(restrictions, unit_name, faction_name):
+        """Prüft eine Beschränkungsmenge (None = keine) gegen Einheit und Fraktion."""
+        if restrictions is None:
+            # Keine Beschränkung -> Erlaubt
+            return True
+        # Ist der Einheiten-Name ODER Fraktions-Name in der Liste?
+        if unit_name in restrictions or faction_name in restrictions:
+            return True
+        # Fraktionsübergreifende Logik (Dunkle/Helle Seite)
+        if faction_name in DARK_SIDE_FACTIONS and "Dunkle Seite" in restrictions:
+            return True
+        if faction_name in LIGHT_SIDE_FACTIONS and "Helle Seite" in restrictions:
+            return True
+        return False
+
     def get_valid_upgrades(self, slot_type, unit_name, faction_name):
         """
         Filtert Upgrades basierend auf Slot, Fraktion und Einheitenbeschränkung.
+        Bekannte Einheiten werden aus der vorberechneten Tabelle bedient.
         """
-        valid = []
-        for upg in self.upgrades:
-            # 1. Passt der Typ?
-            # Safe comparison
-            if str(upg.get("type")) != str(slot_type):
-                continue
-
-            # 2. Prüfe Beschränkungen (Restrictions)
-            restrictions = upg.get("restricted_to")
-
-            if restrictions is None or len(restrictions) == 0:
-                # Keine Beschränkung -> Erlaubt
-                valid.append(upg)
-            else:
-                # Ist der Einheiten-Name ODER Fraktions-Name in der Liste?
-                # restrictions might be a list of strings
-
-                # Normalize logic
-                if unit_name in restrictions or faction_name in restrictions:
-                    valid.append(upg)
-
-                # Fraktionsübergreifende Logik (Dunkle/Helle Seite) - Catalog has "force_alignment"
-                # Legacy logic:
-                elif faction_name in ["Galaktisches Imperium", "Separatistenallianz", "Schattenkollektiv"] and "Dunkle Seite" in restrictions:
-                    valid.append(upg)
-                elif faction_name in ["Rebellenallianz", "Galaktische Republik"] and "Helle Seite" in restrictions:
-                    valid.append(upg)
-
-                # Catalog logic using IDs/Factions needs to map here if we rely on names.
-                # Since we mapped restrictions to Names in load_catalog, this check should work
-                # IF the unit_name passed here matches what we stored in restrictions.
-
-        return valid
+        slot_table = self.upgrade_eligibility.get(faction_name, {}).get(unit_name)
+        if slot_table is not None and str(slot_type) in slot_table:
+            return list(slot_table[str(slot_type)])
+
+        return [upg for upg, restrictions in self.upgrades_by_type.get(str(slot_type), [])
+                if self.is_upgrade_allowed(restrictions, unit_name, faction_name)]
+
+    def build_upgrade_eligibility(self):
+        """Berechnet für jede Einheit und jeden ihrer Slots die erlaubten Upgrades."""
+        self.upgrade_eligibility = {}
+        for faction, units in self.units.items():
+            faction_table = self.upgrade_eligibility.setdefault(faction, {})
+            for u in units:
+                if u.get("name") in faction_table:
+                    continue
+                slot_table = faction_table[u.get("name")] = {}
+                for slot in u.get("slots", []):
+                    slot_table[str(slot)] = [
+                        upg for upg, restrictions in self.upgrades_by_type.get(str(slot), [])
+                        if self.is_upgrade_allowed(restrictions, u.get("name"), faction)
+                    ]
+
+    def add_upgrade(self, upgrade):
+        """
+        Fügt ein Upgrade hinzu und aktualisiert Slot-Index und
+        Berechtigungstabelle inkrementell (ohne kompletten Reload).
+        """
+        self.upgrades.append(upgrade)
+        self.index_upgrade(upgrade)
+        restrictions = upgrade.get("restricted_to")
+        restriction_set = frozenset(restrictions) if restrictions else None
+        slot = str(upgrade.get("type"))
+        self.upgrades_by_type.setdefault(slot, []).append((upgrade, restriction_set))
+
+        for faction, faction_table in self.upgrade_eligibility.items():
+            for unit_name, slot_table in faction_table.items():
+                if slot in slot_table and self.is_upgrade_allowed(restriction_set, unit_name, faction):
+                    slot_table[slot].append(upgrade)
 
     def get_command_cards(self, faction_name):
         """Returns command cards for the given faction (and neutral ones)."""
@@ -1,3 +1,6 @@
+import re
+from functools import lru_cache
+
 class LegionRules:
     """
     Zentrale Datenbank für Star Wars: Legion Regeln.
@@ -122,6 +125,24 @@ class LegionRules:
 
     KEYWORDS = {
         # --- UNIT KEYWORDS ---
+        "Armor": {
+            "name": "Armor X",
+            "german": "Panzerung",
+            "timing": "defense_modify",
+            "effect": "Hebe bis zu X Treffer auf (ohne X: alle Treffer). Wucht wandelt Treffer in Crits um."
+        },
+        "Agile": {
+            "name": "Agile X",
+            "german": "Agil",
+            "timing": "after_move",
+            "effect": "Nach Standardbewegung: Erhalte X Dodge Marker."
+        },
+        "Unhindered": {
+            "name": "Unhindered",
+            "german": "Ungehindert",
+            "timing": "movement",
+            "effect": "Schwieriges Gelände reduziert die Geschwindigkeit nicht."
+        },
         "Jump": {
             "name": "Springen X",
             "german": "Springen",
@@ -274,24 +295,86 @@ class LegionRules:
         # White Def: 1 Block, 1 Surge, 4 Blank (Total 6)
     }
 
+    # Lookup-Index (lowercase Name -> englischer Schlüssel), siehe get_keyword_index()
+    _keyword_index = None
+
+    @staticmethod
+    def get_keyword_index():
+        """
+        Baut einmalig einen Index über englische Schlüssel, deutsche Namen und
+        Anzeigenamen ohne Parameter ("Pierce X" -> "pierce").
+        """
+        if LegionRules._keyword_index is None:
+            index = {}
+            for key, kw in LegionRules.KEYWORDS.items():
+                for alias in (key, kw.get("german"), kw.get("name")):
+                    if not alias:
+                        continue
+                    alias = alias.lower()
+                    # "Immune: Pierce" erscheint im Katalog auch als "Immune Pierce"
+                    for variant in (alias, alias.replace(":", "")):
+                        index.setdefault(variant, key)
+                        if variant.endswith(" x"):
+                            index.setdefault(variant[:-2], key)
+            LegionRules._keyword_index = index
+        return LegionRules._keyword_index
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def parse_keyword(text):
+        """
+        Zerlegt ein Schlüsselwort wie "Pierce 1" oder "Durchschlagen 1" in
+        (kanonischer englischer Name, Wert). Wert ist None ohne Zahl.
+        Unbekannte Schlüsselwörter behalten ihren Namen ohne Wert.
+        """
+        text = (text or "").strip()
+        match = re.match(r"^(.*?)\s+(\d+|X)$", text)
+        if match:
+            base, raw_value = match.group(1), match.group(2)
+            value = int(raw_value) if raw_value.isdigit() else None
+        else:
+            base, value = text, None
+
+        index = LegionRules.get_keyword_index()
+        canonical = index.get(base.lower()) or index.get(text.lower())
+        if canonical is None:
+            # Alte Logik: erstes Wort ("Charge (Melee)" -> "Charge")
+            canonical = index.get(base.split(" ")[0].lower())
+        return (canonical or base, value)
+
+    @staticmethod
+    def parse_keyword_list(keywords):
+        """
+        Wandelt eine Keyword-Liste (oder einen kommagetrennten "info"-String)
+        in ein Dict {kanonischer englischer Name: Wert} um.
+        Keywords ohne Zahl zählen als 1; "X"-Keywords ohne Zahl (z.B. "Panzerung"
+        = alle Treffer) als 0, damit sie von "Panzerung 1" unterscheidbar bleiben.
+        Mehrfache Einträge werden addiert.
+        """
+        if isinstance(keywords, str):
+            keywords = keywords.split(",")
+
+        kw_map = {}
+        for kw in keywords or []:
+            kw = kw.strip()
+            if not kw:
+                continue
+            name, value = LegionRules.parse_keyword(kw)
+            if value is None:
+                rule = LegionRules.KEYWORDS.get(name)
+                value = 0 if rule and rule["name"].endswith(" X") else 1
+            kw_map[name] = kw_map.get(name, 0) + value
+        return kw_map
+
     # Helper method to get keyword def
     @staticmethod
     def get_keyword(name):
-        # Versuche exakten Match oder "Name X"
+        # Versuche exakten Match oder "Name X" (englisch oder deutsch) über den Index
         if name in LegionRules.KEYWORDS:
             return LegionRules.KEYWORDS[name]
 
-        # Split "Pierce 1" -> "Pierce"
-        base = name.split(" ")[0]
-        if base in LegionRules.KEYWORDS:
-            return LegionRules.KEYWORDS[base]
-
-        # Check German names
-        for k, v in LegionRules.KEYWORDS.items():
-            if v.get("german") == base or v.get("german") == name:
-                return v
-
-        return None
+        canonical, _ = LegionRules.parse_keyword(name)
+        return LegionRules.KEYWORDS.get(canonical)
 
     @staticmethod
     def get_dice_distribution(color, type_):
@@ -0,0 +1,238 @@
+"""
+Strukturierte, wiederabspielbare Match-Ereignisse (JSON Lines).
+
+Jedes Ereignis hat einen Typ (command_card, order_drawn, attack, panic, ...),
+frei wählbare Daten (Würfelergebnisse, Seeds) und ein Delta der geänderten
+Spielzustands-Felder. Das erste Ereignis einer Partie enthält einen
+vollständigen Snapshot. Replay baut daraus den Zustand an jedem beliebigen
+Ereignis-Index wieder auf, ohne neu zu würfeln (mit Keyframes für schnellen
+Sprung). analyze_matches wertet viele Log-Dateien parallel aus.
+
+Aufruf (Auswertung):
+    python utilities/MatchEvents.py log/*.jsonl
+"""
+import argparse
+import copy
+import datetime
+import glob
+import gzip
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+EVENT_VERSION = 1
+KEYFRAME_INTERVAL = 50
+
+# Verfolgte Felder (alles, was Regel-Engine und Dialoge während der Partie ändern)
+STATE_FIELDS = ("round_number", "current_phase", "priority_player", "active_turn_player",
+                "player_score", "opponent_score")
+UNIT_FIELDS = ("minis", "current_hp", "suppression", "aim", "dodge", "standby", "order_token",
+               "activated", "panic_state", "cover_status")
+SIDE_PREFIX = {"Player": "P", "Opponent": "O"}
+
+
+def assign_unit_ids(state):
+    """Stabile IDs (P1, O3, ...) - Einheiten werden bei Vernichtung aus der Armee entfernt."""
+    for side, prefix in SIDE_PREFIX.items():
+        for i, unit in enumerate(state.units(side), 1):
+            unit.setdefault("uid", f"{prefix}{i}")
+
+
+def unit_ref(unit):
+    """Kurzer Verweis auf eine Einheit in den Ereignisdaten."""
+    if not unit:
+        return None
+    return {"uid": unit.get("uid"), "name": unit.get("name")}
+
+
+def attack_data(side, attacker, target, weapons, result, **extra):
+    """Ereignisdaten eines Angriffs inkl. Würfelergebnissen (AttackResult der RulesEngine)."""
+    data = {"side": side, "attacker": unit_ref(attacker), "target": unit_ref(target),
+            "weapons": [w.get("name") for w in weapons], "pool": result.pool, "results": result.results,
+            "total_hits": result.total_hits, "defense": result.defense,
+            "wounds": result.wounds, "suppression": result.suppression}
+    data.update(extra)
+    return data
+
+
+def snapshot(state):
+    """Kompakter Zustand: Spiel-Felder plus die verfolgten Felder jeder lebenden Einheit."""
+    units = {}
+    for side in SIDE_PREFIX:
+        for unit in state.units(side):
+            if "uid" in unit:
+                entry = {"side": side, "name": unit.get("name")}
+                entry.update({f: unit[f] for f in UNIT_FIELDS if f in unit})
+                units[unit["uid"]] = entry
+    return {"state": {f: getattr(state, f) for f in STATE_FIELDS}, "units": units}
+
+
+def diff(old, new):
+    """Delta zwischen zwei Snapshots (None, wenn sich nichts geändert hat)."""
+    delta = {}
+    state = {k: v for k, v in new["state"].items() if old["state"].get(k) != v}
+    if state:
+        delta["state"] = state
+    units = {}
+    for uid, entry in new["units"].items():
+        before = old["units"].get(uid)
+        if before is None:
+            changed = entry
+        else:
+            changed = {k: v for k, v in entry.items() if before.get(k) != v}
+            changed.update({k: None for k in before if k not in entry})  # Feld entfernt
+        if changed:
+            units[uid] = changed
+    if units:
+        delta["units"] = units
+    removed = [uid for uid in old["units"] if uid not in new["units"]]
+    if removed:
+        delta["removed"] = removed
+    return delta or None
+
+
+def apply_delta(snap, delta):
+    """Delta auf einen Snapshot anwenden (in place)."""
+    if not delta:
+        return snap
+    snap["state"].update(delta.get("state", {}))
+    for uid, changed in delta.get("units", {}).items():
+        snap["units"].setdefault(uid, {}).update(changed)
+    for uid in delta.get("removed", []):
+        snap["units"].pop(uid, None)
+    return snap
+
+
+class EventRecorder:
+    """Erzeugt typisierte Ereignisse mit Zustands-Delta für einen GameState."""
+
+    def __init__(self, state):
+        self.state = state
+        self.seq = 0
+        self._last = None
+
+    def record(self, kind, message, data=None):
+        snap = snapshot(self.state)
+        event = {"v": EVENT_VERSION, "seq": self.seq,
+                 "time": datetime.datetime.now().strftime("%H:%M:%S"),
+                 "type": kind, "message": message, "data": data or {}}
+        if self._last is None:
+            event["snapshot"] = copy.deepcopy(snap)
+        else:
+            delta = diff(self._last, snap)
+            if delta:
+                event["delta"] = delta
+        self._last = snap
+        self.seq += 1
+        return event
+
+
+def open_events(path, mode="rt"):
+    """JSONL-Datei öffnen, .gz wird transparent (de)komprimiert."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode.replace("t", ""), encoding="utf-8")
+
+
+def read_events(path):
+    with open_events(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class Replay:
+    """Spielzustand an jedem Ereignis-Index (ohne neu zu würfeln)."""
+
+    def __init__(self, events, keyframe_interval=KEYFRAME_INTERVAL):
+        self.events = events
+        self.keyframe_interval = keyframe_interval
+        start = next((i for i, e in enumerate(events) if "snapshot" in e), None)
+        if start is None:
+            raise ValueError("Kein Snapshot im Ereignis-Log (Partie nicht gestartet?)")
+        self.start = start
+        # Keyframes: vollständiger Zustand alle keyframe_interval Ereignisse
+        self._keyframes = {}
+        snap = copy.deepcopy(events[start]["snapshot"])
+        for i in range(start, len(events)):
+            if i > start:
+                apply_delta(snap, events[i].get("delta"))
+            if (i - start) % keyframe_interval == 0:
+                self._keyframes[i] = copy.deepcopy(snap)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(read_events(path), **kwargs)
+
+    def __len__(self):
+        return len(self.events)
+
+    def state_at(self, index):
+        """Snapshot nach Ereignis index ({"state": ..., "units": ...})."""
+        if index < 0:
+            index += len(self.events)
+        if not self.start <= index < len(self.events):
+            raise IndexError(f"Ereignis {index} liegt außerhalb der Partie")
+        base = self.start + (index - self.start) // self.keyframe_interval * self.keyframe_interval
+        snap = copy.deepcopy(self._keyframes[base])
+        for i in range(base + 1, index + 1):
+            apply_delta(snap, self.events[i].get("delta"))
+        return snap
+
+    def find(self, kind):
+        """Indizes aller Ereignisse eines Typs."""
+        return [i for i, e in enumerate(self.events) if e.get("type") == kind]
+
+
+def summarize_match(path):
+    """Kennzahlen einer Partie aus ihrer Ereignis-Datei."""
+    events = read_events(path)
+    summary = {"file": os.path.basename(path), "events": len(events), "attacks": 0,
+               "wounds": {"Player": 0, "Opponent": 0}, "panics": 0, "rounds": 0,
+               "player_score": 0, "opponent_score": 0}
+    for e in events:
+        data = e.get("data", {})
+        if e.get("type") in ("attack", "melee"):
+            summary["attacks"] += 1
+            side = data.get("side")
+            if side in summary["wounds"]:
+                summary["wounds"][side] += data.get("wounds", 0)
+        elif e.get("type") == "panic" and data.get("state"):
+            summary["panics"] += 1
+    if any("snapshot" in e for e in events):
+        final = Replay(events).state_at(-1)["state"]
+        summary.update(rounds=final["round_number"], player_score=final["player_score"],
+                       opponent_score=final["opponent_score"])
+    return summary
+
+
+def analyze_matches(paths, workers=None):
+    """Viele Partien parallel auswerten. workers=1 läuft im aktuellen Prozess."""
+    if workers == 1:
+        return [summarize_match(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(summarize_match, paths, chunksize=8))
+
+
+def format_report(summaries):
+    lines = [f"{'Partie':<36} {'Runde':>5} {'Punkte P:O':>11} {'Angriffe':>8} {'Wunden P:O':>11} {'Panik':>5}"]
+    for s in summaries:
+        lines.append(f"{s['file'][:36]:<36} {s['rounds']:>5} {s['player_score']:>5}:{s['opponent_score']:<5} "
+                     f"{s['attacks']:>8} {s['wounds']['Player']:>5}:{s['wounds']['Opponent']:<5} {s['panics']:>5}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match-Ereignisse (JSONL) auswerten")
+    parser.add_argument("files", nargs="*", help="Ereignis-Dateien (Standard: log/*.jsonl*)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Prozesse (Standard: alle Kerne)")
+    args = parser.parse_args(argv)
+
+    paths = args.files or sorted(glob.glob(os.path.join("log", "*.jsonl*")))
+    if not paths:
+        parser.error("Keine Ereignis-Dateien gefunden.")
+    print(format_report(analyze_matches(paths, args.workers)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Match-Log des Game Companion mit gepuffertem Hintergrund-Schreiber.
+
+MatchLog hält die strukturierte Ereignisliste der Partie an einer Stelle.
+Neben der Text-Datei entsteht optional eine JSONL-Datei mit typisierten
+Ereignissen und Zustands-Deltas (siehe MatchEvents, auch gzip-komprimiert).
+Die Zeilen für die Log-Dateien gehen über eine Queue an einen Worker-Thread,
+der sie gebündelt schreibt und regelmäßig per fsync sichert. flush() wird
+bei Phasenwechsel und beim Schließen des Fensters aufgerufen; der Tk-Thread
+macht dadurch während der Aktivierungsphase keine Datei-I/O mehr.
+"""
+import datetime
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+try:
+    from .MatchEvents import EventRecorder
+except ImportError:
+    try:
+        from utilities.MatchEvents import EventRecorder
+    except ImportError:
+        from MatchEvents import EventRecorder
+
+FLUSH_INTERVAL = 1.0   # Sekunden, nach denen gesammelte Zeilen spätestens geschrieben werden
+FSYNC_INTERVAL = 5.0   # Sekunden zwischen zwei fsync-Aufrufen
+BATCH_SIZE = 64
+
+
+class _Flush:
+    """Marker in der Queue: alles davor schreiben, fsync, dann done setzen."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class LogWriter:
+    """
+    Schreibt Zeilen gebündelt in eine Datei (eigener Thread, Datei bleibt offen).
+    serialize wandelt Objekte erst im Worker in Zeilen um; *.gz wird komprimiert.
+    """
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL, fsync_interval=FSYNC_INTERVAL,
+                 batch_size=BATCH_SIZE, mode="a", serialize=None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.serialize = serialize
+        if path.endswith(".gz"):
+            self._file = gzip.open(path, mode + "t", encoding="utf-8")
+        else:
+            self._file = open(path, mode, encoding="utf-8")
+        self._queue = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name="match-log", daemon=True)
+        self._thread.start()
+
+    def write(self, line):
+        if not self._closed:
+            self._queue.put(line)
+
+    def flush(self, wait=True, timeout=5.0):
+        """Gepufferte Zeilen schreiben und fsync. wait=False blockiert den Aufrufer nicht."""
+        if self._closed:
+            return
+        marker = _Flush()
+        self._queue.put(marker)
+        if wait:
+            marker.done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        if self._closed:
+            return
+        self._queue.put(None)  # Worker schreibt den Rest, fsync und schließt die Datei
+        self._closed = True
+        self._thread.join(timeout)
+
+    def _run(self):
+        last_sync = time.monotonic()
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            lines, markers = [], []
+            # Alles Anstehende in einem Rutsch einsammeln
+            while True:
+                if item is None:
+                    running = False
+                elif isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    lines.append(item)
+                if len(lines) >= self.batch_size or not running:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if lines:
+                    if self.serialize:
+                        lines = [self.serialize(line) for line in lines]
+                    self._file.write("".join(line + "\n" for line in lines))
+                    self.batches += 1
+                self._file.flush()
+                if markers or not running or time.monotonic() - last_sync >= self.fsync_interval:
+                    os.fsync(self._file.fileno())
+                    last_sync = time.monotonic()
+            except Exception as e:
+                logging.error(f"Failed to append to log file: {e}")
+            for marker in markers:
+                marker.done.set()
+        self._file.close()
+
+
+class MatchLog:
+    """Ereignisliste der Partie plus optionale LogWriter für Text- und Ereignis-Datei."""
+
+    def __init__(self):
+        self.events = []
+        self.writer = None
+        self.event_writer = None
+        self.recorder = None
+
+    @property
+    def path(self):
+        return self.writer.path if self.writer else None
+
+    @property
+    def events_path(self):
+        return self.event_writer.path if self.event_writer else None
+
+    def start(self, path, header_lines=(), events_path=None, state=None):
+        """
+        Neue Log-Datei beginnen (Kopfzeilen werden ebenfalls im Hintergrund geschrieben).
+        Mit events_path und state werden zusätzlich typisierte Ereignisse mit Deltas geschrieben.
+        """
+        self.close()
+        self.writer = LogWriter(path, mode="w")
+        for line in header_lines:
+            self.writer.write(line)
+        if events_path and state is not None:
+            self.recorder = EventRecorder(state)
+            self.event_writer = LogWriter(events_path, mode="w", serialize=self._to_json)
+
+    @staticmethod
+    def _to_json(event):
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+    def log(self, message, kind="note", data=None):
+        if self.recorder:
+            event = self.recorder.record(kind, message, data)
+        else:
+            event = {"time": datetime.datetime.now().strftime("%H:%M:%S"), "type": kind,
+                     "message": message, "data": data or {}}
+        self.events.append(event)
+        logging.debug(f"MATCH_EVENT: {message}")
+        if self.writer:
+            self.writer.write(self.format(event))
+        if self.event_writer:
+            self.event_writer.write(event)
+        return event
+
+    @staticmethod
+    def format(event):
+        return f"[{event['time']}] {event['message']}"
+
+    @property
+    def entries(self):
+        """Formatierte Zeilen aller Ereignisse (wie in der Log-Datei)."""
+        return [self.format(e) for e in self.events]
+
+    def flush(self, wait=False):
+        for writer in (self.writer, self.event_writer):
+            if writer:
+                writer.flush(wait=wait)
+
+    def close(self):
+        for writer in (self.writer, self.event_writer):
+            if writer:
+                writer.close()
+        self.writer = self.event_writer = self.recorder = None
@@ -0,0 +1,417 @@
+"""
+Monte-Carlo-Simulator für Einheiten-Duelle (ohne GUI).
+
+Zwei Einheiten (oder alle Einheiten zweier gespeicherter Armeen) beschießen
+sich abwechselnd nach den Kampfregeln des Game Companion: Niederhalten
+reduziert den Pool, Sammeln zu Beginn der Aktivierung, Panik verhindert den
+Angriff, Zielen, Kritisch/Wucht/Durchschlagen, Deckung und Niederhalten.
+Ausgegeben werden Wunden pro Punkt, Time-to-Kill und die Verteilung des
+Niederhaltens. Die Simulationen laufen in Blöcken auf einem Prozess-Pool.
+
+Aufruf (Beispiele):
+    python utilities/MatchupSimulator.py "Galaktisches Imperium:Stormtroopers" "Rebellenallianz:Rebel Troopers"
+    python utilities/MatchupSimulator.py Armeen/Imperium/liste.json Armeen/Rebellen/liste.json -n 1000000
+    python utilities/MatchupSimulator.py "Galaktisches Imperium" "Rebellenallianz" --csv sweep.csv
+"""
+import argparse
+import csv
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Import dependencies with compatibility for both script and package modes
+try:
+    from .LegionData import LegionDatabase
+    from .DiceEngine import DiceEngine
+    from .AttackCalculator import calculate_attack
+    from .ArmyFormat import load_army_file
+    from .GameEngine import courage_value
+except ImportError:
+    try:
+        from utilities.LegionData import LegionDatabase
+        from utilities.DiceEngine import DiceEngine
+        from utilities.AttackCalculator import calculate_attack
+        from utilities.ArmyFormat import load_army_file
+        from utilities.GameEngine import courage_value
+    except ImportError:
+        from LegionData import LegionDatabase
+        from DiceEngine import DiceEngine
+        from AttackCalculator import calculate_attack
+        from ArmyFormat import load_army_file
+        from GameEngine import courage_value
+
+DEFAULT_SAMPLES = 100_000
+DEFAULT_ROUNDS = 6
+CHUNK_SIZE = 50_000
+
+
+def select_weapons(unit, melee=False):
+    """Fernkampfwaffen (Reichweite > 1) bzw. Nahkampfwaffen (Reichweite 0)."""
+    if melee:
+        return [w for w in unit.get("weapons", []) if w["range"][0] == 0]
+    return [w for w in unit.get("weapons", []) if w["range"][1] > 1]
+
+
+def prepare_combatant(unit, defender, melee=False, aims=0, cover=0):
+    """
+    Reduziert eine Einheit auf die Werte, die der Simulator braucht (picklebar).
+    Als Waffe wird das Profil mit den meisten erwarteten Wunden gegen defender gewählt.
+    """
+    minis = unit.get("minis", 1)
+    target_kw = defender.get("keyword_map", {})
+    best, best_outcome = None, None
+    for weapon in select_weapons(unit, melee):
+        kw_map = dict(unit.get("keyword_map", {}))
+        for name, val in weapon.get("keyword_map", {}).items():
+            kw_map[name] = kw_map.get(name, 0) + val
+        pool = {c: n * minis for c, n in weapon["dice"].items()}
+        outcome = calculate_attack(pool, kw_map, attack_surge=unit.get("surge", {}).get("attack"),
+                                   aims=aims, cover=cover,
+                                   defense_die=defender.get("defense", "White"),
+                                   defense_surge=defender.get("surge", {}).get("defense") == "block",
+                                   target_keywords=target_kw)
+        if best is None or outcome.expected_wounds > best_outcome.expected_wounds:
+            best, best_outcome = (weapon, kw_map), outcome
+
+    weapon, kw_map = best if best else ({"name": "-", "dice": {}}, dict(unit.get("keyword_map", {})))
+    return {
+        "name": unit["name"],
+        "points": unit.get("points", 0),
+        "hp": unit.get("hp", 1),
+        "minis": minis,
+        "courage": courage_value(unit),
+        "defense": unit.get("defense", "White"),
+        "defense_surge": unit.get("surge", {}).get("defense") == "block",
+        "attack_surge": unit.get("surge", {}).get("attack"),
+        "weapon": weapon["name"],
+        "dice": {c: n for c, n in weapon["dice"].items() if n > 0},
+        "keywords": kw_map,
+        "unit_keywords": dict(unit.get("keyword_map", {})),
+    }
+
+
+def resolve_attacks(engine, pools, attacker, target, aims, cover=0, dodges=0):
+    """
+    Vektorisierte Angriffsauflösung für n Angriffe (Reihenfolge wie roll_attack
+    im Game Companion). pools: {Farbe: Array (n,)}, aims: Array (n,).
+    Rückgabe: (Wunden, Niederhalten) als Arrays (n,).
+    """
+    kw = attacker["keywords"]
+    target_kw = target["unit_keywords"]
+    rng = engine.rng
+
+    counts = engine.roll_attack_pools(pools)
+    crit, hit, surge, blank = (counts[:, i].copy() for i in range(4))
+
+    # ZIELEN: Blanks zuerst, Surges nur ohne Surge-Umwandlung
+    reroll_cap = aims * (2 + kw.get("Precise", 0))
+    if np.any(reroll_cap > 0):
+        rerollable = blank + (0 if attacker["attack_surge"] else surge)
+        k = np.minimum(rerollable, reroll_cap)
+        from_blank = np.minimum(blank, k)
+        surge -= k - from_blank
+
+        # Farben der neu geworfenen Würfel gemäß Pool-Zusammensetzung je Zeile
+        total = sum(pools.values())
+        rerolls, left, share_left = {}, k, np.maximum(total, 1)
+        for color in list(pools)[:-1]:
+            p = np.divide(pools[color], share_left, out=np.zeros(len(k)), where=share_left > 0)
+            rerolls[color] = rng.binomial(left, np.clip(p, 0.0, 1.0))
+            left = left - rerolls[color]
+            share_left = np.maximum(share_left - pools[color], 1)
+        rerolls[list(pools)[-1]] = left
+        re = engine.roll_attack_pools(rerolls)
+        crit += re[:, 0]
+        hit += re[:, 1]
+        surge += re[:, 2]
+
+    critical = kw.get("Critical", 0)
+    if critical:
+        converted = np.minimum(surge, critical)
+        crit += converted
+        surge -= converted
+    if attacker["attack_surge"] == "hit":
+        hit += surge
+    elif attacker["attack_surge"] == "crit":
+        crit += surge
+
+    impact = kw.get("Impact", 0) if "Armor" in target_kw else 0
+    if impact:
+        converted = np.minimum(hit, impact)
+        crit += converted
+        hit -= converted
+
+    total_hits = crit + hit
+    cover_val = 0 if kw.get("Blast", 0) > 0 else max(0, cover - kw.get("Sharpshooter", 0))
+    hit -= np.minimum(hit, cover_val)
+    dodge_val = 0 if kw.get("High Velocity", 0) > 0 else dodges
+    remaining = np.maximum(0, crit + hit - dodge_val)
+
+    defense = engine.roll_defense_batch(target["defense"], remaining)
+    blocks = defense[:, 0] + (defense[:, 1] if target["defense_surge"] else 0)
+    pierce = 0 if "Immune: Pierce" in target_kw else kw.get("Pierce", 0)
+    blocks = np.maximum(0, blocks - pierce)
+    wounds = remaining - np.minimum(blocks, remaining)
+
+    suppression = (total_hits > 0).astype(np.int64) + kw.get("Suppressive", 0)
+    return wounds, suppression
+
+
+def _attack_pools(combatant, alive_minis, suppression, can_attack):
+    """Würfelpool je Zeile: Waffenwürfel x lebende Minis, minus Niederhalten (weiß -> schwarz -> rot)."""
+    pools = {c: np.where(can_attack, n * alive_minis, 0) for c, n in combatant["dice"].items()}
+    reduction = np.minimum(suppression, 2)
+    for color in ("white", "black", "red"):
+        if color in pools:
+            taken = np.minimum(pools[color], reduction)
+            pools[color] = pools[color] - taken
+            reduction = reduction - taken
+    return pools
+
+
+def simulate_chunk(first, second, n, seed, rounds=DEFAULT_ROUNDS, aims=1, cover=0):
+    """
+    Simuliert n Duelle (first greift in jeder Runde zuerst an).
+    Rückgabe: dict mit Histogrammen, die sich über Blöcke aufsummieren lassen.
+    """
+    engine = DiceEngine(seed)
+    sides = [first, second]
+    health = [np.full(n, c["hp"] * c["minis"], dtype=np.int64) for c in sides]
+    supp = [np.zeros(n, dtype=np.int64) for _ in sides]
+    killed_in = [np.zeros(n, dtype=np.int64) for _ in sides]  # 0 = überlebt
+
+    size = max(c["hp"] * c["minis"] for c in sides) + 1
+    result = {
+        "n": n,
+        "first_wounds": [np.zeros(size, dtype=np.int64) for _ in sides],
+        "first_suppression": [np.zeros(8, dtype=np.int64) for _ in sides],
+        "wounds_total": [0, 0],
+        "attacks": [0, 0],
+    }
+
+    for rnd in range(1, rounds + 1):
+        for me, other in ((0, 1), (1, 0)):
+            attacker, target = sides[me], sides[other]
+            if not attacker["dice"]:
+                continue
+            alive = (health[me] > 0) & (health[other] > 0)
+
+            # Aktivierung: Sammeln, dann Panik / Niederhalten prüfen
+            rally = engine.roll_defense_batch("white", supp[me])
+            supp[me] -= rally[:, 0] + rally[:, 1]
+            panicked = supp[me] >= 2 * attacker["courage"]
+            suppressed = supp[me] >= attacker["courage"]
+            can_attack = alive & ~panicked
+            my_aims = np.where(suppressed, max(0, aims - 1), aims)
+
+            alive_minis = -(-health[me] // attacker["hp"])
+            pools = _attack_pools(attacker, alive_minis, supp[me], can_attack)
+            wounds, suppression = resolve_attacks(engine, pools, attacker, target, my_aims, cover)
+            wounds = np.where(can_attack, np.minimum(wounds, health[other]), 0)
+            suppression = np.where(can_attack, suppression, 0)
+
+            if rnd == 1:
+                # Erster Angriff jeder Seite (für first immer mit voller Stärke)
+                result["first_wounds"][me] += np.bincount(wounds[can_attack], minlength=size)[:size]
+                result["first_suppression"][me] += np.bincount(np.minimum(suppression[can_attack], 7), minlength=8)
+            result["wounds_total"][me] += int(wounds.sum())
+            result["attacks"][me] += int(can_attack.sum())
+
+            health[other] -= wounds
+            supp[other] += suppression
+            newly_dead = (health[other] <= 0) & (killed_in[other] == 0)
+            killed_in[other][newly_dead] = rnd
+
+        # Endphase: je 1 Niederhalten entfernen
+        for s in supp:
+            np.maximum(s - 1, 0, out=s)
+
+    # ttk[i][r] = Anzahl Duelle, in denen der Gegner von Seite i in Runde r fiel (r=0: überlebt)
+    result["ttk"] = [np.bincount(killed_in[other], minlength=rounds + 1) for other in (1, 0)]
+    return result
+
+
+def merge_results(parts):
+    """Summiert die Histogramme mehrerer Blöcke."""
+    merged = None
+    for part in parts:
+        if merged is None:
+            merged = {k: (list(v) if isinstance(v, list) else v) for k, v in part.items()}
+            continue
+        merged["n"] += part["n"]
+        for key in ("first_wounds", "first_suppression", "ttk"):
+            merged[key] = [a + b for a, b in zip(merged[key], part[key])]
+        for key in ("wounds_total", "attacks"):
+            merged[key] = [a + b for a, b in zip(merged[key], part[key])]
+    return merged
+
+
+def summarize(first, second, result):
+    """Kennzahlen eines Duells aus Sicht von first (Angreifer)."""
+    n = result["n"]
+    wounds = result["first_wounds"][0]
+    attacks = max(1, int(wounds.sum()))
+    mean_wounds = float((np.arange(len(wounds)) * wounds).sum() / attacks)
+    ttk = result["ttk"][0]
+    kills = ttk[1:].cumsum()
+    median_ttk = next((r + 1 for r, k in enumerate(kills) if k >= n / 2), None)
+    supp_hist = result["first_suppression"][0] / attacks
+    return {
+        "attacker": first["name"],
+        "weapon": first["weapon"],
+        "defender": second["name"],
+        "points": first["points"],
+        "wounds_per_attack": mean_wounds,
+        "wounds_per_100_points": mean_wounds / first["points"] * 100 if first["points"] else 0.0,
+        "median_ttk": median_ttk,
+        "kill_chance": float(kills[-1] / n),
+        "loss_chance": float(result["ttk"][1][1:].sum() / n),
+        "suppression": [float(p) for p in supp_hist],
+    }
+
+
+def load_side(spec, db):
+    """
+    Einheiten einer Seite laden: "Fraktion:Einheitenname", Pfad zu einer
+    gespeicherten Armee (JSON) oder ein Fraktionsname (alle Einheiten des Katalogs).
+    """
+    if spec.lower().endswith(".json") and os.path.exists(spec):
+        data, missing = load_army_file(spec, db)
+        for text in missing:
+            logging.warning(f"Nicht im Katalog: {text}")
+        units = []
+        for item in data.get("army", []):
+            db_unit = db.get_unit(data.get("faction"), item["name"])
+            if db_unit:
+                # Gespeicherte Punkte/Minis (inkl. Upgrades) überschreiben die Basiswerte
+                units.append({**db_unit, **item, "keyword_map": db_unit.get("keyword_map", {})})
+            else:
+                logging.warning(f"Einheit {item['name']} nicht in DB gefunden.")
+        return units
+
+    if ":" in spec:
+        faction, name = spec.split(":", 1)
+        unit = db.get_unit(faction.strip(), name.strip())
+        if not unit:
+            raise ValueError(f"Einheit nicht gefunden: {spec}")
+        return [unit]
+
+    if spec in db.units:
+        return list(db.units[spec])
+    raise ValueError(f"Unbekannte Seite: {spec} (erwartet 'Fraktion:Einheit', Fraktion oder Armee-JSON)")
+
+
+def run_matchups(side_a, side_b, samples=DEFAULT_SAMPLES, workers=None, seed=None,
+                 rounds=DEFAULT_ROUNDS, aims=1, cover=0, melee=False, progress=None):
+    """
+    Simuliert jede Paarung aus side_a x side_b (side_a greift zuerst an) auf
+    einem Prozess-Pool (workers=1: im aktuellen Prozess). progress(done, total)
+    wird nach jedem Block aufgerufen.
+    Rückgabe: Liste von summarize()-Dicts.
+    """
+    matchups = []
+    for a in side_a:
+        for b in side_b:
+            first = prepare_combatant(a, b, melee, aims, cover)
+            second = prepare_combatant(b, a, melee, aims, cover)
+            if first["dice"]:
+                matchups.append((first, second))
+
+    chunks = [min(CHUNK_SIZE, samples - start) for start in range(0, samples, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(matchups) * len(chunks))
+    parts = [[] for _ in matchups]
+    total, done = len(matchups) * len(chunks), 0
+
+    jobs = []
+    for m, (first, second) in enumerate(matchups):
+        for c, size in enumerate(chunks):
+            chunk_seed = int(seeds[m * len(chunks) + c].generate_state(1)[0])
+            jobs.append((m, (first, second, size, chunk_seed, rounds, aims, cover)))
+
+    def collect(m, part):
+        nonlocal done
+        parts[m].append(part)
+        done += 1
+        if progress:
+            progress(done, total)
+
+    if workers == 1:
+        for m, job in jobs:
+            collect(m, simulate_chunk(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(simulate_chunk, *job): m for m, job in jobs}
+            for fut in as_completed(futures):
+                collect(futures[fut], fut.result())
+
+    return [summarize(first, second, merge_results(parts[m])) for m, (first, second) in enumerate(matchups)]
+
+
+def format_report(rows):
+    """Tabellarische Textausgabe, sortiert nach Wunden pro 100 Punkte."""
+    lines = [f"{'Angreifer':<32} {'Waffe':<24} {'Ziel':<32} {'Pkt':>4} {'Ø W':>5} "
+             f"{'W/100P':>7} {'TTK':>4} {'Kill%':>6} {'Verl%':>6}  Niederhalten 0/1/2/3+"]
+    for r in sorted(rows, key=lambda r: r["wounds_per_100_points"], reverse=True):
+        supp = r["suppression"] + [0.0] * 4
+        supp_text = "/".join(f"{p * 100:.0f}" for p in supp[:3] + [sum(supp[3:])])
+        ttk = r["median_ttk"] if r["median_ttk"] is not None else "-"
+        lines.append(f"{r['attacker'][:32]:<32} {r['weapon'][:24]:<24} {r['defender'][:32]:<32} "
+                     f"{r['points']:>4} {r['wounds_per_attack']:>5.2f} {r['wounds_per_100_points']:>7.2f} "
+                     f"{ttk:>4} {r['kill_chance'] * 100:>5.1f}% {r['loss_chance'] * 100:>5.1f}%  {supp_text}")
+    return "\n".join(lines)
+
+
+def write_csv(rows, path):
+    fields = ["attacker", "weapon", "defender", "points", "wounds_per_attack",
+              "wounds_per_100_points", "median_ttk", "kill_chance", "loss_chance", "suppression"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({**r, "suppression": " ".join(f"{p:.4f}" for p in r["suppression"])})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte-Carlo-Simulation von Einheiten-Duellen (SW Legion)")
+    parser.add_argument("side_a", help="'Fraktion:Einheit', Fraktion (alle Einheiten) oder Armee-JSON")
+    parser.add_argument("side_b", help="'Fraktion:Einheit', Fraktion (alle Einheiten) oder Armee-JSON")
+    parser.add_argument("-n", "--samples", type=int, default=DEFAULT_SAMPLES, help="Duelle pro Paarung")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed für reproduzierbare Läufe")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Maximale Runden pro Duell")
+    parser.add_argument("--aims", type=int, default=1, help="Zielmarker pro Angriff")
+    parser.add_argument("--cover", type=int, default=0, help="Deckung des Ziels (0-2)")
+    parser.add_argument("--melee", action="store_true", help="Nahkampfwaffen statt Fernkampf")
+    parser.add_argument("--csv", help="Ergebnisse zusätzlich als CSV speichern")
+    args = parser.parse_args(argv)
+
+    db = LegionDatabase.shared()
+    try:
+        side_a, side_b = load_side(args.side_a, db), load_side(args.side_b, db)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.time()
+
+    def progress(done, total):
+        elapsed = time.time() - start
+        eta = elapsed / done * (total - done)
+        print(f"\r[{done}/{total}] {done / total * 100:5.1f}% | {elapsed:.0f}s, noch ~{eta:.0f}s",
+              end="", file=sys.stderr, flush=True)
+
+    rows = run_matchups(side_a, side_b, args.samples, args.workers, args.seed,
+                        args.rounds, args.aims, args.cover, args.melee, progress)
+    print(file=sys.stderr)
+    print(format_report(rows))
+    if args.csv:
+        write_csv(rows, args.csv)
+        print(f"CSV gespeichert: {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,48 +5,31 @@ import random
 import os
 import sys
 import subprocess
+import logging
 
 # Import LegionDatabase with compatibility for both script and package modes
 try:
     from .LegionData import LegionDatabase
     from .LegionUtils import get_writable_path, get_gemini_key
     from .MapRenderer import MapRenderer
+    from .GeminiCache import shared_cache
+    from .GeminiRouter import GeminiBackend, GEMINI_AVAILABLE
 except ImportError:
     try:
         from utilities.LegionData import LegionDatabase
         from utilities.LegionUtils import get_writable_path, get_gemini_key
         from utilities.MapRenderer import MapRenderer
+        from utilities.GeminiCache import shared_cache
+        from utilities.GeminiRouter import GeminiBackend, GEMINI_AVAILABLE
     except ImportError:
         from LegionData import LegionDatabase
         from LegionUtils import get_writable_path, get_gemini_key
         from MapRenderer import MapRenderer
+        from GeminiCache import shared_cache
+        from GeminiRouter import GeminiBackend, GEMINI_AVAILABLE
 
 from PIL import Image, ImageTk, ImageDraw, ImageFont
 
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
-
-# Gemini SDK Setup
-import logging
-try:
-    from google import genai
-    GEMINI_AVAILABLE = True
-    GEMINI_VERSION = 2
-    logging.info("MissionBuilder: Using google-genai (v2) - SUCCESS")
-except ImportError as e:
-    logging.error(f"MissionBuilder: google-genai import failed: {e}")
-    try:
-        import google.generativeai as genai
-        GEMINI_AVAILABLE = True
-        GEMINI_VERSION = 1
-        logging.info("MissionBuilder: Using google.generativeai (v1) - SUCCESS")
-    except ImportError as e2:
-        logging.error(f"MissionBuilder: google.generativeai import failed: {e2}")
-        GEMINI_AVAILABLE = False
-        GEMINI_VERSION = 0
 
 class LegionMissionGenerator:
     def __init__(self, root):
@@ -63,8 +46,9 @@ class LegionMissionGenerator:
         except:
             pass
 
-        self.db = LegionDatabase()
+        self.db = LegionDatabase.shared()
         self.api_key = self.load_api_key()
+        self.gemini_backend = None  # wird bei der ersten Anfrage erzeugt
         self.current_scenario_text = ""
         
         # Musik-Einstellungen
@@ -924,8 +908,8 @@ class LegionMissionGenerator:
         return prompt
 
     def generate_scenario_with_gemini(self):
-        if not GEMINI_AVAILABLE and not REQUESTS_AVAILABLE:
-            messagebox.showerror("Fehler", "Weder google-genai noch requests sind verfügbar.")
+        if not GEMINI_AVAILABLE:
+            messagebox.showerror("Fehler", "Keine Gemini-Anbindung verfügbar (google-genai, google-generativeai oder requests installieren).")
             return
 
         if not self.api_key:
@@ -942,113 +926,11 @@ class LegionMissionGenerator:
         self.root.update()
 
         try:
-            text_content = ""
-            if GEMINI_VERSION == 2:
-                # Use new SDK
-                client = genai.Client(api_key=self.api_key)
-                models_to_try = ['gemini-3-flash-preview', 'gemini-3-pro-preview', 'gemini-2.5-flash', 'gemini-2.0-flash']
-                response = None
-                last_err = None
-
-                for model_name in models_to_try:
-                    try:
-                        logging.info(f"Gemini (v2): Trying model {model_name}")
-                        response = client.models.generate_content(
-                            model=model_name,
-                            contents=[prompt]
-                        )
-                        if response:
-                            logging.info(f"Gemini (v2): Success with {model_name}")
-                            text_content = response.text
-                            break
-                    except Exception as e:
-                        logging.warning(f"Gemini (v2): Failed with {model_name}: {e}")
-                        last_err = e
-                
-                if not text_content:
-                    if last_err:
-                        raise last_err
-                    else:
-                        raise Exception("No response from Gemini (v2)")
-                
-            elif GEMINI_VERSION == 1:
-                # Use old SDK - Try to use 2.0 or just 1.5 if that's all V1 supports, but 1.5 is 404ing.
-                # Attempt to use newer names with V1 if possible
-                genai.configure(api_key=self.api_key)
-                
-                # List of potential models for V1
-                v1_models = ['gemini-2.0-flash', 'gemini-1.5-flash-latest', 'gemini-1.5-pro']
-                model = None
-                
-                for m_name in v1_models:
-                    try:
-                        logging.info(f"Gemini (v1): Trying model {m_name}")
-                        model = genai.GenerativeModel(m_name)
-                        response = model.generate_content(prompt)
-                        text_content = response.text
-                        logging.info(f"Gemini (v1): Success with {m_name}")
-                        break
-                    except Exception as e:
-                         logging.warning(f"Gemini (v1): Failed with {m_name}: {e}")
-
-                if not text_content:
-                     # Fallback to the original one just in case
-                     model = genai.GenerativeModel('gemini-1.5-flash')
-                     response = model.generate_content(prompt)
-                     text_content = response.text
-                
-            elif REQUESTS_AVAILABLE:
-                # Fallback to REST API - Try multiple models
-                # Validated models from API listing (Feb 2026)
-                models = ["gemini-3-flash-preview", "gemini-3-pro-preview", "gemini-2.5-flash", "gemini-2.0-flash"]
-                success = False
-                
-                logging.info(f"MissionBuilder: Starting REST API fallback with models: {models}")
-                
-                for m in models:
-                    # Construct URL - handle whether model string already contains 'models/' or not
-                    if m.startswith("models/"):
-                        model_path = m
-                    else:
-                        model_path = f"models/{m}"
-                        
-                    url = f"https://generativelanguage.googleapis.com/v1beta/{model_path}:generateContent?key={self.api_key}"
-                    headers = {'Content-Type': 'application/json'}
-                    data = {
-                        "contents": [{
-                            "parts": [{"text": prompt}]
-                        }]
-                    }
-                    try:
-                        msg = f"\nVersuche Modell: {m}..."
-                        self.txt_output.insert(tk.END, msg)
-                        print(f"DEBUG: {msg.strip()}")
-                        logging.info(f"MissionBuilder: Trying model {m}")
-                        
-                        self.root.update()
-                        response = requests.post(url, headers=headers, json=data)
-                        
-                        if response.status_code == 200:
-                            result = response.json()
-                            text_content = result['candidates'][0]['content']['parts'][0]['text']
-                            success = True
-                            logging.info(f"MissionBuilder: Success with model {m}")
-                            print(f"DEBUG: Success with model {m}")
-                            break
-                        else:
-                            warn_msg = f"Model {m} failed: {response.status_code} - {response.text}"
-                            logging.warning(warn_msg)
-                            print(f"DEBUG: {warn_msg}")
-                    except Exception as e:
-                        logging.error(f"MissionBuilder: Exception for {m}: {e}")
-                        print(f"DEBUG: Exception for {m}: {e}")
-                        continue
-                        
-                if not success:
-                     err_msg = f"\nAlle Modelle fehlgeschlagen. Letzter Status: {response.status_code if 'response' in locals() else 'Unknown'}"
-                     self.txt_output.insert(tk.END, err_msg)
-                     logging.error(f"MissionBuilder: All fallback models failed.")
-                     return
+            # Gemeinsamer Client: Cache (auch offline), dann Modelle in Router-Reihenfolge
+            if self.gemini_backend is None:
+                self.gemini_backend = GeminiBackend(self.api_key, cache=shared_cache())
+            text_content = self.gemini_backend.generate(prompt)
+            logging.info(shared_cache().summary())
 
             # Display Result
             self.current_scenario_text = text_content
@@ -1056,6 +938,7 @@ class LegionMissionGenerator:
             self.insert_formatted_text(self.txt_output, text_content)
 
         except Exception as e:
+            logging.error(f"MissionBuilder: Gemini request failed: {e}")
             self.txt_output.insert(tk.END, f"\nFehler bei Gemini Anfrage: {e}")
 
     def create_music_section(self, parent):
@@ -0,0 +1,196 @@
+"""
+Dauerhafte Phasen-Panels für den mittleren Bereich des Game Companion.
+
+Die Ansichten, die in jeder Aktivierung erscheinen (Zug-Auswahl und aktive
+Einheit), werden einmal aufgebaut und danach nur noch ein-/ausgeblendet und
+mit neuen Texten/Befehlen versehen. Seltene Ansichten (Aufstellung,
+Kommandophase, Endphase) werden weiterhin frei in den Bereich gezeichnet;
+PanelStack.clear() entfernt diese Widgets, lässt die Panels aber bestehen.
+"""
+import tkinter as tk
+
+
+class PanelStack:
+    """Verwaltet Panels in einem Container, von denen höchstens eines sichtbar ist."""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self._factories = {}
+        self.panels = {}
+        self.current = None
+
+    def register(self, name, factory):
+        """factory(parent) baut das Panel (Objekt mit .frame) beim ersten Anzeigen."""
+        self._factories[name] = factory
+
+    def get(self, name):
+        panel = self.panels.get(name)
+        if panel is None:
+            panel = self.panels[name] = self._factories[name](self.parent)
+        return panel
+
+    def clear(self):
+        """Frei gezeichnete Widgets zerstören, Panels nur ausblenden."""
+        keep = {str(p.frame) for p in self.panels.values()}
+        for widget in self.parent.winfo_children():
+            if str(widget) in keep:
+                widget.pack_forget()
+            else:
+                widget.destroy()
+        self.current = None
+
+    def show(self, name):
+        """Panel anzeigen (alles andere im Container verschwindet)."""
+        panel = self.get(name)
+        if self.current is not panel:
+            self.clear()
+            panel.frame.pack(fill="both", expand=True)
+            self.current = panel
+        return panel
+
+
+class TurnPanel:
+    """Aktivierungsphase: wer am Zug ist, Pool-Info, Ziehen oder offene Befehle."""
+
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent)
+        self.lbl_round = tk.Label(self.frame, font=("Segoe UI", 16, "bold"))
+        self.lbl_round.pack(pady=10)
+        self.lbl_turn = tk.Label(self.frame, font=("Segoe UI", 20, "bold"))
+        self.lbl_turn.pack(pady=10)
+        self.lbl_info = tk.Label(self.frame, bg="#eee", padx=10)
+        self.lbl_info.pack(pady=5)
+
+        # Menschlicher Zug: Ziehen oder Einheit mit offenem Befehl wählen
+        self.f_human = tk.Frame(self.frame)
+        self.lbl_options = tk.Label(self.f_human, font=("bold"))
+        self.lbl_options.pack(pady=5)
+        self.btn_draw = tk.Button(self.f_human, text="Vom Stapel ziehen (Zufall)", bg="#FF9800", fg="white",
+                                  font=("bold"), width=25)
+        self.btn_draw.pack(pady=5)
+        self.lbl_face_up = tk.Label(self.f_human, text="--- Wähle Einheit (Offener Befehl) ---")
+        self.f_units = tk.Frame(self.f_human)
+        self.unit_buttons = []
+
+        # AI-Zug
+        self.lbl_ai = tk.Label(self.frame, text="AI denkt nach...", font=("italic"))
+
+    def update(self, round_number, turn_text, turn_color, info, human, options_text="",
+               draw_command=None, can_draw=False, units=()):
+        """
+        units: Liste von (Text, Befehl) für Einheiten mit offenem Befehl.
+        Buttons werden wiederverwendet, überzählige nur ausgeblendet.
+        """
+        self.lbl_round.config(text=f"RUNDE {round_number}: Aktivierungsphase")
+        self.lbl_turn.config(text=turn_text, fg=turn_color)
+        self.lbl_info.config(text=info)
+
+        if not human:
+            self.f_human.pack_forget()
+            self.lbl_ai.pack(pady=20)
+            return
+        self.lbl_ai.pack_forget()
+        self.f_human.pack(pady=20)
+        self.lbl_options.config(text=options_text)
+        self.btn_draw.config(command=draw_command, state=tk.NORMAL if can_draw else tk.DISABLED)
+
+        units = list(units)
+        if units:
+            self.lbl_face_up.pack(pady=10)
+            self.f_units.pack(fill="x")
+        else:
+            self.lbl_face_up.pack_forget()
+            self.f_units.pack_forget()
+        while len(self.unit_buttons) < len(units):
+            self.unit_buttons.append(tk.Button(self.f_units))
+        for i, button in enumerate(self.unit_buttons):
+            if i < len(units):
+                text, command = units[i]
+                button.config(text=text, command=command)
+                button.pack(fill="x", pady=2)
+            else:
+                button.pack_forget()
+
+
+# Aktions-Buttons der aktiven Einheit: (Text, Aktion, Hintergrund)
+ACTION_BUTTONS = (("Bewegung", "Move", "#2196F3"), ("Angriff", "Attack", "#2196F3"),
+                  ("Zielen (Aim)", "Aim", "#2196F3"), ("Ausweichen (Dodge)", "Dodge", "#2196F3"),
+                  ("Bereitschaft", "Standby", "#2196F3"), ("Erholung", "Recover", "#2196F3"),
+                  ("Interaktion", "Interact", "#795548"), ("Nahkampf", "Melee", "#8D6E63"))
+
+
+class ActivationPanel:
+    """
+    Aktive Einheit: Status-Zeile und je nach Modus Aktions-Buttons ("actions"),
+    nur Passen/Beenden ("done"), die AI-Anzeige ("ai") oder nichts (None).
+    """
+
+    def __init__(self, parent, on_action, on_pass, on_end, on_manual):
+        self.frame = tk.Frame(parent)
+        self.lbl_unit = tk.Label(self.frame, font=("Segoe UI", 18, "bold"))
+        self.lbl_unit.pack(pady=10)
+
+        f_status = tk.Frame(self.frame, bg="#eee", pady=5)
+        f_status.pack(fill="x")
+        self.lbl_status = tk.Label(f_status, font=("bold"), bg="#eee")
+        self.lbl_status.pack()
+        self.lbl_panic = tk.Label(f_status, text="PANIK! Keine Aktionen.", fg="red", bg="#eee")
+        self.lbl_suppressed = tk.Label(f_status, text="NIEDERGEHALTEN (-1 Aktion)", fg="orange", bg="#eee")
+
+        self.f_acts = tk.Frame(self.frame)
+        self.f_acts.pack(pady=10)
+
+        # Modus "actions": Raster mit allen Aktionen
+        self.f_actions = tk.Frame(self.f_acts)
+        self.lbl_manual = tk.Label(self.f_actions, text="Manueller Opponent-Modus:", font=("Segoe UI", 12, "bold"),
+                                   fg="orange")
+        self.lbl_manual.grid(row=0, column=0, columnspan=2, pady=5)
+        for i, (text, action, bg) in enumerate(ACTION_BUTTONS):
+            tk.Button(self.f_actions, text=text, command=lambda a=action: on_action(a), bg=bg, fg="white",
+                      font=("Segoe UI", 10), width=15).grid(row=1 + i // 2, column=i % 2, padx=5, pady=5)
+        tk.Button(self.f_actions, text="Einheit Passen", command=on_pass, bg="#FF9800", fg="white",
+                  font=("bold")).grid(row=5, column=0, padx=5, pady=5)
+        tk.Button(self.f_actions, text="Aktivierung Beenden", command=on_end, bg="#F44336", fg="white",
+                  font=("bold")).grid(row=5, column=1, padx=5, pady=5)
+
+        # Modus "done": keine Aktionen mehr
+        self.f_done = tk.Frame(self.f_acts)
+        tk.Button(self.f_done, text="Einheit Passen", command=on_pass, bg="#FF9800", fg="white",
+                  font=("bold")).pack(pady=5)
+        tk.Button(self.f_done, text="Aktivierung Beenden", command=on_end, bg="#F44336", fg="white",
+                  font=("bold")).pack()
+
+        # Modus "ai": AI führt die Aktionen aus
+        self.f_ai = tk.Frame(self.f_acts)
+        tk.Label(self.f_ai, text="🤖 AI denkt nach...", font=("Segoe UI", 14, "bold"), fg="blue").pack(pady=20)
+        tk.Button(self.f_ai, text="AI Überspringen (Manuell übernehmen)", command=on_manual,
+                  bg="#FF5722", fg="white").pack(pady=10)
+
+        self.mode = None
+
+    def update(self, unit_name, color, status_text, panicked=False, suppressed=False, mode="actions",
+               manual_opponent=False):
+        self.lbl_unit.config(text=f"AKTIV: {unit_name}", fg=color)
+        self.lbl_status.config(text=status_text)
+        if panicked:
+            self.lbl_panic.pack(after=self.lbl_status)
+        else:
+            self.lbl_panic.pack_forget()
+        if suppressed:
+            self.lbl_suppressed.pack()
+        else:
+            self.lbl_suppressed.pack_forget()
+
+        if manual_opponent:
+            self.lbl_manual.grid()
+        else:
+            self.lbl_manual.grid_remove()
+
+        frames = {"actions": self.f_actions, "done": self.f_done, "ai": self.f_ai}
+        if mode != self.mode:
+            for name, frame in frames.items():
+                if name == mode:
+                    frame.pack()
+                else:
+                    frame.pack_forget()
+            self.mode = mode
@@ -0,0 +1,145 @@
+"""
+Gemeinsamer Tooltip-Manager für Game Companion und Army Builder.
+
+Ein einziges Tooltip-Fenster pro Hauptfenster wird wiederverwendet (nur
+ein-/ausgeblendet und neu beschriftet). Tooltips erscheinen erst nach einer
+kurzen Hover-Verzögerung; wer die Maus schnell über eine lange Liste zieht,
+löst nur einen einzigen (verspäteten) Aufbau aus. Formatierte Texte werden
+pro Schlüssel (z.B. ("unit", Fraktion, Name)) zwischengespeichert.
+"""
+import tkinter as tk
+from collections import OrderedDict
+
+DELAY_MS = 400        # Hover-Verzögerung bis zum ersten Anzeigen
+SWITCH_DELAY_MS = 60  # Wechsel zwischen Zeilen, während der Tooltip schon sichtbar ist
+CACHE_SIZE = 512
+
+
+class TooltipManager:
+    """Ein wiederverwendbares Tooltip-Fenster mit Verzögerung und Text-Cache."""
+
+    def __init__(self, root, delay=DELAY_MS, switch_delay=SWITCH_DELAY_MS, wraplength=400,
+                 cache_size=CACHE_SIZE):
+        self.root = root
+        self.delay = delay
+        self.switch_delay = switch_delay
+        self.wraplength = wraplength
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.window = None
+        self._label = None
+        self._text = None
+        self._after_id = None
+        self._target = None
+        self.visible = False
+        self.windows_created = 0
+        self.hits = self.misses = 0
+
+    # --- Text-Cache ---
+
+    def cached(self, key, formatter, *args):
+        """formatter(*args) nur beim ersten Mal pro Schlüssel aufrufen (LRU)."""
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        text = self._cache[key] = formatter(*args)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    def clear_cache(self):
+        """z.B. nach dem Neuladen der Datenbank."""
+        self._cache.clear()
+
+    # --- Anbindung an Widgets ---
+
+    def bind(self, widget, text, offset=(20, 20)):
+        """
+        Tooltip für ein Widget. text ist ein fester Text oder eine Funktion ohne
+        Argumente, die erst beim Anzeigen aufgerufen wird (None = kein Tooltip).
+        """
+        def on_enter(event):
+            self.schedule(widget, text, event.x_root + offset[0], event.y_root + offset[1])
+
+        widget.bind("<Enter>", on_enter, add="+")
+        widget.bind("<Leave>", self.hide, add="+")
+        widget.bind("<ButtonPress>", self.hide, add="+")
+
+    def bind_rows(self, tree, row_text, offset=(20, 20)):
+        """Tooltip pro Treeview-Zeile: row_text(item) liefert den Text (oder None)."""
+        def on_motion(event):
+            item = tree.identify_row(event.y)
+            if not item:
+                self.hide()
+                return
+            target = (str(tree), item)
+            if target == self._target:
+                return  # gleiche Zeile: nichts neu planen
+            self.schedule(target, lambda: row_text(item), event.x_root + offset[0], event.y_root + offset[1])
+
+        tree.bind("<Motion>", on_motion, add="+")
+        tree.bind("<Leave>", self.hide, add="+")
+        tree.bind("<Button-1>", self.hide, add="+")
+
+    # --- Anzeigen / Verstecken ---
+
+    def schedule(self, target, text, x, y):
+        """Tooltip verzögert anzeigen; ein neuer Aufruf ersetzt den vorherigen (Debounce)."""
+        self.cancel()
+        self._target = target
+        delay = self.switch_delay if self.visible else self.delay
+        self._after_id = self.root.after(delay, lambda: self.show(text, x, y))
+
+    def show(self, text, x, y):
+        self._after_id = None
+        if callable(text):
+            text = text()
+        if not text:
+            self._withdraw()
+            return
+        window = self._ensure_window()
+        if text != self._text:
+            self._label.config(text=text)
+            self._text = text
+        window.geometry(f"+{x}+{y}")
+        if not self.visible:
+            window.deiconify()
+            window.lift()
+            self.visible = True
+
+    def hide(self, event=None):
+        self.cancel()
+        self._target = None
+        self._withdraw()
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _withdraw(self):
+        if self.visible and self.window is not None:
+            try:
+                self.window.withdraw()
+            except tk.TclError:
+                self.window = None
+        self.visible = False
+
+    def _ensure_window(self):
+        try:
+            if self.window is not None and self.window.winfo_exists():
+                return self.window
+        except tk.TclError:
+            pass
+        self.window = tk.Toplevel(self.root)
+        self.window.wm_overrideredirect(True)
+        self.window.withdraw()
+        self._label = tk.Label(self.window, bg="lightyellow", font=("Arial", 9), wraplength=self.wraplength,
+                               justify="left", relief="solid", borderwidth=1, padx=5, pady=2)
+        self._label.pack()
+        self._text = None
+        self.visible = False
+        self.windows_created += 1
+        return self.window
@@ -0,0 +1,74 @@
+"""
+Inkrementelle Aktualisierung von ttk.Treeview-Listen.
+
+TreeSync merkt sich pro Zeile einen Schlüssel (Item-ID) und die zuletzt
+gezeigten Werte. sync() fügt nur neue Zeilen ein, ändert nur Zeilen mit
+geänderten Werten, löscht entfernte und korrigiert die Reihenfolge - statt
+bei jedem Aufruf alle Zeilen zu löschen und neu einzufügen. Auswahl, Fokus
+und Scroll-Position bleiben dadurch erhalten.
+"""
+
+
+class TreeSync:
+    """Schlüssel-basiertes Zeilenmodell für eine Treeview (nur oberste Ebene)."""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._rows = {}  # Item-ID -> Werte-Tupel
+        self.inserted = self.updated = self.deleted = self.moved = 0
+
+    @staticmethod
+    def _unique_keys(keys):
+        """Doppelte Schlüssel (z.B. zweimal dieselbe Einheit) bekommen ein #n-Suffix."""
+        seen = {}
+        result = []
+        for key in keys:
+            key = str(key)
+            n = seen.get(key, 0)
+            seen[key] = n + 1
+            result.append(key if n == 0 else f"{key}#{n}")
+        return result
+
+    def sync(self, rows):
+        """
+        rows: Iterable von (Schlüssel, Werte). Gibt die Item-IDs in Reihenfolge zurück.
+        """
+        rows = list(rows)
+        keys = self._unique_keys(key for key, _ in rows)
+        wanted = set(keys)
+
+        for key in [k for k in self._rows if k not in wanted]:
+            if self.tree.exists(key):
+                self.tree.delete(key)
+            del self._rows[key]
+            self.deleted += 1
+
+        new_rows = {}
+        for index, (key, (_, values)) in enumerate(zip(keys, rows)):
+            values = tuple(values)
+            old = self._rows.get(key)
+            if old is None:
+                self.tree.insert("", index, iid=key, values=values)
+                self.inserted += 1
+            elif old != values:
+                self.tree.item(key, values=values)
+                self.updated += 1
+            new_rows[key] = values
+        self._rows = new_rows
+
+        keys = tuple(keys)
+        if tuple(self.tree.get_children("")) != keys:
+            for index, key in enumerate(keys):
+                self.tree.move(key, "", index)
+            self.moved += 1
+        return list(keys)
+
+    def values(self, key):
+        return self._rows.get(key)
+
+    def clear(self):
+        """Alle Zeilen entfernen (z.B. beim Fraktionswechsel)."""
+        for key in self._rows:
+            if self.tree.exists(key):
+                self.tree.delete(key)
+        self._rows = {}